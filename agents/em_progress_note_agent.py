@@ -0,0 +1,247 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from agents.models.optimized_pydantic_models import (
+    OptimizedEMProgressNoteInput,
+    get_optimized_progress_note_agent
+)
+from constants import azure_config
+from services.patient_history_service import get_patient_history_repository
+from settings import logger
+from utils.context_extractor import (
+    extract_historical_clinical_context,
+    extract_relevant_intake_context,
+    format_context_for_prompt,
+    log_context_metrics
+)
+from utils.context_packer import pack_context
+from utils.mcp_client import call_mcp_tool
+from utils.rate_limiter import get_model_rate_limiter
+
+# Load environment variables
+load_dotenv()
+
+
+async def fetch_dictation(appointment_id: str) -> Dict[str, Any]:
+    """Fetch the dictation for an appointment from the MCP server ({"dictation": {...}})."""
+    return await call_mcp_tool(
+        tool_name="appointment-dictation",
+        arguments={"appointmentId": appointment_id}
+    )
+
+
+def _normalize_dictations(dictations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Wrap bare dictation objects as {"dictation": {...}}, the shape the context extractor expects."""
+    return [item if isinstance(item, dict) and "dictation" in item else {"dictation": item} for item in dictations]
+
+
+async def _load_input(input_payload) -> Tuple[List[Dict[str, Any]], Dict[str, Any], str]:
+    """
+    Resolve the activity input into (dictations, patient intake, data identifier).
+
+    Accepts either {"dictations": [...], "patient_intake": {...}} or an appointment ID,
+    whose dictation is fetched from the MCP server.
+    """
+    if isinstance(input_payload, dict) and "dictations" in input_payload:
+        dictations = input_payload.get("dictations") or []
+        return (
+            _normalize_dictations(dictations),
+            input_payload.get("patient_intake") or {},
+            f"data_with_{len(dictations)}_dictations"
+        )
+
+    appointment_id = str(input_payload)
+    response = await fetch_dictation(appointment_id)
+    dictations = [response] if isinstance(response, dict) and response.get("dictation") else []
+    intake_data = (response.get("patient_intake") or {}) if isinstance(response, dict) else {}
+    return dictations, intake_data, f"appointment_{appointment_id}"
+
+
+async def _load_historical_context(dictations: List[Dict[str, Any]], patient_id: str, session_id: str) -> Dict[str, Any]:
+    """
+    Historical context from the per-patient history index.
+
+    Only the visits since the last indexed note are scanned, so the cost does not
+    grow with the patient's history. Falls back to rescanning the supplied dictations when the
+    index is disabled or unavailable.
+    """
+    if azure_config.patient_history_enabled and patient_id:
+        try:
+            history = await asyncio.to_thread(
+                get_patient_history_repository().record_dictations, patient_id, dictations
+            )
+            return history.to_historical_context()
+        except Exception as e:
+            logger.warning("⚠️ Patient history index unavailable, rescanning dictations",
+                          session_id=session_id,
+                          error=str(e))
+    return extract_historical_clinical_context(dictations, patient_id)
+
+
+async def main(input_payload) -> dict:
+    """
+    E/M Progress Note Generator Agent
+    Generates a compliant medical progress note based on physician transcription and structured patient information.
+    """
+    start_time = time.perf_counter()
+    session_id = f"progress_note_{str(input_payload)[:50]}"
+
+    try:
+        # Track dictation retrieval time (MCP for appointment IDs, no-op for direct data)
+        retrieval_start = time.perf_counter()
+        dictations, intake_data, data_identifier = await _load_input(input_payload)
+        retrieval_time = time.perf_counter() - retrieval_start
+        session_id = f"progress_note_{data_identifier}"
+
+        logger.debug("🚀 Progress Note Agent: Starting execution",
+                    session_id=session_id,
+                    dictations_count=len(dictations),
+                    has_patient_intake=bool(intake_data),
+                    retrieval_duration_seconds=retrieval_time)
+
+        if not dictations:
+            return {"error": "No dictation data available", "data_identifier": data_identifier}
+
+        # The first dictation is the current visit; all of them provide historical context
+        dictation_data = dictations[0]["dictation"]
+
+        # Extract and parse data from current dictation
+        parsing_start = time.perf_counter()
+        file_content = dictation_data.get("fileContent", {})
+        data = OptimizedEMProgressNoteInput(
+            transcription=file_content.get("data", "") if isinstance(file_content, dict) else str(file_content),
+            patient_name=dictation_data.get("patientName", "Unknown Patient"),
+            patient_id=dictation_data.get("patientId", ""),
+            patient_date_of_birth=dictation_data.get("patientDateOfBirth", ""),
+            date_of_service=dictation_data.get("dateOfService", ""),
+            provider=dictation_data.get("provider", ""),
+            progress_note_type=dictation_data.get("dictationTypeName", "Progress Note"),
+            created_by=dictation_data.get("createdBy", ""),
+            creation_date=dictation_data.get("creationDate", ""),
+            is_new_patient=dictation_data.get("isNewPatient")
+        )
+        parsing_time = time.perf_counter() - parsing_start
+
+        logger.debug("⏱️ Data Extraction & Parsing",
+                    session_id=session_id,
+                    duration_seconds=parsing_time,
+                    process="data_extraction_parsing",
+                    transcription_length=len(data.transcription),
+                    patient_id=data.patient_id)
+
+        # Extract relevant context efficiently - only high and medium priority data
+        context_start = time.perf_counter()
+        intake_context = extract_relevant_intake_context(intake_data)
+        historical_context = await _load_historical_context(dictations, data.patient_id, session_id)
+        context_time = time.perf_counter() - context_start
+        log_context_metrics(intake_context, historical_context, session_id)
+
+        # Prepare prompt with extracted priority data
+        prompt_start = time.perf_counter()
+        packed_context = pack_context(intake_context, historical_context)
+        user_prompt = format_context_for_prompt(
+            intake_context,
+            historical_context,
+            data.transcription,
+            {
+                "patient_name": data.patient_name,
+                "patient_id": data.patient_id,
+                "patient_date_of_birth": data.patient_date_of_birth,
+                "date_of_service": data.date_of_service,
+                "provider": data.provider,
+            },
+            packed_context
+        )
+        prompt_time = time.perf_counter() - prompt_start
+
+        logger.debug("⏱️ Prompt Preparation",
+                    session_id=session_id,
+                    duration_seconds=prompt_time,
+                    process="prompt_preparation",
+                    prompt_length=len(user_prompt),
+                    transcription_length=len(data.transcription),
+                    context_tokens=packed_context.used_tokens,
+                    context_token_budget=packed_context.budget,
+                    context_facts_dropped=len(packed_context.dropped))
+
+        # Track agent initialization time (cached)
+        agent_init_start = time.perf_counter()
+        agent = get_optimized_progress_note_agent()
+        agent_init_time = time.perf_counter() - agent_init_start
+
+        logger.debug("⏱️ Agent Initialization",
+                    session_id=session_id,
+                    duration_seconds=agent_init_time,
+                    process="agent_initialization",
+                    agent_type="optimized_progress_note_generator")
+
+        # Model calls share the worker-wide limiter so large batches queue here instead of hitting 429s
+        rate_limit_start = time.perf_counter()
+        async with get_model_rate_limiter():
+            rate_limit_wait_time = time.perf_counter() - rate_limit_start
+
+            # Track AI model inference time (awaited on the worker's event loop)
+            ai_inference_start = time.perf_counter()
+            ai_result = await agent.run(user_prompt)
+            ai_inference_time = time.perf_counter() - ai_inference_start
+
+        logger.debug("⏱️ AI Model Inference",
+                    session_id=session_id,
+                    duration_seconds=ai_inference_time,
+                    rate_limit_wait_seconds=rate_limit_wait_time,
+                    process="ai_model_inference")
+
+        total_time = time.perf_counter() - start_time
+        logger.debug(f"🎉 Progress Note Agent: Successfully generated note for patient {data.patient_name}",
+                    session_id=session_id,
+                    total_execution_time=total_time)
+
+        return {
+            "progress_note": ai_result.output.model_dump(),
+            "meta": {
+                "session_id": session_id,
+                "agent_type": "optimized_progress_note_generator",
+                "structured_output_enabled": True,
+                "context_enhanced": bool(intake_context or historical_context),
+                "context_packing": {
+                    "strategy": packed_context.strategy,
+                    "token_budget": packed_context.budget,
+                    "used_tokens": packed_context.used_tokens,
+                    "included_facts": len(packed_context.included),
+                    "dropped_facts": packed_context.dropped_summary()
+                },
+                "performance_metrics": {
+                    "total_execution_time": round(total_time, 2),
+                    "dictation_retrieval_time": round(retrieval_time, 2),
+                    "context_extraction_time": round(context_time, 2),
+                    "rate_limit_wait_time": round(rate_limit_wait_time, 2),
+                    "ai_inference_time": round(ai_inference_time, 2),
+                    "measured_at": datetime.now().isoformat()
+                }
+            }
+        }
+
+    except Exception as e:
+        total_time = time.perf_counter() - start_time
+        logger.error("❌ Progress Note Agent: Execution failed",
+                    session_id=session_id,
+                    error=str(e),
+                    total_time_before_error=total_time,
+                    exc_info=True)
+
+        return {
+            "status": "error",
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "performance_metrics": {
+                "session_id": session_id,
+                "total_execution_time": round(total_time, 2),
+                "measured_at": datetime.now().isoformat(),
+                "error_occurred": True
+            },
+            "timestamp": datetime.now().isoformat()
+        }
@@ -5,31 +5,36 @@ from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.azure import AzureProvider
 from dotenv import load_dotenv
 
+from utils.http_client import get_shared_http_client
+
 load_dotenv()
 
 
 @lru_cache(maxsize=None)
 def get_optimized_azure_openai_model(model="gpt-5") -> OpenAIModel:
     """Get configured Azure OpenAI model instance with optimized settings"""
-    
+
     if model not in ["gpt-5-mini", "gpt-5-nano"]:
         endpoint = "https://ptm-me2x3s2u-swedencentral.cognitiveservices.azure.com/"
     else:
         endpoint = "https://audit-tool-agent.cognitiveservices.azure.com/"
     api_version = '2024-12-01-preview'
-    
+    api_key = os.getenv("AZURE_OPENAI_KEY")
+
     if not api_key:
         raise ValueError("AZURE_OPENAI_KEY environment variable is required")
     if not endpoint:
         raise ValueError("AZURE_OPENAI_ENDPOINT environment variable is required")
     if not api_version:
         raise ValueError("AZURE_OPENAI_API_VERSION environment variable is required")
-    
+
+    # All providers share one pooled client so concurrent activities reuse warm connections
     return OpenAIModel(
         model,
         provider=AzureProvider(
-            azure_endpoint=endpoint, 
-            api_version=api_version, 
-            api_key=api_key
+            azure_endpoint=endpoint,
+            api_version=api_version,
+            api_key=api_key,
+            http_client=get_shared_http_client()
         )
-    )
\ No newline at end of file
+    )
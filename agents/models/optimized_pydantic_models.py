@@ -1,45 +1,32 @@
 import os
-from typing import List, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 from functools import lru_cache
 
-import logfire
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 from dotenv import load_dotenv
 
 from settings import logger
 from agents.models.azure_openai_model import get_optimized_azure_openai_model
+from utils.guidelines_cache import (
+    GuidelinesSnapshot,
+    get_guidelines_snapshot,
+    subscribe_guidelines_changes,
+)
+from utils.guidelines_index import TOPIC_MDM_COMPLEXITY
 
 load_dotenv()
 
-logfire.configure()
-logfire.instrument_pydantic_ai()
 
-try:
-    from utils.guidelines_cache import (
-        get_em_coding_guidelines, 
-        get_specific_code_requirements, 
-        get_mdm_complexity_guide
-    )
-    
-    _EM_CODING_GUIDELINES = get_em_coding_guidelines()
-    _SPECIFIC_CODE_REQUIREMENTS_99212 = get_specific_code_requirements('99212')
-    _SPECIFIC_CODE_REQUIREMENTS_99213 = get_specific_code_requirements('99213')
-    _SPECIFIC_CODE_REQUIREMENTS_99214 = get_specific_code_requirements('99214')
-    _SPECIFIC_CODE_REQUIREMENTS_99215 = get_specific_code_requirements('99215')
-    _MDM_COMPLEXITY_GUIDE = get_mdm_complexity_guide()
-    
-    logger.debug("Full guidelines loaded and cached successfully for optimized agents")
-    
-except ImportError as e:
-    logger.warning(f"Guidelines cache not available: {e}")
-    _EM_CODING_GUIDELINES = None
-    _SPECIFIC_CODE_REQUIREMENTS_99212 = None
-    _SPECIFIC_CODE_REQUIREMENTS_99213 = None
-    _SPECIFIC_CODE_REQUIREMENTS_99214 = None
-    _SPECIFIC_CODE_REQUIREMENTS_99215 = None
-    _MDM_COMPLEXITY_GUIDE = None
+@lru_cache(maxsize=None)
+def _configure_instrumentation() -> None:
+    """Configure logfire tracing of pydantic-ai once, right before the first agent is built."""
+    import logfire
+
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
 
 
 class OptimizedEMInput(BaseModel):
@@ -112,24 +99,42 @@ class OptimizedEMCodeAssignment(BaseModel):
     justification: str = Field(description="Brief clinical justification for the assigned code based on MDM criteria")
 
 
-class CodeJustification(BaseModel):
-    """Structured justification for E/M code assignment"""
-    supportedBy: str = Field(description="Required. Primary support statement, typically 'Supported by [level] MDM per AMA 2025 E/M guidelines.'")
+# Auditor model output schemas: only the fields that need the model's judgement.
+# utils.audit_fields derives the rest (supportedBy, tier). Docstrings are sent to the model as schema descriptions.
+class JustificationJudgement(BaseModel):
+    """Structured justification for the final E/M code"""
     documentationSummary: List[str] = Field(description="Required. List of key documentation points supporting the code")
     mdmConsiderations: List[str] = Field(description="Required. List of Medical Decision Making considerations")
     complianceAlerts: Optional[List[str]] = Field(description="Optional. List of compliance alerts or warnings", default=None)
 
 
-class ConfidenceAssessment(BaseModel):
-    """Confidence assessment with score, tier, and detailed reasoning"""
+class CodeJustification(JustificationJudgement):
+    """Structured justification for E/M code assignment"""
+    supportedBy: str = Field(description="Required. Primary support statement, typically 'Supported by [level] MDM per AMA 2025 E/M guidelines.'")
+
+
+class ConfidenceJudgement(BaseModel):
+    """Confidence assessment with score and detailed reasoning"""
     score: int = Field(description="Confidence score from 0 to 100", ge=0, le=100)
-    tier: str = Field(description="Confidence tier based on score (Very High, High, Moderate, Low, Very Low)")
     mdmAssignmentReason: List[str] = Field(description="List of specific reasons supporting the MDM level assignment", default_factory=list)
     documentationEnhancementOpportunities: List[str] = Field(description="List of specific opportunities to enhance documentation quality", default_factory=list)
     score_deductions: List[str] = Field(description="Specific reasons for score reductions, each starting with '- Score reduced by X points:' format", default_factory=list)
     quick_tip: Optional[str] = Field(description="Optional short, friendly tip to help the provider improve future documentation", default=None)
 
 
+class ConfidenceAssessment(ConfidenceJudgement):
+    """Confidence assessment with score, tier, and detailed reasoning"""
+    tier: str = Field(description="Confidence tier based on score (Very High, High, Moderate, Low, Very Low)")
+
+
+class OptimizedEMAuditJudgement(BaseModel):
+    """E/M audit result"""
+    audit_flags: List[str] = Field(description="List of compliance risks or missing statements")
+    final_assigned_code: str = Field(description="Final E/M code after audit review")
+    final_justification: JustificationJudgement = Field(description="Structured final justification after audit")
+    confidence: ConfidenceJudgement = Field(description="Confidence score with detailed reasoning and deductions")
+
+
 class OptimizedEMAuditResult(BaseModel):
     """Optimized response schema for E/M audit result - focused output only"""
     audit_flags: List[str] = Field(description="List of compliance risks or missing statements")
@@ -144,6 +149,12 @@ class OptimizedEMEnhancementOutput(BaseModel):
     assigned_code: str
     justification: str
     is_new_patient: Optional[bool] = None
+    patient_id: Optional[str] = None
+    patient_name: Optional[str] = None
+    provider: Optional[str] = None
+    date_of_service: Optional[str] = None
+    guideline_version: Optional[str] = None
+    mdm_prescore: Optional[Dict] = None
 
 
 class OptimizedEMAuditOutput(BaseModel):
@@ -154,45 +165,93 @@ class OptimizedEMAuditOutput(BaseModel):
     final_justification: CodeJustification
     confidence: ConfidenceAssessment
     is_new_patient: Optional[bool] = None
+    guideline_version: Optional[str] = None
 
 
 
 
 
-_optimized_em_enhancement_agent = None
-_optimized_em_auditor_agent = None
 _optimized_progress_note_agent = None
 
-@lru_cache(maxsize=None)
-def get_optimized_em_enhancement_agent() -> Agent:
-    """Get or create the optimized EM enhancement agent with guidelines-enhanced prompt"""
-    global _optimized_em_enhancement_agent
-    if _optimized_em_enhancement_agent is None:
-        logger.debug("Creating optimized EM enhancement agent instance")
-        
-        enhanced_prompt = f"""E/M coding specialist. Analyze medical note and assign appropriate code (99212-99215).
+# Guideline-dependent agents, keyed by name and rebuilt lazily when the guidelines version changes
+_guideline_agents: Dict[str, Tuple[str, Agent]] = {}
+_guideline_agents_lock = threading.Lock()
+
+
+def _get_guideline_agent(
+    name: str, build: Callable[[GuidelinesSnapshot], Agent], snapshot: Optional[GuidelinesSnapshot] = None
+) -> Agent:
+    """
+    Return the cached agent for a guidelines version (default: the current one), building it on first use.
+
+    Callers that stamp results with a version pass the snapshot they read it from, so a
+    hot reload in between cannot hand them an agent built from another version.
+    """
+    current = get_guidelines_snapshot()
+    snapshot = snapshot or current
+    cached = _guideline_agents.get(name)
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+
+    if snapshot.version != current.version:
+        # Superseded while the caller held it: build once for this call, keep the cache current
+        logger.debug(f"Creating optimized {name} agent for a superseded guidelines version",
+                    guideline_version=snapshot.version[:12])
+        _configure_instrumentation()
+        return build(snapshot)
+
+    with _guideline_agents_lock:
+        cached = _guideline_agents.get(name)
+        if cached is None or cached[0] != snapshot.version:
+            logger.debug(f"Creating optimized {name} agent instance", guideline_version=snapshot.version[:12])
+            _configure_instrumentation()
+            _guideline_agents[name] = (snapshot.version, build(snapshot))
+            logger.debug(f"Optimized {name} agent created successfully")
+        return _guideline_agents[name][1]
+
+
+def _invalidate_guideline_agents(snapshot: GuidelinesSnapshot, previous: Optional[GuidelinesSnapshot]) -> None:
+    """Drop agents built from a superseded guidelines version."""
+    with _guideline_agents_lock:
+        _guideline_agents.clear()
+    logger.debug("Guideline-dependent agents invalidated",
+                guideline_version=snapshot.version[:12],
+                previous_version=previous.version[:12] if previous else None)
+
 
-EMBEDDED GUIDELINES:
+subscribe_guidelines_changes(_invalidate_guideline_agents)
+
+
+def _embedded_guidelines(snapshot: GuidelinesSnapshot) -> str:
+    """Render the guidelines block shared by the enhancement and auditor system prompts."""
+    index = snapshot.get_index()
+    return f"""EMBEDDED GUIDELINES:
 
 === E/M CODING GUIDELINES ===
-{_EM_CODING_GUIDELINES}
+{snapshot.guidelines}
 
 === SPECIFIC CODE REQUIREMENTS ===
 
 99212 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99212}
+{index.code_requirements('99212')}
 
 99213 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99213}
+{index.code_requirements('99213')}
 
 99214 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99214}
+{index.code_requirements('99214')}
 
 99215 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99215}
+{index.code_requirements('99215')}
 
 === MDM COMPLEXITY GUIDE ===
-{_MDM_COMPLEXITY_GUIDE}
+{index.topic(TOPIC_MDM_COMPLEXITY)}"""
+
+
+def _build_em_enhancement_agent(snapshot: GuidelinesSnapshot) -> Agent:
+    enhanced_prompt = f"""E/M coding specialist. Analyze medical note and assign appropriate code (99212-99215).
+
+{_embedded_guidelines(snapshot)}
 
 METHODOLOGY:
 1. Analyze the provided medical note against the embedded AMA 2025 guidelines above
@@ -205,46 +264,18 @@ KEY ANALYSIS AREAS:
 3. Medical necessity and clinical complexity
 
 RESPONSE: Return assigned_code and clinical justification based on embedded AMA guidelines."""
-        
-        _optimized_em_enhancement_agent = Agent(
-            model=get_optimized_azure_openai_model(), 
-            # model=get_optimized_azure_openai_model(model="gpt-5-mini"), 
-            result_type=OptimizedEMCodeAssignment, output_retries=1, system_prompt=enhanced_prompt
-        )
-        logger.debug("Optimized EM enhancement agent created successfully")
-    return _optimized_em_enhancement_agent
-
-
-@lru_cache(maxsize=None)
-def get_optimized_em_auditor_agent() -> Agent:
-    """Get or create the optimized EM auditor agent with guidelines-enhanced prompt"""
-    global _optimized_em_auditor_agent
-    if _optimized_em_auditor_agent is None:
-        logger.debug("Creating optimized EM auditor agent instance")
-        
-        enhanced_audit_prompt = f"""Medical coding auditor. Review enhancement agent's code assignment and provide final audit results.
-
-EMBEDDED GUIDELINES:
-
-=== E/M CODING GUIDELINES ===
-{_EM_CODING_GUIDELINES}
-
-=== SPECIFIC CODE REQUIREMENTS ===
 
-99212 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99212}
-
-99213 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99213}
+    return Agent(
+        model=get_optimized_azure_openai_model(), 
+        # model=get_optimized_azure_openai_model(model="gpt-5-mini"), 
+        result_type=OptimizedEMCodeAssignment, output_retries=1, system_prompt=enhanced_prompt
+    )
 
-99214 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99214}
 
-99215 Requirements:
-{_SPECIFIC_CODE_REQUIREMENTS_99215}
+def _build_em_auditor_agent(snapshot: GuidelinesSnapshot) -> Agent:
+    enhanced_audit_prompt = f"""Medical coding auditor. Review enhancement agent's code assignment and provide final audit results.
 
-=== MDM COMPLEXITY GUIDE ===
-{_MDM_COMPLEXITY_GUIDE}
+{_embedded_guidelines(snapshot)}
 
 AUDIT METHODOLOGY:
 1. Use the embedded AMA 2025 guidelines above to verify compliance with current standards
@@ -278,13 +309,21 @@ RESPONSE FORMAT:
 - confidence: Score with specific deductions and tips
 
 Always reference the embedded AMA 2025 guidelines in your audit findings."""
-        
-        _optimized_em_auditor_agent = Agent(
-            model=get_optimized_azure_openai_model(), 
-            result_type=OptimizedEMAuditResult, output_retries=1, system_prompt=enhanced_audit_prompt
-        )
-        logger.debug("Optimized EM auditor agent created successfully")
-    return _optimized_em_auditor_agent
+
+    return Agent(
+        model=get_optimized_azure_openai_model(), 
+        result_type=OptimizedEMAuditJudgement, output_retries=1, system_prompt=enhanced_audit_prompt
+    )
+
+
+def get_optimized_em_enhancement_agent(snapshot: Optional[GuidelinesSnapshot] = None) -> Agent:
+    """Get or create the optimized EM enhancement agent for a guidelines snapshot (default: current)"""
+    return _get_guideline_agent("EM enhancement", _build_em_enhancement_agent, snapshot)
+
+
+def get_optimized_em_auditor_agent(snapshot: Optional[GuidelinesSnapshot] = None) -> Agent:
+    """Get or create the optimized EM auditor agent for a guidelines snapshot (default: current)"""
+    return _get_guideline_agent("EM auditor", _build_em_auditor_agent, snapshot)
 
 
 @lru_cache(maxsize=None)
@@ -293,6 +332,7 @@ def get_optimized_progress_note_agent() -> Agent:
     global _optimized_progress_note_agent
     if _optimized_progress_note_agent is None:
         logger.debug("Creating optimized progress note agent instance")
+        _configure_instrumentation()
         
         progress_note_prompt = """Medical progress note specialist. Generate structured medical progress notes from transcriptions with enhanced patient context.
 
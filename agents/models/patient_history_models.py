@@ -0,0 +1,175 @@
+"""Pydantic models for the incremental per-patient clinical history index."""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from utils.context_extractor import detect_clinical_findings
+
+
+# Visit summaries kept per patient; context only uses the most recent ones
+MAX_RECENT_VISITS = 5
+RECENT_CONTEXT_VISITS = 3
+# Keys of the most recently indexed visits kept to skip repeats (the entity has a 64 KB cap)
+MAX_VISIT_KEYS = 100
+# Leading characters of the note text that identify a dictation without a creation date
+VISIT_KEY_TEXT_CHARS = 256
+
+_DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d")
+
+
+def visit_sort_key(date_of_service: str) -> str:
+    """Normalize a date of service to ISO so visits sort chronologically (raw value if unparseable)."""
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_of_service[:10], date_format).date().isoformat()
+        except ValueError:
+            continue
+    return date_of_service
+
+
+def visit_key(dictation: Dict[str, Any]) -> str:
+    """Stable identifier of a dictation, used to skip visits that are already indexed."""
+    parts = [dictation.get(field) or "" for field in ("patientId", "dateOfService", "creationDate", "createdBy")]
+    if not dictation.get("creationDate"):
+        # Length plus a bounded prefix, so a long note is not hashed in full
+        text = _dictation_text(dictation)
+        parts += [str(len(text)), text[:VISIT_KEY_TEXT_CHARS]]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _dictation_text(dictation: Dict[str, Any]) -> str:
+    file_content = dictation.get("fileContent") or {}
+    return file_content.get("data", "") if isinstance(file_content, dict) else str(file_content)
+
+
+class VisitSummary(BaseModel):
+    """Clinical findings of one indexed visit."""
+
+    visit_key: str
+    date_of_service: str = ""
+    sort_key: str = ""
+    provider: str = ""
+    conditions: List[str] = Field(default_factory=list)
+    medications: List[str] = Field(default_factory=list)
+    trends: List[str] = Field(default_factory=list)
+
+    @classmethod
+    def from_dictation(cls, dictation: Dict[str, Any], key: Optional[str] = None) -> "VisitSummary":
+        """Scan one dictation's text once and keep only its findings (key: its visit_key, if already computed)."""
+        date_of_service = dictation.get("dateOfService") or ""
+        findings = detect_clinical_findings(_dictation_text(dictation))
+        return cls(
+            visit_key=key or visit_key(dictation),
+            date_of_service=date_of_service,
+            sort_key=visit_sort_key(date_of_service),
+            provider=dictation.get("provider") or "",
+            **findings
+        )
+
+
+class PatientHistory(BaseModel):
+    """
+    Rolling clinical summary of a patient's visits.
+
+    Aggregates (visit count, date range, providers, last time each condition or
+    medication was seen) are updated per visit; only the most recent visit
+    summaries are kept, so the index and the context built from it stay the same
+    size however long the history grows.
+    """
+
+    patient_id: str
+    visit_count: int = 0
+    earliest_date: str = ""
+    earliest_sort_key: str = ""
+    most_recent_date: str = ""
+    most_recent_sort_key: str = ""
+    providers: List[str] = Field(default_factory=list)
+    condition_last_seen: Dict[str, str] = Field(default_factory=dict)
+    medication_last_seen: Dict[str, str] = Field(default_factory=dict)
+    recent_visits: List[VisitSummary] = Field(default_factory=list, description="Most recent visits first")
+    visit_keys: List[str] = Field(default_factory=list, description="Keys of the most recently indexed visits")
+    updated_at: Optional[datetime] = None
+
+    @field_validator("visit_keys")
+    @classmethod
+    def keep_recent_visit_keys(cls, v: List[str]) -> List[str]:
+        """Trim histories stored before the key list was bounded."""
+        return v[-MAX_VISIT_KEYS:]
+
+    def add_visit(self, visit: VisitSummary) -> bool:
+        """Fold one visit into the history; returns False when it was already indexed."""
+        if visit.visit_key in self.visit_keys:
+            return False
+
+        self.visit_keys.append(visit.visit_key)
+        del self.visit_keys[:-MAX_VISIT_KEYS]
+        self.visit_count += 1
+        if not self.earliest_sort_key or visit.sort_key < self.earliest_sort_key:
+            self.earliest_date, self.earliest_sort_key = visit.date_of_service, visit.sort_key
+        if not self.most_recent_sort_key or visit.sort_key > self.most_recent_sort_key:
+            self.most_recent_date, self.most_recent_sort_key = visit.date_of_service, visit.sort_key
+        if visit.provider and visit.provider not in self.providers:
+            self.providers.append(visit.provider)
+        for condition in visit.conditions:
+            self.condition_last_seen[condition] = max(self.condition_last_seen.get(condition, ""), visit.sort_key)
+        for medication in visit.medications:
+            self.medication_last_seen[medication] = max(self.medication_last_seen.get(medication, ""), visit.sort_key)
+
+        self.recent_visits.append(visit)
+        self.recent_visits.sort(key=lambda summary: summary.sort_key, reverse=True)
+        del self.recent_visits[MAX_RECENT_VISITS:]
+        self.updated_at = datetime.now(timezone.utc)
+        return True
+
+    def add_dictations(self, dictations: List[Dict[str, Any]]) -> int:
+        """
+        Index this patient's new dictations ({"dictation": {...}} items); returns how many were added.
+
+        Dictations are walked newest first and the walk stops at the first one that is
+        already indexed, so only the visits since the last indexed note are keyed and
+        scanned and the cost does not grow with the patient's history.
+        """
+        patient_dictations = [
+            item.get("dictation", {}) for item in dictations
+            if item.get("dictation", {}).get("patientId") == self.patient_id
+        ]
+        # Stable sort: the current dictation (first item) stays ahead of others on the same day
+        patient_dictations.sort(key=lambda dictation: visit_sort_key(dictation.get("dateOfService") or ""), reverse=True)
+        added = 0
+        for dictation in patient_dictations:
+            key = visit_key(dictation)
+            if key in self.visit_keys:
+                break
+            added += self.add_visit(VisitSummary.from_dictation(dictation, key))
+        return added
+
+    def to_historical_context(self) -> Dict[str, Any]:
+        """Build the same context shape as extract_historical_clinical_context from the indexed summaries."""
+        if not self.visit_count:
+            return {}
+
+        historical_context: Dict[str, Any] = {
+            "visit_count": self.visit_count,
+            "date_range": {
+                "most_recent": self.most_recent_date,
+                "earliest": self.earliest_date
+            }
+        }
+
+        recent_visits = self.recent_visits[:RECENT_CONTEXT_VISITS]
+        conditions = sorted({condition for visit in recent_visits for condition in visit.conditions})
+        medications = sorted({medication for visit in recent_visits for medication in visit.medications})
+        trends = [f"{visit.date_of_service}: {trend}" for visit in recent_visits for trend in visit.trends]
+
+        if conditions:
+            historical_context["recurring_conditions"] = conditions
+        if medications:
+            historical_context["recent_medications"] = medications
+        if trends:
+            historical_context["clinical_trends"] = trends[-3:]
+        if self.providers:
+            historical_context["providers"] = list(self.providers)
+        return historical_context
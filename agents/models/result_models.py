@@ -0,0 +1,142 @@
+"""Pydantic models for persisted audit results."""
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+# Characters Azure Tables does not allow in PartitionKey/RowKey values
+_FORBIDDEN_KEY_CHARACTERS = str.maketrans({"/": "_", "\\": "_", "#": "_", "?": "_"})
+
+# Upper bound used to invert timestamps so that RowKeys sort newest first
+_MAX_EPOCH_MILLISECONDS = 10 ** 13
+
+
+# Upper bound used to invert YYYYMMDD dates so that date partitions sort newest first
+_MAX_DATE_NUMBER = 99999999
+
+
+def to_table_key(value: str) -> str:
+    """Sanitize a value so it can be used inside an Azure Tables key."""
+    return str(value).translate(_FORBIDDEN_KEY_CHARACTERS)
+
+
+def date_partition_key(day: date) -> str:
+    """PartitionKey of the per-day index; later days sort first, like the RowKeys inside them."""
+    return f"date|{_MAX_DATE_NUMBER - int(day.strftime('%Y%m%d')):08d}"
+
+
+class AuditResultRecord(BaseModel):
+    """Compact, query-friendly row describing the outcome of one audited document."""
+
+    document_id: str
+    instance_id: str
+    processed_at: datetime = Field(..., description="UTC time the orchestration produced the result")
+    status: str = Field("completed", description="completed or failed")
+    patient_id: Optional[str] = None
+    patient_name: Optional[str] = None
+    provider: Optional[str] = None
+    date_of_service: Optional[str] = None
+    is_new_patient: Optional[bool] = None
+    assigned_code: Optional[str] = None
+    final_assigned_code: Optional[str] = None
+    confidence_score: Optional[int] = None
+    confidence_tier: Optional[str] = None
+    audit_flags_count: int = 0
+    guideline_version: Optional[str] = Field(None, description="Guidelines source hash the result was produced under")
+    error: Optional[str] = None
+
+    @classmethod
+    def from_pipeline_result(cls, instance_id: str, processed_at: datetime, result: Dict[str, Any]) -> "AuditResultRecord":
+        """Build a record from one entry of the E/M coding orchestrator results."""
+        enhancement_data = result.get("enhancement_agent") or {}
+        auditor_data = result.get("auditor_agent") or {}
+        confidence = auditor_data.get("confidence") or {}
+        error = result.get("error") or auditor_data.get("error") or enhancement_data.get("error")
+
+        return cls(
+            document_id=str(
+                auditor_data.get("document_id")
+                or enhancement_data.get("document_id")
+                or result.get("document_id")
+                or "unknown"
+            ),
+            instance_id=instance_id,
+            processed_at=processed_at,
+            status="failed" if error or not auditor_data else "completed",
+            patient_id=enhancement_data.get("patient_id"),
+            patient_name=enhancement_data.get("patient_name"),
+            provider=enhancement_data.get("provider"),
+            date_of_service=enhancement_data.get("date_of_service"),
+            is_new_patient=auditor_data.get("is_new_patient", enhancement_data.get("is_new_patient")),
+            assigned_code=enhancement_data.get("assigned_code"),
+            final_assigned_code=auditor_data.get("final_assigned_code"),
+            confidence_score=confidence.get("score"),
+            confidence_tier=confidence.get("tier"),
+            audit_flags_count=len(auditor_data.get("audit_flags") or []),
+            guideline_version=auditor_data.get("guideline_version") or enhancement_data.get("guideline_version"),
+            error=str(error) if error else None,
+        )
+
+    def index_keys(self) -> Dict[str, str]:
+        """Partition keys under which this record is indexed (one entity per index)."""
+        keys = {
+            "document": f"document|{to_table_key(self.document_id)}",
+            "date": date_partition_key(self.processed_at.date()),
+        }
+        if self.patient_id:
+            keys["patient"] = f"patient|{to_table_key(self.patient_id)}"
+        if self.provider:
+            keys["provider"] = f"provider|{to_table_key(self.provider)}"
+        return keys
+
+    def row_key(self) -> str:
+        """RowKey that sorts newest first and is unique per document and instance."""
+        inverted_ms = _MAX_EPOCH_MILLISECONDS - int(self.processed_at.timestamp() * 1000)
+        return to_table_key(f"{inverted_ms:013d}_{self.instance_id}_{self.document_id}")
+
+    def to_azure_entity(self, partition_key: str) -> Dict[str, Any]:
+        """Convert to Azure Table entity format for the given index partition."""
+        return {
+            "PartitionKey": partition_key,
+            "RowKey": self.row_key(),
+            "DocumentId": self.document_id,
+            "InstanceId": self.instance_id,
+            "ProcessedAt": self.processed_at.isoformat(),
+            "Status": self.status,
+            "PatientId": self.patient_id or "",
+            "PatientName": self.patient_name or "",
+            "Provider": self.provider or "",
+            "DateOfService": self.date_of_service or "",
+            "IsNewPatient": self.is_new_patient,
+            "AssignedCode": self.assigned_code or "",
+            "FinalAssignedCode": self.final_assigned_code or "",
+            "ConfidenceScore": self.confidence_score,
+            "ConfidenceTier": self.confidence_tier or "",
+            "AuditFlagsCount": self.audit_flags_count,
+            "GuidelineVersion": self.guideline_version or "",
+            "Error": self.error or "",
+        }
+
+    @classmethod
+    def from_azure_entity(cls, entity: Dict[str, Any]) -> "AuditResultRecord":
+        """Rebuild a record from an Azure Table entity."""
+        return cls(
+            document_id=entity["DocumentId"],
+            instance_id=entity["InstanceId"],
+            processed_at=datetime.fromisoformat(entity["ProcessedAt"]),
+            status=entity.get("Status", "completed"),
+            patient_id=entity.get("PatientId") or None,
+            patient_name=entity.get("PatientName") or None,
+            provider=entity.get("Provider") or None,
+            date_of_service=entity.get("DateOfService") or None,
+            is_new_patient=entity.get("IsNewPatient"),
+            assigned_code=entity.get("AssignedCode") or None,
+            final_assigned_code=entity.get("FinalAssignedCode") or None,
+            confidence_score=entity.get("ConfidenceScore"),
+            confidence_tier=entity.get("ConfidenceTier") or None,
+            audit_flags_count=entity.get("AuditFlagsCount") or 0,
+            guideline_version=entity.get("GuidelineVersion") or None,
+            error=entity.get("Error") or None,
+        )
@@ -13,6 +13,8 @@ from agents.models.optimized_pydantic_models import (
     get_optimized_em_auditor_agent
 )
 from settings import logger
+from utils.audit_fields import complete_audit_result
+from utils.guidelines_cache import get_guidelines_snapshot
 
 # Load environment variables
 load_dotenv()
@@ -114,7 +116,10 @@ async def main(enhancement_result: dict) -> dict:
     try:
         # Track agent initialization time (cached)
         agent_init_start = time.perf_counter()
-        agent = get_optimized_em_auditor_agent()
+        # One snapshot for the agent, the derived fields and the version stamp
+        guidelines = get_guidelines_snapshot()
+        guideline_version = guidelines.version
+        agent = get_optimized_em_auditor_agent(guidelines)
         agent_init_time = time.perf_counter() - agent_init_start
         
         logger.debug("⏱️ Agent Initialization", 
@@ -214,16 +219,18 @@ Focus on accuracy, compliance, patient type consistency, and actionable feedback
                 final_code = corrected_code
                 logger.debug(f"🔧 Code corrected for patient type: {result.output.final_assigned_code} -> {final_code}")
         
-        # Track response formatting time (document metadata added here, not from model)
+        # Track response formatting time (document metadata and derived fields added here, not from model)
         formatting_start = time.perf_counter()
+        audit_result = complete_audit_result(result.output, final_code, guidelines.get_index())
         response = OptimizedEMAuditOutput(
             document_id=enhancement_result.get("document_id", ""),
             text=enhancement_result.get("text", ""),
             audit_flags=audit_flags,
             final_assigned_code=final_code,
-            final_justification=result.output.final_justification,
-            confidence=result.output.confidence,
-            is_new_patient=is_new_patient
+            final_justification=audit_result.final_justification,
+            confidence=audit_result.confidence,
+            is_new_patient=is_new_patient,
+            guideline_version=guideline_version
         ).model_dump()
         formatting_time = time.perf_counter() - formatting_start
         
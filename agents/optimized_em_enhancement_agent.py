@@ -1,88 +1,172 @@
-import os
 import time
 import json
 from datetime import datetime
 
 import azure.functions as func
 from dotenv import load_dotenv
-from pydantic_ai.mcp import MCPServerSSE
 
 from agents.models.optimized_pydantic_models import (
     OptimizedEMInput, 
+    OptimizedEMCodeAssignment,
     OptimizedEMEnhancementOutput, 
     get_optimized_em_enhancement_agent
 )
+from constants import azure_config
 from settings import logger
+from utils.guidelines_cache import GuidelinesSnapshot, get_guidelines_snapshot
+from utils.mcp_client import call_mcp_tool, get_mcp_server
+from utils.mdm_scorer import estimate_mdm
 
 # Load environment variables
 load_dotenv()
 
 
+async def _fetch_document(document_id: str, session_id: str):
+    """Fetch a progress note from the MCP server; returns (input, connection time, call time)."""
+    # Track MCP connection time (near zero once warm-up has opened the shared session)
+    mcp_start = time.perf_counter()
+    await get_mcp_server()
+    mcp_connection_time = time.perf_counter() - mcp_start
+    
+    logger.debug("⏱️ MCP Server Connection", 
+                session_id=session_id,
+                duration_seconds=mcp_connection_time,
+                process="mcp_server_connection")
+    
+    # Track progress note retrieval time
+    api_call_start = time.perf_counter()
+    response = await call_mcp_tool(
+        tool_name="appointment-progressnote", 
+        arguments={"documentId": document_id}
+    )
+    api_call_time = time.perf_counter() - api_call_start
+    
+    logger.debug("⏱️ MCP Progress Note Call", 
+               session_id=session_id,
+               duration_seconds=api_call_time,
+               process="mcp_progress_note_call",
+               document_id=str(document_id)[:50])
+
+    logger.debug(f"Received document for analysis: {response['document']['id']}")
+    
+    doc = response.get("document", {})
+    
+    # patient type string to boolean: "new" -> True, "established" -> False
+    patient_type_str = response.get("isNewPatient", "established")
+    is_new_patient = patient_type_str.lower() == "new"
+    
+    data = OptimizedEMInput(
+        document_id=doc.get("id", ""),
+        date_of_service=doc.get("dateOfService", ""),
+        provider=doc.get("provider", ""),
+        patient_name=doc.get("patientName", ""),
+        text=doc.get("fileContent", {}).get("data", ""),
+        patient_id=doc.get("patientId", ""),
+        is_new_patient=is_new_patient
+        # is_new_patient=True
+    )
+    return data, mcp_connection_time, api_call_time
+
+
+async def _assign_with_model(data: OptimizedEMInput, session_id: str, snapshot: GuidelinesSnapshot):
+    """Assign the code with the enhancement model; returns (assignment, init, prompt and inference times)."""
+    # Track agent initialization time (cached)
+    agent_init_start = time.perf_counter()
+    agent = get_optimized_em_enhancement_agent(snapshot)
+    agent_init_time = time.perf_counter() - agent_init_start
+    
+    logger.debug("⏱️ Agent Initialization", 
+                session_id=session_id,
+                duration_seconds=agent_init_time,
+                process="agent_initialization",
+                agent_type="optimized_enhancement_agent")
+    
+    # Track prompt preparation time (minimal prompt)
+    prompt_start = time.perf_counter()
+    patient_type = "new patient" if data.is_new_patient else "established patient"
+    code_range = "99202-99205" if data.is_new_patient else "99212-99215"
+    
+    user_prompt = f"""Document ID: {data.document_id}
+Date: {data.date_of_service}
+Provider: {data.provider}
+Patient Type: {patient_type}
+
+Medical Note:
+{data.text}
+
+Analyze and assign appropriate E/M code ({code_range}) with brief MDM-focused justification. Use {code_range} codes for {patient_type} visits."""
+    prompt_time = time.perf_counter() - prompt_start
+    
+    logger.debug("⏱️ Minimal Prompt Preparation", 
+                session_id=session_id,
+                duration_seconds=prompt_time,
+                process="prompt_preparation",
+                prompt_length=len(user_prompt),
+                text_length=len(data.text))
+    
+    logger.debug(f"🧠 Optimized Enhancement Agent: Sending minimal prompt to AI model...")
+    logger.debug(f"📝 Optimized prompt length: {len(user_prompt)} characters")
+    
+    # Track AI model inference time with timeout (this is usually the slowest part)
+    inference_start = time.perf_counter()
+    try:
+        # Use asyncio timeout for additional safety
+        import asyncio
+        result = await asyncio.wait_for(
+            agent.run(user_prompt), 
+            timeout=15.0  # Aggressive AI timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error("❌ AI Model Timeout", session_id=session_id)
+        raise TimeoutError("AI model inference timed out after 15 seconds")
+        
+    inference_time = time.perf_counter() - inference_start
+    
+    logger.debug("⏱️ AI Model Inference - CRITICAL BOTTLENECK", 
+               session_id=session_id,
+               duration_seconds=inference_time,
+               process="ai_model_inference",
+               prompt_length=len(user_prompt),
+               text_length=len(data.text),
+               document_id=data.document_id)
+    
+    logger.debug(f"✅ Optimized Enhancement Agent: Received response from AI model")
+    logger.debug(f"🎯 Optimized Enhancement Agent: Assigned code {result.output.assigned_code}")
+    logger.debug(f"📋 Optimized Enhancement Agent: Justification length: {len(result.output.justification)} characters")
+    return result.output, agent_init_time, prompt_time, inference_time
+
+
 async def main(input_payload) -> dict:
     """
     Optimized E/M Enhancement Agent - Stage D
     Minimal output: only assigned_code and justification
     Optimized for speed with reduced prompts and aggressive timeouts
+
+    Accepts a document ID (fetched from the MCP server) or a pre-parsed
+    document (an EMInput dict, e.g. from PDF ingestion).
     """
     # Track overall execution time
     start_time = time.perf_counter()
-    session_id = f"opt_enhancement_{input_payload}"
+    is_parsed_document = isinstance(input_payload, dict) and "text" in input_payload
+    document_ref = input_payload.get("document_id") if is_parsed_document else input_payload
+    session_id = f"opt_enhancement_{document_ref}"
     
     logger.debug("🚀 Optimized Enhancement Agent: Starting execution", 
                 session_id=session_id,
-                document_id=str(input_payload)[:50])
+                document_id=str(document_ref)[:50],
+                pre_parsed=is_parsed_document)
     
     try:
-        # Track MCP server connection time with aggressive timeout
-        mcp_start = time.perf_counter()
-        server = MCPServerSSE(
-            url=os.getenv("MCP_API_URL"), 
-            headers={"X-API-Key": os.getenv("MCP_API_KEY")},
-            timeout=8.0  # Aggressive MCP timeout
-        )
-        mcp_connection_time = time.perf_counter() - mcp_start
-        
-        logger.debug("⏱️ MCP Server Connection", 
-                    session_id=session_id,
-                    duration_seconds=mcp_connection_time,
-                    process="mcp_server_connection")
-        
-        async with server:
-            # Track progress note retrieval time
-            api_call_start = time.perf_counter()
-            response = await server.call_tool(
-                tool_name="appointment-progressnote", 
-                arguments={"documentId": input_payload}
-            )
-            api_call_time = time.perf_counter() - api_call_start
-            
-            logger.debug("⏱️ MCP Progress Note Call", 
-                       session_id=session_id,
-                       duration_seconds=api_call_time,
-                       process="mcp_progress_note_call",
-                       document_id=str(input_payload)[:50])
-
-        logger.debug(f"Received document for analysis: {response['document']['id']}")
-        
         # Track data extraction and parsing time (optimized)
         parsing_start = time.perf_counter()
-        doc = response.get("document", {})
-        
-        # patient type string to boolean: "new" -> True, "established" -> False
-        patient_type_str = response.get("isNewPatient", "established")
-        is_new_patient = patient_type_str.lower() == "new"
-        
-        data = OptimizedEMInput(
-            document_id=doc.get("id", ""),
-            date_of_service=doc.get("dateOfService", ""),
-            provider=doc.get("provider", ""),
-            patient_name=doc.get("patientName", ""),
-            text=doc.get("fileContent", {}).get("data", ""),
-            patient_id=doc.get("patientId", ""),
-            is_new_patient=is_new_patient
-            # is_new_patient=True
-        )
-        parsing_time = time.perf_counter() - parsing_start
+        if is_parsed_document:
+            data = OptimizedEMInput(**{
+                field: value for field, value in input_payload.items() if field in OptimizedEMInput.model_fields
+            })
+            mcp_connection_time = api_call_time = 0.0
+        else:
+            data, mcp_connection_time, api_call_time = await _fetch_document(input_payload, session_id)
+        parsing_time = time.perf_counter() - parsing_start - mcp_connection_time - api_call_time
         
         logger.debug("⏱️ Data Extraction & Parsing", 
                     session_id=session_id,
@@ -91,78 +175,52 @@ async def main(input_payload) -> dict:
                     text_length=len(data.text),
                     document_id=data.document_id)
         
-        # Track agent initialization time (cached)
-        agent_init_start = time.perf_counter()
-        agent = get_optimized_em_enhancement_agent()
-        agent_init_time = time.perf_counter() - agent_init_start
+        # One snapshot for the agent, the pre-score and the version stamp, so a hot reload
+        # mid-request cannot stamp the result with a version it was not produced with
+        guidelines = get_guidelines_snapshot()
+        guideline_version = guidelines.version
         
-        logger.debug("⏱️ Agent Initialization", 
-                    session_id=session_id,
-                    duration_seconds=agent_init_time,
-                    process="agent_initialization",
-                    agent_type="optimized_enhancement_agent")
+        # Rule-based MDM estimate; clear-cut notes skip the model (the auditor still reviews them)
+        prescore_start = time.perf_counter()
+        prescore = estimate_mdm(data.text, guidelines.get_index())
+        prescore_time = time.perf_counter() - prescore_start
+        skip_threshold = azure_config.mdm_prescore_skip_threshold
+        skip_model = 0 < skip_threshold <= prescore.certainty
         
-        # Track prompt preparation time (minimal prompt)
-        prompt_start = time.perf_counter()
-        patient_type = "new patient" if data.is_new_patient else "established patient"
-        code_range = "99202-99205" if data.is_new_patient else "99212-99215"
-        
-        user_prompt = f"""Document ID: {data.document_id}
-Date: {data.date_of_service}
-Provider: {data.provider}
-Patient Type: {patient_type}
-
-Medical Note:
-{data.text}
-
-Analyze and assign appropriate E/M code ({code_range}) with brief MDM-focused justification. Use {code_range} codes for {patient_type} visits."""
-        prompt_time = time.perf_counter() - prompt_start
-        
-        logger.debug("⏱️ Minimal Prompt Preparation", 
+        logger.debug("⏱️ MDM Pre-Score", 
                     session_id=session_id,
-                    duration_seconds=prompt_time,
-                    process="prompt_preparation",
-                    prompt_length=len(user_prompt),
-                    text_length=len(data.text))
-        
-        logger.debug(f"🧠 Optimized Enhancement Agent: Sending minimal prompt to AI model...")
-        logger.debug(f"📝 Optimized prompt length: {len(user_prompt)} characters")
+                    duration_seconds=prescore_time,
+                    process="mdm_prescore",
+                    mdm_level=prescore.level_name,
+                    estimated_code=prescore.code_for(data.is_new_patient),
+                    certainty=round(prescore.certainty, 3),
+                    skip_model=skip_model)
         
-        # Track AI model inference time with timeout (this is usually the slowest part)
-        inference_start = time.perf_counter()
-        try:
-            # Use asyncio timeout for additional safety
-            import asyncio
-            result = await asyncio.wait_for(
-                agent.run(user_prompt), 
-                timeout=15.0  # Aggressive AI timeout
+        if skip_model:
+            assignment = OptimizedEMCodeAssignment(
+                assigned_code=prescore.code_for(data.is_new_patient),
+                justification=prescore.justification()
             )
-        except asyncio.TimeoutError:
-            logger.error("❌ AI Model Timeout", session_id=session_id)
-            raise TimeoutError("AI model inference timed out after 15 seconds")
-            
-        inference_time = time.perf_counter() - inference_start
-        
-        logger.debug("⏱️ AI Model Inference - CRITICAL BOTTLENECK", 
-                   session_id=session_id,
-                   duration_seconds=inference_time,
-                   process="ai_model_inference",
-                   prompt_length=len(user_prompt),
-                   text_length=len(data.text),
-                   document_id=data.document_id)
-        
-        logger.debug(f"✅ Optimized Enhancement Agent: Received response from AI model")
-        logger.debug(f"🎯 Optimized Enhancement Agent: Assigned code {result.output.assigned_code}")
-        logger.debug(f"📋 Optimized Enhancement Agent: Justification length: {len(result.output.justification)} characters")
+            agent_init_time = prompt_time = inference_time = 0.0
+            logger.debug(f"⚡ Optimized Enhancement Agent: Pre-score certainty {prescore.certainty:.2f} "
+                        f"meets {skip_threshold}, skipping the AI model")
+        else:
+            assignment, agent_init_time, prompt_time, inference_time = await _assign_with_model(data, session_id, guidelines)
         
         # Track response formatting time (minimal processing)
         formatting_start = time.perf_counter()
         response = OptimizedEMEnhancementOutput(
             document_id=data.document_id,
             text=data.text,
-            assigned_code=result.output.assigned_code,
-            justification=result.output.justification,
-            is_new_patient=data.is_new_patient
+            assigned_code=assignment.assigned_code,
+            justification=assignment.justification,
+            is_new_patient=data.is_new_patient,
+            patient_id=data.patient_id,
+            patient_name=data.patient_name,
+            provider=data.provider,
+            date_of_service=data.date_of_service,
+            guideline_version=guideline_version,
+            mdm_prescore={**prescore.to_dict(), "model_skipped": skip_model}
         ).model_dump()
         formatting_time = time.perf_counter() - formatting_start
         
@@ -185,7 +243,7 @@ Analyze and assign appropriate E/M code ({code_range}) with brief MDM-focused ju
                    session_id=session_id,
                    total_execution_time=total_time,
                    document_id=data.document_id,
-                   assigned_code=result.output.assigned_code)
+                   assigned_code=assignment.assigned_code)
         
         # Add simple performance metrics to response - just execution times
         response["performance_metrics"] = {
@@ -196,6 +254,7 @@ Analyze and assign appropriate E/M code ({code_range}) with brief MDM-focused ju
                 "progress_note_api_call": round(api_call_time, 3),
                 "json_parsing": round(parsing_time, 3),
                 "agent_initialization": round(agent_init_time, 3),
+                "mdm_prescore": round(prescore_time, 3),
                 "prompt_preparation": round(prompt_time, 3),
                 "ai_model_inference": round(inference_time, 3),
                 "response_formatting": round(formatting_time, 3)
@@ -1,8 +1,9 @@
 """Constants and configuration settings for the EM Audit Tool."""
 
 import os
+import tempfile
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from settings import logger
 
@@ -19,12 +20,117 @@ class EnvironmentVariable(Enum):
     # Azure Storage Configuration
     AZURE_STORAGE_CONNECTION_STRING = "AZURE_STORAGE_CONNECTION_STRING"
     FEEDBACK_TABLE_NAME = "FEEDBACK_TABLE_NAME"
+    
+    # Results Store Configuration
+    RESULTS_STORE_BACKEND = "RESULTS_STORE_BACKEND"
+    RESULTS_TABLE_NAME = "RESULTS_TABLE_NAME"
+    RESULTS_SQLITE_PATH = "RESULTS_SQLITE_PATH"
+    
+    # Completion Callback Configuration
+    CALLBACK_ALLOWED_HOSTS = "CALLBACK_ALLOWED_HOSTS"
+    
+    # Report Storage Configuration
+    REPORT_STORAGE_BACKEND = "REPORT_STORAGE_BACKEND"
+    REPORTS_CONTAINER_NAME = "REPORTS_CONTAINER_NAME"
+    REPORTS_LOCAL_DIR = "REPORTS_LOCAL_DIR"
+    
+    # Guidelines Configuration
+    GUIDELINES_RELOAD_INTERVAL_SECONDS = "GUIDELINES_RELOAD_INTERVAL_SECONDS"
+    GUIDELINES_BLOB_CONTAINER = "GUIDELINES_BLOB_CONTAINER"
+    
+    # Warm-up Configuration
+    WARMUP_PRIME_MODEL = "WARMUP_PRIME_MODEL"
+    
+    # Model HTTP Client Configuration
+    OPENAI_HTTP_MAX_CONNECTIONS = "OPENAI_HTTP_MAX_CONNECTIONS"
+    OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS = "OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS = "OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS"
+    OPENAI_HTTP_TIMEOUT_SECONDS = "OPENAI_HTTP_TIMEOUT_SECONDS"
+    OPENAI_HTTP2 = "OPENAI_HTTP2"
+    
+    # Model Rate Limiting Configuration
+    MODEL_MAX_CONCURRENT_REQUESTS = "MODEL_MAX_CONCURRENT_REQUESTS"
+    MODEL_REQUESTS_PER_MINUTE = "MODEL_REQUESTS_PER_MINUTE"
+    MODEL_RATE_LIMIT_INSTANCES = "MODEL_RATE_LIMIT_INSTANCES"
+    FUNCTIONS_WORKER_PROCESS_COUNT = "FUNCTIONS_WORKER_PROCESS_COUNT"
+    
+    # Progress Note Batch Configuration
+    PROGRESS_NOTE_BATCH_MAX_CONCURRENCY = "PROGRESS_NOTE_BATCH_MAX_CONCURRENCY"
+    PROGRESS_NOTE_BATCH_MAX_APPOINTMENTS = "PROGRESS_NOTE_BATCH_MAX_APPOINTMENTS"
+    
+    # Patient History Index Configuration
+    PATIENT_HISTORY_ENABLED = "PATIENT_HISTORY_ENABLED"
+    PATIENT_HISTORY_TABLE_NAME = "PATIENT_HISTORY_TABLE_NAME"
+    CLINICAL_VOCABULARY_PATH = "CLINICAL_VOCABULARY_PATH"
+    
+    # Progress Note Context Configuration
+    PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET = "PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET"
+    PROGRESS_NOTE_CONTEXT_PACKING = "PROGRESS_NOTE_CONTEXT_PACKING"
+    
+    # PDF Ingestion Configuration
+    PDF_INGESTION_MAX_WORKERS = "PDF_INGESTION_MAX_WORKERS"
+    
+    # MDM Pre-Scorer Configuration
+    MDM_PRESCORE_SKIP_THRESHOLD = "MDM_PRESCORE_SKIP_THRESHOLD"
 
 
 class DefaultValue(Enum):
     """Default values for configuration settings."""
     
     FEEDBACK_TABLE_NAME = "UserFeedback"
+    RESULTS_TABLE_NAME = "AuditResults"
+    RESULTS_SQLITE_FILENAME = "em_audit_results.db"
+    CALLBACK_ALLOWED_HOSTS = ""
+    REPORTS_CONTAINER_NAME = "em-audit-reports"
+    REPORTS_LOCAL_DIRNAME = "em_audit_reports"
+    GUIDELINES_RELOAD_INTERVAL_SECONDS = "30"
+    GUIDELINES_BLOB_LOCAL_DIRNAME = "em_audit_guidelines"
+    WARMUP_PRIME_MODEL = "false"
+    OPENAI_HTTP_MAX_CONNECTIONS = "100"
+    OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS = "50"
+    OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS = "120"
+    OPENAI_HTTP_TIMEOUT_SECONDS = "600"
+    OPENAI_HTTP2 = "auto"
+    MODEL_MAX_CONCURRENT_REQUESTS = "16"
+    MODEL_REQUESTS_PER_MINUTE = "0"
+    MODEL_RATE_LIMIT_INSTANCES = "1"
+    FUNCTIONS_WORKER_PROCESS_COUNT = "1"
+    PROGRESS_NOTE_BATCH_MAX_CONCURRENCY = "10"
+    PROGRESS_NOTE_BATCH_MAX_APPOINTMENTS = "500"
+    PATIENT_HISTORY_ENABLED = "true"
+    PATIENT_HISTORY_TABLE_NAME = "PatientHistory"
+    PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET = "800"
+    PDF_INGESTION_MAX_WORKERS = "0"
+    MDM_PRESCORE_SKIP_THRESHOLD = "0"
+
+
+class ContextPackingStrategy(Enum):
+    """Supported strategies for fitting progress-note context into its token budget."""
+    
+    GREEDY = "greedy"
+    OPTIMAL = "optimal"
+
+
+class PDFExtractionMode(Enum):
+    """Which pages of a PDF to extract text from."""
+    
+    FULL = "full"
+    FIRST_PAGES = "first_pages"
+    HEADER_SIGNATURE = "header_signature"
+
+
+class ResultsStoreBackend(Enum):
+    """Supported backends for the audit results store."""
+    
+    AZURE_TABLE = "table"
+    SQLITE = "sqlite"
+
+
+class ReportStorageBackend(Enum):
+    """Supported backends for generated report files."""
+    
+    AZURE_BLOB = "blob"
+    LOCAL = "local"
 
 
 class ConfigurationManager:
@@ -126,6 +232,242 @@ class AzureConfig:
             EnvironmentVariable.FEEDBACK_TABLE_NAME,
             DefaultValue.FEEDBACK_TABLE_NAME.value
         )
+    
+    @property
+    def results_store_backend(self) -> str:
+        """Get results store backend (Azure Table when storage is configured, otherwise sqlite)."""
+        has_storage = bool(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.AZURE_STORAGE_CONNECTION_STRING, ""
+        ))
+        default_backend = ResultsStoreBackend.AZURE_TABLE if has_storage else ResultsStoreBackend.SQLITE
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.RESULTS_STORE_BACKEND,
+            default_backend.value
+        )
+    
+    @property
+    def results_table_name(self) -> str:
+        """Get results table name."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.RESULTS_TABLE_NAME,
+            DefaultValue.RESULTS_TABLE_NAME.value
+        )
+    
+    @property
+    def results_sqlite_path(self) -> str:
+        """Get path of the local sqlite results store."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.RESULTS_SQLITE_PATH,
+            os.path.join(tempfile.gettempdir(), DefaultValue.RESULTS_SQLITE_FILENAME.value)
+        )
+    
+    @property
+    def report_storage_backend(self) -> str:
+        """Get report storage backend (Azure Blob when storage is configured, otherwise local files)."""
+        has_storage = bool(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.AZURE_STORAGE_CONNECTION_STRING, ""
+        ))
+        default_backend = ReportStorageBackend.AZURE_BLOB if has_storage else ReportStorageBackend.LOCAL
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.REPORT_STORAGE_BACKEND,
+            default_backend.value
+        )
+    
+    @property
+    def reports_container_name(self) -> str:
+        """Get blob container name for generated reports."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.REPORTS_CONTAINER_NAME,
+            DefaultValue.REPORTS_CONTAINER_NAME.value
+        )
+    
+    @property
+    def reports_local_dir(self) -> str:
+        """Get local directory for generated reports."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.REPORTS_LOCAL_DIR,
+            os.path.join(tempfile.gettempdir(), DefaultValue.REPORTS_LOCAL_DIRNAME.value)
+        )
+    
+    @property
+    def guidelines_reload_interval_seconds(self) -> float:
+        """Get how often guidelines sources are checked for changes (0 disables hot reload)."""
+        return float(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.GUIDELINES_RELOAD_INTERVAL_SECONDS,
+            DefaultValue.GUIDELINES_RELOAD_INTERVAL_SECONDS.value
+        ))
+    
+    @property
+    def guidelines_blob_container(self) -> Optional[str]:
+        """Get the blob container guidelines are synced from (None to use the deployed files)."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.GUIDELINES_BLOB_CONTAINER, ""
+        ) or None
+    
+    @property
+    def guidelines_blob_local_dir(self) -> str:
+        """Get the local directory blob-synced guidelines are stored in."""
+        return os.path.join(tempfile.gettempdir(), DefaultValue.GUIDELINES_BLOB_LOCAL_DIRNAME.value)
+    
+    @property
+    def warmup_prime_model(self) -> bool:
+        """Get whether warm-up sends one small model request to prime the Azure OpenAI connection."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.WARMUP_PRIME_MODEL,
+            DefaultValue.WARMUP_PRIME_MODEL.value
+        ).lower() in ("1", "true", "yes")
+    
+    @property
+    def openai_http_max_connections(self) -> int:
+        """Get the maximum number of concurrent connections to Azure OpenAI per worker."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.OPENAI_HTTP_MAX_CONNECTIONS,
+            DefaultValue.OPENAI_HTTP_MAX_CONNECTIONS.value
+        ))
+    
+    @property
+    def openai_http_max_keepalive_connections(self) -> int:
+        """Get the maximum number of idle connections kept open for reuse."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            DefaultValue.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS.value
+        ))
+    
+    @property
+    def openai_http_keepalive_expiry_seconds(self) -> float:
+        """Get how long an idle connection is kept before it is closed."""
+        return float(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            DefaultValue.OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS.value
+        ))
+    
+    @property
+    def openai_http_timeout_seconds(self) -> float:
+        """Get the read/write timeout for model requests."""
+        return float(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.OPENAI_HTTP_TIMEOUT_SECONDS,
+            DefaultValue.OPENAI_HTTP_TIMEOUT_SECONDS.value
+        ))
+    
+    @property
+    def openai_http2(self) -> str:
+        """Get the HTTP/2 mode: auto (when h2 is installed), true or false."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.OPENAI_HTTP2,
+            DefaultValue.OPENAI_HTTP2.value
+        ).lower()
+    
+    @property
+    def model_max_concurrent_requests(self) -> int:
+        """Get the maximum number of in-flight model requests across all instances."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.MODEL_MAX_CONCURRENT_REQUESTS,
+            DefaultValue.MODEL_MAX_CONCURRENT_REQUESTS.value
+        ))
+    
+    @property
+    def model_requests_per_minute(self) -> float:
+        """Get the model request rate limit across all instances (0 disables it)."""
+        return float(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.MODEL_REQUESTS_PER_MINUTE,
+            DefaultValue.MODEL_REQUESTS_PER_MINUTE.value
+        ))
+    
+    @property
+    def model_rate_limit_instances(self) -> int:
+        """Get the number of instances the model request limits are split across (the app's maximum scale-out)."""
+        return max(1, int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.MODEL_RATE_LIMIT_INSTANCES,
+            DefaultValue.MODEL_RATE_LIMIT_INSTANCES.value
+        )))
+    
+    @property
+    def functions_worker_process_count(self) -> int:
+        """Get the number of Python worker processes per instance (each has its own limiter)."""
+        return max(1, int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.FUNCTIONS_WORKER_PROCESS_COUNT,
+            DefaultValue.FUNCTIONS_WORKER_PROCESS_COUNT.value
+        )))
+    
+    @property
+    def progress_note_batch_max_concurrency(self) -> int:
+        """Get the default number of progress notes a batch generates at once."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PROGRESS_NOTE_BATCH_MAX_CONCURRENCY,
+            DefaultValue.PROGRESS_NOTE_BATCH_MAX_CONCURRENCY.value
+        ))
+    
+    @property
+    def progress_note_batch_max_appointments(self) -> int:
+        """Get the maximum number of appointments accepted in one batch."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PROGRESS_NOTE_BATCH_MAX_APPOINTMENTS,
+            DefaultValue.PROGRESS_NOTE_BATCH_MAX_APPOINTMENTS.value
+        ))
+    
+    @property
+    def patient_history_enabled(self) -> bool:
+        """Get whether progress notes read patient history from the incremental history index."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PATIENT_HISTORY_ENABLED,
+            DefaultValue.PATIENT_HISTORY_ENABLED.value
+        ).lower() in ("1", "true", "yes")
+    
+    @property
+    def patient_history_table_name(self) -> str:
+        """Get patient history index table name."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PATIENT_HISTORY_TABLE_NAME,
+            DefaultValue.PATIENT_HISTORY_TABLE_NAME.value
+        )
+    
+    @property
+    def clinical_vocabulary_path(self) -> Optional[str]:
+        """Get the clinical concept vocabulary file (None to use the bundled vocabulary)."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.CLINICAL_VOCABULARY_PATH, ""
+        ) or None
+    
+    @property
+    def progress_note_context_token_budget(self) -> int:
+        """Get the token budget for the intake and history context of a progress-note prompt."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET,
+            DefaultValue.PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET.value
+        ))
+    
+    @property
+    def progress_note_context_packing(self) -> str:
+        """Get the context packing strategy (greedy or optimal)."""
+        return ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PROGRESS_NOTE_CONTEXT_PACKING,
+            ContextPackingStrategy.GREEDY.value
+        ).lower()
+    
+    @property
+    def callback_allowed_hosts(self) -> List[str]:
+        """Get the hosts completion webhooks may be sent to (comma-separated, "*.example.com" allows subdomains)."""
+        hosts = ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.CALLBACK_ALLOWED_HOSTS,
+            DefaultValue.CALLBACK_ALLOWED_HOSTS.value
+        )
+        return [host.strip().lower() for host in hosts.split(",") if host.strip()]
+    
+    @property
+    def pdf_ingestion_max_workers(self) -> int:
+        """Get the number of PDF ingestion worker processes (0 = one per CPU)."""
+        return int(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.PDF_INGESTION_MAX_WORKERS,
+            DefaultValue.PDF_INGESTION_MAX_WORKERS.value
+        ))
+    
+    @property
+    def mdm_prescore_skip_threshold(self) -> float:
+        """Get the pre-score certainty (0-1) from which the enhancement model is skipped (0 = never skip)."""
+        return float(ConfigurationManager.get_optional_env_var(
+            EnvironmentVariable.MDM_PRESCORE_SKIP_THRESHOLD,
+            DefaultValue.MDM_PRESCORE_SKIP_THRESHOLD.value
+        ))
 
 
 class UserAction(Enum):
@@ -0,0 +1,55 @@
+import logging
+from http import HTTPStatus
+
+import azure.functions as func
+import azure.durable_functions as df
+
+from utils.report_writer import iter_encoded_chunks, wants_gzip
+from utils.tabular_export import CSV_CONTENT_TYPE, flatten_audit_result, iter_csv_chunks
+
+
+async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
+    """
+    Download the flattened audit results of a completed orchestration as CSV.
+
+    Query parameters:
+    - gzip: true/false; defaults to the request's Accept-Encoding
+    """
+    instance_id = req.route_params.get("instance_id")
+    logging.debug(f"CSV report download requested for instance ID: {instance_id}")
+
+    status = await client.get_status(instance_id)
+
+    if not status:
+        return func.HttpResponse("Orchestration instance not found.", status_code=HTTPStatus.NOT_FOUND)
+
+    if status.runtime_status != df.OrchestrationRuntimeStatus.Completed:
+        return func.HttpResponse(
+            f"Orchestration has not completed. Current status: {status.runtime_status.value}",
+            status_code=HTTPStatus.ACCEPTED
+        )
+
+    try:
+        results = status.output.get("results", [])
+        compress = wants_gzip(req.params, req.headers)
+
+        rows = (flatten_audit_result(result, instance_id) for result in results)
+        body = b"".join(iter_encoded_chunks(iter_csv_chunks(rows), compress=compress))
+
+        filename = f"audit_results_{instance_id[:8]}.csv"
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Type": f"{CSV_CONTENT_TYPE}; charset=utf-8"
+        }
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+
+        return func.HttpResponse(
+            body=body,
+            status_code=HTTPStatus.OK,
+            mimetype=CSV_CONTENT_TYPE,
+            headers=headers
+        )
+    except Exception as e:
+        logging.error(f"Error processing CSV report for download for instance {instance_id}: {e}")
+        return func.HttpResponse("Error processing the CSV report for download.", status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -6,11 +6,46 @@ from http import HTTPStatus
 import azure.functions as func
 import azure.durable_functions as df
 
+from utils.report_writer import (
+    REPORT_FORMAT_JSON,
+    REPORT_FORMAT_NDJSON,
+    REPORT_FORMATS,
+    FieldProjection,
+    iter_encoded_chunks,
+    iter_report_chunks,
+    wants_gzip,
+)
+
 
 async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
+    """
+    Download the consolidated JSON report for a completed orchestration.
+
+    Query parameters:
+    - format: json (default) or ndjson (one summary/result/performance object per line)
+    - fields: comma-separated dotted paths within each result to keep, or to drop when
+              prefixed with "-" (e.g. fields=-enhancement_agent.text)
+    - gzip: true/false; defaults to the request's Accept-Encoding
+    """
     instance_id = req.route_params.get("instance_id")
     logging.debug(f"JSON report download requested for instance ID: {instance_id}")
 
+    report_format = req.params.get("format", REPORT_FORMAT_JSON).lower()
+    if report_format not in REPORT_FORMATS:
+        return func.HttpResponse(
+            json.dumps({"error": f"format must be one of: {', '.join(REPORT_FORMATS)}"}),
+            status_code=HTTPStatus.BAD_REQUEST,
+            mimetype="application/json"
+        )
+    try:
+        projection = FieldProjection.parse(req.params.get("fields"))
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            status_code=HTTPStatus.BAD_REQUEST,
+            mimetype="application/json"
+        )
+
     status = await client.get_status(instance_id)
 
     if not status:
@@ -25,31 +60,38 @@ async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) ->
     try:
         results = status.output.get("results", [])
         performance_data = status.output.get("performance", {})
-        
-        consolidated_result = {
-            "test_summary": {
-                "total_documents": len(results),
-                "successful_documents": len([r for r in results if "error" not in r]),
-                "failed_documents": len([r for r in results if "error" in r]),
-                "test_timestamp": datetime.now().isoformat(),
-                "test_type": "azure_durable_functions_processing",
-                "instance_id": instance_id
-            },
-            "results": results,
-            "performance": performance_data
+        compress = wants_gzip(req.params, req.headers)
+
+        summary = {
+            "total_documents": len(results),
+            "successful_documents": len([r for r in results if "error" not in r]),
+            "failed_documents": len([r for r in results if "error" in r]),
+            "test_timestamp": datetime.now().isoformat(),
+            "test_type": "azure_durable_functions_processing",
+            "instance_id": instance_id
+        }
+
+        # Serialized one result at a time; with gzip only the compressed bytes accumulate.
+        # The body is still joined in memory: func.HttpResponse takes a complete body
+        # (streaming needs the FastAPI HTTP extension, which this app does not use).
+        chunks = iter_report_chunks(summary, results, performance_data, report_format, projection)
+        body = b"".join(iter_encoded_chunks(chunks, compress=compress))
+
+        is_ndjson = report_format == REPORT_FORMAT_NDJSON
+        content_type = "application/x-ndjson" if is_ndjson else "application/json"
+        filename = f"audit_results_consolidated_{instance_id[:8]}.{'ndjson' if is_ndjson else 'json'}"
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Type": f"{content_type}; charset=utf-8"
         }
-        
-        json_content = json.dumps(consolidated_result, indent=2, ensure_ascii=False)
-        filename = f"audit_results_consolidated_{instance_id[:8]}.json"
+        if compress:
+            headers["Content-Encoding"] = "gzip"
 
         return func.HttpResponse(
-            body=json_content,
+            body=body,
             status_code=HTTPStatus.OK,
-            mimetype="application/json",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Type": "application/json; charset=utf-8"
-            }
+            mimetype=content_type,
+            headers=headers
         )
     except Exception as e:
         logging.error(f"Error processing JSON report for download for instance {instance_id}: {e}")
@@ -0,0 +1,44 @@
+import logging
+from io import BytesIO
+from http import HTTPStatus
+
+import azure.functions as func
+import azure.durable_functions as df
+
+from utils.tabular_export import PARQUET_CONTENT_TYPE, flatten_audit_result, write_parquet
+
+
+async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
+    """Download the flattened audit results of a completed orchestration as Parquet (snappy)."""
+    instance_id = req.route_params.get("instance_id")
+    logging.debug(f"Parquet report download requested for instance ID: {instance_id}")
+
+    status = await client.get_status(instance_id)
+
+    if not status:
+        return func.HttpResponse("Orchestration instance not found.", status_code=HTTPStatus.NOT_FOUND)
+
+    if status.runtime_status != df.OrchestrationRuntimeStatus.Completed:
+        return func.HttpResponse(
+            f"Orchestration has not completed. Current status: {status.runtime_status.value}",
+            status_code=HTTPStatus.ACCEPTED
+        )
+
+    try:
+        results = status.output.get("results", [])
+        output_buffer = BytesIO()
+        write_parquet((flatten_audit_result(result, instance_id) for result in results), output_buffer)
+
+        filename = f"audit_results_{instance_id[:8]}.parquet"
+        return func.HttpResponse(
+            body=output_buffer.getvalue(),
+            status_code=HTTPStatus.OK,
+            mimetype=PARQUET_CONTENT_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except ImportError as e:
+        logging.error(f"Parquet export unavailable: {e}")
+        return func.HttpResponse("Parquet export is not available on this deployment.", status_code=HTTPStatus.NOT_IMPLEMENTED)
+    except Exception as e:
+        logging.error(f"Error processing Parquet report for download for instance {instance_id}: {e}")
+        return func.HttpResponse("Error processing the Parquet report for download.", status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
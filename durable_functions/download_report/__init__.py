@@ -5,6 +5,9 @@ from http import HTTPStatus
 import azure.functions as func
 import azure.durable_functions as df
 
+from services.report_storage import get_report_storage
+from utils.excel_report import EXCEL_CONTENT_TYPE
+
 
 async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
     instance_id = req.route_params.get("instance_id")
@@ -22,17 +25,23 @@ async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) ->
         )
 
     try:
-        b64_excel = status.output.get("excel_report_base64")
-        if not b64_excel:
-            raise ValueError("Base64 Excel report not found in orchestration output.")
+        report_reference = (status.output.get("excel_report") or {}).get("report")
+        if report_reference:
+            # Read in chunks from storage but joined here: func.HttpResponse takes a complete body
+            excel_bytes = b"".join(get_report_storage().iter_report(report_reference))
+        else:
+            # Orchestrations completed before reports moved to storage embed the workbook
+            b64_excel = status.output.get("excel_report_base64")
+            if not b64_excel:
+                return func.HttpResponse("Excel report not found for this orchestration.", status_code=HTTPStatus.NOT_FOUND)
+            excel_bytes = base64.b64decode(b64_excel)
 
-        excel_bytes = base64.b64decode(b64_excel)
         filename = f"audit_report_{instance_id[:8]}.xlsx"
 
         return func.HttpResponse(
             body=excel_bytes,
             status_code=HTTPStatus.OK,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mimetype=EXCEL_CONTENT_TYPE,
             headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
     except Exception as e:
@@ -1,7 +1,50 @@
 import azure.durable_functions as df
 from datetime import datetime
 
+from agents.models.result_models import AuditResultRecord
 from settings import logger
+from utils.excel_report import compact_excel_result
+
+
+# Webhook delivery: up to 4 attempts, 5 seconds apart
+CALLBACK_RETRY_OPTIONS = df.RetryOptions(first_retry_interval_in_milliseconds=5000, max_number_of_attempts=4)
+
+
+def _parse_orchestration_input(orchestration_input) -> tuple:
+    """
+    Split the orchestration input into the documents to process and the optional callback URL.
+
+    Accepts a single document ID, a list of documents, or a dict carrying
+    ``document_id``/``documents`` plus an optional ``callback_url``.
+    """
+    if isinstance(orchestration_input, dict):
+        documents = orchestration_input.get("documents") or [orchestration_input.get("document_id")]
+        return documents, orchestration_input.get("callback_url")
+    if isinstance(orchestration_input, list):
+        return orchestration_input, None
+    return [orchestration_input], None
+
+
+def _build_callback_payload(orchestration_id: str, output: dict) -> dict:
+    """Compact completion summary sent to the client's webhook instead of the full output."""
+    documents = []
+    for result in output.get("results", []):
+        auditor_data = result.get("auditor_agent") or {}
+        enhancement_data = result.get("enhancement_agent") or {}
+        documents.append({
+            "document_id": auditor_data.get("document_id") or enhancement_data.get("document_id"),
+            "final_assigned_code": auditor_data.get("final_assigned_code"),
+            "confidence_score": (auditor_data.get("confidence") or {}).get("score"),
+        })
+
+    return {
+        "instance_id": orchestration_id,
+        "runtime_status": "Completed",
+        "processed_documents": output.get("processed_documents"),
+        "successful_documents": output.get("successful_documents"),
+        "failed_documents": output.get("failed_documents"),
+        "documents": documents,
+    }
 
 
 def orchestrator_function(context: df.DurableOrchestrationContext):
@@ -9,17 +52,18 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
     orchestration_id = context.instance_id
     # orchestration_start_time = context.current_utc_datetime
     
-    document = context.get_input()
+    documents, callback_url = _parse_orchestration_input(context.get_input())
     
     context.set_custom_status("Starting document processing")
     logger.debug("🚀 OPTIMIZED EM Coding Pipeline: Request Ingested", 
                 orchestration_id=orchestration_id,
-                document_id=str(document)[:50],
+                document_id=str(documents)[:50],
+                has_callback=bool(callback_url),
                 pipeline_tracking="enabled")
 
     # Process documents through OPTIMIZED enhancement agent
     context.set_custom_status("Starting enhancement agent")
-    enhancement_tasks = [context.call_activity("enhancement_agent_activity", document)]
+    enhancement_tasks = [context.call_activity("enhancement_agent_activity", document) for document in documents]
     
     # Track actual enhancement execution time
     enhancement_results = yield context.task_all(enhancement_tasks)
@@ -43,15 +87,19 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
                 results_count=len(final_results))
     context.set_custom_status("Auditor agent completed")
     
-    # Generate Excel report
-    # excel_start = time.perf_counter()
-    # excel_b64 = yield context.call_activity("excel_export_activity", final_results)
-    # excel_duration = time.perf_counter() - excel_start
+    # Generate Excel report; the activity stores the workbook and returns only a reference.
+    # Activity inputs are written to the orchestration history, so note text is left out.
+    context.set_custom_status("Generating Excel report")
+    excel_report = yield context.call_activity("excel_export_activity", {
+        "instance_id": orchestration_id,
+        "results": [compact_excel_result(result) for result in final_results]
+    })
     
-    # logger.debug("⏱️ Excel Export Complete", 
-    #             orchestration_id=orchestration_id,
-    #             duration_seconds=excel_duration,
-    #             process="excel_export_phase")
+    logger.debug("⏱️ Excel Export Complete", 
+                orchestration_id=orchestration_id,
+                rows=excel_report.get("rows", 0),
+                duration_seconds=excel_report.get("duration_seconds"),
+                process="excel_export_phase")
     
     # Calculate comprehensive performance metrics using agent data
     # enhancement_agent_metrics = enhancement_results[0].get('enhancement_performance', {}) if enhancement_results else {}
@@ -80,6 +128,14 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
         }
         processed_results.append(processed_result)
 
+    # Index compact result rows so audits can be looked up without the instance ID
+    context.set_custom_status("Persisting results")
+    result_records = [
+        AuditResultRecord.from_pipeline_result(orchestration_id, context.current_utc_datetime, result).model_dump(mode="json")
+        for result in final_results
+    ]
+    persistence_result = yield context.call_activity("persist_results_activity", result_records)
+
     logger.debug("🏁 OPTIMIZED Pipeline Complete - COMPREHENSIVE PERFORMANCE SUMMARY",
                orchestration_id=orchestration_id,
                total_flow_execution_time=total_flow_execution_time,
@@ -103,8 +159,7 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
                 })
     
     # Return consolidated results with simple performance metrics
-    context.set_custom_status("E/M Coding pipeline completed")
-    return {
+    output = {
         "processed_documents": len(final_results),
         "successful_documents": successful_docs,
         "failed_documents": failed_docs,
@@ -115,8 +170,29 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
             "enhancement_agent_time": round(enhancement_agent_time, 2),
             "auditor_agent_time": round(auditor_agent_time, 2),
             "total_flow_execution_time": round(total_flow_execution_time, 2)
-        }
+        },
+        "persistence": persistence_result,
+        "excel_report": excel_report
     }
 
+    # Push completion to the client's webhook so it does not have to poll the status URLs
+    if callback_url:
+        context.set_custom_status("Notifying completion callback")
+        try:
+            output["callback"] = yield context.call_activity_with_retry(
+                "notify_completion_activity", CALLBACK_RETRY_OPTIONS, {
+                    "callback_url": callback_url,
+                    "payload": _build_callback_payload(orchestration_id, output)
+                })
+        except Exception as e:
+            # Every attempt failed: record it, the audit itself succeeded
+            logger.warning("📣 Completion callback not delivered after retries",
+                          orchestration_id=orchestration_id,
+                          error=str(e))
+            output["callback"] = {"delivered": False, "error": str(e)}
+
+    context.set_custom_status("E/M Coding pipeline completed")
+    return output
+
 
 main = orchestrator_function
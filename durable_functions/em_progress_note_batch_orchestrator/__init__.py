@@ -0,0 +1,115 @@
+import azure.durable_functions as df
+
+from settings import logger
+
+
+def _activity_input(appointment: dict):
+    """Progress-note activity input: the supplied dictations/intake, or the appointment ID to fetch them."""
+    if appointment.get("dictations"):
+        return {
+            "dictations": appointment["dictations"],
+            "patient_intake": appointment.get("patient_intake") or {}
+        }
+    return appointment["appointment_id"]
+
+
+def _is_failed(result) -> bool:
+    return not isinstance(result, dict) or result.get("status") == "failed" or "error" in result
+
+
+def orchestrator_function(context: df.DurableOrchestrationContext):
+    """
+    Generate progress notes for many appointments with bounded concurrency.
+
+    Input: {"appointments": [{"appointment_id", "dictations", "patient_intake"}, ...],
+            "max_concurrency": int, "format": "markdown" | "json"}
+
+    At most max_concurrency progress-note activities are scheduled at a time; a new
+    one starts whenever one finishes (sliding window). Markdown is rendered by
+    format_progress_note_activity after all notes are generated.
+    """
+    batch = context.get_input()
+    appointments = batch["appointments"]
+    max_concurrency = batch["max_concurrency"]
+    render_markdown = batch.get("format", "markdown") == "markdown"
+
+    logger.debug("🎭 Progress Note Batch Orchestrator: Starting",
+                orchestrator_instance_id=context.instance_id,
+                appointments=len(appointments),
+                max_concurrency=max_concurrency)
+
+    results = [None] * len(appointments)
+    pending = []
+    next_index = 0
+
+    def schedule_next():
+        nonlocal next_index
+        task = context.call_activity("progress_note_agent_activity", _activity_input(appointments[next_index]))
+        pending.append((task, next_index))
+        next_index += 1
+
+    while next_index < len(appointments) and len(pending) < max_concurrency:
+        schedule_next()
+
+    while pending:
+        context.set_custom_status(
+            f"Generating progress notes: {next_index - len(pending)}/{len(appointments)} completed"
+        )
+        finished = yield context.task_any([task for task, _ in pending])
+        position = next(i for i, (task, _) in enumerate(pending) if task is finished)
+        _, index = pending.pop(position)
+        if isinstance(finished.result, Exception):
+            # Failed at the host level (e.g. functionTimeout); keep it serializable for the formatter
+            logger.warning("⚠️ Progress note activity failed",
+                          orchestrator_instance_id=context.instance_id,
+                          appointment_id=appointments[index]["appointment_id"],
+                          error=str(finished.result))
+            results[index] = {"status": "failed", "error": str(finished.result) or type(finished.result).__name__}
+        else:
+            results[index] = finished.result
+        if next_index < len(appointments):
+            schedule_next()
+
+    markdown = [""] * len(results)
+    completed = [index for index, result in enumerate(results) if not _is_failed(result)]
+    if render_markdown and completed:
+        context.set_custom_status("Formatting progress notes")
+        rendered = yield context.call_activity("format_progress_note_activity", [results[index] for index in completed])
+        for index, note_markdown in zip(completed, rendered):
+            markdown[index] = note_markdown
+
+    appointment_results = []
+    for appointment, result, rendered in zip(appointments, results, markdown):
+        failed = _is_failed(result)
+        entry = {
+            "appointment_id": appointment["appointment_id"],
+            "status": "failed" if failed else "completed",
+        }
+        if failed:
+            entry["error"] = result.get("error", "Unknown error") if isinstance(result, dict) else str(result)
+        else:
+            entry["progress_note"] = result.get("progress_note")
+            entry["meta"] = result.get("meta")
+            if render_markdown:
+                entry["markdown"] = rendered
+        appointment_results.append(entry)
+
+    failed_count = sum(entry["status"] == "failed" for entry in appointment_results)
+    context.set_custom_status("Progress note batch completed")
+    logger.debug("🎭 Progress Note Batch Orchestrator: Complete",
+                orchestrator_instance_id=context.instance_id,
+                appointments=len(appointments),
+                failed=failed_count)
+
+    return {
+        "processed_appointments": len(appointments),
+        "successful_appointments": len(appointments) - failed_count,
+        "failed_appointments": failed_count,
+        "max_concurrency": max_concurrency,
+        "processing_timestamp": context.current_utc_datetime.isoformat(),
+        "orchestrator_instance_id": context.instance_id,
+        "results": appointment_results,
+    }
+
+
+main = orchestrator_function
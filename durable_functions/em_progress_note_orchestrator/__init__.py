@@ -4,115 +4,6 @@ from datetime import datetime
 from settings import logger
 
 
-# TODO: [DELETE] Format progress note as markdown before returning
-def format_progress_note_as_markdown(progress_note_result: dict) -> str:
-    """Format progress note result as a readable markdown similar to original dictation format."""
-    if not isinstance(progress_note_result, dict) or "progress_note" not in progress_note_result:
-        return ""
-    
-    progress_note = progress_note_result["progress_note"]
-    
-    # Build the formatted markdown
-    formatted_sections = []
-    
-    # Patient Info
-    patient_info = progress_note.get("patient_info", {})
-    formatted_sections.append("## Patient Information")
-    formatted_sections.append("")
-    formatted_sections.append(f"**Patient Name:** {patient_info.get('patient_name', '')}")
-    formatted_sections.append(f"**Date of Birth:** {patient_info.get('date_of_birth', '')}")
-    formatted_sections.append(f"**Date of Service:** {patient_info.get('date_of_service', '')}")
-    if provider := patient_info.get('provider'):
-        formatted_sections.append(f"**Provider:** {provider}")
-    formatted_sections.append("")
-    
-    # History
-    if history := progress_note.get("history"):
-        formatted_sections.append("## History")
-        formatted_sections.append("")
-        formatted_sections.append(history)
-        formatted_sections.append("")
-    
-    # Past Medical History
-    if pmh := progress_note.get("past_medical_history"):
-        formatted_sections.append("## Past Medical History")
-        formatted_sections.append("")
-        # Convert bullet points to markdown if it's already formatted with -
-        if pmh.strip().startswith('-'):
-            formatted_sections.append(pmh)
-        else:
-            formatted_sections.append(pmh)
-        formatted_sections.append("")
-    
-    # Medications
-    if medications := progress_note.get("medications"):
-        formatted_sections.append("## Medications")
-        formatted_sections.append("")
-        # Convert bullet points to markdown if it's already formatted with -
-        if medications.strip().startswith('-'):
-            formatted_sections.append(medications)
-        else:
-            formatted_sections.append(medications)
-        formatted_sections.append("")
-    
-    # Allergies
-    if allergies := progress_note.get("allergies"):
-        formatted_sections.append("## Allergies")
-        formatted_sections.append("")
-        formatted_sections.append(allergies)
-        formatted_sections.append("")
-    
-    # Physical Examination
-    if physical_exam := progress_note.get("physical_examination"):
-        formatted_sections.append("## Physical Examination")
-        formatted_sections.append("")
-        if isinstance(physical_exam, dict) and "findings" in physical_exam:
-            for finding in physical_exam["findings"]:
-                system = finding.get("system", "")
-                findings = finding.get("findings", "")
-                formatted_sections.append(f"**{system}:** {findings}")
-        else:
-            formatted_sections.append(str(physical_exam))
-        formatted_sections.append("")
-    
-    # Imaging/Studies
-    if imaging := progress_note.get("imaging_studies"):
-        formatted_sections.append("## Imaging / Radiographs / Studies Reviewed")
-        formatted_sections.append("")
-        formatted_sections.append(str(imaging))
-        formatted_sections.append("")
-    
-    # Assessment
-    if assessment := progress_note.get("assessment"):
-        formatted_sections.append("## Assessment")
-        formatted_sections.append("")
-        if isinstance(assessment, list):
-            for i, item in enumerate(assessment, 1):
-                formatted_sections.append(f"{i}. {item}")
-        else:
-            formatted_sections.append(str(assessment))
-        formatted_sections.append("")
-    
-    # Plan
-    if plan := progress_note.get("plan"):
-        formatted_sections.append("## Plan")
-        formatted_sections.append("")
-        if isinstance(plan, list):
-            for i, item in enumerate(plan, 1):
-                formatted_sections.append(f"{i}. {item}")
-        else:
-            formatted_sections.append(str(plan))
-        formatted_sections.append("")
-    
-    # Dictation Notes
-    if dictation_notes := progress_note.get("dictation_notes"):
-        formatted_sections.append("---")
-        formatted_sections.append("")
-        formatted_sections.append(f"*{dictation_notes}*")
-    
-    return "\n".join(formatted_sections)
-
-
 def orchestrator_function(context: df.DurableOrchestrationContext):
     appointment_id = context.get_input()
     
@@ -149,8 +40,12 @@ def orchestrator_function(context: df.DurableOrchestrationContext):
                         appointment_id=str(appointment_id),
                         agent_error=error_msg)
         
-        # TODO: [DELETE] Format progress note as markdown before returning
-        formatted_progress_note = format_progress_note_as_markdown(progress_note_result) if not has_error else ""
+        # Markdown is rendered in an activity so replays reuse the recorded result
+        formatted_progress_note = ""
+        if not has_error:
+            context.set_custom_status("Formatting progress note")
+            formatted_notes = yield context.call_activity("format_progress_note_activity", [progress_note_result])
+            formatted_progress_note = formatted_notes[0]
         
         return {
             "processed_documents": 1,
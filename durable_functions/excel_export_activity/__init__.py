@@ -1,92 +1,72 @@
-import logging
-import base64
-from io import BytesIO
-from typing import List
+import os
+import tempfile
+import time
+from datetime import datetime
 
-import pandas as pd
+from services.report_storage import get_report_storage
+from settings import logger
+from utils.excel_report import EXCEL_CONTENT_TYPE, write_excel_report
 
 
-def main(final_results: List[dict]) -> str:
-    logging.debug("Generating Excel report...")
+def main(export_request: dict) -> dict:
+    """
+    Generate the Excel report for an orchestration and store it outside the orchestration output.
+
+    Args:
+        export_request: {"instance_id": str, "results": list of compact_excel_result rows}
+
+    Returns:
+        {"report": storage reference or None when there were no rows, "rows": int, ...}
+    """
+    start_time = time.perf_counter()
+    instance_id = export_request.get("instance_id", "unknown")
+    logger.debug("📊 Excel Export Activity: Starting",
+                instance_id=instance_id,
+                results_count=len(export_request.get("results", [])))
+
+    fd, temp_path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
     try:
-        rows = []
-        for result in final_results:
-            if "error" in result: 
-                continue
-            
-            # Format evaluation with audit information (matching json_to_excel_converter.py)
-            auditor_data = result.get('auditor_agent', {})
-            final_justification_obj = auditor_data.get('final_justification', {})
-            audit_flags = auditor_data.get('audit_flags', [])
-            
-            # Create formatted evaluation text
-            evaluation_parts = []
-            
-            # Handle structured final_justification
-            if isinstance(final_justification_obj, dict):
-                if final_justification_obj.get('supportedBy'):
-                    evaluation_parts.append(f"Code Selection: {final_justification_obj['supportedBy']}")
-                
-                if final_justification_obj.get('documentationSummary'):
-                    doc_summary = '\n'.join([f"  • {item}" for item in final_justification_obj['documentationSummary']])
-                    evaluation_parts.append(f"Documentation Summary:\n{doc_summary}")
-                    
-                if final_justification_obj.get('mdmConsiderations'):
-                    mdm_considerations = '\n'.join([f"  • {item}" for item in final_justification_obj['mdmConsiderations']])
-                    evaluation_parts.append(f"MDM Considerations:\n{mdm_considerations}")
-                    
-                if final_justification_obj.get('complianceAlerts'):
-                    compliance_alerts = '\n'.join([f"  ⚠ {item}" for item in final_justification_obj['complianceAlerts']])
-                    evaluation_parts.append(f"Compliance Alerts:\n{compliance_alerts}")
-            elif isinstance(final_justification_obj, str) and final_justification_obj:
-                # Handle legacy string format for backward compatibility
-                evaluation_parts.append(f"Justification: {final_justification_obj}")
-            
-            if audit_flags:
-                flags_text = '\n'.join([f"  • {flag}" for flag in audit_flags])
-                evaluation_parts.append(f"Audit Flags:\n{flags_text}")
-            
-            rec = {
-                'Document ID': result.get('document_id'),
-                'Patient Name': result.get('patient_name', 'Unknown Patient'),
-                'Patient ID': result.get('patient_id', '0000'),
-                'Date of Service': result.get('date_of_service', 'N/A'),
-                'Provider': result.get('provider', 'N/A'),
-                'Assigned Code': result.get('enhancement_agent', {}).get('assigned_code', ''),
-                'E&M Code Justification': result.get('enhancement_agent', {}).get('justification', ''),
-                'E&M Code Evaluation': '\n\n'.join(evaluation_parts)
-            }
-            
-            # Add enhancement agent code recommendations and auditor evaluations
-            for code in ['99212', '99213', '99214', '99215']:
-                enh_key = f'code_{code}'
-                eval_key = f'code_{code}_evaluation'
-                
-                # enhancement recommendations
-                enh_text = result.get('enhancement_agent', {}) \
-                               .get('code_recommendations', {}) \
-                               .get(enh_key, '')
-                rec[f'E&M Code {code}'] = enh_text
-                
-                # auditor evaluations
-                eval_text = result.get('auditor_agent', {}) \
-                                .get('code_evaluations', {}) \
-                                .get(eval_key, '')
-                rec[f'E&M Code {code} evaluation'] = eval_text
-            
-            rows.append(rec)
+        with open(temp_path, "wb") as output:
+            row_count = write_excel_report(export_request.get("results", []), output)
+
+        reference = None
+        if row_count:
+            with open(temp_path, "rb") as report_file:
+                reference = get_report_storage().save_report(
+                    f"excel/audit_report_{instance_id}.xlsx", report_file, EXCEL_CONTENT_TYPE
+                )
+        else:
+            logger.warning("📊 Excel Export Activity: No data available to generate Excel report",
+                          instance_id=instance_id)
 
-        if not rows:
-            logging.warning("No data available to generate Excel report.")
-            return ""
+        duration = time.perf_counter() - start_time
+        logger.debug("📊 Excel Export Activity: Complete",
+                    instance_id=instance_id,
+                    rows=row_count,
+                    size_bytes=reference.get("size_bytes") if reference else 0,
+                    duration_seconds=round(duration, 3))
+        return {
+            "report": reference,
+            "rows": row_count,
+            "duration_seconds": round(duration, 3),
+            "timestamp": datetime.now().isoformat()
+        }
 
-        df = pd.DataFrame(rows)
-        output_buffer = BytesIO()
-        df.to_excel(output_buffer, index=False, engine='openpyxl')
-        output_buffer.seek(0)
-        b64_excel = base64.b64encode(output_buffer.read()).decode('utf-8')
-        logging.debug("Excel report generated successfully.")
-        return b64_excel
     except Exception as e:
-        logging.error(f"Error generating Excel file: {e}")
-        return ""
+        duration = time.perf_counter() - start_time
+        logger.error("📊 Excel Export Activity: Failed",
+                    instance_id=instance_id,
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    duration_seconds=round(duration, 3),
+                    exc_info=True)
+        return {
+            "report": None,
+            "rows": 0,
+            "error": str(e),
+            "duration_seconds": round(duration, 3),
+            "timestamp": datetime.now().isoformat()
+        }
+    finally:
+        os.remove(temp_path)
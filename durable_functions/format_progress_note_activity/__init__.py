@@ -0,0 +1,16 @@
+import time
+from typing import List
+
+from settings import logger
+from utils.progress_note_formatter import format_progress_note_as_markdown
+
+
+def main(notes: List[dict]) -> List[str]:
+    """Render progress-note results as markdown ("" for failed or unstructured results)."""
+    start_time = time.perf_counter()
+    rendered = [format_progress_note_as_markdown(note) for note in notes]
+    logger.debug("📝 Format Progress Note Activity: Complete",
+                notes=len(notes),
+                rendered=sum(bool(markdown) for markdown in rendered),
+                duration_seconds=round(time.perf_counter() - start_time, 3))
+    return rendered
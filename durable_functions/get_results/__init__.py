@@ -0,0 +1,114 @@
+"""Azure Function for querying persisted audit results."""
+
+import json
+from http import HTTPStatus
+
+import azure.functions as func
+from azure.core.exceptions import AzureError
+
+from services.results_service import DEFAULT_PAGE_SIZE, get_results_repository
+from settings import logger
+from utils.guidelines_cache import get_guidelines_version
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Look up audit results without knowing the orchestration instance ID.
+
+    Query parameters (at least one lookup is required):
+    - document_id: Results for a specific document
+    - patient_id: Results for a specific patient
+    - provider: Results for a specific provider
+    - start_date / end_date: Inclusive processing date range (YYYY-MM-DD)
+    - limit: Page size (optional, default 50, max 500)
+    - continuation_token: Token returned by the previous page (optional)
+
+    Every item carries "stale": true when it was produced under a guidelines
+    version other than the one currently loaded (or under an unknown version).
+    """
+    logger.debug(
+        "Received results query request",
+        method=req.method,
+        url=req.url,
+        function=f"{__name__}.main"
+    )
+
+    try:
+        limit_param = req.params.get("limit")
+        limit = DEFAULT_PAGE_SIZE
+        if limit_param:
+            try:
+                limit = int(limit_param)
+            except ValueError:
+                return func.HttpResponse(
+                    json.dumps({"error": "Invalid limit parameter"}),
+                    status_code=HTTPStatus.BAD_REQUEST.value,
+                    headers={"Content-Type": "application/json"}
+                )
+
+        try:
+            result = get_results_repository().query_results(
+                document_id=req.params.get("document_id"),
+                patient_id=req.params.get("patient_id"),
+                provider=req.params.get("provider"),
+                start_date=req.params.get("start_date"),
+                end_date=req.params.get("end_date"),
+                limit=limit,
+                continuation_token=req.params.get("continuation_token")
+            )
+        except ValueError as e:
+            return func.HttpResponse(
+                json.dumps({"error": str(e)}),
+                status_code=HTTPStatus.BAD_REQUEST.value,
+                headers={"Content-Type": "application/json"}
+            )
+
+        current_version = get_guidelines_version()
+        for item in result["items"]:
+            item["stale"] = item.get("guideline_version") != current_version
+        result["guideline_version"] = current_version
+
+        logger.debug(
+            "Retrieved audit results",
+            count=result["count"],
+            has_more=bool(result["continuation_token"]),
+            function=f"{__name__}.main"
+        )
+
+        return func.HttpResponse(
+            json.dumps(result, default=str),
+            status_code=HTTPStatus.OK.value,
+            headers={"Content-Type": "application/json"}
+        )
+
+    except AzureError as e:
+        logger.error(
+            "Azure storage error during results query",
+            error=str(e),
+            function=f"{__name__}.main",
+            exc_info=True
+        )
+        return func.HttpResponse(
+            json.dumps({
+                "error": "Storage service unavailable",
+                "message": "Please try again later"
+            }),
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
+            headers={"Content-Type": "application/json"}
+        )
+
+    except Exception as e:
+        logger.error(
+            "Unexpected error during results query",
+            error=str(e),
+            function=f"{__name__}.main",
+            exc_info=True
+        )
+        return func.HttpResponse(
+            json.dumps({
+                "error": "Internal server error",
+                "message": "An unexpected error occurred"
+            }),
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR.value,
+            headers={"Content-Type": "application/json"}
+        )
@@ -1,3 +1,4 @@
+import json
 import logging
 from http import HTTPStatus
 
@@ -6,7 +7,24 @@ import azure.functions as func
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.debug("Health check endpoint was triggered.")
+    if req.params.get("details", "").lower() not in ("1", "true", "yes"):
+        return func.HttpResponse(
+            "Audit Tool API is up and running.",
+            status_code=HTTPStatus.OK
+        )
+
+    # Worker diagnostics; imported here so the plain health check stays dependency-free
+    from utils.guidelines_cache import get_cache_statistics
+    from utils.html_processor import get_html_text_cache_statistics
+    from utils.http_client import get_http_pool_stats
+
     return func.HttpResponse(
-        "Audit Tool API is up and running.",
-        status_code=HTTPStatus.OK
+        json.dumps({
+            "status": "ok",
+            "guidelines_cache": get_cache_statistics(),
+            "html_text_cache": get_html_text_cache_statistics(),
+            "model_http_pool": get_http_pool_stats()
+        }),
+        status_code=HTTPStatus.OK,
+        headers={"Content-Type": "application/json"}
     )
@@ -0,0 +1,83 @@
+import time
+from datetime import datetime
+
+import httpx
+
+from settings import logger
+from utils.callback_urls import callback_url_error
+
+
+CALLBACK_TIMEOUT_SECONDS = 10.0
+
+
+class CallbackDeliveryError(Exception):
+    """Transient delivery failure (network error, 429 or 5xx); raised so the orchestrator retries."""
+
+
+async def main(notification: dict) -> dict:
+    """
+    Deliver the completion payload of an orchestration to the client's webhook.
+
+    Transient failures raise CallbackDeliveryError so the orchestrator's retry policy
+    runs the activity again; refused URLs and other 4xx responses are reported in the
+    returned status instead, since retrying cannot fix them.
+    """
+    callback_url = notification.get("callback_url")
+    payload = notification.get("payload", {})
+    instance_id = payload.get("instance_id", "N/A")
+    start_time = time.perf_counter()
+
+    logger.debug("📣 Completion Callback Activity: Starting",
+                instance_id=instance_id,
+                callback_url=callback_url)
+
+    # Checked again here: the allowlist may have changed since the orchestration started
+    refused = callback_url_error(callback_url or "")
+    if refused:
+        logger.warning("📣 Completion Callback Activity: Callback URL refused",
+                      instance_id=instance_id,
+                      callback_url=callback_url,
+                      reason=refused)
+        return {
+            "delivered": False,
+            "error": refused,
+            "duration_seconds": 0.0,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    try:
+        # Redirects are not followed, so an allowed host cannot bounce the request elsewhere
+        async with httpx.AsyncClient(timeout=CALLBACK_TIMEOUT_SECONDS, follow_redirects=False) as http_client:
+            response = await http_client.post(callback_url, json=payload)
+    except httpx.HTTPError as e:
+        logger.warning("📣 Completion Callback Activity: Delivery failed, will retry",
+                      instance_id=instance_id,
+                      callback_url=callback_url,
+                      error=str(e),
+                      error_type=type(e).__name__,
+                      duration_seconds=round(time.perf_counter() - start_time, 3))
+        raise CallbackDeliveryError(f"{type(e).__name__}: {e}") from e
+
+    duration = time.perf_counter() - start_time
+    if response.status_code == 429 or response.status_code >= 500:
+        logger.warning("📣 Completion Callback Activity: Callback endpoint unavailable, will retry",
+                      instance_id=instance_id,
+                      callback_url=callback_url,
+                      status_code=response.status_code,
+                      duration_seconds=round(duration, 3))
+        raise CallbackDeliveryError(f"Callback endpoint returned HTTP {response.status_code}")
+
+    delivered = response.is_success
+    log = logger.debug if delivered else logger.warning
+    log("📣 Completion Callback Activity: Finished",
+        instance_id=instance_id,
+        callback_url=callback_url,
+        status_code=response.status_code,
+        duration_seconds=round(duration, 3))
+
+    return {
+        "delivered": delivered,
+        "status_code": response.status_code,
+        "duration_seconds": round(duration, 3),
+        "timestamp": datetime.now().isoformat()
+    }
@@ -0,0 +1,38 @@
+import time
+from datetime import datetime
+from typing import List
+
+from agents.models.result_models import AuditResultRecord
+from services.results_service import get_results_repository
+from settings import logger
+
+
+def main(records: List[dict]) -> dict:
+    """Write the compact result rows of an orchestration to the results store."""
+    start_time = time.perf_counter()
+
+    try:
+        stored = get_results_repository().save_results([AuditResultRecord(**record) for record in records])
+        duration = time.perf_counter() - start_time
+        logger.debug("💾 Persist Results Activity: Complete",
+                    stored_results=stored,
+                    duration_seconds=round(duration, 3))
+        return {
+            "stored_results": stored,
+            "duration_seconds": round(duration, 3),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        duration = time.perf_counter() - start_time
+        logger.error("💾 Persist Results Activity: Failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    duration_seconds=round(duration, 3),
+                    exc_info=True)
+        return {
+            "stored_results": 0,
+            "error": str(e),
+            "duration_seconds": round(duration, 3),
+            "timestamp": datetime.now().isoformat()
+        }
@@ -1,35 +1,51 @@
 import time
 from datetime import datetime
 
-from agents.em_progress_note_agent import generate_progress_note
+from agents.em_progress_note_agent import main as progress_note_agent_main
 from settings import logger
 
 
-def main(appointment_id: str) -> str:
-    start_time = time.time()
-    
-    logger.debug("🎯 Progress Note Agent Activity: Starting", 
-                appointment_id=str(appointment_id),
-                activity_start_time=start_time)
-    
+async def main(appointment_id) -> dict:
+    """
+    Generate a progress note on the worker's event loop.
+
+    The MCP fetch and the model call are awaited, so one worker can run many
+    progress-note activities concurrently instead of blocking a thread per note.
+    """
+    start_time = time.perf_counter()
+
+    logger.debug("🎯 Progress Note Agent Activity: Starting",
+                appointment_id=str(appointment_id)[:50])
+
     try:
-        result = generate_progress_note(appointment_id)
-        
-        duration = time.time() - start_time
-        logger.debug("🎯 Progress Note Agent Activity: Completed successfully", 
-                    appointment_id=str(appointment_id),
-                    duration_seconds=duration)
-        
+        result = await progress_note_agent_main(appointment_id)
+        duration = time.perf_counter() - start_time
+
+        if "error" in result:
+            logger.error("🎯 Progress Note Agent Activity: Agent returned error",
+                        appointment_id=str(appointment_id)[:50],
+                        error=result["error"],
+                        duration_seconds=round(duration, 3))
+            return {
+                **result,
+                "status": "failed",
+                "appointment_id": str(appointment_id),
+                "timestamp": datetime.now().isoformat()
+            }
+
+        logger.debug("🎯 Progress Note Agent Activity: Completed successfully",
+                    appointment_id=str(appointment_id)[:50],
+                    duration_seconds=round(duration, 3))
         return result
-        
+
     except Exception as e:
-        duration = time.time() - start_time
-        logger.error("🎯 Progress Note Agent Activity: Error occurred", 
-                    appointment_id=str(appointment_id),
+        duration = time.perf_counter() - start_time
+        logger.error("🎯 Progress Note Agent Activity: Error occurred",
+                    appointment_id=str(appointment_id)[:50],
                     error=str(e),
-                    duration_seconds=duration,
+                    duration_seconds=round(duration, 3),
                     exc_info=True)
-        
+
         return {
             "status": "failed",
             "error": str(e),
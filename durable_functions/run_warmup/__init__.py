@@ -0,0 +1,30 @@
+"""Azure Function that warms the worker serving it and reports per-step timings."""
+
+import json
+from http import HTTPStatus
+
+import azure.functions as func
+
+from services.warmup_service import run_warmup
+
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Warm up this worker before real traffic arrives.
+
+    Query parameters:
+    - prime: "true" to also send one tiny model request, "false" to skip it
+      (default: WARMUP_PRIME_MODEL)
+
+    Returns 200 when every step succeeded or was skipped, 503 otherwise.
+    """
+    prime_param = req.params.get("prime")
+    prime_model = prime_param.lower() in ("1", "true", "yes") if prime_param is not None else None
+
+    report = await run_warmup(prime_model=prime_model, trigger="http")
+
+    return func.HttpResponse(
+        json.dumps(report),
+        status_code=HTTPStatus.OK.value if report["status"] == "ok" else HTTPStatus.SERVICE_UNAVAILABLE.value,
+        headers={"Content-Type": "application/json"}
+    )
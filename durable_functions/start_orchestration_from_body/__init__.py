@@ -1,16 +1,42 @@
 import logging
 import json
 from http import HTTPStatus
+from typing import Optional
 
 import azure.functions as func
 import azure.durable_functions as df
 
+from utils.callback_urls import callback_url_error
+
+
+def _get_callback_url(req: func.HttpRequest) -> Optional[str]:
+    """Read the optional webhook URL from the query string or the JSON body."""
+    callback_url = req.params.get("callback_url")
+    if callback_url:
+        return callback_url
+    try:
+        body = req.get_json()
+    except ValueError:
+        return None
+    return body.get("callback_url") if isinstance(body, dict) else None
+
 
 async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
     logging.debug("Orchestration start from request body received.")
     try:
         document_id = req.params.get("document_id")
-        instance_id = await client.start_new("em_coding_orchestrator", client_input=document_id)
+        callback_url = _get_callback_url(req)
+
+        callback_error = callback_url_error(callback_url) if callback_url else None
+        if callback_error:
+            return func.HttpResponse(
+                json.dumps({"error": callback_error}),
+                status_code=HTTPStatus.BAD_REQUEST,
+                mimetype="application/json"
+            )
+
+        client_input = {"document_id": document_id, "callback_url": callback_url} if callback_url else document_id
+        instance_id = await client.start_new("em_coding_orchestrator", client_input=client_input)
         logging.debug(f"Orchestration started with ID: {instance_id}")
         return client.create_check_status_response(req, instance_id)
 
@@ -7,14 +7,59 @@ import azure.durable_functions as df
 
 from utils.pdf_processor import process_pdf_samples
 
+SAMPLE_DIR = "data/samples"
+
+
+def _int_param(req: func.HttpRequest, name: str):
+    value = req.params.get(name)
+    return int(value) if value and value.isdigit() and int(value) > 0 else None
+
 
 async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
     logging.debug("Orchestration start from samples requested.")
     try:
-        limit_str = req.params.get('limit')
-        limit = int(limit_str) if limit_str and limit_str.isdigit() else None
+        limit = _int_param(req, 'limit')
+        batch_size = _int_param(req, 'batch_size')
+
+        if req.params.get('max_active'):
+            # Waiting for running orchestrations would hold the request past the HTTP response
+            # limit (~230 s) and functionTimeout, losing the instance IDs already started
+            return func.HttpResponse(
+                json.dumps({"error": "max_active is not supported on this route; use batch_size only."}),
+                status_code=HTTPStatus.BAD_REQUEST,
+                mimetype="application/json"
+            )
+
+        if batch_size:
+            # Stream: start an orchestration per batch as soon as its PDFs are parsed
+            from services.ingestion_pipeline import submit_em_coding_batches
+            from utils.pdf_ingestion import aiter_em_inputs
+
+            submission = await submit_em_coding_batches(
+                client,
+                aiter_em_inputs(SAMPLE_DIR, limit=limit),
+                batch_size=batch_size
+            )
+            if not submission["instance_ids"]:
+                return func.HttpResponse(
+                    json.dumps({"message": "No sample PDF files were found or processed."}),
+                    status_code=HTTPStatus.NOT_FOUND,
+                    mimetype="application/json"
+                )
+            logging.debug(f"Started {submission['batches']} orchestrations from samples")
+            return func.HttpResponse(
+                json.dumps({
+                    **submission,
+                    "orchestrations": [
+                        client.create_http_management_payload(instance_id)
+                        for instance_id in submission["instance_ids"]
+                    ]
+                }),
+                status_code=HTTPStatus.ACCEPTED,
+                mimetype="application/json"
+            )
 
-        sample_inputs = process_pdf_samples(limit=limit)
+        sample_inputs = process_pdf_samples(SAMPLE_DIR, limit=limit)
 
         if not sample_inputs:
             return func.HttpResponse(
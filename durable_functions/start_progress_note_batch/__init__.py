@@ -0,0 +1,87 @@
+import logging
+import json
+from http import HTTPStatus
+
+import azure.functions as func
+import azure.durable_functions as df
+
+from constants import azure_config
+
+# Upper bound for a caller-supplied max_concurrency
+MAX_BATCH_CONCURRENCY = 50
+OUTPUT_FORMATS = ("markdown", "json")
+
+
+def parse_batch_request(body) -> dict:
+    """
+    Validate a batch request and build the orchestrator input.
+
+    Body: {"appointments": [{"appointment_id": str, "dictations": [...], "patient_intake": {...}}, ...],
+           "max_concurrency": int (optional), "format": "markdown" | "json" (optional)}
+
+    Appointments without dictations are fetched from the MCP server by appointment_id.
+
+    Raises:
+        ValueError: If the request is invalid
+    """
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    appointments = body.get("appointments")
+    if not isinstance(appointments, list) or not appointments:
+        raise ValueError("appointments must be a non-empty list")
+    max_appointments = azure_config.progress_note_batch_max_appointments
+    if len(appointments) > max_appointments:
+        raise ValueError(f"A batch accepts at most {max_appointments} appointments")
+
+    normalized = []
+    for position, appointment in enumerate(appointments):
+        if not isinstance(appointment, dict) or not appointment.get("appointment_id"):
+            raise ValueError(f"appointments[{position}] must be an object with an appointment_id")
+        dictations = appointment.get("dictations") or []
+        if not isinstance(dictations, list):
+            raise ValueError(f"appointments[{position}].dictations must be a list")
+        normalized.append({
+            "appointment_id": str(appointment["appointment_id"]),
+            "dictations": dictations,
+            "patient_intake": appointment.get("patient_intake") or {},
+        })
+
+    max_concurrency = body.get("max_concurrency", azure_config.progress_note_batch_max_concurrency)
+    if not isinstance(max_concurrency, int) or not 1 <= max_concurrency <= MAX_BATCH_CONCURRENCY:
+        raise ValueError(f"max_concurrency must be an integer between 1 and {MAX_BATCH_CONCURRENCY}")
+
+    output_format = body.get("format", "markdown")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(OUTPUT_FORMATS)}")
+
+    return {"appointments": normalized, "max_concurrency": max_concurrency, "format": output_format}
+
+
+async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
+    try:
+        try:
+            batch = parse_batch_request(req.get_json())
+        except ValueError as e:
+            return func.HttpResponse(
+                json.dumps({"error": str(e)}),
+                status_code=HTTPStatus.BAD_REQUEST,
+                mimetype="application/json"
+            )
+
+        logging.debug(f"📋 Starting batch progress note generation for {len(batch['appointments'])} appointments")
+        instance_id = await client.start_new("em_progress_note_batch_orchestrator", client_input=batch)
+        logging.debug(f"🎭 Batch orchestration started with instance ID: {instance_id}")
+        return client.create_check_status_response(req, instance_id)
+
+    except Exception as e:
+        logging.error(f"❌ Error starting batch progress note generation: {str(e)}", exc_info=True)
+        return func.HttpResponse(
+            json.dumps({
+                "error": "Failed to start batch progress note generation",
+                "details": str(e),
+                "error_type": type(e).__name__
+            }),
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            mimetype="application/json"
+        )
@@ -0,0 +1,66 @@
+import logging
+import json
+from http import HTTPStatus
+
+import azure.functions as func
+import azure.durable_functions as df
+
+
+# Azure Functions closes idle HTTP requests after 230 seconds, so the wait must end before that
+DEFAULT_TIMEOUT_SECONDS = 30
+MAX_TIMEOUT_SECONDS = 200
+DEFAULT_RETRY_INTERVAL_SECONDS = 2
+
+
+def _parse_seconds(value: str, default: int, maximum: int) -> int:
+    """Parse a positive number of seconds from a query parameter, clamped to the maximum."""
+    if not value:
+        return default
+    seconds = int(value)
+    if seconds <= 0:
+        raise ValueError("Value must be positive")
+    return min(seconds, maximum)
+
+
+async def main(req: func.HttpRequest, client: df.DurableOrchestrationClient) -> func.HttpResponse:
+    """
+    Long-poll an orchestration instance until it completes or the timeout expires.
+
+    Query parameters:
+    - timeout: Seconds to wait for completion (default 30, max 200)
+    - interval: Seconds between status checks inside the host (default 2)
+
+    Returns the orchestration output when it finishes in time, otherwise the standard
+    202 check-status payload so the client can simply call this endpoint again.
+    """
+    instance_id = req.route_params.get("instance_id")
+    logging.debug(f"Long-poll requested for instance ID: {instance_id}")
+
+    try:
+        timeout_seconds = _parse_seconds(req.params.get("timeout"), DEFAULT_TIMEOUT_SECONDS, MAX_TIMEOUT_SECONDS)
+        interval_seconds = _parse_seconds(req.params.get("interval"), DEFAULT_RETRY_INTERVAL_SECONDS, timeout_seconds)
+    except ValueError:
+        return func.HttpResponse(
+            json.dumps({"error": "timeout and interval must be positive integers (seconds)"}),
+            status_code=HTTPStatus.BAD_REQUEST,
+            mimetype="application/json"
+        )
+
+    try:
+        status = await client.get_status(instance_id)
+        if not status:
+            return func.HttpResponse("Orchestration instance not found.", status_code=HTTPStatus.NOT_FOUND)
+
+        return await client.wait_for_completion_or_create_check_status_response(
+            req,
+            instance_id,
+            timeout_in_milliseconds=timeout_seconds * 1000,
+            retry_interval_in_milliseconds=interval_seconds * 1000
+        )
+    except Exception as e:
+        logging.error(f"Error waiting for orchestration {instance_id}: {str(e)}")
+        return func.HttpResponse(
+            json.dumps({"error": "Could not wait for the orchestration.", "details": str(e)}),
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            mimetype="application/json"
+        )
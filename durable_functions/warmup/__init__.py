@@ -0,0 +1,13 @@
+"""Platform warm-up trigger: runs on each new instance before it receives traffic."""
+
+from services.warmup_service import run_warmup
+from settings import logger
+
+
+async def main(warmup_context) -> None:
+    """Warm this instance so its first real request does not pay startup costs."""
+    report = await run_warmup(trigger="platform")
+    logger.info("🔥 Instance warm-up finished",
+                status=report["status"],
+                duration_seconds=report["total_duration_seconds"],
+                steps={step["name"]: step["status"] for step in report["steps"]})
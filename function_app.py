@@ -1,21 +1,10 @@
 import azure.functions as func
 import azure.durable_functions as df
 
-# Health
-from durable_functions.health import main as health_main
-# Processing agents
-from durable_functions.start_orchestration_from_body import main as start_orchestration_from_body_main
-from durable_functions.download_json_report import main as download_json_report_main
-from durable_functions.em_coding_orchestrator import main as em_coding_orchestrator_main
-from durable_functions.enhancement_agent_activity import main as enhancement_agent_activity_main
-from durable_functions.auditor_agent_activity import main as auditor_agent_activity_main
-# Progress Note
-from durable_functions.start_progress_note_from_id import main as progress_note_from_id_main
-from durable_functions.em_progress_note_orchestrator import main as em_progress_note_orchestrator_main
-from durable_functions.progress_note_agent_activity import main as progress_note_agent_activity_main
-# Feedback endpoints
-from durable_functions.submit_feedback import main as submit_feedback_main
-from durable_functions.get_feedback_analytics import main as get_feedback_analytics_main
+# Route modules are imported inside each function on first invocation, so a cold
+# start only loads the dependencies of the routes it actually serves (pydantic-ai,
+# logfire, openpyxl, pyarrow and the Azure storage SDKs stay unloaded for
+# /api/health). Profile with `python -m utils.import_profiler`.
 
 
 app = func.FunctionApp()
@@ -24,59 +13,161 @@ app = func.FunctionApp()
 @app.function_name("health")
 @app.route(route="health", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
 def health(req: func.HttpRequest) -> func.HttpResponse:
-    return health_main(req)
+    from durable_functions.health import main
+    return main(req)
 
 @app.function_name("start_orchestration_from_body")
 @app.route(route="orchestrations", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
 @app.durable_client_input(client_name="client")
-def start_orchestration_from_body(req: func.HttpRequest, client) -> func.HttpResponse:
-    return start_orchestration_from_body_main(req, client)
+async def start_orchestration_from_body(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.start_orchestration_from_body import main
+    return await main(req, client)
+
+@app.function_name("start_orchestration_from_samples")
+@app.route(route="orchestrations/from-samples", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def start_orchestration_from_samples(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.start_orchestration_from_samples import main
+    return await main(req, client)
 
 @app.function_name("download_json_report")
 @app.route(route="reports/json/{instance_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
 @app.durable_client_input(client_name="client")
-def download_json_report(req: func.HttpRequest, client) -> func.HttpResponse:
-    return download_json_report_main(req, client)
+async def download_json_report(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.download_json_report import main
+    return await main(req, client)
+
+@app.function_name("download_report")
+@app.route(route="reports/excel/{instance_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def download_report(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.download_report import main
+    return await main(req, client)
+
+@app.function_name("download_csv_report")
+@app.route(route="reports/csv/{instance_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def download_csv_report(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.download_csv_report import main
+    return await main(req, client)
+
+@app.function_name("download_parquet_report")
+@app.route(route="reports/parquet/{instance_id}", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def download_parquet_report(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.download_parquet_report import main
+    return await main(req, client)
+
+@app.function_name("wait_for_orchestration")
+@app.route(route="orchestrations/{instance_id}/wait", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def wait_for_orchestration(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.wait_for_orchestration import main
+    return await main(req, client)
 
 @app.function_name("progress_note_from_id")
 @app.route(route="progress-notes", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
 @app.durable_client_input(client_name="client")
-def progress_note_from_id(req: func.HttpRequest, client) -> func.HttpResponse:
-    return progress_note_from_id_main(req, client)
+async def progress_note_from_id(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.start_progress_note_from_id import main
+    return await main(req, client)
+
+@app.function_name("start_progress_note_batch")
+@app.route(route="progress-notes/batch", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
+@app.durable_client_input(client_name="client")
+async def start_progress_note_batch(req: func.HttpRequest, client) -> func.HttpResponse:
+    from durable_functions.start_progress_note_batch import main
+    return await main(req, client)
 
 @app.function_name("submit_feedback")
 @app.route(route="feedback", methods=["POST"], auth_level=func.AuthLevel.ANONYMOUS)
 def submit_feedback(req: func.HttpRequest) -> func.HttpResponse:
-    return submit_feedback_main(req)
+    from durable_functions.submit_feedback import main
+    return main(req)
 
 @app.function_name("get_feedback_analytics")
 @app.route(route="feedback/analytics", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
 def get_feedback_analytics(req: func.HttpRequest) -> func.HttpResponse:
-    return get_feedback_analytics_main(req)
+    from durable_functions.get_feedback_analytics import main
+    return main(req)
+
+@app.function_name("get_results")
+@app.route(route="results", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
+def get_results(req: func.HttpRequest) -> func.HttpResponse:
+    from durable_functions.get_results import main
+    return main(req)
+
+@app.function_name("run_warmup")
+@app.route(route="warmup", methods=["GET", "POST"], auth_level=func.AuthLevel.ANONYMOUS)
+async def run_warmup(req: func.HttpRequest) -> func.HttpResponse:
+    from durable_functions.run_warmup import main
+    return await main(req)
+
+# Warm-up trigger (must be named "warmup"); runs when the platform adds an instance
+@app.function_name("warmup")
+@app.warm_up_trigger("warmup_context")
+async def warmup(warmup_context) -> None:
+    from durable_functions.warmup import main
+    await main(warmup_context)
 
 # Orchestrator
 @app.function_name("em_coding_orchestrator")
 @app.orchestration_trigger(context_name="context")
 def em_coding_orchestrator(context: df.DurableOrchestrationContext):
-    return em_coding_orchestrator_main(context)
+    from durable_functions.em_coding_orchestrator import main
+    return main(context)
 
 @app.function_name("em_progress_note_orchestrator")
 @app.orchestration_trigger(context_name="context")
 def em_progress_note_orchestrator(context: df.DurableOrchestrationContext):
-    return em_progress_note_orchestrator_main(context)
+    from durable_functions.em_progress_note_orchestrator import main
+    return main(context)
+
+@app.function_name("em_progress_note_batch_orchestrator")
+@app.orchestration_trigger(context_name="context")
+def em_progress_note_batch_orchestrator(context: df.DurableOrchestrationContext):
+    from durable_functions.em_progress_note_batch_orchestrator import main
+    return main(context)
 
 # Activities
 @app.function_name("enhancement_agent_activity")
 @app.activity_trigger(input_name="document")
 async def enhancement_agent_activity(document: dict) -> dict:
-    return await enhancement_agent_activity_main(document)
+    from durable_functions.enhancement_agent_activity import main
+    return await main(document)
 
 @app.function_name("auditor_agent_activity")
 @app.activity_trigger(input_name="enhancement_data")
 async def auditor_agent_activity(enhancement_data: dict) -> dict:
-    return await auditor_agent_activity_main(enhancement_data)
+    from durable_functions.auditor_agent_activity import main
+    return await main(enhancement_data)
+
+@app.function_name("notify_completion_activity")
+@app.activity_trigger(input_name="notification")
+async def notify_completion_activity(notification: dict) -> dict:
+    from durable_functions.notify_completion_activity import main
+    return await main(notification)
+
+@app.function_name("excel_export_activity")
+@app.activity_trigger(input_name="export_request")
+def excel_export_activity(export_request: dict) -> dict:
+    from durable_functions.excel_export_activity import main
+    return main(export_request)
+
+@app.function_name("persist_results_activity")
+@app.activity_trigger(input_name="records")
+def persist_results_activity(records: list) -> dict:
+    from durable_functions.persist_results_activity import main
+    return main(records)
 
 @app.function_name("progress_note_agent_activity")
 @app.activity_trigger(input_name="appointment_id")
-async def progress_note_agent_activity(appointment_id: str) -> dict:
-    return await progress_note_agent_activity_main(appointment_id)
+async def progress_note_agent_activity(appointment_id) -> dict:
+    from durable_functions.progress_note_agent_activity import main
+    return await main(appointment_id)
+
+@app.function_name("format_progress_note_activity")
+@app.activity_trigger(input_name="notes")
+def format_progress_note_activity(notes: list) -> list:
+    from durable_functions.format_progress_note_activity import main
+    return main(notes)
@@ -0,0 +1,98 @@
+"""Service streaming parsed documents into E/M coding orchestrations with backpressure."""
+
+import asyncio
+from typing import Any, AsyncIterable, Dict, List, Optional
+
+import azure.durable_functions as df
+
+from agents.models.pydantic_models import EMInput
+from settings import logger
+
+
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+ORCHESTRATOR_NAME = "em_coding_orchestrator"
+
+_ACTIVE_STATUSES = {
+    df.OrchestrationRuntimeStatus.Pending,
+    df.OrchestrationRuntimeStatus.Running,
+    df.OrchestrationRuntimeStatus.ContinuedAsNew,
+}
+
+
+async def _wait_for_capacity(client, instance_ids: List[str], active: List[str], max_active: int, poll_interval: float) -> None:
+    """Block until fewer than max_active of the submitted orchestrations are still running."""
+    while True:
+        statuses = await asyncio.gather(*[client.get_status(instance_id) for instance_id in active])
+        active[:] = [
+            instance_id for instance_id, status in zip(active, statuses)
+            if status is not None and status.runtime_status in _ACTIVE_STATUSES
+        ]
+        if len(active) < max_active:
+            return
+        logger.debug("⏳ Ingestion pipeline waiting for orchestrations to finish",
+                    active=len(active),
+                    max_active=max_active,
+                    submitted=len(instance_ids))
+        await asyncio.sleep(poll_interval)
+
+
+async def submit_em_coding_batches(
+    client,
+    documents: AsyncIterable[EMInput],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_active: Optional[int] = None,
+    callback_url: Optional[str] = None,
+    poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS
+) -> Dict[str, Any]:
+    """
+    Start one E/M coding orchestration per batch_size documents as they arrive.
+
+    The first orchestration starts as soon as its batch is parsed, and only the
+    batch being filled is held in memory. With max_active set, no new batch is
+    submitted (and therefore no more documents are pulled from the source) while
+    that many of the submitted orchestrations are still running.
+
+    Args:
+        client: Durable orchestration client
+        documents: Parsed documents, e.g. utils.pdf_ingestion.aiter_em_inputs(...)
+        batch_size: Documents per orchestration
+        max_active: Maximum concurrently running orchestrations (None: unbounded)
+        callback_url: Optional completion webhook passed to every orchestration
+
+    Returns:
+        Dict with the started "instance_ids", "documents" and "batches" counts
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    if max_active is not None and max_active <= 0:
+        raise ValueError("max_active must be positive")
+
+    instance_ids: List[str] = []
+    active: List[str] = []
+    batch: List[dict] = []
+    document_count = 0
+
+    async def submit() -> None:
+        if max_active is not None and len(active) >= max_active:
+            await _wait_for_capacity(client, instance_ids, active, max_active, poll_interval_seconds)
+        documents_batch = batch[:]
+        batch.clear()
+        client_input = {"documents": documents_batch, "callback_url": callback_url} if callback_url else documents_batch
+        instance_id = await client.start_new(ORCHESTRATOR_NAME, client_input=client_input)
+        instance_ids.append(instance_id)
+        active.append(instance_id)
+        logger.debug("📤 Ingestion pipeline started orchestration",
+                    instance_id=instance_id,
+                    batch=len(instance_ids),
+                    documents=len(documents_batch))
+
+    async for document in documents:
+        batch.append(document.model_dump())
+        document_count += 1
+        if len(batch) >= batch_size:
+            await submit()
+    if batch:
+        await submit()
+
+    return {"instance_ids": instance_ids, "documents": document_count, "batches": len(instance_ids)}
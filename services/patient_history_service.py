@@ -0,0 +1,154 @@
+"""Service for the incremental per-patient clinical history index used by progress notes."""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import TableServiceClient, UpdateMode
+
+from agents.models.patient_history_models import PatientHistory
+from agents.models.result_models import to_table_key
+from constants import ResultsStoreBackend, azure_config
+from settings import logger
+
+
+# Optimistic-concurrency retries when two notes for the same patient update the index at once
+MAX_UPDATE_ATTEMPTS = 5
+HISTORY_ROW_KEY = "history"
+
+
+class PatientHistoryRepository(ABC):
+    """Storage-agnostic repository holding one PatientHistory per patient."""
+
+    @abstractmethod
+    def get_history(self, patient_id: str) -> Optional[PatientHistory]:
+        """Get a patient's indexed history, or None when nothing is indexed yet."""
+
+    @abstractmethod
+    def record_dictations(self, patient_id: str, dictations: List[Dict[str, Any]]) -> PatientHistory:
+        """
+        Index the patient's dictations that are not indexed yet and return the updated history.
+
+        Only the visits newer than the last indexed one are scanned; the stored history
+        is written back only when it changed.
+        """
+
+
+class TablePatientHistoryRepository(PatientHistoryRepository):
+    """Azure Tables implementation: one entity per patient, updated with ETag checks."""
+
+    def __init__(self):
+        self.table_name = azure_config.patient_history_table_name
+        self.table_service_client = TableServiceClient.from_connection_string(
+            conn_str=azure_config.storage_connection_string
+        )
+        self.table_client = self.table_service_client.create_table_if_not_exists(self.table_name)
+
+    def _read(self, patient_id: str):
+        try:
+            entity = self.table_client.get_entity(partition_key=to_table_key(patient_id), row_key=HISTORY_ROW_KEY)
+        except ResourceNotFoundError:
+            return None, None
+        return PatientHistory.model_validate_json(entity["History"]), entity.metadata["etag"]
+
+    def get_history(self, patient_id: str) -> Optional[PatientHistory]:
+        return self._read(patient_id)[0]
+
+    def record_dictations(self, patient_id: str, dictations: List[Dict[str, Any]]) -> PatientHistory:
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            history, etag = self._read(patient_id)
+            history = history or PatientHistory(patient_id=patient_id)
+            if not history.add_dictations(dictations):
+                return history
+
+            entity = {
+                "PartitionKey": to_table_key(patient_id),
+                "RowKey": HISTORY_ROW_KEY,
+                "PatientId": patient_id,
+                "VisitCount": history.visit_count,
+                "History": history.model_dump_json(),
+            }
+            try:
+                if etag is None:
+                    self.table_client.create_entity(entity=entity)
+                else:
+                    self.table_client.update_entity(
+                        entity=entity,
+                        mode=UpdateMode.REPLACE,
+                        etag=etag,
+                        match_condition=MatchConditions.IfNotModified
+                    )
+            except (ResourceExistsError, ResourceModifiedError):
+                logger.debug(
+                    "Patient history changed concurrently, retrying",
+                    patient_id=patient_id,
+                    attempt=attempt + 1,
+                    function=f"{__name__}.{self.__class__.__name__}.record_dictations"
+                )
+                continue
+            return history
+
+        raise RuntimeError(f"Could not update patient history for {patient_id} after {MAX_UPDATE_ATTEMPTS} attempts")
+
+
+class SqlitePatientHistoryRepository(PatientHistoryRepository):
+    """Local sqlite stand-in, stored next to the audit results."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or azure_config.results_sqlite_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS patient_history (
+                    patient_id TEXT PRIMARY KEY,
+                    visit_count INTEGER NOT NULL,
+                    history TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def _read(self, patient_id: str) -> Optional[PatientHistory]:
+        row = self._connection.execute(
+            "SELECT history FROM patient_history WHERE patient_id = ?", (patient_id,)
+        ).fetchone()
+        return PatientHistory.model_validate_json(row[0]) if row else None
+
+    def get_history(self, patient_id: str) -> Optional[PatientHistory]:
+        with self._lock:
+            return self._read(patient_id)
+
+    def record_dictations(self, patient_id: str, dictations: List[Dict[str, Any]]) -> PatientHistory:
+        # The lock makes read-modify-write atomic for every note generated by this worker
+        with self._lock, self._connection:
+            history = self._read(patient_id) or PatientHistory(patient_id=patient_id)
+            if history.add_dictations(dictations):
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO patient_history (patient_id, visit_count, history, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (patient_id, history.visit_count, history.model_dump_json(), datetime.now(timezone.utc).isoformat())
+                )
+        return history
+
+
+@lru_cache(maxsize=None)
+def get_patient_history_repository() -> PatientHistoryRepository:
+    """Get the patient history repository (same backend selection as the results store)."""
+    backend = azure_config.results_store_backend
+    logger.debug(
+        "Initializing patient history repository",
+        backend=backend,
+        function=f"{__name__}.get_patient_history_repository"
+    )
+    if backend == ResultsStoreBackend.AZURE_TABLE.value:
+        return TablePatientHistoryRepository()
+    if backend == ResultsStoreBackend.SQLITE.value:
+        return SqlitePatientHistoryRepository()
+    raise ValueError(f"Unsupported patient history backend: {backend}")
@@ -0,0 +1,133 @@
+"""Service for storing generated report files outside the orchestration output."""
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from azure.core.exceptions import ResourceExistsError
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+from constants import ReportStorageBackend, azure_config
+from settings import logger
+
+
+# Read size used when streaming local report files back to clients
+_LOCAL_READ_CHUNK_BYTES = 1024 * 1024
+
+
+class ReportStorage(ABC):
+    """
+    Storage-agnostic report file store.
+
+    save_report returns a small JSON-serializable reference that is stored in the
+    orchestration output instead of the report bytes themselves.
+    """
+
+    backend: str
+
+    @abstractmethod
+    def save_report(self, name: str, stream: BinaryIO, content_type: str) -> Dict[str, Any]:
+        """Store the stream under name and return a reference to it."""
+
+    @abstractmethod
+    def iter_report(self, reference: Dict[str, Any]) -> Iterator[bytes]:
+        """Yield the stored report in chunks."""
+
+    def _reference(self, name: str, size_bytes: int, content_type: str) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "name": name,
+            "size_bytes": size_bytes,
+            "content_type": content_type,
+        }
+
+
+class BlobReportStorage(ReportStorage):
+    """Azure Blob Storage implementation."""
+
+    backend = ReportStorageBackend.AZURE_BLOB.value
+
+    def __init__(self):
+        self.container_name = azure_config.reports_container_name
+        self.blob_service_client = BlobServiceClient.from_connection_string(azure_config.storage_connection_string)
+        self.container_client = self.blob_service_client.get_container_client(self.container_name)
+        try:
+            self.container_client.create_container()
+        except ResourceExistsError:
+            pass
+
+    def save_report(self, name: str, stream: BinaryIO, content_type: str) -> Dict[str, Any]:
+        blob_client = self.container_client.upload_blob(
+            name=name,
+            data=stream,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type)
+        )
+        size_bytes = blob_client.get_blob_properties().size
+
+        logger.debug(
+            "Stored report in blob storage",
+            container_name=self.container_name,
+            name=name,
+            size_bytes=size_bytes,
+            function=f"{__name__}.{self.__class__.__name__}.save_report"
+        )
+        return {**self._reference(name, size_bytes, content_type), "container": self.container_name}
+
+    def iter_report(self, reference: Dict[str, Any]) -> Iterator[bytes]:
+        container_client = self.blob_service_client.get_container_client(reference.get("container", self.container_name))
+        yield from container_client.download_blob(reference["name"]).chunks()
+
+
+class LocalReportStorage(ReportStorage):
+    """Local filesystem implementation, used for development and tests."""
+
+    backend = ReportStorageBackend.LOCAL.value
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or azure_config.reports_local_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        path = os.path.realpath(os.path.join(self.base_dir, name))
+        if os.path.commonpath([path, os.path.realpath(self.base_dir)]) != os.path.realpath(self.base_dir):
+            raise ValueError(f"Invalid report name: {name}")
+        return path
+
+    def save_report(self, name: str, stream: BinaryIO, content_type: str) -> Dict[str, Any]:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as report_file:
+            shutil.copyfileobj(stream, report_file)
+        size_bytes = os.path.getsize(path)
+
+        logger.debug(
+            "Stored report on local disk",
+            path=path,
+            size_bytes=size_bytes,
+            function=f"{__name__}.{self.__class__.__name__}.save_report"
+        )
+        return self._reference(name, size_bytes, content_type)
+
+    def iter_report(self, reference: Dict[str, Any]) -> Iterator[bytes]:
+        with open(self._path(reference["name"]), "rb") as report_file:
+            while chunk := report_file.read(_LOCAL_READ_CHUNK_BYTES):
+                yield chunk
+
+
+@lru_cache(maxsize=None)
+def get_report_storage() -> ReportStorage:
+    """Get the configured report storage (shared per worker)."""
+    backend = azure_config.report_storage_backend
+    logger.debug(
+        "Initializing report storage",
+        backend=backend,
+        function=f"{__name__}.get_report_storage"
+    )
+    if backend == ReportStorageBackend.AZURE_BLOB.value:
+        return BlobReportStorage()
+    if backend == ReportStorageBackend.LOCAL.value:
+        return LocalReportStorage()
+    raise ValueError(f"Unsupported report storage backend: {backend}")
@@ -0,0 +1,311 @@
+"""Service for persisting audit results and querying them by document, patient, provider or date."""
+
+import base64
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from azure.data.tables import TableServiceClient
+
+from agents.models.result_models import AuditResultRecord, date_partition_key, to_table_key
+from constants import ResultsStoreBackend, azure_config
+from settings import logger
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_continuation_token(token: Any) -> Optional[str]:
+    """Encode a backend continuation token as an opaque URL-safe string."""
+    if token is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(token).encode("utf-8")).decode("ascii")
+
+
+def decode_continuation_token(token: Optional[str]) -> Any:
+    """Decode a continuation token produced by encode_continuation_token."""
+    if not token:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid continuation token") from e
+
+
+def _table_continuation_token(token: Optional[str]) -> Optional[Dict[str, str]]:
+    """Decode an Azure Tables continuation token ({"PartitionKey": ..., "RowKey": ...})."""
+    value = decode_continuation_token(token)
+    if value is None:
+        return None
+    if not (isinstance(value, dict) and value and set(value) <= {"PartitionKey", "RowKey"}
+            and all(isinstance(key, str) for key in value.values())):
+        raise ValueError("Invalid continuation token")
+    return value
+
+
+def _offset_continuation_token(token: Optional[str]) -> int:
+    """Decode an offset continuation token (0 when absent)."""
+    value = decode_continuation_token(token)
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("Invalid continuation token")
+    return value
+
+
+def _date_bounds(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Convert inclusive YYYY-MM-DD bounds into [start, end) ISO prefixes for string comparison."""
+    start = date.fromisoformat(start_date).isoformat() if start_date else None
+    end = (date.fromisoformat(end_date) + timedelta(days=1)).isoformat() if end_date else None
+    return start, end
+
+
+class ResultsRepository(ABC):
+    """Storage-agnostic repository for compact audit result records."""
+
+    @abstractmethod
+    def save_results(self, records: List[AuditResultRecord]) -> int:
+        """Persist records and return how many were written."""
+
+    @abstractmethod
+    def query_results(
+        self,
+        document_id: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Query records, newest first.
+
+        Exactly one lookup key is used, in order of precedence: document_id, patient_id,
+        provider. start_date/end_date (inclusive, YYYY-MM-DD, on the processing date)
+        narrow the lookup, or act as the lookup on their own when no key is given.
+
+        Returns:
+            Dict with "count", "items" and an opaque "continuation_token" (None on the last page)
+        """
+
+    @staticmethod
+    def _validate_query(document_id, patient_id, provider, start_date, end_date, limit) -> None:
+        if not any([document_id, patient_id, provider, start_date, end_date]):
+            raise ValueError("One of document_id, patient_id, provider, start_date or end_date is required")
+        if limit <= 0 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+
+class TableResultsRepository(ResultsRepository):
+    """
+    Azure Tables implementation.
+
+    Every record is written once per index (document, patient, provider, processing date)
+    with the index value in the PartitionKey, so each lookup is a single-partition query.
+    """
+
+    def __init__(self):
+        self.table_name = azure_config.results_table_name
+        self.table_service_client = TableServiceClient.from_connection_string(
+            conn_str=azure_config.storage_connection_string
+        )
+        self.table_client = self.table_service_client.create_table_if_not_exists(self.table_name)
+
+    def save_results(self, records: List[AuditResultRecord]) -> int:
+        for record in records:
+            for partition_key in record.index_keys().values():
+                self.table_client.upsert_entity(entity=record.to_azure_entity(partition_key))
+
+        logger.debug(
+            "Stored audit results in Azure Tables",
+            table_name=self.table_name,
+            count=len(records),
+            function=f"{__name__}.{self.__class__.__name__}.save_results"
+        )
+        return len(records)
+
+    def query_results(
+        self,
+        document_id: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        self._validate_query(document_id, patient_id, provider, start_date, end_date, limit)
+        start, end = _date_bounds(start_date, end_date)
+
+        conditions = []
+        parameters: Dict[str, Any] = {}
+        for index, value in (("document", document_id), ("patient", patient_id), ("provider", provider)):
+            if value:
+                conditions.append("PartitionKey eq @pk")
+                parameters["pk"] = f"{index}|{to_table_key(value)}"
+                if start:
+                    conditions.append("ProcessedAt ge @start")
+                    parameters["start"] = start
+                if end:
+                    conditions.append("ProcessedAt lt @end")
+                    parameters["end"] = end
+                break
+        else:
+            # Date-only lookup: contiguous range scan over the per-day partitions, whose
+            # inverted-date keys make ascending key order newest day first
+            conditions.append("PartitionKey ge @newest_pk and PartitionKey le @oldest_pk")
+            parameters["newest_pk"] = date_partition_key(date.fromisoformat(end_date)) if end_date else "date|"
+            parameters["oldest_pk"] = date_partition_key(date.fromisoformat(start_date)) if start_date else "date|~"
+
+        pages = self.table_client.query_entities(
+            query_filter=" and ".join(conditions),
+            parameters=parameters,
+            results_per_page=limit
+        ).by_page(continuation_token=_table_continuation_token(continuation_token))
+
+        items = [AuditResultRecord.from_azure_entity(entity).model_dump(mode="json") for entity in next(pages, [])]
+        return {
+            "count": len(items),
+            "items": items,
+            "continuation_token": encode_continuation_token(pages.continuation_token),
+        }
+
+
+class SqliteResultsRepository(ResultsRepository):
+    """Local sqlite stand-in with the same query semantics, used for development and tests."""
+
+    _COLUMNS = list(AuditResultRecord.model_fields.keys())
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or azure_config.results_sqlite_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS audit_results (
+                    document_id TEXT NOT NULL,
+                    instance_id TEXT NOT NULL,
+                    processed_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    patient_id TEXT,
+                    patient_name TEXT,
+                    provider TEXT,
+                    date_of_service TEXT,
+                    is_new_patient INTEGER,
+                    assigned_code TEXT,
+                    final_assigned_code TEXT,
+                    confidence_score INTEGER,
+                    confidence_tier TEXT,
+                    audit_flags_count INTEGER NOT NULL DEFAULT 0,
+                    guideline_version TEXT,
+                    error TEXT,
+                    PRIMARY KEY (document_id, instance_id)
+                )
+                """
+            )
+            # Databases created before results were stamped with the guidelines version
+            existing = {row["name"] for row in self._connection.execute("PRAGMA table_info(audit_results)")}
+            if "guideline_version" not in existing:
+                self._connection.execute("ALTER TABLE audit_results ADD COLUMN guideline_version TEXT")
+            for column in ("patient_id", "provider", "processed_at"):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_audit_results_{column} ON audit_results ({column}, processed_at)"
+                )
+
+    def save_results(self, records: List[AuditResultRecord]) -> int:
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        rows = []
+        for record in records:
+            row = record.model_dump(mode="json")
+            rows.append(tuple(row[column] for column in self._COLUMNS))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO audit_results ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+
+        logger.debug(
+            "Stored audit results in sqlite",
+            db_path=self.db_path,
+            count=len(records),
+            function=f"{__name__}.{self.__class__.__name__}.save_results"
+        )
+        return len(records)
+
+    def query_results(
+        self,
+        document_id: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        continuation_token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        self._validate_query(document_id, patient_id, provider, start_date, end_date, limit)
+        start, end = _date_bounds(start_date, end_date)
+        offset = _offset_continuation_token(continuation_token)
+
+        conditions = []
+        parameters: List[Any] = []
+        for column, value in (("document_id", document_id), ("patient_id", patient_id), ("provider", provider)):
+            if value:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+                break
+        if start:
+            conditions.append("processed_at >= ?")
+            parameters.append(start)
+        if end:
+            conditions.append("processed_at < ?")
+            parameters.append(end)
+
+        # Fetch one extra row to know whether another page exists
+        with self._lock:
+            cursor = self._connection.execute(
+                f"SELECT * FROM audit_results WHERE {' AND '.join(conditions)} "
+                f"ORDER BY processed_at DESC, document_id LIMIT ? OFFSET ?",
+                (*parameters, limit + 1, offset)
+            )
+            rows = cursor.fetchall()
+
+        items = []
+        for row in rows[:limit]:
+            item = dict(row)
+            if item["is_new_patient"] is not None:
+                item["is_new_patient"] = bool(item["is_new_patient"])
+            items.append(AuditResultRecord(**item).model_dump(mode="json"))
+
+        return {
+            "count": len(items),
+            "items": items,
+            "continuation_token": encode_continuation_token(offset + limit) if len(rows) > limit else None,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_results_repository() -> ResultsRepository:
+    """Get the configured results repository (shared per worker)."""
+    backend = azure_config.results_store_backend
+    logger.debug(
+        "Initializing results repository",
+        backend=backend,
+        function=f"{__name__}.get_results_repository"
+    )
+    if backend == ResultsStoreBackend.AZURE_TABLE.value:
+        return TableResultsRepository()
+    if backend == ResultsStoreBackend.SQLITE.value:
+        return SqliteResultsRepository()
+    raise ValueError(f"Unsupported results store backend: {backend}")
@@ -0,0 +1,185 @@
+"""Service that pays a worker's one-time startup costs before the first real request."""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from constants import azure_config
+from settings import logger
+from utils.guidelines_cache import get_guidelines_snapshot, warm_cache_async
+from utils.http_client import get_http_pool_stats
+from utils.mcp_client import get_mcp_connection_stats, get_mcp_server
+
+
+PRIME_PROMPT = "Reply with OK."
+
+STEP_OK = "ok"
+STEP_SKIPPED = "skipped"
+STEP_FAILED = "failed"
+
+# A warm-up that completed this recently is reported again instead of re-run
+WARMUP_REUSE_SECONDS = 60.0
+
+# Concurrent warm-ups (platform trigger + HTTP) await the one in-flight run
+_inflight: Optional[asyncio.Task] = None
+_inflight_prime_model = False
+_last_report: Optional[Dict[str, Any]] = None
+_last_completed_at = float("-inf")
+
+
+class WarmupSkipped(Exception):
+    """Raised by a warm-up step that does not apply to this deployment."""
+
+
+async def _warm_guidelines() -> Dict[str, Any]:
+    """Load the compiled guidelines and their section index."""
+    await warm_cache_async()
+    snapshot = get_guidelines_snapshot()
+    return {"version": snapshot.version[:12], "source": snapshot.source}
+
+
+async def _warm_agents() -> Dict[str, Any]:
+    """Build every agent (and configure instrumentation) for the current guidelines version."""
+    from agents.models.optimized_pydantic_models import (
+        get_optimized_em_auditor_agent,
+        get_optimized_em_enhancement_agent,
+        get_optimized_progress_note_agent,
+    )
+
+    builders = {
+        "enhancement": get_optimized_em_enhancement_agent,
+        "auditor": get_optimized_em_auditor_agent,
+        "progress_note": get_optimized_progress_note_agent,
+    }
+    for build in builders.values():
+        build()
+    return {"agents": list(builders)}
+
+
+async def _warm_mcp() -> Dict[str, Any]:
+    """Open the worker's shared MCP session (DNS, TLS, SSE handshake) and leave it open for requests."""
+    if not os.getenv("MCP_API_URL"):
+        raise WarmupSkipped("MCP_API_URL not set")
+
+    server = await get_mcp_server()
+    tools = await server.list_tools()
+    return {"tools": len(tools)}
+
+
+async def _prime_model() -> Dict[str, Any]:
+    """Send one tiny request through the shared model client to open its pooled TLS connection."""
+    from pydantic_ai.direct import model_request
+    from pydantic_ai.messages import ModelRequest
+
+    from agents.models.azure_openai_model import get_optimized_azure_openai_model
+
+    model = get_optimized_azure_openai_model()
+    response = await model_request(model, [ModelRequest.user_text_prompt(PRIME_PROMPT)])
+    return {"model": model.model_name, "total_tokens": response.usage.total_tokens}
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    result: Dict[str, Any] = {"name": name}
+    try:
+        result.update(await step())
+        result["status"] = STEP_OK
+    except WarmupSkipped as e:
+        result.update(status=STEP_SKIPPED, reason=str(e))
+    except Exception as e:
+        logger.error(f"🔥 Warm-up step failed: {name}",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    exc_info=True)
+        result.update(status=STEP_FAILED, error=str(e), error_type=type(e).__name__)
+    result["duration_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    logger.debug(f"⏱️ Warm-up step: {name}",
+                duration_seconds=result["duration_seconds"],
+                status=result["status"],
+                process=f"warmup_{name}")
+    return result
+
+
+async def _warmup(prime_model: bool, trigger: str) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    logger.debug("🔥 Warm-up: Starting", trigger=trigger, prime_model=prime_model)
+
+    steps: List[Dict[str, Any]] = [
+        await _run_step("guidelines", _warm_guidelines),
+        await _run_step("agents", _warm_agents),
+        await _run_step("mcp_handshake", _warm_mcp),
+    ]
+    if prime_model:
+        steps.append(await _run_step("model_prime", _prime_model))
+    else:
+        steps.append({"name": "model_prime", "status": STEP_SKIPPED, "reason": "disabled", "duration_seconds": 0.0})
+
+    total = round(time.perf_counter() - start_time, 3)
+    status = "degraded" if any(step["status"] == STEP_FAILED for step in steps) else "ok"
+    logger.debug("🔥 Warm-up: Complete", trigger=trigger, status=status, duration_seconds=total)
+
+    return {
+        "status": status,
+        "trigger": trigger,
+        "total_duration_seconds": total,
+        "steps": steps,
+        "model_http_pool": get_http_pool_stats(),
+        "mcp_connection": get_mcp_connection_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _covers(report: Dict[str, Any], prime_model: bool) -> bool:
+    """Whether a finished warm-up did everything a new one with this prime_model would."""
+    primed = any(step["name"] == "model_prime" and step["status"] == STEP_OK for step in report["steps"])
+    return report["status"] == "ok" and (primed or not prime_model)
+
+
+async def run_warmup(prime_model: Optional[bool] = None, trigger: str = "http") -> Dict[str, Any]:
+    """
+    Warm this worker: guidelines, agents, MCP session and (optionally) one model request.
+
+    A call made while a warm-up is running awaits that run, and a call made within
+    WARMUP_REUSE_SECONDS of a successful run gets its report back (marked "reused").
+
+    Args:
+        prime_model: Send a tiny model request; defaults to WARMUP_PRIME_MODEL
+        trigger: What started the warm-up (logged and reported)
+
+    Returns:
+        Report with overall status and per-step timings
+    """
+    global _inflight, _inflight_prime_model, _last_report, _last_completed_at
+
+    if prime_model is None:
+        prime_model = azure_config.warmup_prime_model
+
+    if (_last_report is not None and time.monotonic() - _last_completed_at < WARMUP_REUSE_SECONDS
+            and _covers(_last_report, prime_model)):
+        logger.debug("🔥 Warm-up: Reusing recent run", trigger=trigger)
+        return {**_last_report, "reused": True}
+
+    loop = asyncio.get_running_loop()
+    if _inflight is not None and (_inflight.done() or _inflight.get_loop() is not loop):
+        _inflight = None
+    if _inflight is not None and (_inflight_prime_model or not prime_model):
+        logger.debug("🔥 Warm-up: Joining the run in progress", trigger=trigger)
+        return {**await asyncio.shield(_inflight), "reused": True}
+    if _inflight is not None:
+        # The run in progress does not prime the model; let it finish, then run with priming
+        await asyncio.gather(asyncio.shield(_inflight), return_exceptions=True)
+        return await run_warmup(prime_model=prime_model, trigger=trigger)
+
+    task = loop.create_task(_warmup(prime_model, trigger))
+    _inflight, _inflight_prime_model = task, prime_model
+    try:
+        # Shielded: a cancelled caller must not cancel the run other callers are waiting on
+        report = await asyncio.shield(task)
+    finally:
+        if _inflight is task and task.done():
+            _inflight = None
+    _last_report, _last_completed_at = report, time.monotonic()
+    return report
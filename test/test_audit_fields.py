@@ -0,0 +1,69 @@
+"""Test that derivable audit fields are computed locally instead of generated by the model."""
+
+import asyncio
+from types import SimpleNamespace
+
+from agents import optimized_em_auditor_agent
+from agents.models.optimized_pydantic_models import (
+    ConfidenceJudgement,
+    JustificationJudgement,
+    OptimizedEMAuditJudgement,
+)
+from utils.audit_fields import complete_audit_result, confidence_tier, supported_by
+
+
+def _judgement(code="99214", score=90):
+    return OptimizedEMAuditJudgement(
+        audit_flags=["Time not documented"],
+        final_assigned_code=code,
+        final_justification=JustificationJudgement(
+            documentationSummary=["Two chronic illnesses"],
+            mdmConsiderations=["Prescription drug management"]
+        ),
+        confidence=ConfidenceJudgement(score=score, score_deductions=["- Score reduced by 10 points: No ROS"])
+    )
+
+
+def test_confidence_tier_bands():
+    assert [confidence_tier(score) for score in (100, 90, 89, 70, 69, 50, 49, 30, 29, 0)] == [
+        "Very High", "Very High", "High", "High", "Moderate", "Moderate", "Low", "Low", "Very Low", "Very Low"
+    ]
+
+
+def test_supported_by_uses_the_mdm_level_of_the_code():
+    assert supported_by("99214") == "Supported by moderate MDM per AMA 2025 E/M guidelines."
+    assert supported_by("99202") == "Supported by straightforward MDM per AMA 2025 E/M guidelines."
+    assert supported_by("99499") == "Supported by documented MDM per AMA 2025 E/M guidelines."
+
+
+def test_model_schema_excludes_derived_fields():
+    schema = str(OptimizedEMAuditJudgement.model_json_schema())
+
+    assert "supportedBy" not in schema
+    assert "tier" not in schema
+
+
+def test_complete_audit_result_uses_the_corrected_code():
+    result = complete_audit_result(_judgement("99214", score=90), final_code="99204")
+
+    assert result.final_assigned_code == "99204"
+    assert result.final_justification.supportedBy == "Supported by moderate MDM per AMA 2025 E/M guidelines."
+    assert result.final_justification.documentationSummary == ["Two chronic illnesses"]
+    assert result.confidence.tier == "Very High"
+    assert result.confidence.score_deductions == ["- Score reduced by 10 points: No ROS"]
+
+
+def test_auditor_fills_derived_fields(monkeypatch):
+    class Agent:
+        async def run(self, prompt):
+            return SimpleNamespace(output=_judgement("99215", score=72))
+
+    monkeypatch.setattr(optimized_em_auditor_agent, "get_optimized_em_auditor_agent", lambda snapshot=None: Agent())
+    enhancement = {"document_id": "DOC-1", "text": "Note", "assigned_code": "99215",
+                   "justification": "High MDM", "is_new_patient": True}
+
+    result = asyncio.run(optimized_em_auditor_agent.main(enhancement))
+
+    assert result["final_assigned_code"] == "99205"
+    assert result["confidence"]["tier"] == "High"
+    assert result["final_justification"]["supportedBy"] == "Supported by high MDM per AMA 2025 E/M guidelines."
@@ -0,0 +1,59 @@
+"""Test the completion webhook allowlist and delivery retries."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from durable_functions import notify_completion_activity
+from utils.callback_urls import callback_url_error
+
+
+ALLOWED = ["hooks.example.com", "*.partner.org"]
+AsyncClient = httpx.AsyncClient
+
+
+def test_only_allowed_hosts_are_accepted():
+    assert callback_url_error("https://hooks.example.com/done", ALLOWED) is None
+    assert callback_url_error("https://api.partner.org/cb", ALLOWED) is None
+    assert callback_url_error("https://partner.org.evil.com/cb", ALLOWED)
+    assert callback_url_error("http://169.254.169.254/metadata", ALLOWED)
+    assert callback_url_error("http://localhost:7071/api/health", ALLOWED)
+    assert callback_url_error("ftp://hooks.example.com/done", ALLOWED)
+    assert callback_url_error("https://user:pw@hooks.example.com/done", ALLOWED)
+
+
+def test_callbacks_are_refused_without_an_allowlist(monkeypatch):
+    monkeypatch.delenv("CALLBACK_ALLOWED_HOSTS", raising=False)
+    assert callback_url_error("https://hooks.example.com/done") is not None
+
+    monkeypatch.setenv("CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+    assert callback_url_error("https://hooks.example.com/done") is None
+
+
+def _notify(monkeypatch, handler):
+    monkeypatch.setenv("CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: AsyncClient(transport=transport, **kwargs))
+    notification = {"callback_url": "https://hooks.example.com/done", "payload": {"instance_id": "abc"}}
+    return asyncio.run(notify_completion_activity.main(notification))
+
+
+def test_transient_failures_raise_for_the_retry_policy(monkeypatch):
+    with pytest.raises(notify_completion_activity.CallbackDeliveryError):
+        _notify(monkeypatch, lambda request: httpx.Response(503))
+
+
+def test_client_errors_are_reported_without_retrying(monkeypatch):
+    assert _notify(monkeypatch, lambda request: httpx.Response(404))["delivered"] is False
+    assert _notify(monkeypatch, lambda request: httpx.Response(200))["delivered"] is True
+
+
+def test_refused_urls_are_never_requested(monkeypatch):
+    monkeypatch.setenv("CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+    notification = {"callback_url": "http://10.0.0.1/internal", "payload": {"instance_id": "abc"}}
+
+    result = asyncio.run(notify_completion_activity.main(notification))
+
+    assert result["delivered"] is False
+    assert "CALLBACK_ALLOWED_HOSTS" in result["error"]
@@ -0,0 +1,60 @@
+"""Test the compiled clinical concept matcher used for context extraction."""
+
+import json
+import os
+import tempfile
+
+from utils.clinical_matcher import ClinicalMatcher, get_clinical_matcher
+
+
+def test_matches_synonyms_with_word_boundaries_and_spans():
+    """Test that synonyms map to their concept, substrings do not match, and spans point into the text."""
+    text = "Pt with HTN and Type 2 Diabetes. Condition unstable. Takes Coumadin."
+    matches = get_clinical_matcher().find(text)
+
+    assert [(match.concept, match.text) for match in matches] == [
+        ("hypertension", "HTN"),
+        ("diabetes", "Type 2 Diabetes"),
+        ("warfarin", "Coumadin"),
+    ]
+    assert all(text[match.start:match.end] == match.text for match in matches)
+
+
+def test_negated_hits_are_flagged_within_the_clause():
+    """Test that a negation cue only negates concepts in its own clause."""
+    matcher = get_clinical_matcher()
+    text = "Denies asthma or COPD. Hypertension is not stable."
+
+    negated = {match.concept: match.negated for match in matcher.find(text)}
+
+    assert negated == {"asthma": True, "copd": True, "hypertension": False, "Stable condition noted": True}
+    assert matcher.extract(text) == {"conditions": ["hypertension"], "medications": [], "trends": []}
+
+
+def test_negation_stops_at_termination_terms():
+    """Test that a comma, "but" or "history of" ends a negation's scope, while "no history of" still negates."""
+    matcher = get_clinical_matcher()
+
+    assert matcher.extract("No chest pain, history of hypertension and diabetes")["conditions"] == [
+        "diabetes", "hypertension"
+    ]
+    assert matcher.extract("No asthma but has COPD")["conditions"] == ["copd"]
+    assert matcher.extract("No history of diabetes")["conditions"] == []
+
+
+def test_custom_vocabulary_file():
+    """Test that a vocabulary file defines its own categories and negation cues."""
+    vocabulary = {
+        "negation_cues": ["never"],
+        "categories": {"symptoms": {"chest pain": ["chest pain", "angina"], "dyspnea": []}}
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "vocabulary.json")
+        with open(path, "w", encoding="utf-8") as vocabulary_file:
+            json.dump(vocabulary, vocabulary_file)
+        matcher = ClinicalMatcher.from_file(path)
+
+    assert matcher.extract("Angina at rest; never had dyspnea.") == {"symptoms": ["chest pain"]}
+    assert matcher.extract("Angina at rest; never had dyspnea.", include_negated=True) == {
+        "symptoms": ["chest pain", "dyspnea"]
+    }
@@ -0,0 +1,61 @@
+"""Test priority-based packing of progress-note context into a token budget."""
+
+import pytest
+
+from utils.context_extractor import format_context_for_prompt
+from utils.context_packer import estimate_tokens, pack_context
+
+
+INTAKE = {
+    "chief_complaint": "Follow-up for low back pain",
+    "allergies": ["Penicillin (rash)"],
+    "current_medications": [f"Medication {i} 10 mg daily" for i in range(40)],
+    "medical_conditions": [f"Condition {i}" for i in range(20)],
+    "surgical_history": [f"Surgery {i} (2019)" for i in range(10)],
+}
+HISTORY = {
+    "visit_count": 12,
+    "recurring_conditions": ["hypertension", "diabetes"],
+    "clinical_trends": ["01/10/2024: Stable condition noted"],
+    "providers": ["Dr. A"],
+}
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "optimal"])
+def test_context_stays_within_budget_and_reports_dropped_facts(strategy):
+    """Test that rich context is cut to the budget and every cut fact is reported."""
+    packed = pack_context(INTAKE, HISTORY, budget=150, strategy=strategy)
+    rendered = "\n\n".join(packed.sections)
+
+    assert packed.used_tokens <= 150
+    assert estimate_tokens(rendered) <= 150
+    assert "Penicillin (rash)" in rendered
+    assert "Follow-up for low back pain" in rendered
+    assert packed.dropped
+    assert len(packed.included) + len(packed.dropped) == 2 + 40 + 20 + 10 + 5
+    assert all(summary.split(": ", 1)[1] not in rendered for summary in packed.dropped_summary())
+
+
+def test_prompt_size_is_stable_as_context_grows():
+    """Test that the prompt stops growing once the context budget is reached."""
+    patient_info = {"patient_name": "Test, Patient", "patient_id": "p-1"}
+    richer_intake = dict(INTAKE, current_medications=INTAKE["current_medications"] * 10)
+
+    prompt = format_context_for_prompt(INTAKE, HISTORY, "Transcription.", patient_info, pack_context(INTAKE, HISTORY, 200))
+    richer_prompt = format_context_for_prompt(
+        richer_intake, HISTORY, "Transcription.", patient_info, pack_context(richer_intake, HISTORY, 200)
+    )
+
+    assert abs(len(richer_prompt) - len(prompt)) < 40
+    assert prompt.startswith("PATIENT INFORMATION:")
+    assert prompt.endswith("CURRENT TRANSCRIPTION:\nTranscription.")
+
+
+def test_small_context_is_kept_whole():
+    """Test that nothing is dropped when the context fits."""
+    intake = {"chief_complaint": "Cough", "current_medications": ["Albuterol"]}
+    packed = pack_context(intake, HISTORY, budget=800, strategy="greedy")
+
+    assert packed.dropped == []
+    assert packed.sections[0] == "CURRENT VISIT CONTEXT:\nChief Complaint: Cough\nCurrent Medications: Albuterol"
+    assert "Previous visits: 12 visits on record" in packed.sections[1]
@@ -0,0 +1,143 @@
+"""Test streaming notes out of directory trees and zip/tar archives."""
+
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+
+import fitz
+
+import utils.document_sources as document_sources
+from utils.document_sources import HTML, PDF, iter_source_documents
+from utils.pdf_ingestion import iter_em_inputs
+
+
+def _pdf_bytes(patient_id):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 60), f"Doe, John 01/02/1960 #{patient_id}", fontsize=10)
+    page.insert_text((72, 90), "DATE OF SERVICE: 03/04/2025", fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _html_bytes(patient_id):
+    return (f"<html><body><p>Doe, John 01/02/1960 #{patient_id}</p>"
+            f"<div>DATE OF SERVICE: 03/04/2025</div><p>Mary Jones, MD</p></body></html>").encode()
+
+
+def _tar_bytes(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _write_tree(root):
+    os.makedirs(os.path.join(root, "clinic", "2025"))
+    with open(os.path.join(root, "clinic", "2025", "a.pdf"), "wb") as note:
+        note.write(_pdf_bytes(1))
+    with open(os.path.join(root, "clinic", "b.html"), "wb") as note:
+        note.write(_html_bytes(2))
+    with open(os.path.join(root, ".hidden.pdf"), "wb") as note:
+        note.write(_pdf_bytes(99))
+    with open(os.path.join(root, "readme.txt"), "w") as readme:
+        readme.write("not a note")
+    with zipfile.ZipFile(os.path.join(root, "export.zip"), "w") as archive:
+        archive.writestr("notes/c.pdf", _pdf_bytes(3))
+        archive.writestr("notes/d.htm", _html_bytes(4))
+        archive.writestr("__MACOSX/notes/._c.pdf", b"resource fork")
+        archive.writestr("notes/nested.tar.gz", _tar_bytes({"e.pdf": _pdf_bytes(5)}))
+    with open(os.path.join(root, "more.tgz"), "wb") as archive_file:
+        archive_file.write(_tar_bytes({"f.html": _html_bytes(6)}))
+
+
+def test_tree_and_archives_stream_notes_without_extracting():
+    """Test recursive, sorted discovery of notes in folders and nested archives."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_tree(tmp_dir)
+        files_before = sorted(os.listdir(tmp_dir))
+        documents = list(iter_source_documents(tmp_dir))
+        files_after = sorted(os.listdir(tmp_dir))
+
+    names = [os.path.relpath(document.name, tmp_dir) for document in documents]
+    assert names == [
+        "export.zip!/notes/c.pdf",
+        "export.zip!/notes/d.htm",
+        "export.zip!/notes/nested.tar.gz!/e.pdf",
+        "more.tgz!/f.html",
+        os.path.join("clinic", "b.html"),
+        os.path.join("clinic", "2025", "a.pdf"),
+    ]
+    assert [document.kind for document in documents] == [PDF, HTML, PDF, HTML, HTML, PDF]
+    # Files on disk are passed by path; archive members carry their bytes
+    assert [document.data is None for document in documents] == [False, False, False, False, True, True]
+    assert files_before == files_after
+
+
+def test_iter_em_inputs_dispatches_pdf_and_html_members():
+    """Test that each note goes through the parser for its type."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_tree(tmp_dir)
+        em_inputs = list(iter_em_inputs(tmp_dir))
+
+    assert [em_input.patient_id for em_input in em_inputs] == ["3", "4", "5", "6", "2", "1"]
+    assert [em_input.document_id for em_input in em_inputs] == ["c", "d", "e", "f", "b", "a"]
+    assert all(em_input.date_of_service == "03/04/2025" for em_input in em_inputs)
+    html_note = em_inputs[1]
+    assert html_note.provider == "Mary Jones, MD"
+    assert "DATE OF SERVICE: 03/04/2025\nMary Jones, MD" in html_note.text
+
+
+def test_oversized_and_unreadable_archives_are_skipped(monkeypatch):
+    monkeypatch.setattr(document_sources, "MAX_MEMBER_BYTES", 100)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with zipfile.ZipFile(os.path.join(tmp_dir, "big.zip"), "w") as archive:
+            archive.writestr("small.html", b"<p>ok</p>")
+            archive.writestr("big.pdf", _pdf_bytes(7))
+        with open(os.path.join(tmp_dir, "broken.zip"), "wb") as broken:
+            broken.write(b"not a zip")
+        names = [os.path.relpath(document.name, tmp_dir) for document in iter_source_documents(tmp_dir)]
+
+    assert names == ["big.zip!/small.html"]
+
+
+def _zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_corrupt_nested_archive_skips_only_itself():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outer = os.path.join(tmp_dir, "outer.zip")
+        with open(outer, "wb") as archive_file:
+            archive_file.write(_zip_bytes({
+                "a.html": _html_bytes(1),
+                "inner.zip": b"not a zip",
+                "b.html": _html_bytes(2),
+                "c.pdf": _pdf_bytes(3),
+            }))
+        names = [os.path.relpath(document.name, tmp_dir) for document in iter_source_documents(outer)]
+
+    assert names == ["outer.zip!/a.html", "outer.zip!/b.html", "outer.zip!/c.pdf"]
+
+
+def test_archive_nesting_depth_is_capped(monkeypatch):
+    monkeypatch.setattr(document_sources, "MAX_ARCHIVE_DEPTH", 2)
+    innermost = _zip_bytes({"level3.html": _html_bytes(3)})
+    middle = _zip_bytes({"level2.html": _html_bytes(2), "level3.zip": innermost})
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outer = os.path.join(tmp_dir, "level1.zip")
+        with open(outer, "wb") as archive_file:
+            archive_file.write(_zip_bytes({"level1.html": _html_bytes(1), "level2.zip": middle}))
+        names = [os.path.relpath(document.name, tmp_dir) for document in iter_source_documents(outer)]
+
+    assert names == ["level1.zip!/level1.html", "level1.zip!/level2.zip!/level2.html"]
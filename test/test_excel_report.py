@@ -0,0 +1,86 @@
+"""Test the write-only Excel report and local report storage."""
+
+import io
+import tempfile
+
+from openpyxl import load_workbook
+
+from services.report_storage import LocalReportStorage
+from utils.excel_report import EXCEL_COLUMNS, EXCEL_CONTENT_TYPE, compact_excel_result, write_excel_report
+
+
+RESULTS = [
+    {
+        "enhancement_agent": {
+            "document_id": "doc-1",
+            "patient_name": "Jane Doe",
+            "patient_id": "1234",
+            "assigned_code": "99213",
+            "justification": "Low MDM",
+        },
+        "auditor_agent": {
+            "final_justification": {"supportedBy": "Two stable chronic illnesses", "complianceAlerts": ["Missing ROS"]},
+            "audit_flags": ["Time not documented"],
+        },
+    },
+    {"error": "enhancement failed", "document_id": "doc-2"},
+]
+
+
+def test_write_excel_report():
+    """Test that rows are streamed with the expected columns and failed results skipped."""
+    output = io.BytesIO()
+    assert write_excel_report(RESULTS, output) == 1
+
+    output.seek(0)
+    rows = list(load_workbook(output).active.iter_rows(values_only=True))
+    assert list(rows[0]) == EXCEL_COLUMNS
+    assert len(rows) == 2
+
+    row = dict(zip(EXCEL_COLUMNS, rows[1]))
+    assert row["Document ID"] == "doc-1"
+    assert row["Patient Name"] == "Jane Doe"
+    assert row["Provider"] == "N/A"
+    assert row["Assigned Code"] == "99213"
+    assert "Code Selection: Two stable chronic illnesses" in row["E&M Code Evaluation"]
+    assert "⚠ Missing ROS" in row["E&M Code Evaluation"]
+
+
+def test_compact_results_drop_note_text_but_render_the_same():
+    """Test that the export activity input leaves out note text without changing the workbook."""
+    with_text = [
+        {**result, "enhancement_agent": {**result["enhancement_agent"], "text": "note " * 1000},
+         "auditor_agent": {**result["auditor_agent"], "text": "note " * 1000}}
+        if "enhancement_agent" in result else result
+        for result in RESULTS
+    ]
+    compact = [compact_excel_result(result) for result in with_text]
+
+    assert "text" not in compact[0]["enhancement_agent"]
+    assert "text" not in compact[0]["auditor_agent"]
+    assert compact[1] == RESULTS[1]
+
+    full_output, compact_output = io.BytesIO(), io.BytesIO()
+    write_excel_report(with_text, full_output)
+    write_excel_report(compact, compact_output)
+    full_rows = list(load_workbook(full_output).active.iter_rows(values_only=True))
+    assert full_rows == list(load_workbook(compact_output).active.iter_rows(values_only=True))
+
+
+def test_local_report_storage_round_trip():
+    """Test that a stored report is returned as a reference and streamed back unchanged."""
+    payload = b"x" * (3 * 1024 * 1024 + 17)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = LocalReportStorage(base_dir=tmp_dir)
+        reference = storage.save_report("excel/report.xlsx", io.BytesIO(payload), EXCEL_CONTENT_TYPE)
+
+        assert reference["backend"] == "local"
+        assert reference["size_bytes"] == len(payload)
+        assert b"".join(storage.iter_report(reference)) == payload
+
+        try:
+            storage.save_report("../escape.xlsx", io.BytesIO(b""), EXCEL_CONTENT_TYPE)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Report names must stay inside the storage directory")
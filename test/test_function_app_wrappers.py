@@ -0,0 +1,44 @@
+"""Test that every function_app wrapper awaits its handler when the handler is async."""
+
+import ast
+import importlib
+import inspect
+from pathlib import Path
+
+
+FUNCTION_APP = Path(__file__).resolve().parent.parent / "function_app.py"
+
+
+def _wrappers():
+    tree = ast.parse(FUNCTION_APP.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for statement in node.body:
+            if isinstance(statement, ast.ImportFrom) and statement.module.startswith("durable_functions."):
+                yield node, statement.module
+
+
+def test_async_handlers_are_awaited():
+    wrappers = list(_wrappers())
+    assert wrappers
+
+    for node, module_name in wrappers:
+        handler = importlib.import_module(module_name).main
+        if not inspect.iscoroutinefunction(handler):
+            continue
+        awaited = any(isinstance(child, ast.Await) for child in ast.walk(node))
+        assert isinstance(node, ast.AsyncFunctionDef) and awaited, (
+            f"function_app.{node.name} must be async def and await {module_name}.main"
+        )
+
+
+def test_every_function_module_is_registered():
+    registered = {module_name for _, module_name in _wrappers()}
+    package = FUNCTION_APP.parent / "durable_functions"
+    modules = {
+        f"durable_functions.{path.parent.name}"
+        for path in package.glob("*/__init__.py")
+    }
+
+    assert modules - registered == set()
@@ -0,0 +1,45 @@
+"""Test the precompiled guidelines artifact."""
+
+import tempfile
+from pathlib import Path
+
+from utils.guidelines_compiler import (
+    GUIDELINES_DIR,
+    compile_guidelines,
+    load_artifact,
+    write_artifact,
+)
+
+
+MARKDOWN = """# E/M Guidelines
+* CPT Code 99212 (Straightforward MDM)
+  - One self-limited problem
+* CPT Code 99213 (Low complexity MDM)
+  - Two stable chronic illnesses
+* CPT Code 99214 (Moderate complexity MDM)
+"""
+
+
+def test_artifact_round_trip_and_staleness():
+    """Test that a compiled artifact loads while sources are unchanged and is rejected once they change."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        guidelines_dir = Path(tmp_dir)
+        (guidelines_dir / "em_guideline.md").write_text(MARKDOWN, encoding="utf-8")
+
+        artifact = compile_guidelines(guidelines_dir)
+        artifact_path = guidelines_dir / "compiled.json"
+        write_artifact(artifact, artifact_path)
+
+        loaded = load_artifact(guidelines_dir, artifact_path)
+        assert loaded is not None
+        assert loaded["guidelines"] == MARKDOWN
+        assert "Two stable chronic illnesses" in loaded["index"]["code_sections"]["99213"]
+        assert "99214" not in loaded["index"]["code_sections"]["99213"]
+
+        (guidelines_dir / "em_guideline.md").write_text(MARKDOWN + "* Updated\n", encoding="utf-8")
+        assert load_artifact(guidelines_dir, artifact_path) is None
+
+
+def test_committed_artifact_is_current():
+    """Test that guidelines/em_guidelines.compiled.json matches the committed sources (run `make guidelines`)."""
+    assert load_artifact(GUIDELINES_DIR) is not None
@@ -0,0 +1,73 @@
+"""Test the structured guidelines section index."""
+
+from utils.guidelines_cache import get_em_guidelines_index, get_specific_code_requirements
+from utils.guidelines_index import GuidelinesIndex, SUPPORTED_CODES, TOPIC_MDM_COMPLEXITY
+
+
+GUIDELINES = """Intro paragraph.
+General Principles:
+* Established Patient: seen within three years.
+Specific Code Definitions:
+* CPT Code 99213 (Established Patient - Low MDM):
+  * Medical Decision Making: Low.
+  * Total Time: 20-29 minutes.
+* CPT Code 99214 (Established Patient - Moderate MDM):
+  * Medical Decision Making: Moderate.
+Important Considerations:
+* Documentation is Key.
+
+=== AMA E/M GUIDELINES PDF CONTENT ===
+
+99203 
+99213 
+Low 
+Low 
+• 2 or more self-limited or minor problems; 
+    or 
+• 1 stable chronic illness
+Limited 
+Category 2: Assessment requiring an independent historian(s) 
+Low risk of morbidity from additional diagnostic testing or treatment 
+Revisions effective January 1, 2021:
+"""
+
+
+def test_code_sections_and_table_rows():
+    """Test code bullets stop at the next sibling bullet and table rows cover new patient codes."""
+    index = GuidelinesIndex.from_text(GUIDELINES, "v1")
+
+    requirements = index.code_requirements("99213")
+    assert "Total Time: 20-29 minutes." in requirements
+    assert "99214" not in requirements.split("AMA MDM table")[0]
+    assert "Important Considerations" not in requirements
+
+    row = index.mdm_table["99213"]
+    assert row["codes"] == ["99203", "99213"]
+    assert row["mdm_level"] == "Low"
+    assert row["problems"].startswith("• 2 or more self-limited")
+    assert row["data"].startswith("Limited")
+    assert row["risk"].startswith("Low risk of morbidity")
+
+    new_patient = index.code_requirements("99203")
+    assert "same MDM level as 99213" in new_patient
+    assert "1 stable chronic illness" in new_patient
+
+    assert index.code_requirements("99999").startswith("Invalid code")
+
+
+def test_topics_and_serialization():
+    """Test topic lookup by heading and derived topics, and dict round trip."""
+    index = GuidelinesIndex.from_text(GUIDELINES, "v1")
+    assert index.topic("Important Considerations") == "* Documentation is Key."
+    assert "Medical Decision Making: Low." in index.topic(TOPIC_MDM_COMPLEXITY)
+
+    restored = GuidelinesIndex.from_dict(index.to_dict())
+    assert restored.code_requirements("99203") == index.code_requirements("99203")
+
+
+def test_repository_guidelines_cover_all_codes():
+    """Test that the shipped guidelines resolve every supported code."""
+    index = get_em_guidelines_index()
+    for code in SUPPORTED_CODES:
+        assert "AMA MDM table" in get_specific_code_requirements(code), code
+    assert index.version
@@ -0,0 +1,119 @@
+"""Test the versioned guidelines registry (hot reload, listeners and version stamping)."""
+
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from agents.models import optimized_pydantic_models
+from agents.models.result_models import AuditResultRecord
+from constants import azure_config
+from utils import guidelines_index
+from utils.guidelines_cache import GuidelinesCache, GuidelinesSnapshot, reload_guidelines
+from utils.guidelines_compiler import GUIDELINES_SOURCES, compute_source_hash
+
+
+MARKDOWN = """# E/M Guidelines
+* CPT Code 99213 (Low complexity MDM)
+  - Two stable chronic illnesses
+"""
+
+
+def test_reload_swaps_version_and_notifies_listeners():
+    """Test that editing a source swaps in a new version, notifies listeners and drops old indexes."""
+    cache = GuidelinesCache()
+    saved_state = dict(cache.__dict__)
+    events = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        guidelines_dir = Path(tmp_dir)
+        source = guidelines_dir / "em_guideline.md"
+        source.write_text(MARKDOWN, encoding="utf-8")
+        try:
+            cache._guidelines_dir = guidelines_dir
+            cache._listeners = []
+            cache._reload_interval = 0
+            cache.clear_cache()
+            cache.subscribe(lambda new, previous: events.append((new.version, previous.version if previous else None)))
+
+            first = cache.get_snapshot()
+            assert first.version == compute_source_hash(guidelines_dir)
+            assert "Two stable chronic illnesses" in cache.get_specific_code_requirements("99213")
+            assert reload_guidelines() is False
+
+            source.write_text(MARKDOWN.replace("Two stable", "Three stable"), encoding="utf-8")
+            assert reload_guidelines() is True
+
+            second = cache.get_snapshot()
+            assert second.version != first.version
+            assert "Three stable chronic illnesses" in cache.get_specific_code_requirements("99213")
+            assert events == [(first.version, None), (second.version, first.version)]
+            assert first.version not in guidelines_index._indexes
+        finally:
+            cache.__dict__.update(saved_state)
+            cache.clear_cache()
+
+
+def test_result_record_carries_guideline_version():
+    """Test that persisted records keep the guidelines version stamped by the agents."""
+    result = {
+        "enhancement_agent": {"document_id": "doc-1", "assigned_code": "99213", "guideline_version": "abc"},
+        "auditor_agent": {"document_id": "doc-1", "final_assigned_code": "99213", "guideline_version": "abc"},
+    }
+    record = AuditResultRecord.from_pipeline_result("instance-1", datetime.now(timezone.utc), result)
+
+    assert record.guideline_version == "abc"
+    entity = record.to_azure_entity("document|doc-1")
+    assert AuditResultRecord.from_azure_entity(entity).guideline_version == "abc"
+
+
+def _snapshot(version):
+    return GuidelinesSnapshot(version, f"guidelines {version}", None, "test", "now")
+
+
+def test_agents_follow_the_snapshot_the_caller_stamped(monkeypatch):
+    """Test that a superseded snapshot gets an agent of its own version without evicting the current one."""
+    current, superseded = _snapshot("new"), _snapshot("old")
+    monkeypatch.setattr(optimized_pydantic_models, "get_guidelines_snapshot", lambda: current)
+    monkeypatch.setattr(optimized_pydantic_models, "_configure_instrumentation", lambda: None)
+    monkeypatch.setattr(optimized_pydantic_models, "_guideline_agents", {})
+
+    def build(snapshot):
+        return f"agent for {snapshot.version}"
+
+    assert optimized_pydantic_models._get_guideline_agent("test", build) == "agent for new"
+    assert optimized_pydantic_models._get_guideline_agent("test", build, superseded) == "agent for old"
+    assert optimized_pydantic_models._guideline_agents["test"][0] == "new"
+    assert optimized_pydantic_models._get_guideline_agent("test", build, current) == "agent for new"
+
+
+class _EmptyContainer:
+    def get_container_client(self, name):
+        return self
+
+    def get_blob_client(self, name):
+        return SimpleNamespace(exists=lambda: False)
+
+
+def test_blob_sync_keeps_the_bundled_guidelines_until_sources_exist(monkeypatch):
+    """Test that an empty guidelines container does not switch the cache to an empty directory."""
+    import azure.storage.blob
+
+    cache = GuidelinesCache()
+    saved_dir = cache._guidelines_dir
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        monkeypatch.setenv("GUIDELINES_BLOB_CONTAINER", "guidelines")
+        monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+        monkeypatch.setattr(type(azure_config), "guidelines_blob_local_dir", property(lambda self: tmp_dir))
+        monkeypatch.setattr(azure.storage.blob.BlobServiceClient, "from_connection_string",
+                            staticmethod(lambda conn_str: _EmptyContainer()))
+        try:
+            cache._sync_from_blob()
+            assert cache._guidelines_dir == saved_dir
+
+            for name in GUIDELINES_SOURCES:
+                (Path(tmp_dir) / name).write_bytes(b"synced")
+            cache._sync_from_blob()
+            assert cache._guidelines_dir == Path(tmp_dir)
+        finally:
+            cache._guidelines_dir = saved_dir
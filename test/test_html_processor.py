@@ -0,0 +1,108 @@
+"""Test the streaming HTML-to-text conversion used for MCP payloads and HTML notes."""
+
+from utils.html_processor import (
+    HTML_TEXT_CACHE_SIZE,
+    clear_html_text_cache,
+    extract_html_metadata,
+    get_html_text_cache_statistics,
+    html_to_text,
+    parse_payload_to_eminput,
+)
+
+
+NOTE_HTML = """<div>
+    <div style="text-align: center">CONFIDENTIAL</div>
+    <table>
+        <tr><td>PATIENT NAME: </td><td>Williams, Sarah #987654321</td></tr>
+        <tr><td>&nbsp;</td></tr>
+        <tr><td>DATE OF SERVICE: </td><td>January 20, 2025</td></tr>
+    </table>
+    <p class="single-spacing"><strong>CHIEF COMPLAINT:</strong></p>
+    <p>Patient here for   follow-up.</p>
+    <p><strong>Vital Signs:</strong> BP elevated, other vitals stable</p>
+    <p>1. Diabetes - continue management<br/>
+2. Hypertension &amp; lipids</p>
+    <pre>Line one
+Line two</pre>
+    <script>var ignored = "<p>not text</p>";</script>
+    <style>.dictation-content strong { font-size: 16px; }</style>
+</div>"""
+
+
+def test_blocks_become_lines_and_inline_text_stays_together():
+    assert html_to_text(NOTE_HTML).split("\n") == [
+        "CONFIDENTIAL",
+        "PATIENT NAME: Williams, Sarah #987654321",
+        "DATE OF SERVICE: January 20, 2025",
+        "CHIEF COMPLAINT:",
+        "Patient here for follow-up.",
+        "Vital Signs: BP elevated, other vitals stable",
+        "1. Diabetes - continue management",
+        "2. Hypertension & lipids",
+        "Line one",
+        "Line two",
+    ]
+
+
+def test_empty_and_plain_text_input():
+    assert html_to_text("") == ""
+    assert html_to_text("  plain\n text  ") == "plain text"
+
+
+def test_metadata_is_found_in_converted_table_rows():
+    metadata = extract_html_metadata(html_to_text(NOTE_HTML), "notes/note_42.html")
+
+    assert metadata["document_id"] == "note_42"
+    assert metadata["patient_name"] == "Williams, Sarah"
+    assert metadata["patient_id"] == "987654321"
+    assert metadata["date_of_service"] == "January 20, 2025"
+
+
+def test_converted_text_is_cached_by_content():
+    clear_html_text_cache()
+    payload = {
+        "document": {
+            "id": "DOC-1",
+            "DateOfService": "2025-01-20",
+            "provider": "Dr. Jennifer Johnson",
+            "fileContent": {"encoding": "text", "data": NOTE_HTML},
+        }
+    }
+
+    first = parse_payload_to_eminput(payload)
+    # A retry carries an equal but distinct string
+    retried = parse_payload_to_eminput({"document": {**payload["document"],
+                                                     "fileContent": {"data": "".join(list(NOTE_HTML))}}})
+
+    assert first.text == retried.text
+    assert get_html_text_cache_statistics() == {"hits": 1, "misses": 1, "size": 1, "max_size": HTML_TEXT_CACHE_SIZE}
+
+
+def test_cache_evicts_least_recently_used():
+    clear_html_text_cache()
+    html_to_text("<p>note 0</p>")
+    for index in range(1, HTML_TEXT_CACHE_SIZE + 1):
+        html_to_text(f"<p>note {index}</p>")
+        if index == 1:
+            html_to_text("<p>note 0</p>")  # refreshed: note 1 becomes the oldest
+
+    html_to_text("<p>note 0</p>")
+    html_to_text("<p>note 1</p>")
+
+    statistics = get_html_text_cache_statistics()
+    assert statistics["size"] == HTML_TEXT_CACHE_SIZE
+    assert statistics["hits"] == 2
+    assert statistics["misses"] == HTML_TEXT_CACHE_SIZE + 2
+    clear_html_text_cache()
+
+
+def test_benchmark_reports_every_column(capsys):
+    from utils.html_benchmark import benchmark, main
+
+    timings = benchmark(NOTE_HTML, runs=1)
+
+    assert set(timings) == {"bs4", "streaming", "cached"}
+    assert timings["streaming"] > 0 and timings["cached"] > 0
+    assert main(["--runs", "1"]) == 0
+    assert "sample note" in capsys.readouterr().out
+    assert get_html_text_cache_statistics()["size"] == 0
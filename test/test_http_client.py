@@ -0,0 +1,50 @@
+"""Test the shared pooled model HTTP client."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.http_client import close_shared_http_client, get_http_pool_stats, get_shared_http_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_shared_client_reuses_connections():
+    """Test that sequential requests reuse one keep-alive connection and are counted in the pool stats."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def run():
+        client = get_shared_http_client()
+        assert get_shared_http_client() is client
+        for _ in range(5):
+            response = await client.get(url)
+            assert response.text == "ok"
+        stats = get_http_pool_stats()
+        await close_shared_http_client()
+        return stats
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert stats["requests_total"] == 5
+    assert stats["new_connections"] == 1
+    assert stats["tls_handshakes"] == 0
+    assert stats["connections_open"] == 1 and stats["connections_idle"] == 1
+    assert stats["requests_in_flight"] == 0 and stats["requests_waiting"] == 0
+    assert get_http_pool_stats() is None
@@ -0,0 +1,32 @@
+"""Test the import profiler and the lazy import graph of the function app."""
+
+from utils.import_profiler import format_report, is_imported, parse_importtime, profile_imports
+
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     settings.helpers
+import time:       300 |        420 |   settings
+import time:      1000 |       1420 | function_app
+Traceback lines are ignored
+"""
+
+# Modules only specific routes need; none of them may load when the app is indexed
+HEAVY_MODULES = ["pydantic_ai", "logfire", "openpyxl", "pyarrow", "fitz", "azure.data.tables", "azure.storage.blob"]
+
+
+def test_parse_importtime():
+    """Test that -X importtime lines are parsed with self/cumulative times and nesting depth."""
+    timings = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert [timing.module for timing in timings] == ["settings.helpers", "settings", "function_app"]
+    assert timings[0].depth == 2 and timings[2].depth == 0
+    assert timings[2].cumulative_us == 1420
+    assert is_imported(timings, "settings") and not is_imported(timings, "setting")
+    assert "1.4 ms total" in format_report("function_app", timings)
+
+
+def test_function_app_import_is_lazy():
+    """Test that importing function_app does not load route-specific heavy dependencies."""
+    timings = profile_imports("function_app")
+
+    assert [module for module in HEAVY_MODULES if is_imported(timings, module)] == []
@@ -0,0 +1,114 @@
+"""Test streaming parsed documents into batched E/M coding orchestrations."""
+
+import asyncio
+from types import SimpleNamespace
+
+import azure.durable_functions as df
+import pytest
+
+from agents.models.pydantic_models import EMInput
+from services.ingestion_pipeline import submit_em_coding_batches
+
+
+class _Client:
+    """Records orchestrations; each one reports Running for `polls_until_done` status checks."""
+
+    def __init__(self, polls_until_done=0):
+        self.started = []
+        self.polls_until_done = polls_until_done
+        self._polls = {}
+        self.running_at_start = []
+
+    async def start_new(self, name, client_input=None):
+        self.running_at_start.append(
+            sum(polls <= self.polls_until_done for polls in self._polls.values())
+        )
+        instance_id = f"instance-{len(self.started)}"
+        self.started.append((name, client_input))
+        self._polls[instance_id] = 0
+        return instance_id
+
+    async def get_status(self, instance_id):
+        self._polls[instance_id] += 1
+        done = self._polls[instance_id] > self.polls_until_done
+        status = df.OrchestrationRuntimeStatus.Completed if done else df.OrchestrationRuntimeStatus.Running
+        return SimpleNamespace(runtime_status=status)
+
+
+def _document(index):
+    return EMInput(document_id=f"doc-{index}", date_of_service="2026-01-01", provider="Dr. Test", text=f"note {index}")
+
+
+async def _documents(count, parsed):
+    for index in range(count):
+        parsed.append(index)
+        yield _document(index)
+
+
+def test_documents_are_submitted_in_batches():
+    client = _Client()
+    summary = asyncio.run(submit_em_coding_batches(client, _documents(7, []), batch_size=3))
+
+    assert summary == {"instance_ids": ["instance-0", "instance-1", "instance-2"], "documents": 7, "batches": 3}
+    assert [len(client_input) for _, client_input in client.started] == [3, 3, 1]
+    assert all(name == "em_coding_orchestrator" for name, _ in client.started)
+    assert client.started[0][1][0]["document_id"] == "doc-0"
+
+
+def test_first_batch_starts_before_parsing_finishes():
+    client = _Client()
+    parsed = []
+    parsed_at_first_submission = []
+    start_new = client.start_new
+
+    async def recording_start_new(name, client_input=None):
+        if not client.started:
+            parsed_at_first_submission.append(len(parsed))
+        return await start_new(name, client_input)
+
+    client.start_new = recording_start_new
+    asyncio.run(submit_em_coding_batches(client, _documents(10, parsed), batch_size=2))
+
+    assert parsed_at_first_submission == [2]
+    assert len(parsed) == 10
+
+
+def test_callback_url_is_passed_with_every_batch():
+    client = _Client()
+    asyncio.run(submit_em_coding_batches(client, _documents(3, []), batch_size=2, callback_url="https://hook"))
+
+    assert [client_input["callback_url"] for _, client_input in client.started] == ["https://hook"] * 2
+    assert [len(client_input["documents"]) for _, client_input in client.started] == [2, 1]
+
+
+def test_max_active_waits_for_running_orchestrations():
+    client = _Client(polls_until_done=2)
+    summary = asyncio.run(submit_em_coding_batches(
+        client, _documents(6, []), batch_size=1, max_active=2, poll_interval_seconds=0
+    ))
+
+    assert summary["batches"] == 6
+    assert max(client.running_at_start) == 1
+    # Orchestrations are no longer polled once they have completed
+    assert all(polls <= client.polls_until_done + 1 for polls in client._polls.values())
+
+
+def test_invalid_batch_size_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(submit_em_coding_batches(_Client(), _documents(1, []), batch_size=0))
+
+
+def test_samples_route_rejects_max_active():
+    """Test that the HTTP route refuses to wait for running orchestrations."""
+    import azure.functions as func
+
+    from durable_functions.start_orchestration_from_samples import main
+
+    client = _Client()
+    request = func.HttpRequest("POST", "/api/orchestrations/from-samples",
+                               params={"batch_size": "2", "max_active": "1"}, body=b"")
+
+    response = asyncio.run(main(request, client))
+
+    assert response.status_code == 400
+    assert client.started == []
@@ -0,0 +1,118 @@
+"""Test the rule-based MDM pre-scorer and benchmark it against past audited results."""
+
+import asyncio
+import glob
+import time
+
+from agents import optimized_em_enhancement_agent
+from utils.mdm_scorer import (
+    ASSESSMENT,
+    DATA,
+    HISTORY,
+    HIGH,
+    LOW,
+    MINIMAL,
+    MODERATE,
+    PLAN,
+    PROBLEMS,
+    RESULTS,
+    RISK,
+    estimate_mdm,
+    iter_past_results,
+    mdm_certainty,
+    split_note_sections,
+)
+
+
+STRAIGHTFORWARD_NOTE = """HISTORY:
+Patient returns for a recheck of a healed paper cut. No complaints.
+ASSESSMENT:
+1. Healed laceration of the finger
+PLAN:
+Nothing further needed. Return as needed.
+"""
+
+MODERATE_NOTE = """HISTORY OF PRESENT ILLNESS:
+Knee pain is worsening despite physical therapy.
+IMAGING:
+X-rays of the right knee show joint space narrowing. MRI of the knee shows a degenerative meniscus.
+ASSESSMENT AND PLAN:
+1. Osteoarthritis of the right knee
+2. Type 2 diabetes
+Start meloxicam 15 mg daily. Ordered labs. No fracture seen. She will hold off on an injection.
+"""
+
+
+def test_sections_are_grouped_by_heading_kind():
+    note = split_note_sections(MODERATE_NOTE)
+
+    assert note.structured
+    assert "worsening" in note.sections[HISTORY]
+    assert "MRI of the knee" in note.sections[RESULTS]
+    assert note.sections[ASSESSMENT] == note.sections[PLAN]
+    assert not split_note_sections("Seen today for acupuncture.").structured
+
+
+def test_straightforward_note():
+    estimate = estimate_mdm(STRAIGHTFORWARD_NOTE)
+
+    assert estimate.level_name == "Straightforward"
+    assert (estimate.established_code, estimate.new_patient_code) == ("99212", "99202")
+    assert estimate.elements[DATA].level == MINIMAL
+    assert estimate.elements[RISK].level == MINIMAL
+
+
+def test_moderate_note_uses_two_of_three_elements():
+    estimate = estimate_mdm(MODERATE_NOTE)
+
+    assert estimate.elements[PROBLEMS].level == MODERATE
+    assert estimate.elements[DATA].level == MODERATE
+    assert estimate.elements[RISK].level == MODERATE
+    assert estimate.code_for(is_new_patient=False) == "99214"
+    assert estimate.code_for(is_new_patient=True) == "99204"
+    # "No fracture" and the deferred injection are not counted
+    assert "acute complicated problem" not in estimate.elements[PROBLEMS].evidence
+    assert "procedure" not in estimate.elements[RISK].evidence
+    assert "Moderate MDM" in estimate.justification()
+
+
+def test_certainty_reflects_how_robust_the_median_is():
+    assert mdm_certainty((MODERATE, MODERATE, MODERATE), (1.0, 1.0, 1.0)) == 1.0
+    split = mdm_certainty((LOW, MODERATE, HIGH), (0.9, 0.9, 0.9))
+    agreeing = mdm_certainty((MODERATE, MODERATE, MODERATE), (0.9, 0.9, 0.9))
+    assert split < agreeing
+    assert mdm_certainty((MINIMAL, MINIMAL, MINIMAL), (0.5, 0.5, 0.5)) > 0.8
+
+
+def test_benchmark_against_past_results():
+    results = list(iter_past_results(sorted(glob.glob("test_results/*.json"))))
+    assert len(results) >= 5
+
+    estimate_mdm(results[0][1])  # compile the matcher and load the guidelines index
+    start_time = time.perf_counter()
+    estimates = [(estimate_mdm(text), code) for _, text, code in results]
+    per_note_seconds = (time.perf_counter() - start_time) / len(results)
+
+    agreeing = [estimate.established_code == code for estimate, code in estimates]
+    confident = [match for match, (estimate, _) in zip(agreeing, estimates) if estimate.certainty >= 0.9]
+    assert sum(agreeing) / len(agreeing) >= 0.75
+    # Notes that would skip the model must never contradict the audited code
+    assert confident and all(confident)
+    assert per_note_seconds < 0.05
+
+
+def test_enhancement_skips_the_model_for_confident_notes(monkeypatch):
+    monkeypatch.setenv("MDM_PRESCORE_SKIP_THRESHOLD", "0.5")
+
+    def fail(snapshot=None):
+        raise AssertionError("the model should not be called")
+
+    monkeypatch.setattr(optimized_em_enhancement_agent, "get_optimized_em_enhancement_agent", fail)
+    document = {"document_id": "DOC-1", "date_of_service": "2025-01-20", "provider": "Dr. Lee",
+                "text": MODERATE_NOTE, "is_new_patient": True}
+
+    result = asyncio.run(optimized_em_enhancement_agent.main(document))
+
+    assert result["assigned_code"] == "99204"
+    assert result["mdm_prescore"]["model_skipped"] is True
+    assert result["performance_metrics"]["execution_breakdown"]["ai_model_inference"] == 0.0
@@ -0,0 +1,114 @@
+"""Test the single-pass progress-note metadata extractor against a small corpus."""
+
+import time
+
+import pytest
+
+from utils.metadata_extractor import extract_text_metadata, scan_metadata_candidates
+from utils.pdf_processor import PDFProcessor
+
+
+SIGNATURE = "Electronically signed by John Smith, DPM on Date: 03/05/2024"
+
+CORPUS = [
+    (
+        "header_and_labels",
+        "Doe, John A 03/05/2024 #12345\nDATE OF SERVICE:\nMarch 5, 2024\nPlan: follow up.\n" + SIGNATURE,
+        {"patient_name": "Doe, John A", "patient_id": "12345",
+         "date_of_service": "March 5, 2024", "provider": "John Smith, DPM"},
+    ),
+    (
+        "label_fallbacks",
+        "PATIENT NAME: Brown, Bob\nAcct #987\nDOS: 04-05-2025\nElectronically Signed By: Amy Wong, MD, Date: 4/5/2025",
+        {"patient_name": "Brown, Bob", "patient_id": "987",
+         "date_of_service": "04-05-2025", "provider": "Amy Wong, MD"},
+    ),
+    (
+        "date_label_beats_free_dates",
+        "Seen June 1, 2023 for review.\nDate: July 4, 2024\nMary Jones, MD",
+        {"patient_name": None, "patient_id": None, "date_of_service": "July 4, 2024", "provider": "Mary Jones, MD"},
+    ),
+    (
+        "first_month_date",
+        "Follow up from August 12, 2024 and September 1, 2024.",
+        {"patient_name": None, "patient_id": None, "date_of_service": "August 12, 2024", "provider": None},
+    ),
+    (
+        "recent_numeric_date_preferred",
+        "DOB 02/03/1955. Visit 11/12/2024. Recheck 1/2/2025.",
+        {"patient_name": None, "patient_id": None, "date_of_service": "11/12/2024", "provider": None},
+    ),
+    (
+        "any_numeric_date_last",
+        "DOB 02/03/1955. BP 120/80.",
+        {"patient_name": None, "patient_id": None, "date_of_service": "02/03/1955", "provider": None},
+    ),
+    (
+        "last_credential_wins",
+        "Referred by Mary Jones, MD.\nAssessment done.\nPaul Adams DPM",
+        {"patient_name": None, "patient_id": None, "date_of_service": None, "provider": "Paul Adams DPM"},
+    ),
+    (
+        "signed_by_fallback",
+        "Note signed by Carl Hu\nfor review",
+        {"patient_name": None, "patient_id": None, "date_of_service": None, "provider": "Carl Hu"},
+    ),
+    (
+        "empty",
+        "",
+        {"patient_name": None, "patient_id": None, "date_of_service": None, "provider": None},
+    ),
+]
+
+
+@pytest.mark.parametrize("name,text,expected", CORPUS, ids=[case[0] for case in CORPUS])
+def test_corpus(name, text, expected):
+    assert extract_text_metadata(text) == expected
+
+
+def test_rules_do_not_consume_each_others_text():
+    # "Foot\nDO" is a credential hit, and "on Date" ends a signature; both overlap other rules
+    text = "Pain In The Left Foot\nDOS: 06/01/2024\n" + SIGNATURE.replace("DPM", "DO")
+    metadata = extract_text_metadata(text)
+
+    assert metadata["date_of_service"] == "06/01/2024"
+    assert metadata["provider"] == "John Smith, DO"
+    rules = {candidate.rule for candidate in scan_metadata_candidates(text)}
+    assert {"credential", "dos_abbreviation", "date_label", "signed_on_date", "signed_by"} <= rules
+
+
+def test_candidates_carry_positions():
+    text = "Doe, John 03/05/2024 #12345"
+    for candidate in scan_metadata_candidates(text):
+        assert text[candidate.start:candidate.end] == candidate.value
+
+
+def test_processor_fills_placeholders_for_missing_fields():
+    metadata = PDFProcessor().extract_metadata_from_text("No metadata here.", "data/note_42.pdf", [])
+
+    assert metadata == {
+        "document_id": "note_42",
+        "date_of_service": "2024-01-01",
+        "provider": "Unknown Provider",
+        "patient_name": "Unknown Patient",
+        "patient_id": "0000",
+    }
+
+
+def _best_time(text: str) -> float:
+    timings = []
+    for _ in range(3):
+        start_time = time.perf_counter()
+        extract_text_metadata(text)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def test_extraction_time_is_linear_in_text_size():
+    # Runs of capitalized words used to backtrack quadratically in the credential fallback
+    small = "Left Foot Pain " * 2000
+    large = small * 4
+
+    ratio = _best_time(large) / _best_time(small)
+
+    assert ratio < 10
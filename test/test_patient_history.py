@@ -0,0 +1,108 @@
+"""Test the incremental per-patient history index against a full rescan of the dictations."""
+
+import os
+import tempfile
+
+from agents.models.patient_history_models import MAX_RECENT_VISITS, MAX_VISIT_KEYS, PatientHistory, visit_key
+from services.patient_history_service import SqlitePatientHistoryRepository
+from utils.context_extractor import extract_historical_clinical_context
+
+
+def _dictation(date_of_service, text, provider="Dr. A", patient_id="p-1"):
+    return {
+        "dictation": {
+            "patientId": patient_id,
+            "dateOfService": date_of_service,
+            "creationDate": f"{date_of_service}T10:00:00",
+            "provider": provider,
+            "fileContent": {"encoding": "text", "data": text},
+        }
+    }
+
+
+VISITS = [
+    _dictation("01/10/2024", "Hypertension, stable on lisinopril."),
+    _dictation("03/15/2024", "Diabetes well-controlled with metformin.", provider="Dr. B"),
+    _dictation("06/20/2024", "Hypertension worsening; add amlodipine."),
+    _dictation("09/05/2024", "Asthma stable."),
+]
+
+
+def test_incremental_updates_match_full_rescan():
+    """Test that indexing visits one at a time yields the same context as rescanning all of them."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = SqlitePatientHistoryRepository(db_path=os.path.join(tmp_dir, "history.db"))
+        for visit in VISITS:
+            history = repository.record_dictations("p-1", [visit])
+
+        indexed = history.to_historical_context()
+        rescanned = extract_historical_clinical_context(VISITS, "p-1")
+
+        assert indexed["visit_count"] == 4
+        assert indexed["date_range"] == {"most_recent": "09/05/2024", "earliest": "01/10/2024"}
+        assert sorted(indexed["recurring_conditions"]) == sorted(rescanned["recurring_conditions"])
+        assert indexed["recent_medications"] == ["amlodipine", "metformin"]
+        assert sorted(indexed["providers"]) == ["Dr. A", "Dr. B"]
+        assert indexed["clinical_trends"][0] == "09/05/2024: Stable condition noted"
+        assert repository.get_history("p-1").visit_count == 4
+
+
+def test_reindexing_and_other_patients_are_ignored():
+    """Test that already indexed visits and other patients' dictations do not change the history."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = SqlitePatientHistoryRepository(db_path=os.path.join(tmp_dir, "history.db"))
+        repository.record_dictations("p-1", VISITS)
+        history = repository.record_dictations("p-1", VISITS + [_dictation("10/01/2024", "COPD", patient_id="p-2")])
+
+        assert history.visit_count == 4
+        assert "copd" not in history.condition_last_seen
+        assert repository.get_history("p-2") is None
+
+
+def test_history_size_is_bounded():
+    """Test that only the most recent visit summaries are kept as the history grows."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = SqlitePatientHistoryRepository(db_path=os.path.join(tmp_dir, "history.db"))
+        visits = [_dictation(f"{month:02d}/01/2023", "Stable.") for month in range(1, 13)]
+        history = repository.record_dictations("p-1", visits)
+
+        assert history.visit_count == 12
+        assert len(history.recent_visits) == MAX_RECENT_VISITS
+        assert history.recent_visits[0].date_of_service == "12/01/2023"
+        assert history.condition_last_seen == {}
+
+
+def test_existing_history_only_indexes_visits_since_the_last_indexed_note(monkeypatch):
+    """Test that the walk stops at the newest already indexed dictation and still indexes every visit after it."""
+    from agents.models import patient_history_models
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = SqlitePatientHistoryRepository(db_path=os.path.join(tmp_dir, "history.db"))
+        repository.record_dictations("p-1", VISITS[:2])
+
+        keyed = []
+        original_visit_key = patient_history_models.visit_key
+        monkeypatch.setattr(patient_history_models, "visit_key",
+                            lambda dictation: keyed.append(dictation["dateOfService"]) or original_visit_key(dictation))
+        history = repository.record_dictations("p-1", [VISITS[3], VISITS[2], VISITS[1], VISITS[0]])
+
+        assert keyed[:3] == ["09/05/2024", "06/20/2024", "03/15/2024"]
+        assert "01/10/2024" not in keyed
+        assert history.visit_count == 4
+        assert "amlodipine" in history.medication_last_seen
+        assert "06/20/2024: Concerning changes noted" in history.to_historical_context()["clinical_trends"]
+
+
+def test_visit_keys_are_bounded():
+    """Test that the stored visit keys stop growing and an untimed dictation is keyed on a bounded prefix."""
+    history = PatientHistory(patient_id="p-1", visit_keys=[f"old-{n}" for n in range(MAX_VISIT_KEYS + 50)])
+    assert len(history.visit_keys) == MAX_VISIT_KEYS
+
+    for day in range(1, 29):
+        history.add_dictations([_dictation(f"02/{day:02d}/2024", "Stable.")])
+    assert len(history.visit_keys) == MAX_VISIT_KEYS
+    assert history.visit_keys[-1] == visit_key(_dictation("02/28/2024", "Stable.")["dictation"])
+
+    untimed = {"patientId": "p-1", "dateOfService": "03/01/2024", "fileContent": {"data": "x" * 10000}}
+    longer = {**untimed, "fileContent": {"data": "x" * 10001}}
+    assert visit_key(untimed) != visit_key(longer)
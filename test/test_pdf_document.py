@@ -0,0 +1,116 @@
+"""Test that PDF ingestion parses each file once for both text and patient headers, and only the pages it needs."""
+
+import os
+import tempfile
+
+import fitz
+
+from constants import PDFExtractionMode
+from utils.pdf_processor import PDFDocument, PDFProcessor, select_pages
+
+
+def _write_note(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    # Header split across text runs on one baseline, as EHR exports often are
+    page.insert_text((72, 60), "Doe, John A", fontsize=10)
+    page.insert_text((160, 60), "01/02/1960  #12345", fontsize=10)
+    page.insert_text((400, 61), "Main Clinic", fontsize=10)
+    page.insert_text((72, 90), "DATE OF SERVICE: 03/04/2025", fontsize=10)
+    doc.new_page().insert_text((72, 60), "Electronically signed by Jane Smith, DPM on Date 03/04/2025", fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def test_document_provides_text_and_header_lines():
+    """Test that one parse yields the full text and the page 1 lines in reading order."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "note-1.pdf")
+        _write_note(path)
+        document = PDFDocument.open(path)
+        with open(path, "rb") as pdf_file:
+            in_memory = PDFDocument.from_bytes(pdf_file.read(), "note-1.pdf")
+
+    assert document.header_lines(2) == ["Doe, John A 01/02/1960 #12345 Main Clinic", "DATE OF SERVICE: 03/04/2025"]
+    assert "Electronically signed by Jane Smith" in document.text
+    assert in_memory.text == document.text
+
+
+def test_process_pdf_opens_the_file_once(monkeypatch):
+    """Test that metadata extraction reuses the parsed document instead of reopening the PDF."""
+    opened = []
+    original_open = fitz.open
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "note-1.pdf")
+        _write_note(path)
+        monkeypatch.setattr(fitz, "open", lambda *args, **kwargs: opened.append(args) or original_open(*args, **kwargs))
+        em_input = PDFProcessor().process_pdf_to_em_input(path)
+
+    assert len(opened) == 1
+    assert (em_input.patient_name, em_input.patient_id) == ("Doe, John A", "12345")
+    assert em_input.date_of_service == "03/04/2025"
+    assert em_input.provider == "Jane Smith, DPM"
+
+
+def _write_long_note(path, pages):
+    doc = fitz.open()
+    first = doc.new_page()
+    first.insert_text((72, 60), "Doe, John A 01/02/1960 #12345", fontsize=10)
+    first.insert_text((72, 90), "DATE OF SERVICE: 03/04/2025", fontsize=10)
+    for number in range(2, pages):
+        doc.new_page().insert_text((72, 60), f"Exam findings page {number}", fontsize=10)
+    doc.new_page().insert_text((72, 60), "Electronically signed by Jane Smith, DPM on Date 03/04/2025", fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def test_extraction_modes_only_read_selected_pages(monkeypatch):
+    """Test that page-limited modes never extract the text of the skipped pages."""
+    extracted = []
+    original_get_text = fitz.Page.get_text
+    monkeypatch.setattr(fitz.Page, "get_text",
+                        lambda page, *args, **kwargs: extracted.append(page.number) or original_get_text(page, *args, **kwargs))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "long-note.pdf")
+        _write_long_note(path, 6)
+        full = PDFDocument.open(path)
+        extracted.clear()
+        first_pages = PDFDocument.open(path, mode=PDFExtractionMode.FIRST_PAGES, first_pages=2)
+        first_pages_read = sorted(set(extracted))
+        extracted.clear()
+        header_signature = PDFDocument.open(path, mode=PDFExtractionMode.HEADER_SIGNATURE)
+        header_signature_read = sorted(set(extracted))
+
+    assert full.complete and full.page_numbers == [0, 1, 2, 3, 4, 5]
+    assert first_pages.page_numbers == first_pages_read == [0, 1]
+    assert "Exam findings page 2" in first_pages.text and "signed" not in first_pages.text
+    assert header_signature.page_numbers == header_signature_read == [0, 5]
+    assert not header_signature.complete and header_signature.page_count == 6
+    assert "Exam findings" not in header_signature.text
+    assert header_signature.header_lines() == full.header_lines()
+
+
+def test_metadata_only_extraction_uses_header_and_signature_pages():
+    """Test that metadata comes from the first and last pages alone."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "long-note.pdf")
+        _write_long_note(path, 8)
+        metadata = PDFProcessor().extract_metadata(path)
+        first_page_text = PDFProcessor().extract_text(path, mode=PDFExtractionMode.FIRST_PAGES)
+
+    assert metadata == {
+        "document_id": "long-note",
+        "date_of_service": "03/04/2025",
+        "provider": "Jane Smith, DPM",
+        "patient_name": "Doe, John A",
+        "patient_id": "12345",
+    }
+    assert "Exam findings" not in first_page_text
+
+
+def test_select_pages_handles_short_documents():
+    assert select_pages(1, PDFExtractionMode.HEADER_SIGNATURE) == [0]
+    assert select_pages(0, PDFExtractionMode.HEADER_SIGNATURE) == []
+    assert select_pages(2, PDFExtractionMode.FIRST_PAGES, first_pages=5) == [0, 1]
@@ -0,0 +1,85 @@
+"""Test parallel PDF ingestion: ordering, per-file error isolation and timing."""
+
+import os
+import tempfile
+
+import fitz
+
+from utils.document_sources import HTML, PDF, SourceDocument
+from utils.pdf_ingestion import ingest_pdfs
+
+
+def _write_notes(tmp_dir, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(tmp_dir, f"note-{i:02d}.pdf")
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Doe, John 01/02/1960 #{1000 + i}", fontsize=10)
+        page.insert_text((72, 90), "DATE OF SERVICE: 03/04/2025", fontsize=10)
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def test_pool_ingestion_keeps_order_and_isolates_failures():
+    """Test that a corrupt file fails alone and ordered results follow the input order."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = _write_notes(tmp_dir, 6)
+        corrupt = os.path.join(tmp_dir, "corrupt.pdf")
+        with open(corrupt, "wb") as pdf_file:
+            pdf_file.write(b"not a pdf")
+        paths.insert(3, corrupt)
+
+        results = list(ingest_pdfs(paths, max_workers=2, chunk_size=2))
+
+    assert [result.path for result in results] == paths
+    assert [result.ok for result in results] == [True, True, True, False, True, True, True]
+    assert results[3].error
+    assert results[4].em_input.patient_id == "1003"
+    assert all(result.duration_seconds >= 0 for result in results)
+    assert {result.worker_pid for result in results} - {os.getpid()}
+
+
+def test_unordered_streaming_returns_every_file():
+    """Test that unordered streaming yields each file exactly once."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = _write_notes(tmp_dir, 5)
+        results = list(ingest_pdfs(paths, max_workers=2, chunk_size=1, ordered=False))
+        in_process = list(ingest_pdfs(paths, max_workers=1))
+
+    assert sorted(result.index for result in results) == list(range(5))
+    assert all(result.ok for result in results + in_process)
+    assert {result.worker_pid for result in in_process} == {os.getpid()}
+
+
+def test_metadata_only_ingestion_skips_em_input():
+    """Test that metadata-only runs return metadata instead of EMInput."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = _write_notes(tmp_dir, 2)
+        results = list(ingest_pdfs(paths, metadata_only=True))
+
+    assert all(result.ok and result.em_input is None for result in results)
+    assert [result.metadata["patient_id"] for result in results] == ["1000", "1001"]
+
+
+class _CrashingDocument(SourceDocument):
+    """A note whose parsing kills the worker process, like a segfault in MuPDF."""
+
+    def read(self) -> bytes:
+        os._exit(1)
+
+
+def test_crashed_worker_fails_only_its_file():
+    """Test that a worker dying mid-batch restarts the pool and only the crashing file fails."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = _write_notes(tmp_dir, 8)
+        documents = [SourceDocument(path, PDF) for path in paths]
+        documents.insert(2, _CrashingDocument("crash.html", HTML))
+
+        results = list(ingest_pdfs(documents, max_workers=2, chunk_size=2))
+
+    assert [result.path for result in results] == [document.name for document in documents]
+    assert [result.ok for result in results] == [True, True, False] + [True] * 6
+    assert "BrokenProcessPool" in results[2].error
@@ -0,0 +1,55 @@
+"""Test that the async progress-note activity runs notes concurrently on one event loop."""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import agents.em_progress_note_agent as progress_note_agent
+from utils.progress_note_formatter import format_progress_note_as_markdown
+from durable_functions.progress_note_agent_activity import main as progress_note_activity
+
+
+DICTATION = json.loads((Path(__file__).parent.parent / "data" / "dictation_success_563543C8.json").read_text())
+MODEL_LATENCY_SECONDS = 0.2
+
+
+class _FakeOutput:
+    def model_dump(self):
+        return {"patient_info": {"patient_name": "Test, Patient"}, "history": "History.", "assessment": ["A"], "plan": ["P"]}
+
+
+class _FakeAgent:
+    async def run(self, prompt):
+        await asyncio.sleep(MODEL_LATENCY_SECONDS)
+        return type("Result", (), {"output": _FakeOutput()})()
+
+
+async def _fake_fetch_dictation(appointment_id):
+    return DICTATION
+
+
+def test_activity_runs_notes_concurrently(monkeypatch):
+    """Test that twenty notes take about one model call, not twenty, and produce the orchestrator's shape."""
+    monkeypatch.setenv("PATIENT_HISTORY_ENABLED", "false")
+    monkeypatch.setattr(progress_note_agent, "fetch_dictation", _fake_fetch_dictation)
+    monkeypatch.setattr(progress_note_agent, "get_optimized_progress_note_agent", lambda: _FakeAgent())
+
+    async def run():
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*[progress_note_activity(f"appointment-{i}") for i in range(20)])
+        return results, time.perf_counter() - start_time
+
+    results, elapsed = asyncio.run(run())
+
+    assert elapsed < MODEL_LATENCY_SECONDS * 5
+    assert all("progress_note" in result for result in results)
+    assert "**Patient Name:** Test, Patient" in format_progress_note_as_markdown(results[0])
+
+
+def test_activity_reports_missing_dictation_as_failed():
+    """Test that an empty input is returned as a failed result the orchestrator recognizes."""
+    result = asyncio.run(progress_note_activity({"dictations": []}))
+
+    assert result["status"] == "failed"
+    assert result["error"] == "No dictation data available"
@@ -0,0 +1,159 @@
+"""Test the batch progress-note orchestrator's sliding window and the shared model rate limiter."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from durable_functions.em_progress_note_batch_orchestrator import orchestrator_function
+from durable_functions.start_progress_note_batch import parse_batch_request
+from utils.rate_limiter import AsyncRateLimiter, get_model_rate_limiter
+
+
+class _Task:
+    def __init__(self, name, payload):
+        self.name = name
+        self.payload = payload
+        self.result = None
+
+
+class _Context:
+    """Minimal orchestration context: activities complete in the order task_any receives them."""
+
+    instance_id = "batch-test"
+    current_utc_datetime = datetime(2026, 1, 1)
+
+    def __init__(self, batch):
+        self._batch = batch
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_input(self):
+        return self._batch
+
+    def set_custom_status(self, status):
+        pass
+
+    def call_activity(self, name, payload):
+        if name == "progress_note_agent_activity":
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return _Task(name, payload)
+
+    def task_any(self, tasks):
+        return ("any", tasks)
+
+
+def _run(context):
+    generator = orchestrator_function(context)
+    sent = None
+    try:
+        while True:
+            yielded = generator.send(sent)
+            if isinstance(yielded, tuple) and yielded[0] == "any":
+                finished = yielded[1][-1]
+                context.in_flight -= 1
+                if finished.payload == "bad":
+                    finished.result = {"status": "failed", "error": "No dictation data available"}
+                elif finished.payload == "timeout":
+                    finished.result = Exception("Timeout value of 00:10:00 exceeded by function")
+                else:
+                    finished.result = {"progress_note": {"patient_info": {"patient_name": finished.payload}}, "meta": {}}
+                sent = finished
+            else:
+                context.formatted = yielded.payload
+                sent = [f"# {note.get('progress_note', {}).get('patient_info', {}).get('patient_name', '')}"
+                        for note in yielded.payload]
+    except StopIteration as stop:
+        return stop.value
+
+
+def test_orchestrator_bounds_concurrency_and_keeps_order():
+    """Test that no more than max_concurrency activities are in flight and results keep input order."""
+    appointment_ids = [f"appt-{i}" for i in range(12)] + ["bad"]
+    context = _Context({
+        "appointments": [{"appointment_id": appointment_id} for appointment_id in appointment_ids],
+        "max_concurrency": 3,
+        "format": "markdown",
+    })
+
+    result = _run(context)
+
+    assert context.max_in_flight == 3
+    assert [entry["appointment_id"] for entry in result["results"]] == appointment_ids
+    assert result["successful_appointments"] == 12
+    assert result["failed_appointments"] == 1
+    assert result["results"][0]["markdown"] == "# appt-0"
+    assert result["results"][-1]["status"] == "failed"
+
+
+def test_activity_failure_does_not_fail_the_batch():
+    """Test that an activity that fails at the host level is reported as failed and not sent to the formatter."""
+    context = _Context({
+        "appointments": [{"appointment_id": appointment_id} for appointment_id in ("appt-0", "timeout", "appt-2")],
+        "max_concurrency": 2,
+        "format": "markdown",
+    })
+
+    result = _run(context)
+
+    assert result["successful_appointments"] == 2
+    assert result["results"][1] == {
+        "appointment_id": "timeout",
+        "status": "failed",
+        "error": "Timeout value of 00:10:00 exceeded by function",
+    }
+    assert [entry.get("markdown") for entry in result["results"]] == ["# appt-0", None, "# appt-2"]
+    assert all(isinstance(note, dict) for note in context.formatted)
+    assert len(context.formatted) == 2
+
+
+def test_parse_batch_request_validates_input():
+    """Test that the starter normalizes appointments and rejects invalid batches."""
+    batch = parse_batch_request({"appointments": [{"appointment_id": 42}], "format": "json"})
+
+    assert batch["appointments"] == [{"appointment_id": "42", "dictations": [], "patient_intake": {}}]
+    assert batch["format"] == "json"
+    with pytest.raises(ValueError):
+        parse_batch_request({"appointments": []})
+    with pytest.raises(ValueError):
+        parse_batch_request({"appointments": [{"dictations": []}]})
+    with pytest.raises(ValueError):
+        parse_batch_request({"appointments": [{"appointment_id": "1"}], "max_concurrency": 0})
+
+
+def test_rate_limiter_caps_in_flight_requests():
+    """Test that the limiter never lets more than max_concurrent calls run at once."""
+    limiter = AsyncRateLimiter(max_concurrent=4)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*[call() for _ in range(20)])
+
+    asyncio.run(run())
+
+    assert peak == 4
+    assert limiter.stats()["total"] == 20
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_model_rate_limiter_takes_a_share_of_the_app_budget(monkeypatch):
+    """Test that the app-wide limits are split across instances and worker processes."""
+    monkeypatch.setenv("MODEL_MAX_CONCURRENT_REQUESTS", "40")
+    monkeypatch.setenv("MODEL_REQUESTS_PER_MINUTE", "600")
+    monkeypatch.setenv("MODEL_RATE_LIMIT_INSTANCES", "5")
+    monkeypatch.setenv("FUNCTIONS_WORKER_PROCESS_COUNT", "2")
+    get_model_rate_limiter.cache_clear()
+    try:
+        limiter = get_model_rate_limiter()
+    finally:
+        get_model_rate_limiter.cache_clear()
+
+    assert limiter.max_concurrent == 4
+    assert limiter.requests_per_minute == 60
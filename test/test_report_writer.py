@@ -0,0 +1,65 @@
+"""Test the incremental JSON/NDJSON report writer and field projection."""
+
+import gzip
+import json
+
+from utils.report_writer import FieldProjection, iter_encoded_chunks, iter_report_chunks, wants_gzip
+
+
+SUMMARY = {"total_documents": 2, "instance_id": "abc"}
+PERFORMANCE = {"total_flow_execution_time": 1.5}
+RESULTS = [
+    {
+        "document_id": f"doc-{index}",
+        "enhancement_agent": {"text": "long note " * 50, "assigned_code": "99213"},
+        "auditor_agent": {"final_assigned_code": "99214", "audit_flags": [{"flag": "a", "detail": "b"}]},
+    }
+    for index in range(2)
+]
+
+
+def _render(**kwargs):
+    return "".join(iter_report_chunks(SUMMARY, RESULTS, PERFORMANCE, **kwargs))
+
+
+def test_json_report_matches_json_dumps():
+    """Test that the chunked output is equivalent to serializing the whole report at once."""
+    expected = {"test_summary": SUMMARY, "results": RESULTS, "performance": PERFORMANCE}
+    assert json.loads(_render()) == expected
+    assert _render() == json.dumps(expected, indent=2, ensure_ascii=False)
+
+    empty = {"test_summary": SUMMARY, "results": [], "performance": {}}
+    assert "".join(iter_report_chunks(SUMMARY, [], {})) == json.dumps(empty, indent=2, ensure_ascii=False)
+
+
+def test_ndjson_report_lines():
+    """Test that NDJSON output has one typed object per line."""
+    lines = [json.loads(line) for line in _render(report_format="ndjson").splitlines()]
+    assert [line["type"] for line in lines] == ["summary", "result", "result", "performance"]
+    assert lines[1]["document_id"] == "doc-0"
+
+
+def test_field_projection():
+    """Test include and exclude projections on each result."""
+    excluded = json.loads(_render(projection=FieldProjection.parse("-enhancement_agent.text")))
+    assert "text" not in excluded["results"][0]["enhancement_agent"]
+    assert excluded["results"][0]["enhancement_agent"]["assigned_code"] == "99213"
+
+    included = json.loads(_render(projection=FieldProjection.parse("document_id,auditor_agent.audit_flags.flag")))
+    assert included["results"][1] == {"document_id": "doc-1", "auditor_agent": {"audit_flags": [{"flag": "a"}]}}
+
+    assert FieldProjection.parse("") is None
+    assert RESULTS[0]["enhancement_agent"]["text"], "projection must not mutate the source results"
+
+
+def test_gzip_encoding():
+    """Test that incremental gzip output decompresses to the plain report."""
+    compressed = b"".join(iter_encoded_chunks(iter_report_chunks(SUMMARY, RESULTS, PERFORMANCE), compress=True))
+    assert gzip.decompress(compressed).decode("utf-8") == _render()
+
+
+def test_wants_gzip_prefers_the_query_parameter():
+    assert wants_gzip({"gzip": "true"}, {})
+    assert not wants_gzip({"gzip": "false"}, {"Accept-Encoding": "gzip, br"})
+    assert wants_gzip({}, {"Accept-Encoding": "br, GZIP"})
+    assert not wants_gzip({}, {})
@@ -0,0 +1,136 @@
+"""Test the sqlite results repository used for local audit result lookups."""
+
+import os
+import tempfile
+from datetime import date, datetime, timezone
+
+import pytest
+
+from agents.models.result_models import AuditResultRecord, date_partition_key
+from services.results_service import (
+    SqliteResultsRepository,
+    _table_continuation_token,
+    encode_continuation_token,
+)
+
+
+def _pipeline_result(document_id, patient_id, provider, code="99213", score=82):
+    return {
+        "enhancement_agent": {
+            "document_id": document_id,
+            "assigned_code": code,
+            "patient_id": patient_id,
+            "patient_name": "Test Patient",
+            "provider": provider,
+            "date_of_service": "2025-01-15",
+            "is_new_patient": False,
+        },
+        "auditor_agent": {
+            "document_id": document_id,
+            "final_assigned_code": code,
+            "confidence": {"score": score, "tier": "High"},
+            "audit_flags": ["flag"],
+        },
+    }
+
+
+def _repository(tmp_dir):
+    return SqliteResultsRepository(db_path=os.path.join(tmp_dir, "results.db"))
+
+
+def test_record_from_pipeline_result():
+    """Test that a pipeline result is flattened into a compact record."""
+    processed_at = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+    record = AuditResultRecord.from_pipeline_result("inst-1", processed_at, _pipeline_result("doc-1", "p-1", "Dr. A"))
+
+    assert record.status == "completed"
+    assert record.final_assigned_code == "99213"
+    assert record.confidence_score == 82
+    assert record.audit_flags_count == 1
+    assert set(record.index_keys()) == {"document", "date", "patient", "provider"}
+
+    failed = AuditResultRecord.from_pipeline_result("inst-1", processed_at, {"error": "boom"})
+    assert failed.status == "failed"
+    assert failed.document_id == "unknown"
+
+
+def test_query_by_patient_provider_and_date():
+    """Test lookups by each index and date range filtering."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = _repository(tmp_dir)
+        records = [
+            AuditResultRecord.from_pipeline_result(
+                "inst-1", datetime(2025, 1, day, tzinfo=timezone.utc), _pipeline_result(f"doc-{day}", f"p-{day % 2}", "Dr. A")
+            )
+            for day in range(1, 6)
+        ]
+        assert repository.save_results(records) == 5
+
+        by_patient = repository.query_results(patient_id="p-1")
+        assert [item["document_id"] for item in by_patient["items"]] == ["doc-5", "doc-3", "doc-1"]
+
+        by_provider = repository.query_results(provider="Dr. A", start_date="2025-01-02", end_date="2025-01-03")
+        assert {item["document_id"] for item in by_provider["items"]} == {"doc-2", "doc-3"}
+
+        by_document = repository.query_results(document_id="doc-4")
+        assert by_document["count"] == 1
+        assert by_document["items"][0]["is_new_patient"] is False
+
+
+def test_query_pagination():
+    """Test that continuation tokens walk through every page exactly once."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = _repository(tmp_dir)
+        repository.save_results([
+            AuditResultRecord.from_pipeline_result(
+                "inst-2", datetime(2025, 2, 1, hour, tzinfo=timezone.utc), _pipeline_result(f"doc-{hour}", "p-1", "Dr. B")
+            )
+            for hour in range(7)
+        ])
+
+        seen, token = [], None
+        while True:
+            page = repository.query_results(start_date="2025-02-01", limit=3, continuation_token=token)
+            seen.extend(item["document_id"] for item in page["items"])
+            token = page["continuation_token"]
+            if not token:
+                break
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+
+def test_query_requires_lookup():
+    """Test that unbounded queries are rejected."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = _repository(tmp_dir)
+        for kwargs in ({}, {"patient_id": "p-1", "limit": 0}, {"patient_id": "p-1", "limit": 10_000}):
+            try:
+                repository.query_results(**kwargs)
+            except ValueError:
+                continue
+            raise AssertionError(f"Expected ValueError for {kwargs}")
+
+
+def test_date_partitions_sort_newest_first():
+    """Test that an ascending scan over the per-day partitions returns later days first."""
+    days = [date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 2), date(2025, 10, 1)]
+    keys = [date_partition_key(day) for day in days]
+
+    assert sorted(keys) == list(reversed(keys))
+
+
+def test_tampered_continuation_tokens_are_rejected():
+    """Test that tokens that do not decode to the backend's format raise ValueError (400)."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = _repository(tmp_dir)
+        for value in ("abc", {}, -1, True, 1.5):
+            with pytest.raises(ValueError):
+                repository.query_results(patient_id="p-1", continuation_token=encode_continuation_token(value))
+        with pytest.raises(ValueError):
+            repository.query_results(patient_id="p-1", continuation_token="not base64!")
+
+    assert _table_continuation_token(encode_continuation_token({"PartitionKey": "a", "RowKey": "b"}))
+    for value in ("abc", 3, {}, {"PartitionKey": 1}, {"Other": "x"}):
+        with pytest.raises(ValueError):
+            _table_continuation_token(encode_continuation_token(value))
@@ -0,0 +1,88 @@
+"""Test the flattened CSV/Parquet audit exports."""
+
+import csv
+import io
+
+import pyarrow.parquet as pq
+
+from utils.tabular_export import (
+    AUDIT_EXPORT_COLUMNS,
+    flatten_audit_result,
+    iter_csv_chunks,
+    write_parquet,
+)
+
+
+RESULTS = [
+    {
+        "enhancement_agent": {
+            "document_id": f"doc-{index}",
+            "assigned_code": "99213",
+            "patient_id": "1234",
+            "performance_metrics": {
+                "total_execution_time": 4.2,
+                "execution_breakdown": {"ai_model_inference": 3.9},
+            },
+        },
+        "auditor_agent": {
+            "document_id": f"doc-{index}",
+            "final_assigned_code": "99214" if index % 2 else "99213",
+            "is_new_patient": False,
+            "confidence": {"score": 85, "tier": "High"},
+            "audit_flags": ["a", "b"],
+            "final_justification": {"complianceAlerts": ["Missing ROS"]},
+            "performance_metrics": {"total_execution_time": 2.5},
+        },
+        "timestamp": "2025-01-15T12:00:00",
+    }
+    for index in range(5)
+] + [{"enhancement_agent": {"document_id": "doc-failed"}, "auditor_agent": None}]
+
+
+def _rows():
+    return [flatten_audit_result(result, "instance-1") for result in RESULTS]
+
+
+def test_flatten_audit_result_types():
+    """Test that flattened rows carry typed values and nulls for missing data."""
+    row = _rows()[1]
+    assert row["instance_id"] == "instance-1"
+    assert row["confidence_score"] == 85
+    assert row["audit_flags_count"] == 2
+    assert row["compliance_alerts_count"] == 1
+    assert row["code_changed"] is True
+    assert row["enhancement_ai_model_inference_seconds"] == 3.9
+    assert row["enhancement_json_parsing_seconds"] is None
+
+    failed = _rows()[-1]
+    assert failed["status"] == "failed"
+    assert failed["confidence_score"] is None
+
+
+def test_csv_chunks_round_trip():
+    """Test that chunked CSV output parses back to the same rows."""
+    chunks = list(iter_csv_chunks(_rows(), batch_size=2))
+    assert len(chunks) > 1
+
+    parsed = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert list(parsed[0].keys()) == [column.name for column in AUDIT_EXPORT_COLUMNS]
+    assert len(parsed) == len(RESULTS)
+    assert parsed[0]["final_assigned_code"] == "99213"
+
+
+def test_parquet_typed_columns():
+    """Test that Parquet output uses the shared schema with typed columns."""
+    output = io.BytesIO()
+    assert write_parquet(_rows(), output, batch_size=2) == len(RESULTS)
+
+    output.seek(0)
+    table = pq.read_table(output)
+    assert table.num_rows == len(RESULTS)
+    assert str(table.schema.field("confidence_score").type) == "int64"
+    assert str(table.schema.field("code_changed").type) == "bool"
+    assert table.column("document_id").to_pylist()[-1] == "doc-failed"
+
+    empty = io.BytesIO()
+    assert write_parquet([], empty) == 0
+    empty.seek(0)
+    assert pq.read_table(empty).num_rows == 0
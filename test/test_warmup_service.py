@@ -0,0 +1,79 @@
+"""Test the worker warm-up report."""
+
+import asyncio
+
+import pytest
+
+from services import warmup_service
+from services.warmup_service import STEP_FAILED, STEP_OK, STEP_SKIPPED, run_warmup
+
+
+@pytest.fixture(autouse=True)
+def fresh_warmup_state(monkeypatch):
+    monkeypatch.setattr(warmup_service, "_inflight", None)
+    monkeypatch.setattr(warmup_service, "_last_report", None)
+    monkeypatch.setattr(warmup_service, "_last_completed_at", float("-inf"))
+
+
+def _counting_steps(monkeypatch):
+    calls = []
+
+    def step(name):
+        async def run():
+            calls.append(name)
+            await asyncio.sleep(0.01)
+            return {}
+        return run
+
+    for name in ("_warm_guidelines", "_warm_agents", "_warm_mcp", "_prime_model"):
+        monkeypatch.setattr(warmup_service, name, step(name))
+    return calls
+
+
+def test_warmup_reports_every_step(monkeypatch):
+    """Test that each step is timed and a failing or skipped step does not stop the others."""
+    monkeypatch.delenv("MCP_API_URL", raising=False)
+
+    report = asyncio.run(run_warmup(prime_model=False, trigger="test"))
+    steps = {step["name"]: step for step in report["steps"]}
+
+    assert list(steps) == ["guidelines", "agents", "mcp_handshake", "model_prime"]
+    assert steps["guidelines"]["status"] == STEP_OK
+    assert steps["guidelines"]["version"]
+    assert steps["mcp_handshake"]["status"] == STEP_SKIPPED
+    assert steps["model_prime"] == {"name": "model_prime", "status": STEP_SKIPPED, "reason": "disabled", "duration_seconds": 0.0}
+    assert all(step["duration_seconds"] >= 0 for step in report["steps"])
+    assert report["status"] == ("degraded" if steps["agents"]["status"] == STEP_FAILED else "ok")
+    assert report["trigger"] == "test"
+
+
+def test_concurrent_warmups_share_one_run(monkeypatch):
+    """Test that warm-ups started together await the same run instead of repeating it."""
+    calls = _counting_steps(monkeypatch)
+
+    async def both():
+        return await asyncio.gather(run_warmup(prime_model=True, trigger="timer"),
+                                    run_warmup(prime_model=False, trigger="http"))
+
+    first, second = asyncio.run(both())
+
+    assert calls == ["_warm_guidelines", "_warm_agents", "_warm_mcp", "_prime_model"]
+    assert first["trigger"] == second["trigger"] == "timer"
+    assert second["reused"] is True
+
+
+def test_recent_warmup_is_reused(monkeypatch):
+    """Test that a successful run is reported again within the reuse window, unless it did not prime the model."""
+    calls = _counting_steps(monkeypatch)
+
+    asyncio.run(run_warmup(prime_model=False))
+    reused = asyncio.run(run_warmup(prime_model=False))
+    assert reused["reused"] is True
+    assert len(calls) == 3
+
+    asyncio.run(run_warmup(prime_model=True))
+    assert calls[3:] == ["_warm_guidelines", "_warm_agents", "_warm_mcp", "_prime_model"]
+
+    monkeypatch.setattr(warmup_service, "_last_completed_at", float("-inf"))
+    asyncio.run(run_warmup(prime_model=False))
+    assert len(calls) == 10
@@ -0,0 +1,77 @@
+"""
+Audit Fields
+Fills in the audit result fields that follow from the model's judgement, so the
+auditor model does not spend completion tokens on them: the confidence tier is
+a band of the score (docs/CONFIDENCE_TIERS.md) and supportedBy is a template on
+the MDM level of the final code (AMA MDM table of the guidelines).
+"""
+from typing import Dict, Optional, Tuple
+
+from agents.models.optimized_pydantic_models import (
+    CodeJustification,
+    ConfidenceAssessment,
+    OptimizedEMAuditJudgement,
+    OptimizedEMAuditResult,
+)
+from utils.guidelines_index import GuidelinesIndex
+from utils.mdm_scorer import level_codes
+
+
+# (lowest score, tier) from the highest band down, as in docs/CONFIDENCE_TIERS.md
+CONFIDENCE_TIERS: Tuple[Tuple[int, str], ...] = (
+    (90, "Very High"),
+    (70, "High"),
+    (50, "Moderate"),
+    (30, "Low"),
+    (0, "Very Low"),
+)
+SUPPORTED_BY_TEMPLATE = "Supported by {level} MDM per AMA 2025 E/M guidelines."
+
+
+def confidence_tier(score: int) -> str:
+    """Tier label of a 0-100 confidence score."""
+    return next(tier for lowest_score, tier in CONFIDENCE_TIERS if score >= lowest_score)
+
+
+def code_mdm_levels(index: Optional[GuidelinesIndex] = None) -> Dict[str, str]:
+    """MDM level name of every new and established patient code."""
+    return {
+        code: level_name
+        for level_name, codes in level_codes(index).items()
+        for code in codes
+    }
+
+
+def supported_by(code: str, index: Optional[GuidelinesIndex] = None) -> str:
+    """Primary support statement for a final code, e.g. 'Supported by moderate MDM per ...'."""
+    level_name = code_mdm_levels(index).get(code)
+    return SUPPORTED_BY_TEMPLATE.format(level=level_name.lower() if level_name else "documented")
+
+
+def complete_audit_result(
+    judgement: OptimizedEMAuditJudgement,
+    final_code: Optional[str] = None,
+    index: Optional[GuidelinesIndex] = None
+) -> OptimizedEMAuditResult:
+    """
+    Full audit result from the auditor model's judgement.
+
+    Args:
+        judgement: Auditor model output
+        final_code: Final code after post-processing (e.g. the patient type correction);
+            defaults to the model's final_assigned_code
+        index: Guidelines index for the MDM levels (default: the current E/M guidelines)
+    """
+    final_code = final_code or judgement.final_assigned_code
+    return OptimizedEMAuditResult(
+        audit_flags=judgement.audit_flags,
+        final_assigned_code=final_code,
+        final_justification=CodeJustification(
+            **judgement.final_justification.model_dump(),
+            supportedBy=supported_by(final_code, index)
+        ),
+        confidence=ConfidenceAssessment(
+            **judgement.confidence.model_dump(),
+            tier=confidence_tier(judgement.confidence.score)
+        )
+    )
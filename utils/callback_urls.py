@@ -0,0 +1,35 @@
+"""
+Callback URLs
+Completion webhooks are POSTed from inside the worker, so a caller-supplied URL
+could reach internal services (SSRF). Only http(s) URLs whose host is in
+CALLBACK_ALLOWED_HOSTS are accepted; with no hosts configured, callbacks are off.
+"""
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from constants import azure_config
+
+
+def host_is_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    """Exact host match, or any subdomain for "*.example.com" entries."""
+    host = host.lower().rstrip(".")
+    for allowed in allowed_hosts:
+        if allowed.startswith("*."):
+            if host.endswith(allowed[1:]):
+                return True
+        elif host == allowed:
+            return True
+    return False
+
+
+def callback_url_error(callback_url: str, allowed_hosts: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Why a callback URL is refused, or None when it may be used."""
+    parsed = urlparse(callback_url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "callback_url must be an absolute http(s) URL."
+    if parsed.username or parsed.password:
+        return "callback_url must not contain credentials."
+    allowed_hosts = azure_config.callback_allowed_hosts if allowed_hosts is None else list(allowed_hosts)
+    if not host_is_allowed(parsed.hostname, allowed_hosts):
+        return "callback_url host is not in CALLBACK_ALLOWED_HOSTS."
+    return None
@@ -0,0 +1,155 @@
+"""
+Clinical Concept Matcher Module
+Finds every vocabulary term in a document with one compiled, word-bounded regex
+pass, maps each hit back to its concept and flags hits preceded by a negation cue
+in the same clause and not cut off from it by a termination term such as ",",
+"but" or "history of" (NegEx-style).
+"""
+import json
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from constants import azure_config
+from settings import logger
+
+
+DEFAULT_VOCABULARY_PATH = Path(__file__).parent / "clinical_vocabulary.json"
+DEFAULT_NEGATION_WINDOW_CHARS = 60
+# Terms that end a negation's scope ("No chest pain, history of hypertension")
+DEFAULT_NEGATION_TERMINATORS = (",", "but", "however", "although", "except", "history of")
+
+# A negation cue only applies within its own clause
+_CLAUSE_BOUNDARY = re.compile(r"[.;:!?\n]")
+
+
+class ConceptMatch(NamedTuple):
+    """One vocabulary hit with its span in the original text."""
+    category: str
+    concept: str
+    text: str
+    start: int
+    end: int
+    negated: bool
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for a character trie; greedy optional tails make the longest term win."""
+    branches = [
+        (r"\s+" if character == " " else re.escape(character)) + _trie_pattern(child)
+        for character, child in sorted(node.items()) if character
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    return f"(?:{pattern})?" if "" in node else pattern
+
+
+def _alternation(terms) -> str:
+    """
+    One regex matching any of the terms (normalized, whitespace-tolerant).
+
+    Terms are merged into a prefix trie, so the engine follows a single branch per
+    character instead of retrying every term at every position.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for character in _normalize(term):
+            node = node.setdefault(character, {})
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+class ClinicalMatcher:
+    """Compiled multi-pattern matcher over a {"categories": {category: {concept: [terms]}}} vocabulary."""
+
+    def __init__(self, vocabulary: Dict[str, Any]):
+        self.categories: Dict[str, List[str]] = OrderedDict()
+        self._lookup: Dict[str, tuple] = {}
+        for category, concepts in vocabulary.get("categories", {}).items():
+            self.categories[category] = list(concepts)
+            for concept, terms in concepts.items():
+                for term in terms or [concept]:
+                    self._lookup.setdefault(_normalize(term), (category, concept))
+
+        self.negation_window_chars = int(vocabulary.get("negation_window_chars", DEFAULT_NEGATION_WINDOW_CHARS))
+        self._pattern = re.compile(rf"(?<![\w-])(?:{_alternation(self._lookup)})(?![\w-])", re.IGNORECASE)
+        negation_cues = vocabulary.get("negation_cues") or []
+        self._negation = (
+            re.compile(rf"\b(?:{_alternation(negation_cues)})\b", re.IGNORECASE) if negation_cues else None
+        )
+        terminators = vocabulary.get("negation_terminators", DEFAULT_NEGATION_TERMINATORS)
+        words = [term for term in terminators if term[:1].isalnum()]
+        marks = [re.escape(term) for term in terminators if not term[:1].isalnum()]
+        self._terminator = (
+            re.compile("|".join(marks + ([rf"\b(?:{_alternation(words)})\b"] if words else [])), re.IGNORECASE)
+            if terminators else None
+        )
+
+    @classmethod
+    def from_file(cls, path) -> "ClinicalMatcher":
+        """Load a matcher from a vocabulary JSON file."""
+        with open(path, "r", encoding="utf-8") as vocabulary_file:
+            return cls(json.load(vocabulary_file))
+
+    @property
+    def term_count(self) -> int:
+        return len(self._lookup)
+
+    def _is_negated(self, text: str, start: int) -> bool:
+        if self._negation is None:
+            return False
+        window_start = max(0, start - self.negation_window_chars)
+        window = text[window_start:start]
+        boundaries = list(_CLAUSE_BOUNDARY.finditer(window))
+        if boundaries:
+            window = window[boundaries[-1].end():]
+        # A cue is cut off by any terminator after it; ">=" keeps "no history of" a cue
+        scope_start = 0
+        if self._terminator is not None:
+            scope_start = max((match.end() for match in self._terminator.finditer(window)), default=0)
+        return any(match.end() >= scope_start for match in self._negation.finditer(window))
+
+    def find(self, text: str) -> List[ConceptMatch]:
+        """Find all concept hits in one pass, in document order."""
+        if not text or not self._lookup:
+            return []
+        matches = []
+        for match in self._pattern.finditer(text):
+            category, concept = self._lookup[_normalize(match.group())]
+            matches.append(ConceptMatch(
+                category=category,
+                concept=concept,
+                text=match.group(),
+                start=match.start(),
+                end=match.end(),
+                negated=self._is_negated(text, match.start())
+            ))
+        return matches
+
+    def extract(self, text: str, include_negated: bool = False) -> Dict[str, List[str]]:
+        """Concepts found per category (vocabulary order), skipping negated hits unless asked not to."""
+        found = {match.concept for match in self.find(text) if include_negated or not match.negated}
+        return {
+            category: [concept for concept in concepts if concept in found]
+            for category, concepts in self.categories.items()
+        }
+
+
+@lru_cache(maxsize=None)
+def get_clinical_matcher(vocabulary_path: Optional[str] = None) -> ClinicalMatcher:
+    """Get the shared matcher for CLINICAL_VOCABULARY_PATH (default: utils/clinical_vocabulary.json)."""
+    path = vocabulary_path or azure_config.clinical_vocabulary_path or DEFAULT_VOCABULARY_PATH
+    matcher = ClinicalMatcher.from_file(path)
+    logger.debug("Compiled clinical concept matcher",
+                vocabulary_path=str(path),
+                categories=list(matcher.categories),
+                terms=matcher.term_count)
+    return matcher
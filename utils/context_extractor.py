@@ -7,6 +7,8 @@ from datetime import datetime
 import json
 
 from settings import logger
+from utils.clinical_matcher import get_clinical_matcher
+from utils.context_packer import PackedContext, pack_context
 
 
 def extract_relevant_intake_context(intake_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -145,6 +147,16 @@ def extract_relevant_intake_context(intake_data: Dict[str, Any]) -> Dict[str, An
     return relevant_context
 
 
+def detect_clinical_findings(text: str) -> Dict[str, List[str]]:
+    """Detect conditions, medications and stability indicators mentioned (and not negated) in one dictation."""
+    findings = get_clinical_matcher().extract(text)
+    return {
+        "conditions": findings.get("conditions", []),
+        "medications": findings.get("medications", []),
+        "trends": findings.get("trends", []),
+    }
+
+
 def extract_historical_clinical_context(dictations: List[Dict[str, Any]], current_patient_id: str) -> Dict[str, Any]:
     """
     Extract relevant clinical context from historical progress notes for the same patient.
@@ -186,30 +198,19 @@ def extract_historical_clinical_context(dictations: List[Dict[str, Any]], curren
     for visit in recent_visits:
         file_content = visit.get("fileContent", {}).get("data", "")
         if file_content:
-            # Extract key clinical information
-            content_lower = file_content.lower()
-            
-            # Common conditions
-            conditions = [
-                "diabetes", "hypertension", "atrial fibrillation", "heart failure",
-                "copd", "asthma", "arthritis", "depression", "anxiety"
-            ]
-            for condition in conditions:
-                if condition in content_lower:
-                    clinical_themes["conditions_mentioned"].add(condition)
-            
-            # Stability indicators
-            if "stable" in content_lower:
-                clinical_themes["stability_indicators"].append(f"{visit.get('dateOfService', '')}: Stable condition noted")
-            if "well-controlled" in content_lower:
-                clinical_themes["stability_indicators"].append(f"{visit.get('dateOfService', '')}: Well-controlled")
-            if "worsening" in content_lower or "deteriorating" in content_lower:
-                clinical_themes["stability_indicators"].append(f"{visit.get('dateOfService', '')}: Concerning changes noted")
+            findings = detect_clinical_findings(file_content)
+            clinical_themes["conditions_mentioned"].update(findings["conditions"])
+            clinical_themes["medications_mentioned"].update(findings["medications"])
+            for trend in findings["trends"]:
+                clinical_themes["stability_indicators"].append(f"{visit.get('dateOfService', '')}: {trend}")
     
     # Convert sets to lists for JSON serialization
     if clinical_themes["conditions_mentioned"]:
         historical_context["recurring_conditions"] = list(clinical_themes["conditions_mentioned"])
     
+    if clinical_themes["medications_mentioned"]:
+        historical_context["recent_medications"] = list(clinical_themes["medications_mentioned"])
+    
     if clinical_themes["stability_indicators"]:
         historical_context["clinical_trends"] = clinical_themes["stability_indicators"][-3:]  # Last 3 trends
     
@@ -225,12 +226,17 @@ def format_context_for_prompt(
     intake_context: Dict[str, Any], 
     historical_context: Dict[str, Any],
     current_transcription: str,
-    patient_info: Dict[str, str]
+    patient_info: Dict[str, str],
+    packed_context: Optional[PackedContext] = None
 ) -> str:
     """
     Format the extracted context into an optimized prompt structure.
-    Balances comprehensive information with token efficiency.
+    Patient information and the transcription are always included; intake and
+    historical facts are packed by priority into the context token budget.
     """
+    if packed_context is None:
+        packed_context = pack_context(intake_context, historical_context)
+
     context_sections = []
     
     # Patient information
@@ -241,53 +247,8 @@ Date of Birth: {patient_info.get('patient_date_of_birth', 'Unknown')}
 Date of Service: {patient_info.get('date_of_service', 'Unknown')}
 Provider: {patient_info.get('provider', 'Unknown')}""")
     
-    # Current visit context from intake
-    if intake_context:
-        intake_section = ["CURRENT VISIT CONTEXT:"]
-        
-        if chief_complaint := intake_context.get("chief_complaint"):
-            intake_section.append(f"Chief Complaint: {chief_complaint}")
-        
-        if pain_chars := intake_context.get("pain_characteristics"):
-            intake_section.append(f"Pain Details: {pain_chars}")
-        
-        if allergies := intake_context.get("allergies"):
-            intake_section.append(f"Allergies: {'; '.join(allergies)}")
-        
-        if meds := intake_context.get("current_medications"):
-            intake_section.append(f"Current Medications: {'; '.join(meds[:5])}")  # Limit to 5 most recent
-        
-        if conditions := intake_context.get("medical_conditions"):
-            intake_section.append(f"Active Conditions: {'; '.join(conditions)}")
-        
-        if surgeries := intake_context.get("surgical_history"):
-            intake_section.append(f"Recent Surgeries: {'; '.join(surgeries[:3])}")  # Limit to 3 most recent
-        
-        if social := intake_context.get("social_history"):
-            intake_section.append(f"Relevant Social History: {'; '.join(social)}")
-        
-        context_sections.append("\n".join(intake_section))
-    
-    # Historical clinical context
-    if historical_context:
-        historical_section = ["HISTORICAL CLINICAL CONTEXT:"]
-        
-        if historical_context.get("visit_count", 0) > 1:
-            historical_section.append(f"Previous visits: {historical_context['visit_count']} visits on record")
-        
-        if recurring_conditions := historical_context.get("recurring_conditions"):
-            historical_section.append(f"Recurring conditions: {', '.join(recurring_conditions)}")
-        
-        if trends := historical_context.get("clinical_trends"):
-            historical_section.append(f"Recent trends: {'; '.join(trends)}")
-        
-        if providers := historical_context.get("providers"):
-            if len(providers) > 1:
-                historical_section.append(f"Provider continuity: Multiple providers ({', '.join(providers)})")
-            else:
-                historical_section.append(f"Provider continuity: Consistent care with {providers[0]}")
-        
-        context_sections.append("\n".join(historical_section))
+    # Current visit and historical context that fit the budget
+    context_sections.extend(packed_context.sections)
     
     # Current transcription
     context_sections.append(f"""CURRENT TRANSCRIPTION:
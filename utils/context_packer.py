@@ -0,0 +1,184 @@
+"""
+Context Packer Module
+Turns extracted intake and historical context into prioritized facts with an
+estimated token cost and keeps the most important ones that fit a token budget,
+so progress-note prompts stay the same size however rich the patient record is.
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from constants import ContextPackingStrategy, azure_config
+
+
+# Rough token estimate for English clinical text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+# Optimal packing: priority points per doubling of a fact's value
+PRIORITY_DOUBLING = 5
+
+INTAKE_SECTION = "CURRENT VISIT CONTEXT:"
+HISTORY_SECTION = "HISTORICAL CLINICAL CONTEXT:"
+
+
+class ContextFact(NamedTuple):
+    """One candidate line item of the prompt context."""
+    section: str
+    label: str
+    value: str
+    priority: int
+    cost: int
+    separator: str = "; "
+
+
+class PackedContext(NamedTuple):
+    """Facts selected for a prompt and the ones dropped to respect the budget."""
+    sections: List[str]
+    included: List[ContextFact]
+    dropped: List[ContextFact]
+    used_tokens: int
+    budget: int
+    strategy: str
+
+    def dropped_summary(self) -> List[str]:
+        return [f"{fact.label}: {fact.value}" for fact in self.dropped]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _fact(section: str, label: str, value: Any, priority: int, separator: str = "; ") -> ContextFact:
+    value = str(value)
+    return ContextFact(section, label, value, priority, estimate_tokens(value + separator), separator)
+
+
+def _ranked(section: str, label: str, values: List[Any], priority: int, floor: int, separator: str = "; "):
+    """Facts for a list whose earlier items matter more (priority decays with position)."""
+    return [_fact(section, label, value, max(priority - i, floor), separator) for i, value in enumerate(values)]
+
+
+def collect_context_facts(intake_context: Dict[str, Any], historical_context: Dict[str, Any]) -> List[ContextFact]:
+    """Candidate facts in prompt order, each with its priority (higher is kept first) and token cost."""
+    facts: List[ContextFact] = []
+
+    if intake_context:
+        if chief_complaint := intake_context.get("chief_complaint"):
+            facts.append(_fact(INTAKE_SECTION, "Chief Complaint", chief_complaint, 90))
+        if pain_chars := intake_context.get("pain_characteristics"):
+            facts.append(_fact(INTAKE_SECTION, "Pain Details", pain_chars, 70))
+        facts += _ranked(INTAKE_SECTION, "Allergies", intake_context.get("allergies") or [], 95, 85)
+        facts += _ranked(INTAKE_SECTION, "Current Medications", intake_context.get("current_medications") or [], 80, 55)
+        facts += _ranked(INTAKE_SECTION, "Active Conditions", intake_context.get("medical_conditions") or [], 75, 55)
+        facts += _ranked(INTAKE_SECTION, "Recent Surgeries", intake_context.get("surgical_history") or [], 50, 25)
+        facts += _ranked(INTAKE_SECTION, "Relevant Social History", intake_context.get("social_history") or [], 40, 25)
+
+    if historical_context:
+        if historical_context.get("visit_count", 0) > 1:
+            facts.append(_fact(
+                HISTORY_SECTION, "Previous visits", f"{historical_context['visit_count']} visits on record", 30
+            ))
+        facts += _ranked(HISTORY_SECTION, "Recurring conditions",
+                         historical_context.get("recurring_conditions") or [], 60, 50, ", ")
+        facts += _ranked(HISTORY_SECTION, "Medications in recent notes",
+                         historical_context.get("recent_medications") or [], 45, 35, ", ")
+        facts += _ranked(HISTORY_SECTION, "Recent trends", historical_context.get("clinical_trends") or [], 55, 45)
+        if providers := historical_context.get("providers"):
+            if len(providers) > 1:
+                continuity = f"Multiple providers ({', '.join(providers)})"
+            else:
+                continuity = f"Consistent care with {providers[0]}"
+            facts.append(_fact(HISTORY_SECTION, "Provider continuity", continuity, 20))
+
+    return facts
+
+
+def _select_greedy(facts: List[ContextFact], budget: int) -> List[bool]:
+    """Highest priority first (cheapest first on ties), skipping facts that no longer fit."""
+    selected = [False] * len(facts)
+    remaining = budget
+    for index in sorted(range(len(facts)), key=lambda i: (-facts[i].priority, facts[i].cost, i)):
+        if facts[index].cost <= remaining:
+            selected[index] = True
+            remaining -= facts[index].cost
+    return selected
+
+
+def _select_optimal(facts: List[ContextFact], budget: int) -> List[bool]:
+    """
+    0/1 knapsack over the budget. A fact's value doubles every PRIORITY_DOUBLING points,
+    so a few cheap low-priority facts cannot displace a more important one.
+    """
+    best = [0.0] * (budget + 1)
+    taken = []
+    for fact in facts:
+        value = 2 ** (fact.priority / PRIORITY_DOUBLING)
+        row = [False] * (budget + 1)
+        for capacity in range(budget, fact.cost - 1, -1):
+            candidate = best[capacity - fact.cost] + value
+            if candidate > best[capacity]:
+                best[capacity] = candidate
+                row[capacity] = True
+        taken.append(row)
+
+    selected = [False] * len(facts)
+    capacity = budget
+    for index in range(len(facts) - 1, -1, -1):
+        if taken[index][capacity]:
+            selected[index] = True
+            capacity -= facts[index].cost
+    return selected
+
+
+def _render(facts: List[ContextFact]) -> List[str]:
+    """Group facts back into sections and "Label: value; value" lines, keeping prompt order."""
+    sections: Dict[str, Dict[str, List[ContextFact]]] = {}
+    for fact in facts:
+        sections.setdefault(fact.section, {}).setdefault(fact.label, []).append(fact)
+    return [
+        "\n".join([section] + [
+            f"{label}: {label_facts[0].separator.join(fact.value for fact in label_facts)}"
+            for label, label_facts in lines.items()
+        ])
+        for section, lines in sections.items()
+    ]
+
+
+def pack_context(
+    intake_context: Dict[str, Any],
+    historical_context: Dict[str, Any],
+    budget: Optional[int] = None,
+    strategy: Optional[str] = None
+) -> PackedContext:
+    """
+    Select the intake and historical facts that fit the token budget.
+
+    Args:
+        budget: Token budget for the context sections (default PROGRESS_NOTE_CONTEXT_TOKEN_BUDGET)
+        strategy: "greedy" (priority order) or "optimal" (knapsack; default PROGRESS_NOTE_CONTEXT_PACKING)
+
+    Returns:
+        PackedContext with the rendered sections, the included and the dropped facts
+    """
+    budget = azure_config.progress_note_context_token_budget if budget is None else budget
+    strategy = strategy or azure_config.progress_note_context_packing
+    facts = collect_context_facts(intake_context, historical_context)
+
+    # Reserve every section header and label up front so the rendered context never exceeds the budget
+    overhead = {}
+    for fact in facts:
+        overhead.setdefault(fact.section, estimate_tokens(fact.section))
+        overhead.setdefault((fact.section, fact.label), estimate_tokens(fact.label + ": "))
+    available = max(budget - sum(overhead.values()), 0)
+
+    if strategy == ContextPackingStrategy.OPTIMAL.value:
+        selected = _select_optimal(facts, available)
+    elif strategy == ContextPackingStrategy.GREEDY.value:
+        selected = _select_greedy(facts, available)
+    else:
+        raise ValueError(f"Unsupported context packing strategy: {strategy}")
+
+    included = [fact for fact, keep in zip(facts, selected) if keep]
+    dropped = [fact for fact, keep in zip(facts, selected) if not keep]
+    used_overhead = {fact.section for fact in included} | {(fact.section, fact.label) for fact in included}
+    used_tokens = sum(fact.cost for fact in included) + sum(overhead[key] for key in used_overhead)
+    return PackedContext(_render(included), included, dropped, used_tokens, budget, strategy)
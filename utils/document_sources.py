@@ -0,0 +1,164 @@
+"""
+Document Sources
+Streams progress notes (PDF and HTML) out of directory trees and zip/tar archives,
+nested archives included, without extracting anything to disk. Each document is
+read only when the consumer asks for it, so an archive of thousands of notes
+never has more than the ingestion window in memory.
+"""
+import io
+import os
+import tarfile
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Union
+
+from agents.models.pydantic_models import EMInput
+from utils.html_processor import extract_html_metadata, html_file_to_eminput, html_to_text
+from utils.pdf_processor import PDFProcessor
+from settings import logger
+
+
+PDF = "pdf"
+HTML = "html"
+DOCUMENT_KINDS = {".pdf": PDF, ".html": HTML, ".htm": HTML}
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# Archive members above this size are skipped (guards against decompression bombs)
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+# Separates an archive path from the member path in document names
+MEMBER_SEPARATOR = "!/"
+# Archives nested deeper than this are skipped (guards against self-containing zips)
+MAX_ARCHIVE_DEPTH = 8
+
+# Errors of a corrupt or truncated archive
+_ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError)
+
+
+class SourceDocument(NamedTuple):
+    """
+    A note to ingest. data holds the content of archive members; files on disk
+    keep data=None and are read by whoever parses them (e.g. a worker process).
+    """
+    name: str
+    kind: str
+    data: Optional[bytes] = None
+
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        with open(self.name, "rb") as source_file:
+            return source_file.read()
+
+
+def document_kind(name: str) -> Optional[str]:
+    """PDF, HTML or None (not a note) from the file extension."""
+    return DOCUMENT_KINDS.get(Path(name).suffix.lower())
+
+
+def _is_hidden(name: str) -> bool:
+    # Also skips the "__MACOSX/._note.pdf" resource forks of zips made on macOS
+    return any(part.startswith((".", "__MACOSX")) for part in Path(name).parts)
+
+
+def _archive_kind(name: str) -> Optional[str]:
+    lower_name = name.lower()
+    if lower_name.endswith(ZIP_SUFFIXES):
+        return "zip"
+    if lower_name.endswith(TAR_SUFFIXES):
+        return "tar"
+    return None
+
+
+def _iter_member(name: str, data: bytes, depth: int) -> Iterator[SourceDocument]:
+    """A document read from an archive: a note, or a nested archive to descend into."""
+    archive_kind = _archive_kind(name)
+    if archive_kind:
+        if depth >= MAX_ARCHIVE_DEPTH:
+            logger.warning("📦 Skipping archive nested too deeply", member=name, depth=depth)
+            return
+        # A corrupt nested archive is skipped alone; the rest of its parent is still read
+        try:
+            yield from _iter_archive(name, io.BytesIO(data), archive_kind, depth + 1)
+        except _ARCHIVE_ERRORS as e:
+            logger.warning("📦 Skipping unreadable nested archive", member=name, error=str(e))
+    elif kind := document_kind(name):
+        yield SourceDocument(name, kind, data)
+
+
+def _wanted(name: str, size: int) -> bool:
+    if _is_hidden(name) or not (document_kind(name) or _archive_kind(name)):
+        return False
+    if size > MAX_MEMBER_BYTES:
+        logger.warning("📦 Skipping oversized archive member", member=name, size_bytes=size)
+        return False
+    return True
+
+
+def _iter_archive(archive_name: str, fileobj: Any, archive_kind: str, depth: int = 1) -> Iterator[SourceDocument]:
+    if archive_kind == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _wanted(info.filename, info.file_size):
+                    continue
+                with archive.open(info) as member:
+                    data = member.read()
+                yield from _iter_member(f"{archive_name}{MEMBER_SEPARATOR}{info.filename}", data, depth)
+    else:
+        # Stream mode: members are read in order, without seeking back through the archive
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for info in archive:
+                if not info.isfile() or not _wanted(info.name, info.size):
+                    continue
+                member = archive.extractfile(info)
+                data = member.read() if member else b""
+                yield from _iter_member(f"{archive_name}{MEMBER_SEPARATOR}{info.name}", data, depth)
+
+
+def _iter_file(path: str) -> Iterator[SourceDocument]:
+    archive_kind = _archive_kind(path)
+    if archive_kind:
+        try:
+            with open(path, "rb") as archive_file:
+                yield from _iter_archive(path, archive_file, archive_kind)
+        except _ARCHIVE_ERRORS as e:
+            logger.warning("📦 Skipping unreadable archive", path=path, error=str(e))
+    elif kind := document_kind(path):
+        yield SourceDocument(path, kind)
+
+
+def iter_source_documents(source: Union[str, Path]) -> Iterator[SourceDocument]:
+    """
+    Notes in a directory tree (sorted, recursive), an archive or a single file.
+
+    Files on disk are yielded by path (data=None, read when parsed); archive
+    members carry their content.
+    """
+    source = str(source)
+    if not os.path.isdir(source):
+        yield from _iter_file(source)
+        return
+    for directory, directory_names, file_names in os.walk(source):
+        directory_names[:] = sorted(name for name in directory_names if not _is_hidden(name))
+        for file_name in sorted(file_names):
+            if not _is_hidden(file_name):
+                yield from _iter_file(os.path.join(directory, file_name))
+
+
+def _html_content(document: SourceDocument) -> str:
+    return document.read().decode("utf-8", errors="replace")
+
+
+def source_document_to_eminput(document: SourceDocument, pdf_processor: Optional[PDFProcessor] = None) -> Optional[EMInput]:
+    """Parse a note with the PDF or HTML parser (None when it has no text); errors propagate."""
+    if document.kind == PDF:
+        return (pdf_processor or PDFProcessor()).build_em_input(document.name, document.data)
+    return html_file_to_eminput(_html_content(document), document.name)
+
+
+def source_document_metadata(document: SourceDocument, pdf_processor: Optional[PDFProcessor] = None) -> Dict[str, str]:
+    """Metadata only; PDFs are read from their first and last pages."""
+    if document.kind == PDF:
+        return (pdf_processor or PDFProcessor()).extract_metadata(document.name, data=document.data)
+    return extract_html_metadata(html_to_text(_html_content(document)), document.name)
@@ -0,0 +1,135 @@
+"""
+Excel report generation for audit results.
+
+Rows are streamed into an openpyxl write-only workbook one result at a time,
+so memory stays flat regardless of batch size (no DataFrame, no in-memory sheet).
+"""
+from typing import Any, BinaryIO, Dict, Iterable, List
+
+EXCEL_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+EXCEL_CODES = ["99212", "99213", "99214", "99215"]
+
+EXCEL_COLUMNS = [
+    "Document ID",
+    "Patient Name",
+    "Patient ID",
+    "Date of Service",
+    "Provider",
+    "Assigned Code",
+    "E&M Code Justification",
+    "E&M Code Evaluation",
+] + [column for code in EXCEL_CODES for column in (f"E&M Code {code}", f"E&M Code {code} evaluation")]
+
+
+# Fields of a pipeline result that build_excel_row reads (note text is never needed)
+EXCEL_RESULT_FIELDS = ("document_id", "patient_name", "patient_id", "date_of_service", "provider", "error")
+EXCEL_ENHANCEMENT_FIELDS = (
+    "document_id", "patient_name", "patient_id", "date_of_service", "provider",
+    "assigned_code", "justification", "code_recommendations",
+)
+EXCEL_AUDITOR_FIELDS = ("final_justification", "audit_flags", "code_evaluations")
+
+
+def compact_excel_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The part of a pipeline result the Excel report uses, so the orchestrator can pass
+    results to the export activity without copying every note text into its history.
+    """
+    compact = {key: result[key] for key in EXCEL_RESULT_FIELDS if key in result}
+    for agent_key, fields in (("enhancement_agent", EXCEL_ENHANCEMENT_FIELDS), ("auditor_agent", EXCEL_AUDITOR_FIELDS)):
+        agent_data = result.get(agent_key)
+        if agent_data:
+            compact[agent_key] = {key: agent_data[key] for key in fields if key in agent_data}
+    return compact
+
+
+def format_evaluation(auditor_data: Dict[str, Any]) -> str:
+    """Format the auditor justification and flags (matching json_to_excel_converter.py)."""
+    final_justification_obj = auditor_data.get('final_justification', {})
+    audit_flags = auditor_data.get('audit_flags', [])
+    evaluation_parts = []
+
+    # Handle structured final_justification
+    if isinstance(final_justification_obj, dict):
+        if final_justification_obj.get('supportedBy'):
+            evaluation_parts.append(f"Code Selection: {final_justification_obj['supportedBy']}")
+
+        if final_justification_obj.get('documentationSummary'):
+            doc_summary = '\n'.join([f"  • {item}" for item in final_justification_obj['documentationSummary']])
+            evaluation_parts.append(f"Documentation Summary:\n{doc_summary}")
+
+        if final_justification_obj.get('mdmConsiderations'):
+            mdm_considerations = '\n'.join([f"  • {item}" for item in final_justification_obj['mdmConsiderations']])
+            evaluation_parts.append(f"MDM Considerations:\n{mdm_considerations}")
+
+        if final_justification_obj.get('complianceAlerts'):
+            compliance_alerts = '\n'.join([f"  ⚠ {item}" for item in final_justification_obj['complianceAlerts']])
+            evaluation_parts.append(f"Compliance Alerts:\n{compliance_alerts}")
+    elif isinstance(final_justification_obj, str) and final_justification_obj:
+        # Handle legacy string format for backward compatibility
+        evaluation_parts.append(f"Justification: {final_justification_obj}")
+
+    if audit_flags:
+        flags_text = '\n'.join([f"  • {flag}" for flag in audit_flags])
+        evaluation_parts.append(f"Audit Flags:\n{flags_text}")
+
+    return '\n\n'.join(evaluation_parts)
+
+
+def build_excel_row(result: Dict[str, Any]) -> List[Any]:
+    """Build one worksheet row (ordered as EXCEL_COLUMNS) from a pipeline result."""
+    enhancement_data = result.get('enhancement_agent') or {}
+    auditor_data = result.get('auditor_agent') or {}
+
+    row = [
+        result.get('document_id') or enhancement_data.get('document_id'),
+        result.get('patient_name') or enhancement_data.get('patient_name') or 'Unknown Patient',
+        result.get('patient_id') or enhancement_data.get('patient_id') or '0000',
+        result.get('date_of_service') or enhancement_data.get('date_of_service') or 'N/A',
+        result.get('provider') or enhancement_data.get('provider') or 'N/A',
+        enhancement_data.get('assigned_code', ''),
+        enhancement_data.get('justification', ''),
+        format_evaluation(auditor_data),
+    ]
+
+    # Enhancement agent code recommendations and auditor evaluations
+    for code in EXCEL_CODES:
+        row.append((enhancement_data.get('code_recommendations') or {}).get(f'code_{code}', ''))
+        row.append((auditor_data.get('code_evaluations') or {}).get(f'code_{code}_evaluation', ''))
+
+    return [_cell_value(value) for value in row]
+
+
+def _cell_value(value: Any) -> Any:
+    # Write-only cells accept scalars only; nested agent output is rendered as text
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def write_excel_report(results: Iterable[Dict[str, Any]], output: BinaryIO) -> int:
+    """
+    Stream results into a write-only workbook saved to output.
+
+    Failed results (with an "error" key) are skipped.
+
+    Returns:
+        Number of data rows written
+    """
+    # Imported here: the orchestrator imports this module for compact_excel_result
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    worksheet.append(EXCEL_COLUMNS)
+
+    row_count = 0
+    for result in results:
+        if "error" in result:
+            continue
+        worksheet.append(build_excel_row(result))
+        row_count += 1
+
+    workbook.save(output)
+    return row_count
@@ -1,23 +1,64 @@
 """
 Guidelines Cache Module
-Provides in-memory caching for E/M coding guidelines to improve performance
+Provides in-memory caching for E/M coding guidelines to improve performance.
+
+The cache doubles as a versioned guidelines registry: each loaded version is
+identified by the SHA-256 of its sources, source files (or an optional blob
+container) are checked for changes at most every GUIDELINES_RELOAD_INTERVAL_SECONDS,
+and a changed version is swapped in atomically. Subscribers are notified on
+every swap so dependent caches (agents, indexes) can rebuild lazily.
 """
 import os
 import asyncio
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 import threading
 
+from constants import azure_config
 from settings import logger
+from utils.guidelines_compiler import (
+    ARTIFACT_FILENAME,
+    GUIDELINES_DIR,
+    GUIDELINES_SOURCES,
+    combine_guidelines,
+    compute_source_hash,
+    load_artifact,
+    load_markdown_source,
+    load_pdf_source,
+)
+from utils.guidelines_index import (
+    TOPIC_MDM_COMPLEXITY,
+    GuidelinesIndex,
+    discard_guidelines_indexes,
+    get_guidelines_index,
+    register_guidelines_index,
+)
+
+
+class GuidelinesSnapshot(NamedTuple):
+    """One immutable, fully loaded guidelines version"""
+    version: str
+    guidelines: str
+    index: Optional[GuidelinesIndex]
+    source: str
+    loaded_at: str
+
+    def get_index(self) -> GuidelinesIndex:
+        """Section index of this version (precompiled, or built and cached on first use)"""
+        return self.index or get_guidelines_index(self.guidelines, self.version)
+
+
+GuidelinesListener = Callable[[GuidelinesSnapshot, Optional[GuidelinesSnapshot]], None]
 
 
 class GuidelinesCache:
     """Thread-safe singleton cache for E/M coding guidelines"""
-    
+
     _instance = None
     _lock = threading.Lock()
-    
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -25,21 +66,26 @@ class GuidelinesCache:
                     cls._instance = super().__new__(cls)
                     cls._instance._initialized = False
         return cls._instance
-    
+
     def __init__(self):
         if not getattr(self, '_initialized', False):
-            self._em_guidelines_cache = None
-            self._pdf_guidelines_cache = None
-            self._guidelines_dir = Path(__file__).parent.parent / "guidelines"
+            self._snapshot: Optional[GuidelinesSnapshot] = None
+            self._guidelines_dir = GUIDELINES_DIR
             self._cache_lock = threading.RLock()
+            self._listeners: List[GuidelinesListener] = []
+            self._source_fingerprint: Optional[Tuple] = None
+            self._blob_etags: Dict[str, str] = {}
+            self._last_check = 0.0
+            self._reload_interval = azure_config.guidelines_reload_interval_seconds
+            self._reload_count = 0
             self._initialized = True
             self._cache_warming = False
-    
+
     async def warm_cache_async(self):
         """Asynchronously warm the cache in background"""
-        if self._cache_warming or self._em_guidelines_cache is not None:
+        if self._cache_warming or self._snapshot is not None:
             return
-            
+
         self._cache_warming = True
         try:
             logger.debug("Starting asynchronous guidelines cache warming...")
@@ -51,136 +97,203 @@ class GuidelinesCache:
             logger.error(f"Error during asynchronous cache warming: {str(e)}")
         finally:
             self._cache_warming = False
-    
-    def _load_markdown_guidelines(self) -> str:
-        """Load markdown guidelines from file"""
-        md_file = self._guidelines_dir / "em_guideline.md"
-        if md_file.exists():
-            with open(md_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        return ""
-    
-    def _load_pdf_guidelines(self) -> str:
-        """Load PDF guidelines from file"""
+
+    def _fingerprint_sources(self) -> Tuple:
+        """Cheap change detector: (name, mtime, size) of every source file"""
+        fingerprint = []
+        for name in GUIDELINES_SOURCES:
+            path = self._guidelines_dir / name
+            try:
+                stat = path.stat()
+                fingerprint.append((name, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((name, None, None))
+        return tuple(fingerprint)
+
+    def _sync_from_blob(self) -> None:
+        """Download changed guidelines sources from the configured blob container"""
+        container_name = azure_config.guidelines_blob_container
+        if not container_name:
+            return
+        from azure.storage.blob import BlobServiceClient
+
+        container_client = BlobServiceClient.from_connection_string(
+            azure_config.storage_connection_string
+        ).get_container_client(container_name)
+        local_dir = Path(azure_config.guidelines_blob_local_dir)
+        local_dir.mkdir(parents=True, exist_ok=True)
+
+        for name in (*GUIDELINES_SOURCES, ARTIFACT_FILENAME):
+            blob_client = container_client.get_blob_client(name)
+            if not blob_client.exists():
+                continue
+            etag = blob_client.get_blob_properties().etag
+            if self._blob_etags.get(name) == etag:
+                continue
+            temp_path = local_dir / f"{name}.download"
+            with open(temp_path, "wb") as f:
+                blob_client.download_blob().readinto(f)
+            os.replace(temp_path, local_dir / name)
+            self._blob_etags[name] = etag
+            logger.debug("Downloaded guidelines file from blob storage", name=name, etag=etag)
+
+        # Only read from the download directory once it holds every source; until then the
+        # bundled guidelines stay in use (an empty or partial container must not blank them)
+        missing = [name for name in GUIDELINES_SOURCES if not (local_dir / name).exists()]
+        if missing:
+            logger.warning("Guidelines blob container is missing sources, keeping the current guidelines",
+                          container=container_name,
+                          missing=missing,
+                          guidelines_dir=str(self._guidelines_dir))
+            return
+        self._guidelines_dir = local_dir
+
+    def _try_sync_from_blob(self) -> None:
         try:
-            from utils.pdf_processor import PDFProcessor
-            pdf_file = self._guidelines_dir / "ama_em_guideline.pdf"
-            if pdf_file.exists():
-                processor = PDFProcessor()
-                return processor.extract_text(str(pdf_file))
-        except ImportError:
-            logger.warning("PDFProcessor not available. Skipping PDF guidelines.")
+            self._sync_from_blob()
         except Exception as e:
-            logger.error(f"Error loading PDF guidelines: {str(e)}")
-        return ""
-    
+            logger.error(f"Error syncing guidelines from blob storage: {str(e)}")
+
+    def _load_snapshot(self) -> GuidelinesSnapshot:
+        """Load the current sources: compiled artifact if it matches, otherwise parse the sources"""
+        artifact = load_artifact(self._guidelines_dir)
+        if artifact is not None:
+            index = GuidelinesIndex.from_dict(artifact["index"])
+            register_guidelines_index(index)
+            return GuidelinesSnapshot(
+                version=artifact["source_hash"],
+                guidelines=artifact["guidelines"],
+                index=index,
+                source="artifact",
+                loaded_at=datetime.now().isoformat()
+            )
+
+        logger.debug("Compiled guidelines artifact unavailable, falling back to source parsing")
+        return GuidelinesSnapshot(
+            version=compute_source_hash(self._guidelines_dir),
+            guidelines=combine_guidelines(
+                load_markdown_source(self._guidelines_dir),
+                load_pdf_source(self._guidelines_dir)
+            ),
+            index=None,
+            source="sources",
+            loaded_at=datetime.now().isoformat()
+        )
+
+    def _swap(self, snapshot: GuidelinesSnapshot) -> None:
+        """Atomically publish a new version and notify listeners"""
+        with self._cache_lock:
+            previous = self._snapshot
+            if previous is not None and previous.version == snapshot.version:
+                return
+            self._snapshot = snapshot
+            self._reload_count += previous is not None
+            listeners = list(self._listeners)
+
+        logger.debug(f"E/M guidelines cached successfully ({len(snapshot.guidelines)} characters)",
+                    version=snapshot.version[:12],
+                    previous_version=previous.version[:12] if previous else None,
+                    source=snapshot.source)
+
+        if previous is not None:
+            discard_guidelines_indexes(keep_version=snapshot.version)
+        for listener in listeners:
+            try:
+                listener(snapshot, previous)
+            except Exception as e:
+                logger.error(f"Guidelines change listener failed: {str(e)}", exc_info=True)
+
+    def check_for_updates(self, force: bool = False) -> bool:
+        """
+        Reload the guidelines if their sources changed.
+
+        Checks are throttled to GUIDELINES_RELOAD_INTERVAL_SECONDS unless force is set
+        (an interval of 0 disables automatic checks).
+
+        Returns:
+            True when a new version was swapped in
+        """
+        now = time.monotonic()
+        if not force and (self._reload_interval <= 0 or now - self._last_check < self._reload_interval):
+            return False
+        self._last_check = now
+
+        self._try_sync_from_blob()
+
+        fingerprint = self._fingerprint_sources()
+        if not force and fingerprint == self._source_fingerprint:
+            return False
+        self._source_fingerprint = fingerprint
+
+        current = self._snapshot
+        if current is not None and compute_source_hash(self._guidelines_dir) == current.version:
+            return False
+
+        # Build the new version outside the lock; readers keep using the old one meanwhile
+        self._swap(self._load_snapshot())
+        return current is not None and self._snapshot.version != current.version
+
+    def get_snapshot(self) -> GuidelinesSnapshot:
+        """Get the current guidelines version, loading it on first use"""
+        if self._snapshot is None:
+            with self._cache_lock:
+                if self._snapshot is None:
+                    logger.debug("Loading E/M guidelines into cache...")
+                    self._try_sync_from_blob()
+                    self._source_fingerprint = self._fingerprint_sources()
+                    self._last_check = time.monotonic()
+                    self._swap(self._load_snapshot())
+        else:
+            self.check_for_updates()
+        return self._snapshot
+
     def get_em_guidelines(self) -> str:
         """Get cached E/M coding guidelines"""
-        with self._cache_lock:
-            if self._em_guidelines_cache is None:
-                logger.debug("Loading E/M guidelines into cache...")
-                md_content = self._load_markdown_guidelines()
-                pdf_content = self._load_pdf_guidelines()
-                
-                guidelines_content = md_content
-                if pdf_content.strip():
-                    guidelines_content += "\n\n=== AMA E/M GUIDELINES PDF CONTENT ===\n\n" + pdf_content
-                
-                if not guidelines_content.strip():
-                    guidelines_content = "Guidelines not found. Please ensure guidelines files are available in the guidelines/ directory."
-                
-                self._em_guidelines_cache = guidelines_content
-                logger.debug(f"E/M guidelines cached successfully ({len(guidelines_content)} characters)")
-            
-            return self._em_guidelines_cache
-    
+        return self.get_snapshot().guidelines
+
+    def get_version(self) -> str:
+        """Get the version (source hash) of the current guidelines"""
+        return self.get_snapshot().version
+
+    def get_guidelines_index(self) -> GuidelinesIndex:
+        """Get the section index for the cached guidelines version"""
+        return self.get_snapshot().get_index()
+
     def get_specific_code_requirements(self, code: str) -> str:
-        """Get cached specific requirements for a particular E/M code"""
-        guidelines = self.get_em_guidelines()
-        
-        # Use LRU cache for parsed code requirements
-        return self._extract_code_requirements(guidelines, code)
-    
-    @lru_cache(maxsize=10)
-    def _extract_code_requirements(self, guidelines: str, code: str) -> str:
-        """Extract and cache specific code requirements"""
-        code_sections = {
-            "99212": "CPT Code 99212",
-            "99213": "CPT Code 99213", 
-            "99214": "CPT Code 99214",
-            "99215": "CPT Code 99215"
-        }
-        
-        if code not in code_sections:
-            return f"Invalid code '{code}'. Valid codes are: 99212, 99213, 99214, 99215"
-        
-        # Find the specific section in guidelines
-        lines = guidelines.split('\n')
-        code_content = []
-        in_code_section = False
-        
-        for line in lines:
-            if code_sections[code] in line:
-                in_code_section = True
-            elif in_code_section and any(other_code in line for other_code in code_sections.values() if other_code != code_sections[code]):
-                break
-            
-            if in_code_section:
-                code_content.append(line)
-        
-        if code_content:
-            return '\n'.join(code_content)
-        else:
-            return f"Specific requirements for {code} not found in guidelines."
-    
+        """Get specific requirements for a particular E/M code (O(1) index lookup)"""
+        return self.get_guidelines_index().code_requirements(code)
+
     def get_mdm_complexity_guide(self) -> str:
-        """Get cached MDM complexity guidelines"""
-        guidelines = self.get_em_guidelines()
-        return self._extract_mdm_content(guidelines)
-    
-    @lru_cache(maxsize=1)
-    def _extract_mdm_content(self, guidelines: str) -> str:
-        """Extract and cache MDM-related content"""
-        mdm_keywords = [
-            "Medical Decision Making",
-            "MDM",
-            "Problems Addressed",
-            "Data Reviewed",
-            "Risk of Complications",
-            "straightforward",
-            "low complexity",
-            "moderate complexity", 
-            "high complexity"
-        ]
-        
-        lines = guidelines.split('\n')
-        mdm_content = []
-        
-        for line in lines:
-            if any(keyword.lower() in line.lower() for keyword in mdm_keywords):
-                mdm_content.append(line)
-        
-        if mdm_content:
-            return '\n'.join(mdm_content)
-        else:
-            return "MDM complexity information not found in guidelines."
-    
+        """Get MDM complexity guidelines (O(1) index lookup)"""
+        return self.get_guidelines_index().topic(TOPIC_MDM_COMPLEXITY)
+
+    def subscribe(self, listener: GuidelinesListener) -> None:
+        """Register a callback invoked as listener(new_snapshot, previous_snapshot) on every version swap"""
+        with self._cache_lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
     def clear_cache(self):
         """Clear all cached content (useful for testing or when guidelines are updated)"""
         with self._cache_lock:
-            self._em_guidelines_cache = None
-            self._pdf_guidelines_cache = None
-            self._extract_code_requirements.cache_clear()
-            self._extract_mdm_content.cache_clear()
+            self._snapshot = None
+            self._source_fingerprint = None
+            self._last_check = 0.0
+            discard_guidelines_indexes()
             logger.debug("Guidelines cache cleared")
-    
+
     def get_cache_stats(self) -> dict:
         """Get cache statistics"""
+        snapshot = self._snapshot
         return {
-            "em_guidelines_cached": self._em_guidelines_cache is not None,
-            "em_guidelines_size": len(self._em_guidelines_cache) if self._em_guidelines_cache else 0,
-            "code_requirements_cache_info": self._extract_code_requirements.cache_info(),
-            "mdm_content_cache_info": self._extract_mdm_content.cache_info()
+            "em_guidelines_cached": snapshot is not None,
+            "em_guidelines_size": len(snapshot.guidelines) if snapshot else 0,
+            "version": snapshot.version if snapshot else None,
+            "source": snapshot.source if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "reload_count": self._reload_count,
+            "listeners": len(self._listeners),
+            "index": snapshot.index.stats() if snapshot and snapshot.index else None
         }
 
 
@@ -191,7 +304,7 @@ _guidelines_cache = GuidelinesCache()
 def get_em_coding_guidelines() -> str:
     """
     Get comprehensive E/M coding guidelines from cache.
-    
+
     Returns:
         Complete E/M coding guidelines and standards text
     """
@@ -201,10 +314,10 @@ def get_em_coding_guidelines() -> str:
 def get_specific_code_requirements(code: str) -> str:
     """
     Get specific requirements and criteria for a particular E/M code from cache.
-    
+
     Args:
-        code: The E/M code to get requirements for (99212, 99213, 99214, or 99215)
-        
+        code: The E/M code to get requirements for (99202-99205 or 99212-99215)
+
     Returns:
         Detailed requirements, criteria, and documentation standards for the specified code
     """
@@ -214,13 +327,53 @@ def get_specific_code_requirements(code: str) -> str:
 def get_mdm_complexity_guide() -> str:
     """
     Get detailed Medical Decision Making (MDM) complexity guidelines from cache.
-    
+
     Returns:
         Comprehensive guide to MDM complexity levels
     """
     return _guidelines_cache.get_mdm_complexity_guide()
 
 
+def get_em_guidelines_index() -> GuidelinesIndex:
+    """
+    Get the structured section index for the current guidelines version.
+
+    Returns:
+        GuidelinesIndex with lookups by CPT code and topic
+    """
+    return _guidelines_cache.get_guidelines_index()
+
+
+def get_guidelines_snapshot() -> GuidelinesSnapshot:
+    """
+    Get the current guidelines version as one consistent snapshot.
+
+    Returns:
+        GuidelinesSnapshot with version, text and index
+    """
+    return _guidelines_cache.get_snapshot()
+
+
+def get_guidelines_version() -> str:
+    """
+    Get the version of the guidelines currently in use.
+
+    Returns:
+        SHA-256 of the guidelines sources; stamped on every audit result
+    """
+    return _guidelines_cache.get_version()
+
+
+def subscribe_guidelines_changes(listener: GuidelinesListener) -> None:
+    """Invoke listener(new_snapshot, previous_snapshot) whenever a new guidelines version is swapped in"""
+    _guidelines_cache.subscribe(listener)
+
+
+def reload_guidelines() -> bool:
+    """Check the guidelines sources now and swap in a new version if they changed"""
+    return _guidelines_cache.check_for_updates(force=True)
+
+
 def clear_guidelines_cache():
     """Clear the guidelines cache"""
     _guidelines_cache.clear_cache()
@@ -0,0 +1,159 @@
+"""
+Guidelines Compiler Module
+Compiles the markdown and PDF guidelines into a pre-sectioned JSON artifact so
+cold starts read one file instead of parsing the PDF with PyMuPDF.
+
+Usage:
+    python -m utils.guidelines_compiler            # (re)build guidelines/em_guidelines.compiled.json
+    python -m utils.guidelines_compiler --check    # exit 1 if the artifact is stale
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from settings import logger
+from utils.guidelines_index import GuidelinesIndex
+
+# Bump when the artifact layout changes so older artifacts are ignored
+ARTIFACT_FORMAT_VERSION = 2
+
+GUIDELINES_DIR = Path(__file__).parent.parent / "guidelines"
+MARKDOWN_SOURCE = "em_guideline.md"
+PDF_SOURCE = "ama_em_guideline.pdf"
+GUIDELINES_SOURCES = (MARKDOWN_SOURCE, PDF_SOURCE)
+ARTIFACT_FILENAME = "em_guidelines.compiled.json"
+
+PDF_CONTENT_SEPARATOR = "\n\n=== AMA E/M GUIDELINES PDF CONTENT ===\n\n"
+GUIDELINES_NOT_FOUND = "Guidelines not found. Please ensure guidelines files are available in the guidelines/ directory."
+
+
+def compute_source_hash(guidelines_dir: Path = GUIDELINES_DIR) -> str:
+    """SHA-256 over the names and bytes of every guidelines source file."""
+    digest = hashlib.sha256()
+    for name in GUIDELINES_SOURCES:
+        path = guidelines_dir / name
+        digest.update(name.encode("utf-8"))
+        if path.exists():
+            digest.update(path.read_bytes())
+        else:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
+
+
+def load_markdown_source(guidelines_dir: Path = GUIDELINES_DIR) -> str:
+    """Load markdown guidelines from file"""
+    md_file = guidelines_dir / MARKDOWN_SOURCE
+    if md_file.exists():
+        with open(md_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    return ""
+
+
+def load_pdf_source(guidelines_dir: Path = GUIDELINES_DIR) -> str:
+    """Load PDF guidelines from file (PyMuPDF)"""
+    try:
+        from utils.pdf_processor import PDFProcessor
+        pdf_file = guidelines_dir / PDF_SOURCE
+        if pdf_file.exists():
+            return PDFProcessor().extract_text(str(pdf_file))
+    except ImportError:
+        logger.warning("PDFProcessor not available. Skipping PDF guidelines.")
+    except Exception as e:
+        logger.error(f"Error loading PDF guidelines: {str(e)}")
+    return ""
+
+
+def combine_guidelines(md_content: str, pdf_content: str) -> str:
+    """Combine markdown and PDF text the way the agents expect it"""
+    guidelines_content = md_content
+    if pdf_content.strip():
+        guidelines_content += PDF_CONTENT_SEPARATOR + pdf_content
+    if not guidelines_content.strip():
+        guidelines_content = GUIDELINES_NOT_FOUND
+    return guidelines_content
+
+
+def compile_guidelines(guidelines_dir: Path = GUIDELINES_DIR) -> Dict:
+    """Parse the guidelines sources once and return the compiled artifact"""
+    guidelines = combine_guidelines(load_markdown_source(guidelines_dir), load_pdf_source(guidelines_dir))
+    source_hash = compute_source_hash(guidelines_dir)
+    return {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "source_hash": source_hash,
+        "compiled_at": datetime.now(timezone.utc).isoformat(),
+        "sources": {
+            name: {
+                "size_bytes": (guidelines_dir / name).stat().st_size,
+                "sha256": hashlib.sha256((guidelines_dir / name).read_bytes()).hexdigest()
+            }
+            for name in GUIDELINES_SOURCES if (guidelines_dir / name).exists()
+        },
+        "guidelines": guidelines,
+        "index": GuidelinesIndex.from_text(guidelines, source_hash).to_dict()
+    }
+
+
+def write_artifact(artifact: Dict, artifact_path: Path) -> None:
+    """Write the artifact atomically (temp file + rename)"""
+    temp_path = artifact_path.with_suffix(artifact_path.suffix + ".tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    os.replace(temp_path, artifact_path)
+
+
+def load_artifact(guidelines_dir: Path = GUIDELINES_DIR, artifact_path: Optional[Path] = None) -> Optional[Dict]:
+    """
+    Load the compiled artifact if it exists and matches the current sources.
+
+    Returns:
+        The artifact dict, or None when it is missing, unreadable or stale
+    """
+    artifact_path = artifact_path or guidelines_dir / ARTIFACT_FILENAME
+    if not artifact_path.exists():
+        return None
+    try:
+        with open(artifact_path, 'r', encoding='utf-8') as f:
+            artifact = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read compiled guidelines artifact: {str(e)}")
+        return None
+
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        logger.warning("Compiled guidelines artifact has an unsupported format version; ignoring it",
+                      format_version=artifact.get("format_version"))
+        return None
+    if artifact.get("source_hash") != compute_source_hash(guidelines_dir):
+        logger.warning("Compiled guidelines artifact is stale; run `make guidelines` to rebuild it")
+        return None
+    return artifact
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compile E/M guidelines into a pre-sectioned JSON artifact.")
+    parser.add_argument("--guidelines-dir", type=Path, default=GUIDELINES_DIR)
+    parser.add_argument("--output", type=Path, default=None, help=f"Artifact path (default: <guidelines-dir>/{ARTIFACT_FILENAME})")
+    parser.add_argument("--check", action="store_true", help="Only verify that the artifact is up to date")
+    args = parser.parse_args(argv)
+
+    output = args.output or args.guidelines_dir / ARTIFACT_FILENAME
+    if args.check:
+        if load_artifact(args.guidelines_dir, output) is None:
+            print(f"{output} is missing or stale")
+            return 1
+        print(f"{output} is up to date")
+        return 0
+
+    artifact = compile_guidelines(args.guidelines_dir)
+    write_artifact(artifact, output)
+    print(f"Wrote {output} ({len(artifact['guidelines'])} characters, source hash {artifact['source_hash'][:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
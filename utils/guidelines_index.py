@@ -0,0 +1,276 @@
+"""
+Guidelines Index Module
+Parses the combined E/M guidelines text once into a section tree with O(1)
+lookup by CPT code (99202-99205, 99212-99215) or by topic, keyed by the
+guidelines version (source hash).
+"""
+import re
+import threading
+from typing import Dict, List, Optional
+
+from settings import logger
+
+ESTABLISHED_PATIENT_CODES = ["99212", "99213", "99214", "99215"]
+NEW_PATIENT_CODES = ["99202", "99203", "99204", "99205"]
+SUPPORTED_CODES = NEW_PATIENT_CODES + ESTABLISHED_PATIENT_CODES
+
+# New patient codes share the MDM level of the established code in the same AMA table row
+NEW_TO_ESTABLISHED_CODE = dict(zip(NEW_PATIENT_CODES, ESTABLISHED_PATIENT_CODES))
+
+MDM_KEYWORDS = [
+    "Medical Decision Making",
+    "MDM",
+    "Problems Addressed",
+    "Data Reviewed",
+    "Risk of Complications",
+    "straightforward",
+    "low complexity",
+    "moderate complexity",
+    "high complexity"
+]
+
+TOPIC_MDM_COMPLEXITY = "mdm_complexity"
+TOPIC_MDM_TABLE = "mdm_table"
+
+_CODE_BULLET_RE = re.compile(r"^(?P<indent>\s*)\*\s+CPT Code (?P<code>\d{5})\b")
+_BULLET_RE = re.compile(r"^(?P<indent>\s*)\*\s+")
+_HEADING_RE = re.compile(r"^(?:#+\s*(?P<md>.+?)\s*|(?P<colon>[A-Z][^*:]{3,120}):\s*)$")
+# Banner inserted between the markdown and the PDF text; PDF table lines are not headings
+_BANNER_RE = re.compile(r"^=== (?P<banner>.+?) ===$")
+_TABLE_CODE_RE = re.compile(r"^(?P<code>992\d\d)\s*$")
+_MDM_LEVELS = {"Straightforward", "Low", "Moderate", "High"}
+_DATA_LEVELS = {"Minimal or none", "Limited", "Moderate", "Extensive"}
+_TABLE_END_MARKERS = ("Revisions effective",)
+
+
+def normalize_topic(title: str) -> str:
+    """Normalize a heading or topic name into a lookup key."""
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+def _indent_width(line: str) -> int:
+    return len(line) - len(line.lstrip(" \t"))
+
+
+class GuidelinesIndex:
+    """Section tree over one version of the guidelines text."""
+
+    def __init__(self, version: str, sections: List[Dict], code_sections: Dict[str, str],
+                 mdm_table: Dict[str, Dict], topics: Dict[str, str]):
+        self.version = version
+        self.sections = sections
+        self.code_sections = code_sections
+        self.mdm_table = mdm_table
+        self.topics = topics
+
+    @classmethod
+    def from_text(cls, guidelines: str, version: str) -> "GuidelinesIndex":
+        """Parse guidelines text in a single pass over its lines."""
+        lines = guidelines.split('\n')
+        sections = cls._parse_sections(lines)
+        code_sections = cls._parse_code_bullets(lines)
+        mdm_table = cls._parse_mdm_table(lines)
+
+        topics = {normalize_topic(section["title"]): section["content"] for section in sections}
+        keywords = [keyword.lower() for keyword in MDM_KEYWORDS]
+        mdm_lines = [line for line in lines if any(keyword in line.lower() for keyword in keywords)]
+        topics[TOPIC_MDM_COMPLEXITY] = '\n'.join(mdm_lines) if mdm_lines else \
+            "MDM complexity information not found in guidelines."
+        if mdm_table:
+            topics[TOPIC_MDM_TABLE] = '\n\n'.join(_format_table_row(row) for row in mdm_table.values())
+
+        index = cls(version, sections, code_sections, mdm_table, topics)
+        logger.debug("Guidelines index built",
+                    version=version[:12],
+                    sections=len(sections),
+                    code_sections=len(code_sections),
+                    mdm_table_rows=len(mdm_table))
+        return index
+
+    @staticmethod
+    def _parse_sections(lines: List[str]) -> List[Dict]:
+        """Split the text into top-level sections at markdown heading lines and content banners."""
+        current: Dict = {"title": "Introduction", "lines": []}
+        sections: List[Dict] = [current]
+        in_markdown = True
+        for line in lines:
+            stripped = line.strip()
+            banner = _BANNER_RE.match(stripped)
+            heading = _HEADING_RE.match(stripped) if in_markdown and not _BULLET_RE.match(line) else None
+            if banner or heading:
+                title = banner.group("banner") if banner else heading.group("md") or heading.group("colon")
+                current = {"title": title, "lines": []}
+                sections.append(current)
+                in_markdown = in_markdown and not banner
+            else:
+                current["lines"].append(line)
+        return [
+            {"title": section["title"], "content": '\n'.join(section["lines"]).strip()}
+            for section in sections if any(line.strip() for line in section["lines"])
+        ]
+
+    @staticmethod
+    def _parse_code_bullets(lines: List[str]) -> Dict[str, str]:
+        """Collect each '* CPT Code 9921x' bullet with its nested sub-bullets."""
+        code_sections: Dict[str, str] = {}
+        current_code, current_indent, current_lines = None, 0, []
+        for line in lines:
+            code_match = _CODE_BULLET_RE.match(line)
+            if current_code and (code_match or (line.strip() and _indent_width(line) <= current_indent)):
+                code_sections[current_code] = '\n'.join(current_lines).rstrip()
+                current_code = None
+            if code_match:
+                current_code = code_match.group("code")
+                current_indent = len(code_match.group("indent"))
+                current_lines = [line]
+            elif current_code:
+                current_lines.append(line)
+        if current_code:
+            code_sections[current_code] = '\n'.join(current_lines).rstrip()
+        return code_sections
+
+    @staticmethod
+    def _parse_mdm_table(lines: List[str]) -> Dict[str, Dict]:
+        """
+        Parse the AMA MDM table rows ("99203 / 99213 / Low / <problems> / <data> / <risk>").
+
+        Returns rows keyed by established patient code.
+        """
+        starts = []
+        for i in range(len(lines) - 1):
+            new_match = _TABLE_CODE_RE.match(lines[i].strip())
+            est_match = _TABLE_CODE_RE.match(lines[i + 1].strip())
+            if new_match and est_match and new_match.group("code") in NEW_TO_ESTABLISHED_CODE \
+                    and NEW_TO_ESTABLISHED_CODE[new_match.group("code")] == est_match.group("code"):
+                starts.append(i)
+
+        rows: Dict[str, Dict] = {}
+        for position, start in enumerate(starts):
+            end = starts[position + 1] if position + 1 < len(starts) else len(lines)
+            body = []
+            for line in lines[start + 2:end]:
+                if line.strip().startswith(_TABLE_END_MARKERS):
+                    break
+                if line.strip():
+                    body.append(line.strip())
+            if not body or body[0] not in _MDM_LEVELS:
+                continue
+
+            # Layout: MDM level, problems level, problems..., data level, data..., risk...
+            mdm_level, cells = body[0], body[2:]
+            data_start = next((i for i, line in enumerate(cells) if line in _DATA_LEVELS), len(cells))
+            risk_start = next(
+                (i for i, line in enumerate(cells) if i > data_start and "risk of morbidity" in line.lower()),
+                len(cells)
+            )
+            new_code, established_code = lines[start].strip(), lines[start + 1].strip()
+            rows[established_code] = {
+                "codes": [new_code, established_code],
+                "mdm_level": mdm_level,
+                "problems": _join_cell(cells[:data_start]),
+                "data": _join_cell(cells[data_start:risk_start]),
+                "risk": _join_cell(cells[risk_start:]),
+            }
+        return rows
+
+    def code_requirements(self, code: str) -> str:
+        """Requirements for one E/M code: the markdown section plus its AMA MDM table row."""
+        if code not in SUPPORTED_CODES:
+            return f"Invalid code '{code}'. Valid codes are: {', '.join(SUPPORTED_CODES)}"
+
+        established_code = NEW_TO_ESTABLISHED_CODE.get(code, code)
+        parts = []
+        if code in NEW_TO_ESTABLISHED_CODE:
+            parts.append(
+                f"CPT Code {code} (New Patient Office or Other Outpatient Visit): "
+                f"same MDM level as {established_code} per the AMA MDM table."
+            )
+        elif code in self.code_sections:
+            parts.append(self.code_sections[code])
+        if established_code in self.mdm_table:
+            parts.append(_format_table_row(self.mdm_table[established_code]))
+
+        if parts:
+            return '\n\n'.join(parts)
+        return f"Specific requirements for {code} not found in guidelines."
+
+    def topic(self, name: str) -> Optional[str]:
+        """Content of a heading section or derived topic (e.g. mdm_complexity, mdm_table)."""
+        return self.topics.get(normalize_topic(name))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "sections": self.sections,
+            "code_sections": self.code_sections,
+            "mdm_table": self.mdm_table,
+            "topics": self.topics,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GuidelinesIndex":
+        return cls(data["version"], data["sections"], data["code_sections"], data["mdm_table"], data["topics"])
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "sections": len(self.sections),
+            "codes": sorted(set(self.code_sections) | set(self.mdm_table)),
+            "topics": sorted(self.topics),
+        }
+
+
+def _join_cell(lines: List[str]) -> str:
+    """Re-flow PDF table cell lines: one output line per bullet/category, wrapped lines joined."""
+    items: List[str] = []
+    bullet_pending = False
+    for line in lines:
+        if line == "•":
+            bullet_pending = True
+            continue
+        starts_item = bullet_pending or line.startswith(("•", "Category", "Examples", "(")) or line == "or" or not items
+        if starts_item:
+            items.append(("• " if bullet_pending else "") + line)
+        else:
+            items[-1] = f"{items[-1]} {line}"
+        bullet_pending = False
+    return '\n'.join(re.sub(r"\s+", " ", item).strip() for item in items)
+
+
+def _format_table_row(row: Dict) -> str:
+    return (
+        f"AMA MDM table - {' / '.join(row['codes'])} ({row['mdm_level']} MDM, 2 of 3 elements):\n"
+        f"Problems Addressed: {row['problems']}\n"
+        f"Data Reviewed/Analyzed: {row['data']}\n"
+        f"Risk of Complications/Morbidity/Mortality: {row['risk']}"
+    )
+
+
+_index_lock = threading.Lock()
+_indexes: Dict[str, GuidelinesIndex] = {}
+
+
+def get_guidelines_index(guidelines: str, version: str) -> GuidelinesIndex:
+    """Get the index for a guidelines version, building it on first use."""
+    index = _indexes.get(version)
+    if index is None:
+        with _index_lock:
+            index = _indexes.get(version)
+            if index is None:
+                index = GuidelinesIndex.from_text(guidelines, version)
+                _indexes[version] = index
+    return index
+
+
+def register_guidelines_index(index: GuidelinesIndex) -> None:
+    """Register a prebuilt index (e.g. loaded from the compiled artifact)."""
+    with _index_lock:
+        _indexes[index.version] = index
+
+
+def discard_guidelines_indexes(keep_version: Optional[str] = None) -> None:
+    """Drop cached indexes for superseded guidelines versions (all of them when keep_version is None)."""
+    with _index_lock:
+        for version in list(_indexes):
+            if version != keep_version:
+                del _indexes[version]
@@ -0,0 +1,128 @@
+"""
+HTML Benchmark Module
+Times html_to_text against the BeautifulSoup conversion it replaced
+(BeautifulSoup(html, "html.parser").get_text("\\n", strip=True)), uncached and
+from the content-hash cache. The bs4 column is only filled in when beautifulsoup4
+is installed; it is no longer a dependency of the app.
+
+Usage:
+    python -m utils.html_benchmark                              # built-in sample note
+    python -m utils.html_benchmark note.html payload.json --runs 10
+    python -m utils.html_benchmark --scale 50                   # sample note repeated 50 times
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.html_processor import _convert_html, clear_html_text_cache, html_to_text
+
+DEFAULT_RUNS = 5
+
+SAMPLE_NOTE_HTML = """<div class="dictation-content">
+    <div style="text-align: center"><strong>PROGRESS NOTE</strong></div>
+    <table>
+        <tr><td>PATIENT NAME: </td><td>Williams, Sarah #987654321</td></tr>
+        <tr><td>DATE OF BIRTH: </td><td>03/14/1961</td></tr>
+        <tr><td>DATE OF SERVICE: </td><td>January 20, 2025</td></tr>
+        <tr><td>PROVIDER: </td><td>Dr. Smith</td></tr>
+    </table>
+    <p><strong>CHIEF COMPLAINT:</strong></p>
+    <p>Follow-up of type 2 diabetes and hypertension.</p>
+    <p><strong>HISTORY OF PRESENT ILLNESS:</strong></p>
+    <p>Patient reports improved glucose readings since the last visit, fasting values
+    between 110 and 140. Occasional headaches in the morning, no chest pain or dyspnea.
+    Adherent to metformin and lisinopril; reports mild ankle swelling.</p>
+    <p><strong>Vital Signs:</strong> BP 148/92, HR 78, Temp 98.4 F, Wt 192 lb</p>
+    <p><strong>PHYSICAL EXAM:</strong></p>
+    <ul>
+        <li>General: alert, no acute distress</li>
+        <li>Cardiovascular: regular rate and rhythm, no murmurs</li>
+        <li>Extremities: trace bilateral pedal edema</li>
+    </ul>
+    <p><strong>ASSESSMENT AND PLAN:</strong></p>
+    <p>1. Type 2 diabetes - A1c 7.4%, continue metformin 1000 mg twice daily<br/>
+    2. Hypertension - above goal, increase lisinopril to 20 mg daily, recheck BMP in 2 weeks<br/>
+    3. Edema - likely dependent, monitor</p>
+    <p>Total time spent: 32 minutes including review of labs and counseling.</p>
+    <style>.dictation-content strong { font-size: 16px; }</style>
+</div>"""
+
+
+def _bs4_converter() -> Optional[Callable[[str], str]]:
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return None
+    return lambda html_content: BeautifulSoup(html_content, "html.parser").get_text(separator="\n", strip=True)
+
+
+def load_html(path: str) -> str:
+    """HTML of a file: raw HTML, or a JSON payload with document.fileContent.data as sent by MCP."""
+    content = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        return json.loads(content)["document"]["fileContent"]["data"]
+    return content
+
+
+def best_time(convert: Callable[[str], str], html_content: str, runs: int) -> float:
+    """Fastest of several conversions, in seconds."""
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        convert(html_content)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def benchmark(html_content: str, runs: int = DEFAULT_RUNS) -> Dict[str, Optional[float]]:
+    """Best-of-runs seconds for bs4 (None when not installed), the streaming parser and a cache hit."""
+    bs4_convert = _bs4_converter()
+    clear_html_text_cache()
+    html_to_text(html_content)
+    timings = {
+        "bs4": best_time(bs4_convert, html_content, runs) if bs4_convert else None,
+        "streaming": best_time(_convert_html, html_content, runs),
+        "cached": best_time(html_to_text, html_content, runs),
+    }
+    clear_html_text_cache()
+    return timings
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "n/a"
+    if seconds < 0.001:
+        return f"{seconds * 1_000_000:.0f} us"
+    return f"{seconds * 1000:.2f} ms"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time HTML-to-text conversion against BeautifulSoup.")
+    parser.add_argument("files", nargs="*", help="HTML files or JSON payloads (default: a built-in sample note)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Conversions per input; the best is reported")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat each input this many times")
+    args = parser.parse_args(argv)
+
+    try:
+        inputs: List[Tuple[str, str]] = [(path, load_html(path)) for path in args.files] or [("sample note", SAMPLE_NOTE_HTML)]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Could not read input: {e}", file=sys.stderr)
+        return 2
+
+    if _bs4_converter() is None:
+        print("beautifulsoup4 is not installed; the bs4 column is skipped", file=sys.stderr)
+    print(f"{'input':40}  {'size':>9}  {'bs4':>10}  {'streaming':>10}  {'cached':>10}")
+    for name, html_content in inputs:
+        html_content = html_content * args.scale
+        timings = benchmark(html_content, args.runs)
+        size = f"{len(html_content.encode('utf-8')) / 1024:.1f} KB"
+        print(f"{name[-40:]:40}  {size:>9}  " + "  ".join(f"{_format_seconds(timings[column]):>10}"
+                                                       for column in ("bs4", "streaming", "cached")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,143 @@
-from bs4 import BeautifulSoup
+import hashlib
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional
 
-from agents.models.pydantic_models import EMInput 
+from agents.models.pydantic_models import EMInput
+from utils.metadata_extractor import extract_text_metadata, fill_metadata_placeholders
 from settings import logger
 
 
+# Elements that start a new line of text; everything else is inline
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "body", "br", "caption", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "html", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody",
+    "tfoot", "thead", "title", "tr", "ul",
+})
+# Table cells stay on their row's line, separated by a space
+CELL_TAGS = frozenset({"td", "th"})
+# Elements whose content is never text
+SKIPPED_TAGS = frozenset({"script", "style", "template"})
+
+# Converted notes kept per process, keyed by a hash of the HTML (retries reuse the text)
+HTML_TEXT_CACHE_SIZE = 256
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Collects the text of an HTML document from parser events, without building a
+    tree: one line per block element, whitespace collapsed as a browser would.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self._parts: List[str] = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._break_line()
+            self._pre_depth += tag == "pre"
+        elif tag in CELL_TAGS:
+            self._parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._break_line()
+            if tag == "pre":
+                self._pre_depth = max(0, self._pre_depth - 1)
+        elif tag in CELL_TAGS:
+            self._parts.append(" ")
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._pre_depth and "\n" in data:
+            # Preformatted text keeps its own line breaks
+            first, *rest = data.split("\n")
+            self._parts.append(first)
+            for line in rest:
+                self._break_line()
+                self._parts.append(line)
+        else:
+            self._parts.append(data)
+
+    def close(self):
+        super().close()
+        self._break_line()
+
+    def _break_line(self):
+        if self._parts:
+            line = " ".join("".join(self._parts).split())
+            if line:
+                self.lines.append(line)
+            self._parts = []
+
+
+_text_cache: "OrderedDict[str, str]" = OrderedDict()
+_text_cache_lock = threading.Lock()
+_text_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _convert_html(html_content: str) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+    return "\n".join(extractor.lines)
+
+
+def html_to_text(html_content: str) -> str:
+    """
+    Readable text of an HTML note, one block per line (table rows keep their cells
+    on one line). Results are cached by content hash, so the same note converted
+    again (e.g. on an activity retry) is not reparsed.
+    """
+    if not html_content:
+        return ""
+    key = hashlib.sha256(html_content.encode("utf-8", "surrogatepass")).hexdigest()
+    with _text_cache_lock:
+        text = _text_cache.get(key)
+        if text is not None:
+            _text_cache.move_to_end(key)
+            _text_cache_stats["hits"] += 1
+            return text
+        _text_cache_stats["misses"] += 1
+
+    text = _convert_html(html_content)
+    with _text_cache_lock:
+        _text_cache[key] = text
+        while len(_text_cache) > HTML_TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    return text
+
+
+def get_html_text_cache_statistics() -> Dict[str, int]:
+    """Hits, misses and size of this process's HTML text cache."""
+    with _text_cache_lock:
+        return {**_text_cache_stats, "size": len(_text_cache), "max_size": HTML_TEXT_CACHE_SIZE}
+
+
+def clear_html_text_cache() -> None:
+    with _text_cache_lock:
+        _text_cache.clear()
+        _text_cache_stats.update(hits=0, misses=0)
+
+
 def parse_payload_to_eminput(payload: dict) -> EMInput:
     document = payload["document"]
-    
+
     # Extract plain text from the HTML content
     html_content = document.get("fileContent", {}).get("data", "")
-    soup = BeautifulSoup(html_content, "html.parser")
-    readable_text = soup.get_text(separator="\n", strip=True)
+    readable_text = html_to_text(html_content)
     logger.debug(f"Extracted text: {readable_text[:100]}...")  # Log first 100 characters for debugging
 
     # Assemble EMInput object
@@ -23,4 +150,28 @@ def parse_payload_to_eminput(payload: dict) -> EMInput:
         patient_id=document.get("PatientId")
     )
 
-    return em_input
\ No newline at end of file
+    return em_input
+
+
+def extract_html_metadata(text: str, source_name: str) -> Dict[str, str]:
+    """Metadata of a standalone HTML note (no payload fields), found in its text like a PDF's."""
+    metadata = {"document_id": Path(source_name).stem, **extract_text_metadata(text)}
+    return fill_metadata_placeholders(metadata, source_name, text)
+
+
+def html_file_to_eminput(html_content: str, source_name: str) -> Optional[EMInput]:
+    """Convert an HTML note file (e.g. from an archive) to EMInput (None when it has no text)."""
+    text = html_to_text(html_content)
+    if not text:
+        logger.warning(f"No text extracted from {source_name}")
+        return None
+
+    metadata = extract_html_metadata(text, source_name)
+    return EMInput(
+        document_id=metadata["document_id"],
+        date_of_service=metadata["date_of_service"],
+        provider=metadata["provider"],
+        text=text,
+        patient_name=metadata.get("patient_name"),
+        patient_id=metadata.get("patient_id")
+    )
@@ -0,0 +1,137 @@
+"""
+Shared HTTP Client Module
+One pooled httpx.AsyncClient per worker for every Azure OpenAI provider, so
+concurrent activities reuse keep-alive connections instead of opening (and
+TLS-handshaking) their own. Pool usage is tracked for diagnostics.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from constants import azure_config
+from settings import logger
+
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+_TCP_CONNECTED = "connection.connect_tcp.complete"
+_TLS_COMPLETED = "connection.start_tls.complete"
+
+
+def http2_available() -> bool:
+    """True when the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport that counts requests and new connections using httpcore trace events."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool):
+        super().__init__(limits=limits, http2=http2)
+        self.limits = limits
+        self.http2 = http2
+        self.requests_total = 0
+        self.requests_in_flight = 0
+        self.peak_in_flight = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        caller_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == _TCP_CONNECTED:
+                self.new_connections += 1
+            elif event_name == _TLS_COMPLETED:
+                self.tls_handshakes += 1
+            if caller_trace is not None:
+                await caller_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.requests_total += 1
+        self.requests_in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.requests_in_flight)
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            # In flight until response headers arrive; body streaming shows up as a busy connection
+            self.requests_in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        connections = list(self._pool.connections)
+        in_use = sum(not connection.is_idle() for connection in connections)
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.limits.keepalive_expiry,
+            "connections_open": len(connections),
+            "connections_in_use": in_use,
+            "connections_idle": len(connections) - in_use,
+            "requests_total": self.requests_total,
+            "requests_in_flight": self.requests_in_flight,
+            # HTTP/1.1: one request per connection, so anything beyond the busy connections is queued
+            "requests_waiting": 0 if self.http2 else max(self.requests_in_flight - in_use, 0),
+            "peak_in_flight": self.peak_in_flight,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+        }
+
+
+_client_lock = threading.Lock()
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_transport: Optional[PooledTransport] = None
+
+
+def _resolve_http2() -> bool:
+    mode = azure_config.openai_http2
+    if mode in ("0", "false", "no"):
+        return False
+    available = http2_available()
+    if mode in ("1", "true", "yes") and not available:
+        logger.warning("OPENAI_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+    return available
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Get the worker-wide pooled AsyncClient used by all model providers, creating it on first use."""
+    global _shared_client, _shared_transport
+    if _shared_client is None or _shared_client.is_closed:
+        with _client_lock:
+            if _shared_client is None or _shared_client.is_closed:
+                limits = httpx.Limits(
+                    max_connections=azure_config.openai_http_max_connections,
+                    max_keepalive_connections=azure_config.openai_http_max_keepalive_connections,
+                    keepalive_expiry=azure_config.openai_http_keepalive_expiry_seconds
+                )
+                _shared_transport = PooledTransport(limits=limits, http2=_resolve_http2())
+                _shared_client = httpx.AsyncClient(
+                    transport=_shared_transport,
+                    timeout=httpx.Timeout(azure_config.openai_http_timeout_seconds, connect=CONNECT_TIMEOUT_SECONDS)
+                )
+                logger.debug("Created shared model HTTP client",
+                            max_connections=limits.max_connections,
+                            max_keepalive_connections=limits.max_keepalive_connections,
+                            keepalive_expiry=limits.keepalive_expiry,
+                            http2=_shared_transport.http2)
+    return _shared_client
+
+
+def get_http_pool_stats() -> Optional[Dict[str, Any]]:
+    """Pool statistics of the shared client, or None if it has not been created yet."""
+    transport = _shared_transport
+    return transport.stats() if transport is not None else None
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared client (its connections are reopened lazily on next use)."""
+    global _shared_client, _shared_transport
+    client = _shared_client
+    _shared_client = None
+    _shared_transport = None
+    if client is not None:
+        await client.aclose()
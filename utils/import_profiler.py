@@ -0,0 +1,120 @@
+"""
+Import Profiler Module
+Reports per-module import time (via `python -X importtime`) for a cold import of
+a module, so regressions in the function app's cold-start import graph are visible.
+
+Usage:
+    python -m utils.import_profiler                          # profile function_app
+    python -m utils.import_profiler durable_functions.health --top 10
+    python -m utils.import_profiler --forbid pydantic_ai openpyxl   # exit 1 if any of them is imported
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_MODULE = "function_app"
+DEFAULT_TOP = 25
+
+# "import time:       396 |     248996 |   azure.durable_functions"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s*)(?P<module>\S+)\s*$")
+
+
+class ImportTiming(NamedTuple):
+    """Import cost of one module, in microseconds as reported by -X importtime."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse `-X importtime` stderr into timings, in the order modules finished importing."""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            timings.append(ImportTiming(
+                module=match.group("module"),
+                self_us=int(match.group("self")),
+                cumulative_us=int(match.group("cumulative")),
+                depth=max(len(match.group("indent")) - 1, 0) // 2
+            ))
+    return timings
+
+
+def profile_imports(module: str, python: str = sys.executable) -> List[ImportTiming]:
+    """
+    Import module in a fresh interpreter and return its import timings.
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not _IMPORTTIME_RE.match(line)]
+        raise RuntimeError(f"Importing {module} failed:\n" + "\n".join(errors[-20:]))
+    return parse_importtime(completed.stderr)
+
+
+def is_imported(timings: Sequence[ImportTiming], module: str) -> bool:
+    """True if module or any of its submodules was imported."""
+    return any(timing.module == module or timing.module.startswith(f"{module}.") for timing in timings)
+
+
+def format_report(module: str, timings: Sequence[ImportTiming], top: int = DEFAULT_TOP, sort: str = "cumulative") -> str:
+    """Render the slowest imports as a fixed-width table (milliseconds)."""
+    total = next((timing for timing in reversed(timings) if timing.module == module), None)
+    key = (lambda timing: timing.self_us) if sort == "self" else (lambda timing: timing.cumulative_us)
+    lines = [
+        f"Import profile for {module}: {total.cumulative_us / 1000:.1f} ms total, {len(timings)} modules"
+        if total else f"Import profile for {module}: {len(timings)} modules",
+        f"{'cumulative ms':>14} {'self ms':>9}  module",
+    ]
+    for timing in sorted(timings, key=key, reverse=True)[:top]:
+        lines.append(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import times for a cold import.")
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE, help=f"Module to import (default: {DEFAULT_MODULE})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Number of modules to list")
+    parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative")
+    parser.add_argument("--forbid", nargs="*", default=[], metavar="MODULE",
+                        help="Fail if any of these modules (or their submodules) is imported")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the total import time exceeds this")
+    args = parser.parse_args(argv)
+
+    try:
+        timings = profile_imports(args.module)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(format_report(args.module, timings, args.top, args.sort))
+
+    status = 0
+    imported = [name for name in args.forbid if is_imported(timings, name)]
+    if imported:
+        print(f"\nForbidden modules imported by {args.module}: {', '.join(imported)}")
+        status = 1
+    total = next((timing.cumulative_us for timing in reversed(timings) if timing.module == args.module), 0)
+    if args.budget_ms is not None and total / 1000 > args.budget_ms:
+        print(f"\nImport time {total / 1000:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
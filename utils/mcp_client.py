@@ -0,0 +1,125 @@
+"""
+Shared MCP Client Module
+One MCP session per worker, opened once (DNS, TLS, SSE handshake, initialize) and
+kept open by a background task, so warm-up leaves a live connection behind and
+activities reuse it instead of handshaking on every request. A call that fails on
+the shared session reconnects once and retries.
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import anyio
+import httpx
+
+from settings import logger
+
+MCP_TIMEOUT_SECONDS = 8.0
+
+# Failures that mean the session is gone (tool errors are raised to the caller as-is)
+_CONNECTION_ERRORS = (
+    anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, httpx.HTTPError, OSError, TimeoutError,
+)
+
+
+class _SharedConnection:
+    """An MCPServerSSE held open by a task that owns its context (anyio scopes stay in one task)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        from pydantic_ai.mcp import MCPServerSSE
+
+        self.loop = loop
+        self.server = MCPServerSSE(
+            url=os.getenv("MCP_API_URL"),
+            headers={"X-API-Key": os.getenv("MCP_API_KEY")},
+            timeout=MCP_TIMEOUT_SECONDS
+        )
+        self.ready = loop.create_future()
+        self._stop = asyncio.Event()
+        self.task = loop.create_task(self._hold())
+
+    async def _hold(self) -> None:
+        try:
+            async with self.server:
+                self.ready.set_result(None)
+                await self._stop.wait()
+        except Exception as e:
+            if not self.ready.done():
+                self.ready.set_exception(e)
+            else:
+                logger.warning("🔌 Shared MCP connection closed", error=str(e), error_type=type(e).__name__)
+
+    @property
+    def alive(self) -> bool:
+        return not self.task.done() and not self.loop.is_closed()
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+_connection: Optional[_SharedConnection] = None
+_connection_lock = threading.Lock()
+_stats = {"connections_opened": 0, "calls": 0, "reconnects": 0}
+
+
+async def get_mcp_server():
+    """The worker's connected MCP server, opening the shared session on first use."""
+    global _connection
+    loop = asyncio.get_running_loop()
+    with _connection_lock:
+        connection = _connection
+        if connection is None or connection.loop is not loop or not connection.alive:
+            connection = _connection = _SharedConnection(loop)
+            _stats["connections_opened"] += 1
+    try:
+        # Shielded: a cancelled caller must not cancel the handshake other callers wait on
+        await asyncio.shield(connection.ready)
+    except Exception:
+        _discard(connection)
+        raise
+    return connection.server
+
+
+def _discard(connection: _SharedConnection) -> None:
+    global _connection
+    with _connection_lock:
+        if _connection is connection:
+            _connection = None
+    connection.close()
+
+
+async def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Any:
+    """Call an MCP tool on the shared session; a broken session is replaced and the call retried once."""
+    server = await get_mcp_server()
+    _stats["calls"] += 1
+    try:
+        return await server.call_tool(tool_name=tool_name, arguments=arguments)
+    except _CONNECTION_ERRORS as e:
+        logger.warning("🔌 MCP call failed on the shared connection, reconnecting",
+                      tool_name=tool_name,
+                      error=str(e),
+                      error_type=type(e).__name__)
+        with _connection_lock:
+            connection = _connection
+        if connection is not None and connection.server is server:
+            _discard(connection)
+        _stats["reconnects"] += 1
+        server = await get_mcp_server()
+        return await server.call_tool(tool_name=tool_name, arguments=arguments)
+
+
+def get_mcp_connection_stats() -> Dict[str, Any]:
+    """Connections opened, calls and reconnects of this worker's shared MCP session."""
+    with _connection_lock:
+        connected = _connection is not None and _connection.alive and _connection.ready.done()
+    return {**_stats, "connected": connected}
+
+
+async def close_mcp_connection() -> None:
+    """Close the shared session (e.g. on shutdown); the next call reconnects."""
+    with _connection_lock:
+        connection = _connection
+    if connection is not None:
+        _discard(connection)
+        await asyncio.gather(connection.task, return_exceptions=True)
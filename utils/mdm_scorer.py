@@ -0,0 +1,429 @@
+"""
+MDM Pre-Scorer
+Estimates the AMA Medical Decision Making level of a progress note with
+deterministic rules, before any model call. The note is split into its sections,
+problems / data / risk are each scored from concept hits (one ClinicalMatcher pass,
+negated and deferred mentions ignored), and the level is the one met by 2 of the 3
+elements, mapped to CPT codes with the AMA MDM table of the guidelines index.
+
+Every element carries a certainty, and the estimate's certainty is the chance that
+its MDM level survives each element being read one level off. Clear-cut notes can
+then skip the enhancement model (MDM_PRESCORE_SKIP_THRESHOLD).
+
+Usage:
+    python -m utils.mdm_scorer test_results
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from itertools import product
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.clinical_matcher import ClinicalMatcher, ConceptMatch
+from utils.guidelines_index import ESTABLISHED_PATIENT_CODES, NEW_PATIENT_CODES, GuidelinesIndex
+
+
+# Element levels, lowest first; the index of a name is its level (0-3)
+MDM_LEVELS = ("Straightforward", "Low", "Moderate", "High")
+PROBLEM_LEVELS = ("Minimal", "Low", "Moderate", "High")
+DATA_LEVELS = ("Minimal or none", "Limited", "Moderate", "Extensive")
+RISK_LEVELS = ("Minimal", "Low", "Moderate", "High")
+MINIMAL, LOW, MODERATE, HIGH = range(4)
+
+PROBLEMS, DATA, RISK = "problems", "data", "risk"
+
+# Section kinds, recognized by words of the heading ("ASSESSMENT AND PLAN" is both)
+ASSESSMENT, PLAN, RESULTS, HISTORY = "assessment", "plan", "results", "history"
+SECTION_KEYWORDS = {
+    ASSESSMENT: ("ASSESSMENT", "IMPRESSION", "IMPRESSIONS", "DIAGNOSIS", "DIAGNOSES"),
+    PLAN: ("PLAN", "RECOMMENDATION", "RECOMMENDATIONS", "DISPOSITION"),
+    RESULTS: ("IMAGING", "RADIOGRAPHS", "RADIOGRAPHIC", "STUDIES", "RESULTS", "LABS", "LABORATORY", "TESTS", "X-RAYS"),
+    HISTORY: ("HISTORY", "HPI", "COMPLAINT", "INTERVAL"),
+}
+# Upper-case "LABEL:" lines (text may follow the colon) and markdown headings
+_HEADING_RE = re.compile(
+    r"^[ \t]*(?:#+[ \t]*(?P<md>[^\n]+?)[ \t]*|(?P<label>[A-Z][A-Z0-9 /&(),'-]{2,80}):[ \t]*(?P<rest>[^\n]*))$",
+    re.MULTILINE
+)
+_NUMBERED_ITEM_RE = re.compile(r"^[ \t]*\d{1,2}[.)][ \t]+(?P<item>\S[^\n]*)", re.MULTILINE)
+# Assessment items that are services rather than problems
+_NON_PROBLEM_ITEM_RE = re.compile(r"educat|counsel|discuss|follow[ -]?up|return", re.IGNORECASE)
+_SENTENCE_BOUNDARY = re.compile(r"[.;\n]")
+
+# Concepts per category. Chronic illnesses are separate concepts so distinct ones can be counted;
+# in the other categories the concept names the rule a hit supports.
+MDM_VOCABULARY = {
+    "negation_window_chars": 60,
+    # Negated, historical and deferred mentions are not addressed at this visit
+    "negation_cues": [
+        "no", "not", "denies", "denied", "without", "negative for", "no evidence of", "history of",
+        "rule out", "ruled out", "r/o", "consider", "considering", "possible need for", "if",
+        "hold off", "declined", "declines", "defer", "deferred",
+    ],
+    "categories": {
+        "chronic": {
+            "arthritis": ["arthritis", "osteoarthritis", "arthrosis", "degenerative joint disease", "djd"],
+            "spine degeneration": ["spondylosis", "spondylolisthesis", "stenosis", "degenerative disc",
+                                   "disc degeneration", "disc herniation", "disc herniations", "herniated disc",
+                                   "disc bulge", "disc bulging", "discogenic", "radiculopathy", "scoliosis"],
+            "diabetes": ["diabetes", "diabetes mellitus", "diabetic", "t2dm", "type 2 diabetes", "type 1 diabetes"],
+            "hypertension": ["hypertension", "htn", "high blood pressure"],
+            "hyperlipidemia": ["hyperlipidemia", "dyslipidemia", "high cholesterol"],
+            "obesity": ["obesity", "morbid obesity"],
+            "sleep apnea": ["sleep apnea", "osa"],
+            "heart disease": ["atrial fibrillation", "afib", "heart failure", "chf", "coronary artery disease", "cad"],
+            "lung disease": ["copd", "asthma"],
+            "kidney disease": ["chronic kidney disease", "ckd"],
+            "mood disorder": ["depression", "anxiety", "bipolar"],
+            "chronic pain": ["chronic pain", "fibromyalgia", "neuropathy"],
+            "osteoporosis": ["osteoporosis", "osteopenia"],
+            "gout": ["gout"],
+            "thyroid disease": ["hypothyroidism", "hyperthyroidism"],
+        },
+        "problems": {
+            "threat": ["threat to life", "threat to bodily function", "life threatening", "limb threatening",
+                       "cauda equina", "sepsis", "septic", "myocardial infarction", "stroke",
+                       "compartment syndrome", "osteomyelitis", "pulmonary embolism", "deep vein thrombosis",
+                       "dvt", "severe exacerbation"],
+            "worsening": ["uncontrolled", "poorly controlled", "not controlled", "worsening", "worsened",
+                          "exacerbation", "flare", "progression", "progressive", "side effect", "side effects",
+                          "refractory", "not improving", "no improvement", "without relief", "minimal relief",
+                          "without much benefit", "continues to be painful"],
+            "undiagnosed": ["rule out", "r/o", "concerning for", "suspicious for", "uncertain etiology",
+                            "undiagnosed", "differential diagnosis"],
+            "acute complicated": ["fracture", "dislocation", "tear", "rupture"],
+            "acute": ["sprain", "strain", "contusion", "bursitis", "tendinitis", "tendonitis", "cellulitis",
+                      "laceration", "abrasion"],
+        },
+        "tests": {
+            "mri": ["mri", "magnetic resonance"],
+            "x-ray": ["x-ray", "x-rays", "xray", "xrays", "radiograph", "radiographs", "radiographic", "view", "views"],
+            "ct": ["ct", "ct scan", "cat scan"],
+            "ultrasound": ["ultrasound", "sonogram", "duplex"],
+            "emg": ["emg", "nerve conduction", "ncs"],
+            "labs": ["labs", "lab work", "blood work", "hba1c", "a1c", "cbc", "bmp", "cmp", "lipid panel", "inr",
+                     "creatinine", "tsh", "urinalysis"],
+            "ekg": ["ekg", "ecg", "electrocardiogram"],
+            "stress test": ["stress test"],
+            "echocardiogram": ["echocardiogram", "echo"],
+            "dexa": ["dexa", "bone density"],
+            "bone scan": ["bone scan"],
+        },
+        "data": {
+            "external notes": ["outside records", "external records", "prior records", "records from",
+                               "records reviewed", "notes from", "maps", "pdmp", "prescription monitoring"],
+            "independent historian": ["independent historian", "history obtained from", "history provided by",
+                                      "accompanied by"],
+            "independent interpretation": ["independent interpretation", "my interpretation", "personally reviewed",
+                                           "i reviewed the images", "my review of the images"],
+            "discussion": ["discussed with dr", "spoke with dr", "discussed the case with", "discussion with dr",
+                           "peer to peer"],
+        },
+        "risk": {
+            "admission or emergency care": ["hospital admission", "admit to the hospital", "admission to the hospital",
+                                            "emergency surgery", "emergent surgery", "urgent surgery", "dnr",
+                                            "do not resuscitate", "escalation of care", "emergency department",
+                                            "emergency room", "intensive monitoring for toxicity"],
+            "major surgery decision": ["fusion", "arthroplasty", "joint replacement", "replacement", "laminectomy",
+                                       "discectomy", "decompression", "surgery", "surgical", "orif",
+                                       "open reduction", "reconstruction", "arthroscopy"],
+            "prescription drug management": ["prescribed", "prescription", "refill", "refilled", "refills",
+                                             "increase", "decrease", "titrate", "taper", "start", "started",
+                                             "starting", "begin", "discontinue", "discontinued", "switch",
+                                             "change to", "dosepak", "dose pack", "rx"],
+            "prescription drug": ["meloxicam", "mobic", "gabapentin", "pregabalin", "lyrica", "celecoxib", "celebrex",
+                                  "diclofenac", "cyclobenzaprine", "methocarbamol", "tizanidine", "tramadol",
+                                  "oxycodone", "hydrocodone", "codeine", "prednisone", "methylprednisolone",
+                                  "decadron", "dexamethasone", "trulicity", "metformin", "insulin", "lisinopril",
+                                  "losartan", "metoprolol", "amlodipine", "atorvastatin", "eliquis", "apixaban",
+                                  "warfarin", "zofran", "ondansetron"],
+            "procedure": ["injection", "injections", "injected", "kenalog", "depo-medrol", "cortisone",
+                          "aspiration", "ultrasound guided", "ultrasound guidance", "under ultrasound",
+                          "radiofrequency ablation", "nerve block", "epidural"],
+            "social determinants": ["unable to afford", "cannot afford", "lack of transportation", "homeless",
+                                    "uninsured"],
+            "low risk treatment": ["over the counter", "otc", "tylenol", "acetaminophen", "ibuprofen", "motrin",
+                                   "advil", "aleve", "physical therapy", "home exercise", "home exercises",
+                                   "therapy", "brace", "splint", "ice", "continue current medications",
+                                   "continue medications", "diet", "weight loss", "acupuncture", "chiropractor",
+                                   "compression"],
+        },
+    },
+}
+
+RISK_CONCEPT_LEVELS = {
+    "admission or emergency care": HIGH,
+    # Elective major surgery without identified risk factors is moderate risk
+    "major surgery decision": MODERATE,
+    "prescription drug management": MODERATE,
+    "prescription drug": MODERATE,
+    "procedure": MODERATE,
+    "social determinants": MODERATE,
+    "low risk treatment": LOW,
+}
+
+
+class ElementScore(NamedTuple):
+    """Level of one MDM element (0-3), how sure the rules are of it, and the hits behind it."""
+    level: int
+    certainty: float
+    evidence: List[str]
+
+
+class NoteSections(NamedTuple):
+    """Text of the note per section kind; structured is False when no assessment or plan heading was found."""
+    text: str
+    sections: Dict[str, str]
+    structured: bool
+
+    def get(self, *kinds: str) -> str:
+        """Text of the given section kinds, or the whole note when it has no structure."""
+        if not self.structured:
+            return self.text
+        return "\n".join(self.sections[kind] for kind in kinds if kind in self.sections)
+
+
+class MDMEstimate(NamedTuple):
+    """Estimated MDM level of a note, its CPT codes and the certainty of the estimate (0-1)."""
+    level: int
+    established_code: str
+    new_patient_code: str
+    certainty: float
+    elements: Dict[str, ElementScore]
+
+    @property
+    def level_name(self) -> str:
+        return MDM_LEVELS[self.level]
+
+    def code_for(self, is_new_patient: Optional[bool]) -> str:
+        return self.new_patient_code if is_new_patient else self.established_code
+
+    def justification(self) -> str:
+        """Rule-based justification in the shape the enhancement model writes."""
+        names = {PROBLEMS: PROBLEM_LEVELS, DATA: DATA_LEVELS, RISK: RISK_LEVELS}
+        parts = [
+            f"{element.capitalize()}: {names[element][score.level]}"
+            + (f" ({'; '.join(score.evidence)})" if score.evidence else "")
+            for element, score in self.elements.items()
+        ]
+        return (f"{self.level_name} MDM estimated by the rule-based pre-scorer (2 of 3 elements, "
+                f"certainty {self.certainty:.0%}). " + ". ".join(parts) + ".")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mdm_level": self.level_name,
+            "established_code": self.established_code,
+            "new_patient_code": self.new_patient_code,
+            "certainty": round(self.certainty, 3),
+            "elements": {
+                element: {"level": score.level, "certainty": score.certainty, "evidence": score.evidence}
+                for element, score in self.elements.items()
+            },
+        }
+
+
+@lru_cache(maxsize=None)
+def get_mdm_matcher() -> ClinicalMatcher:
+    return ClinicalMatcher(MDM_VOCABULARY)
+
+
+def split_note_sections(text: str) -> NoteSections:
+    """Group the note's text by section kind, at upper-case "LABEL:" lines and markdown headings."""
+    sections: Dict[str, List[str]] = {}
+    headings = list(_HEADING_RE.finditer(text))
+    for position, heading in enumerate(headings):
+        title = (heading.group("md") or heading.group("label")).upper()
+        words = set(re.split(r"[^A-Z-]+", title))
+        end = headings[position + 1].start() if position + 1 < len(headings) else len(text)
+        body = (heading.group("rest") or "") + text[heading.end():end]
+        for kind, keywords in SECTION_KEYWORDS.items():
+            if words.intersection(keywords):
+                sections.setdefault(kind, []).append(body)
+    joined = {kind: "\n".join(bodies) for kind, bodies in sections.items()}
+    return NoteSections(text, joined, ASSESSMENT in joined or PLAN in joined)
+
+
+def _hits(text: str, *categories: str) -> List[ConceptMatch]:
+    return [match for match in get_mdm_matcher().find(text) if match.category in categories and not match.negated]
+
+
+def score_problems(note: NoteSections) -> ElementScore:
+    """Number and complexity of problems addressed, from the assessment (and history for worsening)."""
+    assessment = note.get(ASSESSMENT)
+    hits = _hits(assessment, "chronic", "problems")
+    chronic = sorted({match.concept for match in hits if match.category == "chronic"})
+    kinds = {match.concept for match in hits if match.category == "problems"}
+    worsening = sorted({match.text.lower() for match in _hits(note.get(HISTORY, ASSESSMENT), "problems")
+                        if match.concept == "worsening"})
+    items = [item.group("item") for item in _NUMBERED_ITEM_RE.finditer(assessment)
+             if not _NON_PROBLEM_ITEM_RE.search(item.group("item"))]
+    unclassified = [item for item in items if not _hits(item, "chronic", "problems")]
+    if not items and not hits and note.sections.get(ASSESSMENT, "").strip():
+        # A narrative impression addresses at least one problem
+        unclassified = [note.sections[ASSESSMENT].strip()]
+
+    evidence = [f"chronic illness: {concept}" for concept in chronic]
+    if "threat" in kinds:
+        return ElementScore(HIGH, 0.9, evidence + ["threat to life or bodily function"])
+    if worsening and (chronic or items):
+        return ElementScore(MODERATE, 0.9, evidence + [f"exacerbation or progression: {', '.join(worsening)}"])
+    if len(chronic) >= 2:
+        return ElementScore(MODERATE, 0.9, evidence)
+    if "undiagnosed" in kinds or "acute complicated" in kinds:
+        found = sorted(kinds & {"undiagnosed", "acute complicated"})
+        return ElementScore(MODERATE, 0.8, evidence + [f"{kind} problem" for kind in found])
+    if chronic:
+        # One stable chronic illness; unclassified items may be more chronic illnesses
+        return ElementScore(LOW, 0.6 if unclassified else 0.8, evidence)
+    if "acute" in kinds:
+        return ElementScore(LOW, 0.8, ["acute uncomplicated problem"])
+    if unclassified:
+        return ElementScore(LOW, 0.6, [f"{len(unclassified)} unclassified problem(s)"])
+    return ElementScore(MINIMAL, 0.8 if note.structured else 0.6, [])
+
+
+def score_data(note: NoteSections) -> ElementScore:
+    """Amount and complexity of data reviewed and analyzed (AMA categories 1-3)."""
+    reviewed = set()
+    results_text = note.get(RESULTS)
+    for match in _hits(results_text, "tests"):
+        # Each reported study is a unique test (e.g. "AP pelvis" and "2 views of the hip")
+        sentence = len(_SENTENCE_BOUNDARY.findall(results_text, 0, match.start))
+        reviewed.add((match.concept, sentence))
+    ordered = {match.concept for match in _hits(note.get(PLAN), "tests")}
+    data_hits = _hits(note.text, "data")
+    concepts = {match.concept for match in data_hits}
+
+    reviewed_counts = Counter(concept for concept, _ in reviewed)
+    evidence = [f"test reviewed: {concept}" + (f" x{count}" if count > 1 else "")
+                for concept, count in sorted(reviewed_counts.items())]
+    evidence += [f"test ordered: {concept}" for concept in sorted(ordered)]
+    evidence += sorted(concepts)
+    category_1 = len(reviewed) + len(ordered) + ("external notes" in concepts) + ("independent historian" in concepts)
+    categories_met = (category_1 >= 3) + ("independent interpretation" in concepts) + ("discussion" in concepts)
+    certainty = 0.9 if note.structured else 0.7
+
+    if categories_met >= 2:
+        return ElementScore(HIGH, 0.8, evidence)
+    if categories_met == 1:
+        return ElementScore(MODERATE, certainty if category_1 != 3 else 0.75, evidence)
+    if category_1 >= 2 or "independent historian" in concepts:
+        return ElementScore(LOW, 0.75, evidence)
+    # A single data point leaves the data element minimal, but only just
+    return ElementScore(MINIMAL, certainty if category_1 == 0 else 0.7, evidence)
+
+
+def score_risk(note: NoteSections) -> ElementScore:
+    """Risk of complications of patient management, from the plan."""
+    concepts = {match.concept for match in _hits(note.get(PLAN), "risk")}
+    if not concepts:
+        return ElementScore(MINIMAL, 0.7 if PLAN in note.sections else 0.6, [])
+    level = max(RISK_CONCEPT_LEVELS[concept] for concept in concepts)
+    top = sorted(concept for concept in concepts if RISK_CONCEPT_LEVELS[concept] == level)
+    if level == MODERATE:
+        # Prescription drug management is unambiguous; a surgery decision or procedure could be high or low
+        certainty = 0.9 if any(concept.startswith("prescription") for concept in top) else 0.75
+    else:
+        certainty = 0.85 if level == HIGH else 0.75
+    return ElementScore(level, certainty, top)
+
+
+def mdm_certainty(levels: Tuple[int, ...], certainties: Tuple[float, ...]) -> float:
+    """
+    Probability that the 2-of-3 level is unchanged when each element may be one level
+    off: element i keeps its level with probability certainties[i], otherwise moves up
+    or down with equal odds.
+    """
+    target = sorted(levels)[1]
+    total = 0.0
+    for shifts in product((-1, 0, 1), repeat=len(levels)):
+        probability = 1.0
+        for certainty, shift in zip(certainties, shifts):
+            probability *= certainty if shift == 0 else (1 - certainty) / 2
+        shifted = sorted(min(max(level + shift, MINIMAL), HIGH) for level, shift in zip(levels, shifts))
+        if shifted[1] == target:
+            total += probability
+    return total
+
+
+def level_codes(index: Optional[GuidelinesIndex] = None) -> Dict[str, Tuple[str, str]]:
+    """(new patient, established) codes per MDM level name, from the AMA MDM table of the guidelines."""
+    if index is None:
+        from utils.guidelines_cache import get_em_guidelines_index
+        index = get_em_guidelines_index()
+    codes = {row["mdm_level"]: tuple(row["codes"]) for row in index.mdm_table.values()}
+    # Guidelines without the AMA table: the CPT code rows are in MDM level order
+    for level_name, new_code, established_code in zip(MDM_LEVELS, NEW_PATIENT_CODES, ESTABLISHED_PATIENT_CODES):
+        codes.setdefault(level_name, (new_code, established_code))
+    return codes
+
+
+def estimate_mdm(text: str, index: Optional[GuidelinesIndex] = None) -> MDMEstimate:
+    """Estimate the MDM level and E/M code of a progress note from its text."""
+    note = split_note_sections(text or "")
+    elements = {PROBLEMS: score_problems(note), DATA: score_data(note), RISK: score_risk(note)}
+    levels = tuple(score.level for score in elements.values())
+    level = sorted(levels)[1]
+    new_code, established_code = level_codes(index)[MDM_LEVELS[level]]
+    certainty = mdm_certainty(levels, tuple(score.certainty for score in elements.values()))
+    return MDMEstimate(level, established_code, new_code, certainty, elements)
+
+
+def iter_past_results(paths: List[str]) -> Iterator[Tuple[str, str, str]]:
+    """(document ID, note text, final audited code) of the distinct notes in saved pipeline results."""
+    seen = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as result_file:
+            data = json.load(result_file)
+        if isinstance(data.get("output"), dict):
+            results = data["output"].get("results", [])
+        else:
+            results = data.get("results") or ([data] if "auditor_agent" in data else [])
+        for result in results:
+            enhancement = result.get("enhancement_agent") or {}
+            code = (result.get("auditor_agent") or {}).get("final_assigned_code")
+            text = enhancement.get("text") or result.get("original_text_preview") or ""
+            if code and text and text not in seen:
+                seen.add(text)
+                yield result.get("document_id") or enhancement.get("document_id"), text, code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the MDM pre-scorer with past audited results.")
+    parser.add_argument("results", nargs="+", help="Result JSON files or directories (e.g. test_results)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for source in args.results:
+        paths += sorted(glob.glob(os.path.join(source, "*.json"))) if os.path.isdir(source) else [source]
+
+    rows = []
+    for document_id, text, code in iter_past_results(paths):
+        start_time = time.perf_counter()
+        estimate = estimate_mdm(text)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        established_code = estimate.established_code if code in ESTABLISHED_PATIENT_CODES else estimate.new_patient_code
+        rows.append((estimate.certainty, established_code == code))
+        levels = "/".join(str(score.level) for score in estimate.elements.values())
+        print(f"{str(document_id)[:36]:36}  audited {code}  estimated {established_code}  "
+              f"P/D/R {levels}  certainty {estimate.certainty:.2f}  {elapsed_ms:.2f} ms")
+
+    if not rows:
+        print("No results with note text found", file=sys.stderr)
+        return 1
+    print(f"Agreement: {sum(match for _, match in rows)}/{len(rows)}")
+    for threshold in (0.8, 0.9, 0.95):
+        selected = [match for certainty, match in rows if certainty >= threshold]
+        print(f"Certainty >= {threshold}: {len(selected)} notes would skip enhancement, "
+              f"{sum(selected)} agree with the audited code")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
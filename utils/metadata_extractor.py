@@ -0,0 +1,198 @@
+"""
+Progress Note Metadata Extractor
+Finds patient, date-of-service and provider metadata in PDF text with one scan of
+a precompiled pattern. Every rule's hits are collected as candidates with their
+positions, then each field is resolved by rule priority, so adding a fallback
+never adds another pass over the document.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from settings import logger
+
+
+_MONTH_DATE = r"[A-Za-z]+\s+\d{1,2},\s+\d{4}"
+_NUMERIC_DATE = r"\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}"
+# "Last, First" with an optional middle initial on the same line
+_PERSON = r"[A-Z][a-z]+,\s+[A-Z][a-z]+(?:[ \t]+[A-Z]\b)?"
+
+# Numeric dates containing these years are preferred as the date of service
+RECENT_YEARS = ("2024", "2025")
+# Longest "First Middle Last, MD" name the credential rule follows (bounds backtracking)
+MAX_CREDENTIAL_NAME_WORDS = 5
+
+
+class MetadataRule(NamedTuple):
+    """
+    One pattern feeding a metadata field.
+
+    rank orders the rules of a field (lowest wins); last picks the last hit of the
+    rule instead of the first. first is the character class a hit starts with: the
+    scanner only tries the rule where that class matches.
+    """
+    name: str
+    field: str
+    rank: int
+    first: str
+    pattern: str
+    ignore_case: bool = False
+    last: bool = False
+
+
+# Rules are matched in lookaheads, so they never consume each other's text and each
+# keeps its own re.findall-style non-overlapping hits. Rules cannot match at the
+# same position (labels, "#", numbers and capitalized names differ in shape); if
+# they ever do, the first in list order wins.
+RULES = [
+    MetadataRule("patient_header", "patient_name", 0, "[A-Z]",
+                 rf"(?P<value>{_PERSON})\s+\d{{2}}/\d{{2}}/\d{{4}}\s+#(?P<id>\d+)"),
+    MetadataRule("patient_name_label", "patient_name", 1, "[Pp]", rf"PATIENT\s+NAME:\s*(?P<value>{_PERSON})", True),
+    MetadataRule("patient_id", "patient_id", 1, "#", r"#(?P<value>\d+)"),
+    MetadataRule("dos_label", "date_of_service", 0, "[Dd]",
+                 rf"DATE\s+OF\s+SERVICE:\s*(?P<value>{_MONTH_DATE}|{_NUMERIC_DATE})", True),
+    MetadataRule("dos_abbreviation", "date_of_service", 1, "[Dd]",
+                 rf"DOS:\s*(?P<value>{_NUMERIC_DATE}|{_MONTH_DATE})", True),
+    MetadataRule("date_label", "date_of_service", 2, "[Dd]", rf"DATE:\s*(?P<value>{_MONTH_DATE}|{_NUMERIC_DATE})", True),
+    # "Month D, YYYY" is anchored on its day, since trying a word pattern at every
+    # letter would dominate the scan; the month word is recovered by _month_start
+    MetadataRule("month_date", "date_of_service", 3, r"\d", r"(?<=\s)(?P<value>\d{1,2},\s+\d{4})"),
+    MetadataRule("recent_date", "date_of_service", 4, r"\d", rf"(?P<value>{_NUMERIC_DATE})"),
+    MetadataRule("signed_on_date", "provider", 0, "[Ee]",
+                 r"Electronically\s+signed\s+by\s+(?P<value>[^,\n]+(?:,\s*[A-Z]+)?)\s+on\s+Date", True),
+    MetadataRule("signed_by_label", "provider", 1, "[Ee]",
+                 r"Electronically\s+Signed\s+By:\s*(?P<value>[^,\n]+(?:,\s*[A-Z\s]+)?),\s*Date:", True),
+    MetadataRule("credential", "provider", 2, "[A-Z]",
+                 rf"(?P<value>[A-Z][a-z]+(?:\s+[A-Z][a-z]*){{0,{MAX_CREDENTIAL_NAME_WORDS - 1}}},?\s+(?:MD|DPM|DO|PA-C|NP))",
+                 last=True),
+    MetadataRule("signed_by", "provider", 3, "[Ss]", r"signed\s+by\s+(?P<value>[^,\n]+(?:,\s*[A-Z]+)?)", True),
+]
+
+# Derived candidates: the header also carries the patient ID, and the last-resort
+# date is any numeric date, recent or not
+_HEADER_ID = MetadataRule("patient_header_id", "patient_id", 0, "", "")
+_ANY_DATE = MetadataRule("numeric_date", "date_of_service", 5, "", "")
+
+METADATA_FIELDS = ("patient_name", "patient_id", "date_of_service", "provider")
+
+# Values used when a field cannot be found, and how the warning names the field
+METADATA_PLACEHOLDERS = {
+    "date_of_service": ("2024-01-01", "date of service"),
+    "provider": ("Unknown Provider", "provider"),
+    "patient_name": ("Unknown Patient", "patient name"),
+    "patient_id": ("0000", "patient ID"),
+}
+
+
+class MetadataCandidate(NamedTuple):
+    """A value found by one rule, with its position in the text."""
+    field: str
+    value: str
+    rule: str
+    rank: int
+    start: int
+    end: int
+
+
+def _compile(rules: List[MetadataRule]) -> re.Pattern:
+    """
+    One alternation over all rules. Each branch consumes the rule's first character
+    (so a mismatch is rejected without entering the branch) and re-reads the rule
+    from that character in a lookahead: group m<i> spans the hit, v<i>/i<i> are the
+    rule's renamed value/ID groups.
+    """
+    branches = []
+    for index, rule in enumerate(rules):
+        body = rule.pattern.replace("(?P<value>", f"(?P<v{index}>").replace("(?P<id>", f"(?P<i{index}>")
+        if rule.ignore_case:
+            body = f"(?i:{body})"
+        branches.append(rf"{rule.first}(?<=(?=(?P<m{index}>{body}))[\s\S])")
+    return re.compile("|".join(branches))
+
+
+_SCANNER = _compile(RULES)
+_LAST_RULES = {rule.name for rule in RULES if rule.last}
+
+
+def _month_start(text: str, day_start: int) -> int:
+    """Start of the month word before a "D, YYYY" day (-1 when there is none)."""
+    position = day_start
+    while position > 0 and text[position - 1].isspace():
+        position -= 1
+    word_end = position
+    while position > 0 and text[position - 1].isascii() and text[position - 1].isalpha():
+        position -= 1
+    return position if position < word_end else -1
+
+
+def scan_metadata_candidates(text: str) -> List[MetadataCandidate]:
+    """All metadata candidates in the text (each rule's in document order) from a single scan."""
+    candidates: List[MetadataCandidate] = []
+    if not text:
+        return candidates
+    # End of each rule's last hit: like re.findall, a rule's hits never overlap
+    rule_ends = [0] * len(RULES)
+    for match in _SCANNER.finditer(text):
+        index = int(match.lastgroup[1:])
+        rule = RULES[index]
+        start, end = match.start(), match.end(match.lastgroup)
+        value_start, value_end = match.span(f"v{index}")
+        if rule.name == "month_date":
+            start = value_start = _month_start(text, value_start)
+            if start < 0:
+                continue
+        if start < rule_ends[index]:
+            continue
+        rule_ends[index] = end
+
+        value = text[value_start:value_end].strip()
+        if rule.name != "recent_date" or any(year in value for year in RECENT_YEARS):
+            candidates.append(MetadataCandidate(rule.field, value, rule.name, rule.rank, value_start, value_end))
+        if rule.name == "recent_date":
+            candidates.append(MetadataCandidate(_ANY_DATE.field, value, _ANY_DATE.name, _ANY_DATE.rank,
+                                                value_start, value_end))
+        elif rule.name == "patient_header":
+            id_start, id_end = match.span(f"i{index}")
+            candidates.append(MetadataCandidate(_HEADER_ID.field, text[id_start:id_end], _HEADER_ID.name,
+                                                _HEADER_ID.rank, id_start, id_end))
+    return candidates
+
+
+def resolve_metadata(candidates: List[MetadataCandidate]) -> Dict[str, Optional[str]]:
+    """Pick each field's value: best-ranked rule, then its first (or last) hit."""
+    best: Dict[str, MetadataCandidate] = {}
+    for candidate in candidates:
+        current = best.get(candidate.field)
+        if (current is None or candidate.rank < current.rank
+                or (candidate.rank == current.rank and candidate.rule in _LAST_RULES)):
+            best[candidate.field] = candidate
+    return {field: best[field].value if field in best else None for field in METADATA_FIELDS}
+
+
+def extract_text_metadata(text: str) -> Dict[str, Optional[str]]:
+    """
+    Patient name and ID, date of service and provider found in the text (None when absent).
+
+    Priorities, highest first:
+        patient_name: "Last, First MM/DD/YYYY #ID" header, "PATIENT NAME:" label
+        patient_id: header ID, first "#digits"
+        date_of_service: "DATE OF SERVICE:", "DOS:", "DATE:", first "Month D, YYYY",
+            first numeric date in a recent year, first numeric date
+        provider: "Electronically signed by X on Date", "Electronically Signed By: X, Date:",
+            last "Name, MD/DPM/DO/PA-C/NP", "signed by X"
+    """
+    return resolve_metadata(scan_metadata_candidates(text))
+
+
+def fill_metadata_placeholders(metadata: Dict[str, Optional[str]], source: str, text: str) -> Dict[str, Optional[str]]:
+    """Replace missing fields with METADATA_PLACEHOLDERS (in place), warning about each one."""
+    missing = False
+    for field, (placeholder, description) in METADATA_PLACEHOLDERS.items():
+        if not metadata.get(field):
+            metadata[field] = placeholder
+            missing = True
+            logger.warning(f"Could not extract {description} from text for {source}")
+
+    if missing:
+        logger.warning(f"Missing metadata in {source}: {metadata}")
+        logger.debug(f"Text preview for debugging: {text[:500]}...")
+    return metadata
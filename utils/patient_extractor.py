@@ -1,7 +1,8 @@
 import re
+from typing import List, Optional, Tuple
 
-import pdfplumber
 
+HEADER_LINES = 5
 
 PATTERN = re.compile(
     r"(?P<name>[A-ZÁÉÍÓÚÑ][\wÁÉÍÓÚÑ-]+,\s*[A-ZÁÉÍÓÚÑ][\wÁÉÍÓÚÑ\s]+?)\s+"
@@ -11,10 +12,9 @@ PATTERN = re.compile(
 DATE_RE = re.compile(r"\d{2}/\d{2}/\d{4}")
 ID_RE = re.compile(r"#(?P<id>\d+)")
 
-def get_patient_from_pdf_headers(pdf_path, header_lines=5):
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
-    header_text = "\n".join(text.splitlines()[:header_lines])
+def get_patient_from_header_lines(lines: List[str], header_lines=HEADER_LINES) -> Tuple[Optional[str], Optional[str]]:
+    """Find "Last, First MM/DD/YYYY #ID" in the first lines of page 1 (see PDFDocument.header_lines)."""
+    header_text = "\n".join(lines[:header_lines])
     match = PATTERN.search(header_text)
     if match:
         name = match.group("name").strip()
@@ -0,0 +1,333 @@
+"""
+PDF Ingestion Engine
+Converts batches of PDF (and HTML) notes to EMInput in a process pool. Files are
+sent to worker processes in chunks, each file is timed and isolated (one bad PDF
+never fails its chunk, and the chunks lost with a crashed worker are retried one
+file at a time on a new pool), and results stream back in input order or as soon
+as each chunk finishes. Sources can be directory trees or zip/tar archives (see
+utils.document_sources). Metadata-only runs read just the first and last page of
+each PDF.
+
+Usage:
+    python -m utils.pdf_ingestion data/500_data --workers 8 --output em_inputs.jsonl
+    python -m utils.pdf_ingestion practice_export.zip --output em_inputs.jsonl
+    python -m utils.pdf_ingestion data/archive --metadata-only --output metadata.jsonl
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from agents.models.pydantic_models import EMInput
+from constants import azure_config
+from utils.document_sources import (
+    PDF,
+    SourceDocument,
+    document_kind,
+    iter_source_documents,
+    source_document_metadata,
+    source_document_to_eminput,
+)
+from settings import logger
+
+
+# Below this many files the pool start-up costs more than it saves
+MIN_FILES_FOR_POOL = 16
+MAX_CHUNK_SIZE = 16
+# Chunks per worker: enough to balance uneven files, few enough to keep IPC cheap
+CHUNKS_PER_WORKER = 4
+# Files per work unit when the number of files is not known up front
+STREAMING_CHUNK_SIZE = 4
+# Chunks submitted ahead of the consumer per worker (bounds parsed-but-unconsumed notes)
+IN_FLIGHT_CHUNKS_PER_WORKER = 2
+
+
+class IngestionResult(NamedTuple):
+    """Outcome of ingesting one document (path is its file or archive member name)."""
+    index: int
+    path: str
+    em_input: Optional[EMInput]
+    error: Optional[str]
+    duration_seconds: float
+    worker_pid: int
+    metadata: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.em_input is not None or self.metadata is not None
+
+
+_worker_processor = None
+
+
+def _get_processor():
+    """One PDFProcessor per worker process."""
+    global _worker_processor
+    if _worker_processor is None:
+        from utils.pdf_processor import PDFProcessor
+        _worker_processor = PDFProcessor()
+    return _worker_processor
+
+
+def _ingest_one(index: int, document: SourceDocument, metadata_only: bool = False) -> IngestionResult:
+    start_time = time.perf_counter()
+    em_input, metadata, error = None, None, None
+    try:
+        if metadata_only:
+            metadata = source_document_metadata(document, _get_processor())
+        else:
+            em_input = source_document_to_eminput(document, _get_processor())
+            if em_input is None:
+                error = "No text extracted"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return IngestionResult(
+        index, document.name, em_input, error, time.perf_counter() - start_time, os.getpid(), metadata
+    )
+
+
+def _ingest_chunk(chunk: Sequence[Tuple[int, SourceDocument]], metadata_only: bool = False) -> List[IngestionResult]:
+    """Work unit run in a worker process."""
+    return [_ingest_one(index, document, metadata_only) for index, document in chunk]
+
+
+def _as_document(item: Union[str, Path, SourceDocument]) -> SourceDocument:
+    if isinstance(item, SourceDocument):
+        return item
+    return SourceDocument(str(item), document_kind(str(item)) or PDF)
+
+
+def _chunks(
+    indexed_paths: Iterator[Tuple[int, SourceDocument]], chunk_size: int
+) -> Iterator[List[Tuple[int, SourceDocument]]]:
+    """Lazily group (index, document) pairs into work units."""
+    while chunk := list(islice(indexed_paths, chunk_size)):
+        yield chunk
+
+
+def default_chunk_size(file_count: Optional[int], workers: int) -> int:
+    if file_count is None:
+        return STREAMING_CHUNK_SIZE
+    return max(1, min(MAX_CHUNK_SIZE, math.ceil(file_count / (workers * CHUNKS_PER_WORKER))))
+
+
+def ingest_pdfs(
+    paths: Iterable[Union[str, Path, SourceDocument]],
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    ordered: bool = True,
+    metadata_only: bool = False
+) -> Iterator[IngestionResult]:
+    """
+    Convert PDFs to EMInput, in parallel when the batch is large enough.
+
+    Paths are consumed lazily and at most IN_FLIGHT_CHUNKS_PER_WORKER chunks per worker
+    are submitted ahead of the consumer, so a slow consumer throttles parsing and
+    memory stays bounded however many files there are.
+
+    Args:
+        paths: PDF or HTML files, or SourceDocuments (any iterable, e.g. iter_source_documents)
+        max_workers: Worker processes (default PDF_INGESTION_MAX_WORKERS, 0 = one per CPU); 1 runs in-process
+        chunk_size: Files per work unit (default: about CHUNKS_PER_WORKER units per worker)
+        ordered: Yield results in input order; otherwise as soon as each chunk finishes
+        metadata_only: Fill IngestionResult.metadata (PDFs: first and last pages only) instead of building EMInput
+
+    Yields:
+        One IngestionResult per path, failures included
+    """
+    indexed_paths = ((index, _as_document(path)) for index, path in enumerate(paths))
+    file_count = len(paths) if isinstance(paths, Sized) else None
+    workers = max_workers or azure_config.pdf_ingestion_max_workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    ingested = failed = 0
+
+    # Small batches run in-process; peek ahead to find out without materializing the input
+    head = list(islice(indexed_paths, MIN_FILES_FOR_POOL))
+    if file_count is not None:
+        workers = min(workers, max(file_count, 1))
+    in_process = workers <= 1 or (max_workers is None and len(head) < MIN_FILES_FOR_POOL)
+    indexed_paths = chain(head, indexed_paths)
+
+    if in_process:
+        for index, path in indexed_paths:
+            result = _ingest_one(index, path, metadata_only)
+            ingested += 1
+            failed += not result.ok
+            yield result
+    else:
+        chunks = _chunks(indexed_paths, chunk_size or default_chunk_size(file_count, workers))
+        max_in_flight = workers * IN_FLIGHT_CHUNKS_PER_WORKER
+        # spawn: never fork the host process (it runs gRPC and event-loop threads)
+        def new_executor() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+        executor = new_executor()
+        # Each future remembers its chunk and the pool it was submitted to
+        submitted: Dict[Future, Tuple[List[Tuple[int, SourceDocument]], ProcessPoolExecutor]] = {}
+        pending: List[Future] = []
+
+        def replace_executor(broken: ProcessPoolExecutor) -> None:
+            nonlocal executor
+            if executor is broken:
+                logger.warning("📄 PDF ingestion worker died, restarting the process pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                executor = new_executor()
+
+        def submit(chunk: List[Tuple[int, SourceDocument]]) -> Future:
+            try:
+                return executor.submit(_ingest_chunk, chunk, metadata_only)
+            except BrokenProcessPool:
+                replace_executor(executor)
+                return executor.submit(_ingest_chunk, chunk, metadata_only)
+
+        def fill():
+            while len(pending) < max_in_flight and (chunk := next(chunks, None)):
+                future = submit(chunk)
+                submitted[future] = (chunk, executor)
+                pending.append(future)
+
+        def isolate(chunk: List[Tuple[int, SourceDocument]]) -> List[IngestionResult]:
+            """Rerun a chunk whose pool broke one file at a time, so only a file that kills its worker fails."""
+            results = []
+            for index, document in chunk:
+                pool = executor
+                try:
+                    results += submit([(index, document)]).result()
+                except BrokenProcessPool as e:
+                    replace_executor(pool)
+                    results.append(IngestionResult(index, document.name, None, f"{type(e).__name__}: {e}", 0.0, 0))
+            return results
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    done = [pending.pop(0)]
+                else:
+                    completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in completed]
+                    pending[:] = [future for future in pending if future not in completed]
+                for future in done:
+                    chunk, pool = submitted.pop(future)
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool:
+                        # A worker died (e.g. a segfault in a malformed PDF) and took every queued chunk
+                        # of its pool with it: restart the pool and retry these files one by one
+                        replace_executor(pool)
+                        results = isolate(chunk)
+                    except Exception as e:
+                        results = [
+                            IngestionResult(index, document.name, None, f"{type(e).__name__}: {e}", 0.0, 0)
+                            for index, document in chunk
+                        ]
+                    fill()
+                    for result in results:
+                        ingested += 1
+                        failed += not result.ok
+                        yield result
+        finally:
+            # A consumer that stops early should not wait for the remaining chunks
+            executor.shutdown(cancel_futures=True)
+
+    logger.debug("📄 PDF ingestion complete",
+                files=ingested,
+                failed=failed,
+                workers=1 if in_process else workers,
+                duration_seconds=round(time.perf_counter() - start_time, 3))
+
+
+def list_documents(source, limit: Optional[int] = None) -> Iterator[Union[str, SourceDocument]]:
+    """
+    Notes in a directory tree, archive or file (lazily, see iter_source_documents),
+    or from an iterable of paths, up to limit.
+    """
+    documents = iter_source_documents(source) if isinstance(source, (str, Path)) else source
+    return islice(documents, limit)
+
+
+def iter_em_inputs(source, limit: Optional[int] = None, max_workers: Optional[int] = None) -> Iterator[EMInput]:
+    """
+    Yield EMInput records as notes are parsed, in input order.
+
+    Args:
+        source: Directory tree, zip/tar archive or note file, or an iterable of paths
+        limit: Stop after this many documents
+        max_workers: See ingest_pdfs
+
+    Failed files are logged and skipped.
+    """
+    for result in ingest_pdfs(list_documents(source, limit), max_workers=max_workers):
+        if result.ok:
+            yield result.em_input
+        else:
+            logger.warning("📄 Skipping document that could not be ingested", path=result.path, error=result.error)
+
+
+async def aiter_em_inputs(
+    source, limit: Optional[int] = None, max_workers: Optional[int] = None
+) -> AsyncIterator[EMInput]:
+    """
+    Async version of iter_em_inputs: parsing runs off the event loop, and the next
+    record is only pulled when the consumer asks for it.
+    """
+    iterator = iter_em_inputs(source, limit, max_workers)
+    try:
+        while (em_input := await asyncio.to_thread(next, iterator, None)) is not None:
+            yield em_input
+    finally:
+        await asyncio.to_thread(iterator.close)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert progress-note PDFs and HTML notes to EMInput (or metadata) JSON lines."
+    )
+    parser.add_argument("source", help="Directory tree, zip/tar archive or single note file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Files per work unit")
+    parser.add_argument("--limit", type=int, default=None, help="Only ingest the first N documents")
+    parser.add_argument("--unordered", action="store_true", help="Write results as they finish")
+    parser.add_argument("--metadata-only", action="store_true",
+                        help="Write patient/DOS/provider metadata, reading only the first and last pages")
+    parser.add_argument("--output", default=None, help="JSON lines file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    documents = list_documents(args.source, args.limit)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start_time = time.perf_counter()
+    succeeded = failed = 0
+    try:
+        for result in ingest_pdfs(documents, args.workers, args.chunk_size, ordered=not args.unordered,
+                                  metadata_only=args.metadata_only):
+            if result.ok:
+                succeeded += 1
+                output.write((json.dumps(result.metadata) if args.metadata_only
+                              else result.em_input.model_dump_json()) + "\n")
+            else:
+                failed += 1
+                print(f"FAILED {result.path}: {result.error}", file=sys.stderr)
+    finally:
+        if args.output:
+            output.close()
+
+    elapsed = time.perf_counter() - start_time
+    total = succeeded + failed
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Ingested {succeeded}/{total} documents in {elapsed:.2f}s ({rate:.1f} files/s, {failed} failed)",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
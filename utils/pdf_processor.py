@@ -10,7 +10,9 @@ import fitz  # PyMuPDF
 from dotenv import load_dotenv
 
 from agents.models.pydantic_models import EMInput
-from utils.patient_extractor import get_patient_from_pdf_headers
+from constants import PDFExtractionMode
+from utils.metadata_extractor import extract_text_metadata, fill_metadata_placeholders
+from utils.patient_extractor import HEADER_LINES, get_patient_from_header_lines
 from settings import logger
 
 # Load environment variables
@@ -28,31 +30,137 @@ DATE_RE = re.compile(r"\d{2}/\d{2}/\d{4}")
 ID_RE = re.compile(r"#(?P<id>\d+)")
 
 
+# Words whose tops are this close (points) belong to the same line, as in pdfplumber
+LINE_Y_TOLERANCE = 3
+
+# Pages read in PDFExtractionMode.FIRST_PAGES unless told otherwise
+DEFAULT_FIRST_PAGES = 1
+
+
+def select_pages(page_count: int, mode: PDFExtractionMode, first_pages: int = DEFAULT_FIRST_PAGES) -> List[int]:
+    """
+    Page numbers to extract: every page, the first N, or the first and last
+    (patient header and date of service open a note, the signature closes it).
+    """
+    if mode == PDFExtractionMode.FULL:
+        return list(range(page_count))
+    if mode == PDFExtractionMode.FIRST_PAGES:
+        return list(range(min(max(first_pages, 1), page_count)))
+    if mode == PDFExtractionMode.HEADER_SIGNATURE:
+        return sorted({0, page_count - 1}) if page_count else []
+    raise ValueError(f"Unsupported PDF extraction mode: {mode}")
+
+
+class PDFDocument:
+    """
+    A PDF parsed once with PyMuPDF.
+
+    Holds the text of the extracted pages plus the first lines of page 1 (rebuilt
+    from word positions, as pdfplumber lays them out), so text and header
+    extraction share a single open and parse of the file. Outside
+    PDFExtractionMode.FULL only some pages are read; the others are never parsed.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        page_texts: List[str],
+        first_page_lines: List[str],
+        page_count: Optional[int] = None,
+        page_numbers: Optional[List[int]] = None
+    ):
+        self.name = name
+        self.page_texts = page_texts
+        self.first_page_lines = first_page_lines
+        self.page_count = len(page_texts) if page_count is None else page_count
+        self.page_numbers = list(range(len(page_texts))) if page_numbers is None else page_numbers
+    
+    @classmethod
+    def open(
+        cls,
+        pdf_path: str,
+        header_line_count: int = HEADER_LINES,
+        mode: PDFExtractionMode = PDFExtractionMode.FULL,
+        first_pages: int = DEFAULT_FIRST_PAGES
+    ) -> "PDFDocument":
+        """Parse a PDF file (only the pages selected by mode, see select_pages)."""
+        with fitz.open(pdf_path) as doc:
+            return cls._from_fitz(str(pdf_path), doc, header_line_count, mode, first_pages)
+    
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        name: str,
+        header_line_count: int = HEADER_LINES,
+        mode: PDFExtractionMode = PDFExtractionMode.FULL,
+        first_pages: int = DEFAULT_FIRST_PAGES
+    ) -> "PDFDocument":
+        """Parse a PDF held in memory."""
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return cls._from_fitz(name, doc, header_line_count, mode, first_pages)
+    
+    @classmethod
+    def _from_fitz(cls, name: str, doc, header_line_count: int, mode: PDFExtractionMode,
+                   first_pages: int) -> "PDFDocument":
+        page_numbers = select_pages(doc.page_count, mode, first_pages)
+        page_texts = [doc[page_number].get_text() for page_number in page_numbers]
+        first_page_lines = _layout_lines(doc[0].get_text("words"), header_line_count) if doc.page_count else []
+        return cls(name, page_texts, first_page_lines, doc.page_count, page_numbers)
+    
+    @property
+    def complete(self) -> bool:
+        """Whether every page was extracted."""
+        return len(self.page_numbers) == self.page_count
+    
+    @property
+    def text(self) -> str:
+        """Text of the extracted pages, joined once."""
+        return "".join(self.page_texts).strip()
+    
+    def header_lines(self, count: int = HEADER_LINES) -> List[str]:
+        """First lines of page 1."""
+        return self.first_page_lines[:count]
+
+
+def _layout_lines(words: List[tuple], limit: int) -> List[str]:
+    """Group PyMuPDF words (x0, y0, x1, y1, text, ...) into top-to-bottom lines of left-to-right words."""
+    lines: List[Tuple[float, List[tuple]]] = []
+    for word in sorted(words, key=lambda word: (word[1], word[0])):
+        if lines and word[1] - lines[-1][0] <= LINE_Y_TOLERANCE:
+            lines[-1][1].append(word)
+        elif len(lines) == limit:
+            break
+        else:
+            lines.append((word[1], [word]))
+    return [" ".join(word[4] for word in sorted(line_words, key=lambda word: word[0])) for _, line_words in lines]
+
+
 class PDFProcessor:
     """Process PDF files containing medical progress notes"""
     
     def __init__(self):
         pass
     
-    def extract_text(self, pdf_path: str) -> str:
-        """Extract text from PDF using PyMuPDF"""
+    def extract_text(
+        self,
+        pdf_path: str,
+        mode: PDFExtractionMode = PDFExtractionMode.FULL,
+        first_pages: int = DEFAULT_FIRST_PAGES
+    ) -> str:
+        """Extract text from PDF using PyMuPDF (all pages, the first N, or the first and last)"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text.strip()
+            return PDFDocument.open(pdf_path, mode=mode, first_pages=first_pages).text
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {str(e)}")
             return ""
     
-    def extract_patient_info(self, pdf_path) -> Tuple[Optional[str], Optional[str]]:
+    def extract_patient_info(self, header_lines: List[str]) -> Tuple[Optional[str], Optional[str]]:
         """
-        Returns: (patient_name, patient_id)
+        Returns: (patient_name, patient_id) from the first lines of page 1
         """
         try:
-            patient_name, patient_id = get_patient_from_pdf_headers(pdf_path)
+            patient_name, patient_id = get_patient_from_header_lines(header_lines)
             if patient_name and patient_id:
                 return patient_name, patient_id
             return None, None
@@ -61,8 +169,13 @@ class PDFProcessor:
             logger.error(f"Error extracting patient info: {str(e)}")
             return None, None
     
-    def extract_metadata_from_text(self, text: str, pdf_path: str) -> Dict[str, str]:
-        """Extract metadata from PDF text content using regex patterns"""
+    def extract_metadata_from_text(
+        self, text: str, pdf_path: str, header_lines: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Extract metadata from PDF text content (see utils.metadata_extractor for the rules).
+        header_lines are the first lines of page 1 (read from pdf_path when not given).
+        """
         # Initialize with filename as document_id
         metadata = {
             "document_id": Path(pdf_path).stem,
@@ -72,134 +185,26 @@ class PDFProcessor:
             "patient_id": None
         }
         
-        # Extract patient information from PDF file
-        patient_name, patient_id = self.extract_patient_info(pdf_path)
+        # Extract patient information from the page 1 header
+        if header_lines is None:
+            try:
+                header_lines = PDFDocument.open(pdf_path).header_lines()
+            except Exception as e:
+                logger.error(f"Error reading PDF headers from {pdf_path}: {str(e)}")
+                header_lines = []
+        patient_name, patient_id = self.extract_patient_info(header_lines)
         if patient_name:
             metadata["patient_name"] = patient_name
         if patient_id:
             metadata["patient_id"] = patient_id
         
-        # Fallback: Extract patient info directly from text if not found in headers
-        if not metadata["patient_name"] or not metadata["patient_id"]:
-            # Pattern for "LastName, FirstName MM/DD/YYYY #ID" at the beginning of document
-            patient_pattern = r'([A-Z][a-z]+,\s+[A-Z][a-z]+(?:\s+[A-Z])?)\s+\d{2}\/\d{2}\/\d{4}\s+#(\d+)'
-            patient_match = re.search(patient_pattern, text)
-            if patient_match:
-                if not metadata["patient_name"]:
-                    metadata["patient_name"] = patient_match.group(1).strip()
-                if not metadata["patient_id"]:
-                    metadata["patient_id"] = patient_match.group(2).strip()
-        
-        # Alternative pattern for patient name in "PATIENT NAME:" section
-        if not metadata["patient_name"]:
-            patient_name_pattern = r'PATIENT\s+NAME:\s*([A-Z][a-z]+,\s+[A-Z][a-z]+(?:\s+[A-Z])?)'
-            patient_name_match = re.search(patient_name_pattern, text, re.IGNORECASE | re.MULTILINE)
-            if patient_name_match:
-                metadata["patient_name"] = patient_name_match.group(1).strip()
-        
-        # Pattern for patient ID with # symbol
-        if not metadata["patient_id"]:
-            patient_id_pattern = r'#(\d+)'
-            patient_id_matches = re.findall(patient_id_pattern, text)
-            if patient_id_matches:
-                # Take the first patient ID found
-                metadata["patient_id"] = patient_id_matches[0]
+        # Everything else (and header fallbacks) comes from one scan of the text
+        text_metadata = extract_text_metadata(text)
+        for field, value in text_metadata.items():
+            if not metadata[field]:
+                metadata[field] = value
         
-        # Extract Date of Service
-        # Primary pattern for "DATE OF SERVICE:" followed by date (handles newlines)
-        date_pattern = r'DATE\s+OF\s+SERVICE:[\s\n]*([A-Za-z]+\s+\d{1,2},\s+\d{4}|\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-        date_match = re.search(date_pattern, text, re.IGNORECASE | re.MULTILINE)
-        if date_match:
-            metadata["date_of_service"] = date_match.group(1).strip()
-        
-        # Pattern for "DOS:" (Date of Service abbreviation)
-        if not metadata["date_of_service"]:
-            dos_pattern = r'DOS:\s*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}|[A-Za-z]+\s+\d{1,2},\s+\d{4})'
-            dos_match = re.search(dos_pattern, text, re.IGNORECASE)
-            if dos_match:
-                metadata["date_of_service"] = dos_match.group(1).strip()
-        
-        # Alternative pattern for "DATE:" followed by date
-        if not metadata["date_of_service"]:
-            alt_date_pattern = r'DATE:\s*([A-Za-z]+\s+\d{1,2},\s+\d{4}|\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-            alt_date_match = re.search(alt_date_pattern, text, re.IGNORECASE)
-            if alt_date_match:
-                metadata["date_of_service"] = alt_date_match.group(1).strip()
-        
-        # Fallback: Find any date in various formats
-        if not metadata["date_of_service"]:
-            # First try month name format
-            general_date_pattern = r'([A-Za-z]+\s+\d{1,2},\s+\d{4})'
-            general_date_matches = re.findall(general_date_pattern, text)
-            if general_date_matches:
-                # Take the first date found that looks like a service date
-                metadata["date_of_service"] = general_date_matches[0].strip()
-            else:
-                # Try numeric date format as last resort
-                numeric_date_pattern = r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-                numeric_date_matches = re.findall(numeric_date_pattern, text)
-                if numeric_date_matches:
-                    # Filter out dates that look like birth dates (older dates)
-                    # and take the most recent looking date
-                    recent_dates = [d for d in numeric_date_matches if '2024' in d or '2025' in d]
-                    if recent_dates:
-                        metadata["date_of_service"] = recent_dates[0].strip()
-                    elif numeric_date_matches:
-                        metadata["date_of_service"] = numeric_date_matches[0].strip()
-        
-        # Extract Provider from electronic signature
-        # Pattern for "Electronically signed by [Provider Name] on Date"
-        provider_pattern = r'Electronically\s+signed\s+by\s+([^,\n]+(?:,\s*[A-Z]+)?)\s+on\s+Date'
-        provider_match = re.search(provider_pattern, text, re.IGNORECASE)
-        if provider_match:
-            metadata["provider"] = provider_match.group(1).strip()
-        
-        # Alternative pattern for "Electronically Signed By: [Name], Date:"
-        if not metadata["provider"]:
-            alt_provider_pattern = r'Electronically\s+Signed\s+By:\s*([^,\n]+(?:,\s*[A-Z\s]+)?),\s*Date:'
-            alt_provider_match = re.search(alt_provider_pattern, text, re.IGNORECASE)
-            if alt_provider_match:
-                metadata["provider"] = alt_provider_match.group(1).strip()
-        
-        # Pattern for provider name followed by credentials (DPM, MD, etc.) at end of document
-        if not metadata["provider"]:
-            provider_credential_pattern = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*,?\s+(?:MD|DPM|DO|PA-C|NP))'
-            provider_credential_matches = re.findall(provider_credential_pattern, text)
-            if provider_credential_matches:
-                # Take the last match as it's likely the signing provider
-                metadata["provider"] = provider_credential_matches[-1].strip()
-        
-        # Fallback patterns if the main patterns don't match
-        if not metadata["provider"]:
-            # Alternative pattern for "signed by [name]"
-            fallback_provider_pattern = r'signed\s+by\s+([^,\n]+(?:,\s*[A-Z]+)?)'
-            fallback_match = re.search(fallback_provider_pattern, text, re.IGNORECASE)
-            if fallback_match:
-                metadata["provider"] = fallback_match.group(1).strip()
-        
-        # If date_of_service not found, use placeholder
-        if not metadata["date_of_service"]:
-            metadata["date_of_service"] = "2024-01-01"
-            logger.warning(f"Could not extract date of service from text for {pdf_path}")
-        
-        # If provider not found, use placeholder
-        if not metadata["provider"]:
-            metadata["provider"] = "Unknown Provider"
-            logger.warning(f"Could not extract provider from text for {pdf_path}")
-        
-        # If patient_name not found, use placeholder
-        if not metadata["patient_name"]:
-            metadata["patient_name"] = "Unknown Patient"
-            logger.warning(f"Could not extract patient name from text for {pdf_path}")
-        
-        # If patient_id not found, use placeholder
-        if not metadata["patient_id"]:
-            metadata["patient_id"] = "0000"
-            logger.warning(f"Could not extract patient ID from text for {pdf_path}")
-
-        if not metadata["date_of_service"] or metadata["date_of_service"] == "2024-01-01" or not metadata["provider"] or not metadata["patient_name"] or not metadata["patient_id"]:
-            logger.warning(f"Missing metadata in {pdf_path}: {metadata}")
-            logger.debug(f"Text preview for debugging: {text[:500]}...")
+        fill_metadata_placeholders(metadata, pdf_path, text)
         
         return metadata
     
@@ -213,43 +218,63 @@ class PDFProcessor:
             "document_id": filename
         }
     
+    def extract_metadata(
+        self,
+        pdf_path: str,
+        mode: PDFExtractionMode = PDFExtractionMode.HEADER_SIGNATURE,
+        data: Optional[bytes] = None
+    ) -> Dict[str, str]:
+        """
+        Metadata only (document ID, patient, date of service, provider), for triage and
+        reindex jobs: by default only the first and last pages are read.
+        data is the PDF content when it is not on disk (pdf_path then only names it).
+        """
+        if data is not None:
+            document = PDFDocument.from_bytes(data, pdf_path, mode=mode)
+        else:
+            document = PDFDocument.open(pdf_path, mode=mode)
+        return self.extract_metadata_from_text(document.text, pdf_path, document.header_lines())
+    
+    def build_em_input(self, pdf_path: str, data: Optional[bytes] = None) -> Optional[EMInput]:
+        """
+        Convert a single PDF to EMInput (None when it has no text); errors propagate.
+        data is the PDF content when it is not on disk (pdf_path then only names it).
+        """
+        # Parse once: full text and page 1 header lines come from the same document
+        document = PDFDocument.from_bytes(data, pdf_path) if data is not None else PDFDocument.open(pdf_path)
+        text = document.text
+        if not text:
+            logger.warning(f"No text extracted from {pdf_path}")
+            return None
+        
+        # Extract metadata from text content
+        metadata = self.extract_metadata_from_text(text, pdf_path, document.header_lines())
+        
+        return EMInput(
+            document_id=metadata["document_id"],
+            date_of_service=metadata["date_of_service"],
+            provider=metadata["provider"],
+            text=text,
+            patient_name=metadata.get("patient_name"),
+            patient_id=metadata.get("patient_id")
+        )
+    
     def process_pdf_to_em_input(self, pdf_path: str) -> Optional[EMInput]:
         """Process a single PDF and convert to EMInput format"""
         try:
-            # Extract text content
-            text = self.extract_text(pdf_path)
-            if not text:
-                logger.warning(f"No text extracted from {pdf_path}")
-                return None
-            
-            # Extract metadata from text content
-            metadata = self.extract_metadata_from_text(text, pdf_path)
-            
-            return EMInput(
-                document_id=metadata["document_id"],
-                date_of_service=metadata["date_of_service"],
-                provider=metadata["provider"],
-                text=text,
-                patient_name=metadata.get("patient_name"),
-                patient_id=metadata.get("patient_id")
-            )
+            return self.build_em_input(pdf_path)
         
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
             return None
     
-    def process_sample_pdfs(self, sample_dir: str, limit: int = 10) -> List[EMInput]:
-        """Process multiple PDF samples for testing"""
-        sample_path = Path(sample_dir)
-        pdf_files = list(sample_path.glob("*.pdf"))[:limit]
+    def process_sample_pdfs(self, sample_dir: str, limit: int = 10, max_workers: Optional[int] = None) -> List[EMInput]:
+        """Process multiple PDF samples (see utils.pdf_ingestion.iter_em_inputs to stream them instead)"""
+        from utils.pdf_ingestion import iter_em_inputs
         
-        logger.debug(f"Processing {len(pdf_files)} PDF files from {sample_dir}")
+        logger.debug(f"Processing up to {limit or 'all'} PDF files from {sample_dir}")
         
-        results = []
-        for pdf_file in pdf_files:
-            em_input = self.process_pdf_to_em_input(str(pdf_file))
-            if em_input:
-                results.append(em_input)
+        results = list(iter_em_inputs(sample_dir, limit=limit, max_workers=max_workers))
         
         logger.debug(f"Successfully processed {len(results)} PDFs")
         return results
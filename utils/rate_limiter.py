@@ -0,0 +1,97 @@
+"""
+Rate Limiter Module
+Limit on model requests shared by every concurrently running activity in a worker
+process: a cap on in-flight requests plus optional pacing to a requests-per-minute
+budget, so a large batch queues locally instead of tripping Azure OpenAI 429s.
+
+The limiter is in memory and not coordinated between processes or instances. The
+configured limits are the budget of the whole app and each process takes an equal
+share: limit / (MODEL_RATE_LIMIT_INSTANCES * FUNCTIONS_WORKER_PROCESS_COUNT). Set
+MODEL_RATE_LIMIT_INSTANCES to the app's maximum scale-out so that every instance
+running at once stays within the deployment's quota.
+"""
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from constants import azure_config
+from settings import logger
+
+
+class AsyncRateLimiter:
+    """Async context manager limiting concurrency and start rate of the calls it wraps."""
+
+    def __init__(self, max_concurrent: int, requests_per_minute: float = 0):
+        self.max_concurrent = max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total = 0
+        self.total_wait_seconds = 0.0
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        wait_start = time.monotonic()
+        self.waiting += 1
+        acquired = False
+        try:
+            await self._semaphore.acquire()
+            acquired = True
+            if self._interval:
+                # Reserve the next start slot; no await between read and write, so no lock is needed
+                now = time.monotonic()
+                start_at = max(now, self._next_start)
+                self._next_start = start_at + self._interval
+                if start_at > now:
+                    await asyncio.sleep(start_at - now)
+        except BaseException:
+            # Cancelled while pacing: give the slot back
+            if acquired:
+                self._semaphore.release()
+            raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.total += 1
+        self.total_wait_seconds += time.monotonic() - wait_start
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "requests_per_minute": self.requests_per_minute,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "total": self.total,
+            "average_wait_seconds": round(self.total_wait_seconds / self.total, 3) if self.total else 0.0,
+        }
+
+
+def process_share(max_concurrent: int, requests_per_minute: float, processes: int) -> Tuple[int, float]:
+    """One process's share of app-wide limits split across this many limiter processes."""
+    processes = max(1, processes)
+    return max(1, max_concurrent // processes), requests_per_minute / processes
+
+
+@lru_cache(maxsize=None)
+def get_model_rate_limiter() -> AsyncRateLimiter:
+    """Get this process's limiter for model requests (its share of MODEL_MAX_CONCURRENT_REQUESTS, MODEL_REQUESTS_PER_MINUTE)."""
+    processes = azure_config.model_rate_limit_instances * azure_config.functions_worker_process_count
+    max_concurrent, requests_per_minute = process_share(
+        azure_config.model_max_concurrent_requests,
+        azure_config.model_requests_per_minute,
+        processes
+    )
+    limiter = AsyncRateLimiter(max_concurrent=max_concurrent, requests_per_minute=requests_per_minute)
+    logger.debug("Created model rate limiter",
+                max_concurrent=limiter.max_concurrent,
+                requests_per_minute=limiter.requests_per_minute,
+                limiter_processes=processes)
+    return limiter
@@ -0,0 +1,165 @@
+"""
+Incremental writers for consolidated audit reports.
+
+Reports are produced as a sequence of small chunks (summary first, then one
+result at a time) so that serialization never holds a second full copy of a
+batch output in memory. Supports pretty JSON, NDJSON and gzip compression,
+plus dotted-path field projection for trimming large fields such as note text.
+"""
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+REPORT_FORMAT_JSON = "json"
+REPORT_FORMAT_NDJSON = "ndjson"
+REPORT_FORMATS = (REPORT_FORMAT_JSON, REPORT_FORMAT_NDJSON)
+
+# wbits for a gzip container (header + trailer) around the deflate stream
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class FieldProjection:
+    """
+    Dotted-path include/exclude projection applied to each report result.
+
+    Spec format (comma-separated): ``document_id,enhancement_agent.assigned_code``
+    keeps only the listed paths; ``-enhancement_agent.text`` drops a path. Includes
+    are applied before excludes. Paths traverse into lists element-wise.
+    """
+
+    def __init__(self, includes: List[Tuple[str, ...]], excludes: List[Tuple[str, ...]]):
+        self.includes = includes
+        self.excludes = excludes
+        self._include_tree = _path_tree(includes) if includes else None
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> Optional["FieldProjection"]:
+        """Parse a ``fields=`` query value; returns None when no projection is requested."""
+        if not spec:
+            return None
+        includes, excludes = [], []
+        for raw_field in spec.split(","):
+            field = raw_field.strip()
+            if not field:
+                continue
+            target = excludes if field.startswith("-") else includes
+            path = tuple(part for part in field.lstrip("-").split(".") if part)
+            if not path:
+                raise ValueError(f"Invalid field path: {raw_field!r}")
+            target.append(path)
+        if not includes and not excludes:
+            return None
+        return cls(includes, excludes)
+
+    def apply(self, value: Any) -> Any:
+        """Return a projected copy of value; the input is not modified."""
+        if self._include_tree is not None:
+            value = _include(value, self._include_tree)
+        for path in self.excludes:
+            value = _exclude(value, path)
+        return value
+
+
+def _path_tree(paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Merge dotted paths into a nested dict; None marks a fully included subtree."""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for part in path[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[path[-1]] = None
+    return tree
+
+
+def _include(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_include(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _include(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def _exclude(value: Any, path: Tuple[str, ...]) -> Any:
+    if isinstance(value, list):
+        return [_exclude(item, path) for item in value]
+    if not isinstance(value, dict) or path[0] not in value:
+        return value
+    if len(path) == 1:
+        return {key: item for key, item in value.items() if key != path[0]}
+    projected = dict(value)
+    projected[path[0]] = _exclude(value[path[0]], path[1:])
+    return projected
+
+
+def iter_report_chunks(
+    summary: Dict[str, Any],
+    results: Iterable[Dict[str, Any]],
+    performance: Optional[Dict[str, Any]] = None,
+    report_format: str = REPORT_FORMAT_JSON,
+    projection: Optional[FieldProjection] = None,
+) -> Iterator[str]:
+    """
+    Yield the report as text chunks: summary first, then one result at a time.
+
+    JSON format produces a single document ``{"test_summary", "results", "performance"}``;
+    NDJSON produces one ``{"type": ..., ...}`` object per line so clients can process
+    results as they arrive.
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {report_format}")
+
+    results = (projection.apply(result) for result in results) if projection else results
+
+    if report_format == REPORT_FORMAT_NDJSON:
+        yield _dumps_line({"type": "summary", **summary})
+        for result in results:
+            yield _dumps_line({"type": "result", **result})
+        if performance:
+            yield _dumps_line({"type": "performance", **performance})
+        return
+
+    # Same bytes as json.dumps(report, indent=2, ensure_ascii=False), including "[]" for no results
+    yield '{\n  "test_summary": ' + _dumps_nested(summary) + ',\n  "results": ['
+    has_results = False
+    for result in results:
+        yield ("," if has_results else "") + "\n    " + _dumps_nested(result, depth=2)
+        has_results = True
+    yield ('\n  ]' if has_results else ']') + ',\n  "performance": ' + _dumps_nested(performance or {}) + "\n}"
+
+
+def wants_gzip(params: Mapping[str, str], headers: Mapping[str, str]) -> bool:
+    """Whether a report download should be gzipped: the gzip query parameter, else the Accept-Encoding header."""
+    gzip_param = params.get("gzip")
+    if gzip_param is not None:
+        return gzip_param.lower() in ("1", "true", "yes")
+    return "gzip" in headers.get("Accept-Encoding", "").lower()
+
+
+def iter_encoded_chunks(chunks: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """Encode text chunks as UTF-8, optionally gzip-compressing them incrementally."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+        return
+
+    compressor = zlib.compressobj(wbits=_GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _dumps_line(value: Dict[str, Any]) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str) + "\n"
+
+
+def _dumps_nested(value: Any, depth: int = 1) -> str:
+    """Pretty-print value as if it were nested `depth` levels inside an indent=2 document."""
+    text = json.dumps(value, indent=2, ensure_ascii=False, default=str)
+    return text.replace("\n", "\n" + "  " * depth)
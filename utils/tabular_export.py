@@ -0,0 +1,187 @@
+"""
+Flat, typed tabular exports (CSV and Parquet) of audit results for analytics.
+
+Both formats share one schema (AUDIT_EXPORT_COLUMNS) so a CSV and a Parquet
+download of the same orchestration load into identical DataFrames. Rows are
+written incrementally: CSV in small text chunks, Parquet in record batches.
+"""
+import csv
+import io
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+CSV_CONTENT_TYPE = "text/csv"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+# Rows buffered before a CSV chunk or Parquet record batch is emitted
+DEFAULT_BATCH_SIZE = 500
+
+ENHANCEMENT_TIMING_STEPS = [
+    "mcp_server_connection",
+    "progress_note_api_call",
+    "json_parsing",
+    "agent_initialization",
+    "prompt_preparation",
+    "ai_model_inference",
+    "response_formatting",
+]
+AUDITOR_TIMING_STEPS = [
+    "agent_initialization",
+    "prompt_preparation",
+    "ai_model_inference",
+    "response_formatting",
+]
+
+
+class ExportColumn(NamedTuple):
+    """One column of the flattened export: name, logical type and value getter."""
+
+    name: str
+    type: str  # "string", "int", "float" or "bool"
+    getter: Callable[[Dict[str, Any]], Any]
+
+
+def _enhancement(result: Dict[str, Any]) -> Dict[str, Any]:
+    return result.get("enhancement_agent") or {}
+
+
+def _auditor(result: Dict[str, Any]) -> Dict[str, Any]:
+    return result.get("auditor_agent") or {}
+
+
+def _metrics(agent_data: Dict[str, Any]) -> Dict[str, Any]:
+    return agent_data.get("performance_metrics") or {}
+
+
+def _step_getter(agent: Callable[[Dict[str, Any]], Dict[str, Any]], step: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda result: (_metrics(agent(result)).get("execution_breakdown") or {}).get(step)
+
+
+def _status(result: Dict[str, Any]) -> str:
+    return "failed" if result.get("error") or _auditor(result).get("error") or not _auditor(result) else "completed"
+
+
+def _code_changed(result: Dict[str, Any]) -> Optional[bool]:
+    assigned = _enhancement(result).get("assigned_code")
+    final = _auditor(result).get("final_assigned_code")
+    return assigned != final if assigned and final else None
+
+
+AUDIT_EXPORT_COLUMNS: List[ExportColumn] = [
+    ExportColumn("instance_id", "string", lambda r: r.get("instance_id")),
+    ExportColumn("document_id", "string", lambda r: _auditor(r).get("document_id") or _enhancement(r).get("document_id")),
+    ExportColumn("status", "string", _status),
+    ExportColumn("processed_at", "string", lambda r: r.get("timestamp")),
+    ExportColumn("patient_id", "string", lambda r: _enhancement(r).get("patient_id")),
+    ExportColumn("patient_name", "string", lambda r: _enhancement(r).get("patient_name")),
+    ExportColumn("provider", "string", lambda r: _enhancement(r).get("provider")),
+    ExportColumn("date_of_service", "string", lambda r: _enhancement(r).get("date_of_service")),
+    ExportColumn("is_new_patient", "bool", lambda r: _auditor(r).get("is_new_patient", _enhancement(r).get("is_new_patient"))),
+    ExportColumn("assigned_code", "string", lambda r: _enhancement(r).get("assigned_code")),
+    ExportColumn("final_assigned_code", "string", lambda r: _auditor(r).get("final_assigned_code")),
+    ExportColumn("code_changed", "bool", _code_changed),
+    ExportColumn(
+        "guideline_version", "string",
+        lambda r: _auditor(r).get("guideline_version") or _enhancement(r).get("guideline_version")
+    ),
+    ExportColumn("confidence_score", "int", lambda r: (_auditor(r).get("confidence") or {}).get("score")),
+    ExportColumn("confidence_tier", "string", lambda r: (_auditor(r).get("confidence") or {}).get("tier")),
+    ExportColumn("audit_flags_count", "int", lambda r: len(_auditor(r).get("audit_flags") or [])),
+    ExportColumn(
+        "compliance_alerts_count", "int",
+        lambda r: len((_auditor(r).get("final_justification") or {}).get("complianceAlerts") or [])
+        if isinstance(_auditor(r).get("final_justification"), dict) else 0
+    ),
+    ExportColumn("enhancement_total_seconds", "float", lambda r: _metrics(_enhancement(r)).get("total_execution_time")),
+    *[
+        ExportColumn(f"enhancement_{step}_seconds", "float", _step_getter(_enhancement, step))
+        for step in ENHANCEMENT_TIMING_STEPS
+    ],
+    ExportColumn("auditor_total_seconds", "float", lambda r: _metrics(_auditor(r)).get("total_execution_time")),
+    *[
+        ExportColumn(f"auditor_{step}_seconds", "float", _step_getter(_auditor, step))
+        for step in AUDITOR_TIMING_STEPS
+    ],
+    ExportColumn("enhancement_activity_seconds", "float", lambda r: (r.get("enhancement_performance") or {}).get("activity_execution_time")),
+    ExportColumn("audit_activity_seconds", "float", lambda r: (r.get("audit_performance") or {}).get("activity_execution_time")),
+]
+
+_CASTS = {"string": str, "int": int, "float": float, "bool": bool}
+
+
+def _coerce(value: Any, column_type: str) -> Any:
+    """Cast value to the column type; values that cannot be cast become null."""
+    if value is None or value == "":
+        return None
+    try:
+        return _CASTS[column_type](value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_audit_result(result: Dict[str, Any], instance_id: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten one pipeline result into a typed row keyed by AUDIT_EXPORT_COLUMNS."""
+    if instance_id is not None:
+        result = {**result, "instance_id": instance_id}
+    return {column.name: _coerce(column.getter(result), column.type) for column in AUDIT_EXPORT_COLUMNS}
+
+
+def iter_csv_chunks(rows: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """Yield CSV text (header first) in chunks of at most batch_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    columns = [column.name for column in AUDIT_EXPORT_COLUMNS]
+    writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if row[name] is None else row[name] for name in columns])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def parquet_schema():
+    """Arrow schema for AUDIT_EXPORT_COLUMNS."""
+    _require_pyarrow()
+    arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_()}
+    return pa.schema([(column.name, arrow_types[column.type]) for column in AUDIT_EXPORT_COLUMNS])
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], output: BinaryIO, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write rows to output as Parquet, one record batch per batch_size rows.
+
+    Returns:
+        Number of rows written
+    """
+    schema = parquet_schema()
+    row_count = 0
+    with pq.ParquetWriter(output, schema, compression="snappy") as writer:
+        batch: List[Dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                row_count += len(batch)
+                batch = []
+        if batch or not row_count:
+            # An empty batch still yields a valid file with the schema
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            row_count += len(batch)
+    return row_count
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet export (pip install pyarrow)")